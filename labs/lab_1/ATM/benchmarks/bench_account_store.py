@@ -0,0 +1,71 @@
+"""Memory and mutation cost: dict of frozen AccountData vs compact AccountStore.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_account_store.py [--size 200000]
+"""
+
+import argparse
+import dataclasses
+import tracemalloc
+from decimal import Decimal
+
+from bench_utils import card_number, timed
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.account_store import AccountStore
+
+
+def make_rows(size: int) -> list[tuple[str, str, str]]:
+    """Raw (card, pin hash, balance) rows as they come out of bank_accounts.json."""
+    return [(card_number(i), f"hashed_pin_{i % 10000:04d}", str(1000 + i % 5000))
+            for i in range(size)]
+
+
+def make_account(row: tuple[str, str, str]) -> AccountData:
+    return AccountData(row[0], row[1], Decimal(row[2]), False, False, None, "12/28")
+
+
+def measure(label: str, build, size: int) -> object:
+    """Build a container and report retained bytes per account (card number strings excluded)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    container = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"  {label:<32} {(after - before) / size:9.1f} bytes/account")
+    return container
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args()
+    size = args.size
+
+    rows = make_rows(size)
+    print(f"=== {size} accounts ===")
+    as_dict = measure(
+        "dict[str, AccountData]",
+        lambda: {row[0]: make_account(row) for row in rows},
+        size)
+    store = AccountStore()
+
+    def build_store() -> AccountStore:
+        for row in rows:
+            store.put(make_account(row))
+        return store
+    measure("AccountStore", build_store, size)
+
+    cards = [card_number(i) for i in range(0, size, max(1, size // 10000))]
+    with timed("AccountData copy per update", len(cards)):
+        for c in cards:
+            acc = as_dict[c]
+            as_dict[c] = dataclasses.replace(acc, balance=acc.balance - 1)
+    with timed("AccountStore in-place update", len(cards)):
+        for c in cards:
+            slot = store.slot(c)
+            store.set_balance(slot, store.balance(slot) - 100)
+
+
+if __name__ == "__main__":
+    main()
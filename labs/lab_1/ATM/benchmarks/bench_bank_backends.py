@@ -0,0 +1,66 @@
+"""Compare JSON (MockBankRepository) and SQLite bank backends at growing account counts.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_bank_backends.py [--sizes 10000 100000 1000000] [--ops 20]
+"""
+
+import argparse
+from decimal import Decimal
+
+from bench_utils import card_number, timed, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.sqlite_bank_repo import SqliteBankRepository
+from atm.config import Config
+
+
+def run_ops(repo, size: int, ops: int) -> None:
+    """Run the same mix of gateway-level operations against a repository."""
+    cards = [card_number((i * 7919 + 1) % size) for i in range(ops)]
+    cards = [c for c in cards if not repo.get_account(c).is_blocked] or cards
+    with timed("get_account", ops):
+        for c in cards:
+            repo.get_account(c)
+    with timed("update_balance", ops):
+        for c in cards:
+            repo.update_balance(c, Decimal("500"))
+    with timed("transfer", ops):
+        for i, c in enumerate(cards):
+            repo.transfer(c, cards[(i + 1) % len(cards)], Decimal("1"))
+    with timed("get_retained_card_numbers", ops):
+        for _ in range(ops):
+            repo.get_retained_card_numbers()
+    with timed("collect_retained_cards"):
+        repo.collect_retained_cards(repo.get_retained_card_numbers())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--ops", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        use_temp_data_dir()
+        print(f"\n=== {size} accounts ===")
+        write_accounts_json(Config.BANK_ACCOUNTS_FILE, size)
+
+        print("json:")
+        with timed("load"):
+            json_repo = MockBankRepository()
+        run_ops(json_repo, size, args.ops)
+
+        write_accounts_json(Config.BANK_ACCOUNTS_FILE, size)
+        print("sqlite:")
+        with timed("migrate from json"):
+            sqlite_repo = SqliteBankRepository()
+        sqlite_repo.close()
+        with timed("open"):
+            sqlite_repo = SqliteBankRepository()
+        run_ops(sqlite_repo, size, args.ops)
+        sqlite_repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Fleet of simulated ATMs against one local BankServer: per-call vs pipelined requests.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_bank_server.py [--accounts 10000] [--atms 1 8 32] [--ops 200]
+
+Runs the fleet against the server as it is (thread-safe repository, no server-wide lock)
+and against the previous design, where every call ran under one server lock.
+"""
+
+import argparse
+import threading
+from decimal import Decimal
+
+from bench_utils import card_number, timed, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.bank_server import BankServer
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.remote_bank_gateway import RemoteBankGateway
+from atm.config import Config
+
+
+class GlobalLockServer(BankServer):
+    """The previous design: one server-wide lock around every call, plain repository."""
+
+    def __init__(self) -> None:
+        super().__init__(BankGateway(MockBankRepository(thread_safe=False)), port=0)
+        self._lock = threading.Lock()
+
+    def dispatch(self, line: bytes):
+        with self._lock:
+            return super().dispatch(line)
+
+
+def run_fleet(port: int, atms: int, ops: int, accounts: int, pipelined: bool, label: str) -> None:
+    """Each ATM thread runs `ops` sessions: PIN check, balance, withdrawal, balance."""
+
+    def atm(index: int) -> None:
+        gw = RemoteBankGateway(port=port, pool_size=1)
+        for i in range(ops):
+            card = card_number((index * ops + i) * 7919 % accounts)
+            session = [
+                ("validate_pin", (card, "0000")),
+                ("get_balance", (card,)),
+                ("withdraw", (card, Decimal("1"))),
+                ("get_balance", (card,)),
+            ]
+            if pipelined:
+                gw.pipeline(session)
+            else:
+                for method, args in session:
+                    gw.call(method, *args)
+        gw.close()
+
+    threads = [threading.Thread(target=atm, args=(i,)) for i in range(atms)]
+    with timed(f"{label}, {'pipelined' if pipelined else 'per call'}", atms * ops * 4):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--atms", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    Config.BANK_JOURNAL_ENABLED = True  # type: ignore[misc]
+    for label, make_server in (("per-card locks", lambda: BankServer(port=0)),
+                               ("global lock", GlobalLockServer)):
+        use_temp_data_dir()
+        write_accounts_json(Config.BANK_ACCOUNTS_FILE, args.accounts)
+        server = make_server()
+        server.start()
+        try:
+            for atms in args.atms:
+                print(f"\n=== {label}: {atms} ATMs x {args.ops} sessions ===")
+                for pipelined in (False, True):
+                    run_fleet(server.port, atms, args.ops, args.accounts, pipelined, label)
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Batch jobs on MockBankRepository: one call per account vs apply_batch / add_accounts.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_bulk_operations.py [--accounts 10000] [--batch 100 1000]
+"""
+
+import argparse
+from decimal import Decimal
+
+from bench_utils import card_number, timed, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.account_operation import AccountOperation, OperationType
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    for batch in args.batch:
+        use_temp_data_dir()
+        print(f"\n=== {batch} changes, {args.accounts} accounts ===")
+        write_accounts_json(Config.BANK_ACCOUNTS_FILE, args.accounts)
+        repo = MockBankRepository()
+        cards = [card_number(i) for i in range(batch) if i % 97]
+        new = [AccountData(card_number(args.accounts + i), "hashed_pin_0000", Decimal("1"))
+               for i in range(batch)]
+
+        with timed("fee: update_balance per card", len(cards)):
+            for c in cards:
+                repo.update_balance(c, repo.get_account(c).balance - Decimal("1"))
+        with timed("fee: apply_batch", len(cards)):
+            repo.apply_batch(AccountOperation(OperationType.ADJUST_BALANCE, c, amount=Decimal("-1"))
+                             for c in cards)
+        with timed("seed: add_account per account", batch):
+            for account in new:
+                repo.add_account(account)
+        with timed("seed: add_accounts", batch):
+            repo.add_accounts(new)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cost of watermark alerts on the cash path.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_cash_alerts.py [--ops 200000] [--sink-delay 0.01]
+
+Times --ops cassette movements (add/remove of one note) with alerts off, with the incremental
+WatermarkMonitor and a file sink, and with a rescan of every denomination after each movement
+(what a periodic checker does per tick): once at half fill (no level changes) and once at the
+low watermark (every movement crosses it and raises an alert). Then a sink that takes
+--sink-delay seconds per alert shows that a slow sink does not slow the cash path (alerts
+beyond the queue are dropped).
+"""
+
+import argparse
+import time
+
+from bench_utils import timed, use_temp_data_dir
+
+from atm.cash_handling.cash_alerts import AlertDispatcher, AlertSink, FileAlertSink
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.config import Config
+
+
+class SlowSink(AlertSink):
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def send(self, alert) -> None:
+        time.sleep(self.delay)
+
+
+def prepared(alerts, fill: float) -> CashInventory:
+    """Inventory with every denomination at fill of its capacity."""
+    inv = CashInventory(alerts=alerts)
+    for denom in inv.get_counts():
+        inv.set_count(denom, int(inv.get_capacity(denom) * fill))
+    return inv
+
+
+def move(inv: CashInventory, ops: int, rescan: bool = False) -> None:
+    denoms = list(inv.get_counts())
+    for k in range(ops):
+        denom = denoms[k % len(denoms)]
+        if (k // len(denoms)) % 2:
+            inv.add_notes(denom, 1)
+        else:
+            inv.remove_notes(denom, 1)
+        if rescan:
+            for i, notes in enumerate(inv.cassettes.totals):
+                inv.watermarks.update(i, notes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--sink-delay", type=float, default=0.01)
+    args = parser.parse_args()
+    use_temp_data_dir()
+    Config.CASH_ALERT_SINKS = ()  # type: ignore[misc]
+    for title, fill in (("half full, no alerts", 0.5), ("at the low watermark, every movement alerts",
+                                                        Config.CASH_LOW_FILL)):
+        print(f"{args.ops} cassette movements, {title}:")
+        inv = prepared(None, fill)
+        with timed("alerts off", args.ops):
+            move(inv, args.ops)
+        inv.close()
+        for label, rescan in (("incremental check, file sink", False), ("rescan all denominations", True)):
+            dispatcher = AlertDispatcher([FileAlertSink()], queue_size=args.ops + 1)
+            inv = prepared(dispatcher, fill)
+            with timed(label, args.ops):
+                move(inv, args.ops, rescan)
+            with timed("  + deliver queued alerts"):
+                dispatcher.flush()
+            inv.close()
+    dispatcher = AlertDispatcher([SlowSink(args.sink_delay)])
+    inv = prepared(dispatcher, Config.CASH_LOW_FILL)
+    with timed(f"sink sleeping {args.sink_delay} s per alert", args.ops):
+        move(inv, args.ops)
+    print(f"    {dispatcher.dropped} alerts dropped (queue of {Config.CASH_ALERT_QUEUE_SIZE})")
+    dispatcher.sinks.clear()  # do not wait for the slow sink to drain the queue on close
+    inv.close()
+
+
+if __name__ == "__main__":
+    main()
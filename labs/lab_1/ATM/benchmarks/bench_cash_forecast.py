@@ -0,0 +1,82 @@
+"""Cost and output of the cash depletion forecast on a synthetic event history.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_cash_forecast.py [--weeks 8] [--per-day 150] [--scenarios 1000 2000 5000]
+
+Writes --weeks of dispense and recycle events (busy weekday lunch hours and evenings, quiet
+nights) to the cash event log, then times reading the log into a DemandModel, forecasting
+when every denomination runs out for each --scenarios count, and the recommended
+replenishment mix; prints the forecast for the largest run.
+"""
+
+import argparse
+import random
+import time
+
+from bench_utils import timed, use_temp_data_dir
+
+from atm.cash_handling.cash_event_log import CashEventLog, read_cash_events
+from atm.cash_handling.dispense_planner import DispensePlanner
+from atm.cash_management.cash_forecast import CashForecaster, DemandModel
+from atm.config import Config
+
+DENOMS = Config.ATM_CASH_DENOMINATIONS
+AMOUNTS = (100, 200, 300, 500, 700, 1000, 1500, 2000, 3000, 5000)
+WEIGHTS = (10, 14, 8, 14, 5, 14, 5, 8, 4, 3)
+HOUR_WEIGHTS = [0.2] * 7 + [1, 2, 2, 2, 3, 4, 3, 2, 2, 3, 4, 4, 3, 2, 1, 0.5]
+
+
+def write_history(weeks: int, per_day: int, end: float) -> int:
+    """Synthetic events for the weeks before end; returns how many were written."""
+    rnd = random.Random(7)
+    planner = DispensePlanner(DENOMS)
+    planner.update({d: 10**6 for d in DENOMS})
+    clock = [0.0]
+    log = CashEventLog(clock=lambda: clock[0])
+    start = end - weeks * 7 * 86400
+    total = sum(HOUR_WEIGHTS)
+    events = 0
+    for day in range(weeks * 7):
+        scale = 0.6 if time.localtime(start + day * 86400).tm_wday >= 5 else 1.0
+        for hour, weight in enumerate(HOUR_WEIGHTS):
+            for _ in range(int(per_day * scale * weight / total + rnd.random())):
+                clock[0] = start + day * 86400 + hour * 3600 + rnd.random() * 3600
+                if rnd.random() < 0.25:
+                    log.record("recycle", {rnd.choice((50, 100, 200)): rnd.randint(1, 5)})
+                else:
+                    log.record("dispense", planner.plan(rnd.choices(AMOUNTS, WEIGHTS)[0]) or {})
+                events += 1
+    log.close()
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--per-day", type=int, default=150)
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[1000, 2000, 5000])
+    args = parser.parse_args()
+    use_temp_data_dir()
+    now = time.time()
+    events = write_history(args.weeks, args.per_day, now)
+    print(f"{events} events over {args.weeks} weeks, {Config.FORECAST_HORIZON_HOURS} h horizon:")
+    with timed("read log + build model"):
+        model = DemandModel.from_events(read_cash_events(), DENOMS, end=now)
+    counts = {20: 300, 50: 400, 100: 600, 200: 500, 500: 300, 1000: 150}
+    room = {d: Config.CASSETTE_CAPACITY - k for d, k in counts.items()}
+    forecast = mix = None
+    for scenarios in args.scenarios:
+        forecaster = CashForecaster(model, scenarios=scenarios, seed=1)
+        with timed(f"forecast, {scenarios} scenarios"):
+            forecast = forecaster.forecast(counts, start=now)
+        with timed(f"mix, {scenarios} scenarios"):
+            mix = forecaster.recommend_mix(counts, room, start=now)
+    assert forecast is not None and mix is not None
+    for denom, f in forecast.items():
+        print(f"    {denom:>5}: {f.notes:>4} notes, empty in median {f.median_hours} h, "
+              f"p10 {f.p10_hours} h, P(empty) {f.empty_probability:.2f}")
+    print(f"    recommended mix for {Config.FORECAST_COVER_HOURS} h: {mix}")
+
+
+if __name__ == "__main__":
+    main()
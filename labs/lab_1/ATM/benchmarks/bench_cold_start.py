@@ -0,0 +1,40 @@
+"""Cold-start time of MockBankRepository: JSON parse vs binary snapshot.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_cold_start.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+
+from bench_utils import card_number, timed, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        use_temp_data_dir()
+        print(f"\n=== {size} accounts ===")
+        write_accounts_json(Config.BANK_ACCOUNTS_FILE, size)
+
+        Config.BANK_SNAPSHOT_ENABLED = False  # type: ignore[misc]
+        with timed("start from JSON"):
+            MockBankRepository()
+
+        Config.BANK_SNAPSHOT_ENABLED = True  # type: ignore[misc]
+        with timed("start from JSON + write snapshot"):
+            MockBankRepository()
+        with timed("start from snapshot"):
+            repo = MockBankRepository()
+        with timed("first get_account (lazy decode)"):
+            repo.get_account(card_number(size // 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Dispense feasibility: incremental bitset table vs rebuilding it vs the old greedy pass.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_dispense_planner.py [--notes 50 500 2000] [--checks 20000]
+
+For cassettes of --notes notes each: time of can_pay on random amounts (multiples of 10),
+of plan(), and of updating the table after a dispense (incremental vs full rebuild).
+Also counts amounts the old greedy pass rejects although they are payable, and cross-checks
+every amount against a plain per-note boolean DP (up to 100 notes per cassette).
+Finally compares CashInventory.nearest_dispensable / max_dispensable (cached bitset) with
+scanning outward from the amount with planner checks.
+"""
+
+import argparse
+import random
+
+from bench_utils import timed, use_temp_data_dir
+
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_handling.dispense_planner import DispensePlanner
+from atm.config import Config
+
+DENOMS = Config.ATM_CASH_DENOMINATIONS
+CHECK_MAX_NOTES = 100
+"""The per-note DP is too slow beyond this many notes per cassette."""
+
+
+def greedy_can_pay(counts: dict[int, int], amount: int) -> bool:
+    """The former CashInventory.can_dispense (without the multiple-of-100 rule)."""
+    remaining = amount
+    for denom in sorted(counts, reverse=True):
+        remaining -= min(remaining // denom, counts[denom]) * denom
+    return remaining == 0
+
+
+def naive_payable(counts: dict[int, int], total: int) -> list[bool]:
+    """Boolean DP over every single note (O(total * notes / 10))."""
+    payable = [False] * (total // 10 + 1)
+    payable[0] = True
+    for denom, count in counts.items():
+        step = denom // 10
+        for _ in range(count):
+            for a in range(len(payable) - 1, step - 1, -1):
+                if payable[a - step]:
+                    payable[a] = True
+    return payable
+
+
+def run(notes: int, checks: int, check: bool) -> None:
+    rnd = random.Random(notes)
+    counts = {d: notes for d in DENOMS}
+    total = sum(d * k for d, k in counts.items())
+    amounts = [10 * rnd.randrange(total // 10 + 1) for _ in range(checks)]
+    planner = DispensePlanner(DENOMS)
+    planner.update(counts)
+    print(f"{notes} notes per cassette (total {total}):")
+    with timed("can_pay, incremental table", checks):
+        for amount in amounts:
+            planner.can_pay(amount)
+    with timed("plan", checks):
+        for amount in amounts:
+            planner.plan(amount)
+    with timed("greedy pass", checks):
+        for amount in amounts:
+            greedy_can_pay(counts, amount)
+    rebuilds = max(1, checks // 100)
+    with timed("can_pay, table rebuilt per check", rebuilds):
+        for amount in amounts[:rebuilds]:
+            fresh = DispensePlanner(DENOMS)
+            fresh.update(counts)
+            fresh.can_pay(amount)
+    updates = []
+    for _ in range(rebuilds):
+        state = dict(counts)
+        for d in (100, 200, 500, 1000):
+            state[d] = notes - rnd.randint(0, min(notes, 5))
+        updates.append(state)
+    with timed("update after dispense (large notes)", rebuilds):
+        for state in updates:
+            planner.update(state)
+    state = updates[-1]
+    missed = sum(1 for amount in amounts
+                 if planner.can_pay(amount) and not greedy_can_pay(state, amount))
+    print(f"    payable amounts greedy rejects: {missed} of {checks}")
+    if check and notes <= CHECK_MAX_NOTES:
+        payable = naive_payable(state, sum(d * k for d, k in state.items()))
+        assert all(planner.can_pay(10 * a) == ok for a, ok in enumerate(payable))
+        print("    cross-check against per-note DP: ok")
+
+
+def scan_nearest(planner: DispensePlanner, amount: int) -> int | None:
+    """Nearest payable withdrawal amount by probing amount, amount -/+ 100, ..."""
+    step = Config.WITHDRAW_AMOUNT_MULTIPLE
+    top = Config.MAX_WITHDRAW_AMOUNT_PER_DAY
+    base = amount // step * step
+    for offset in range(0, top + step, step):
+        for candidate in (base - offset, base + offset + step if offset else base + step):
+            if Config.MIN_WITHDRAW_AMOUNT <= candidate <= top and planner.can_pay(candidate):
+                return candidate
+    return None
+
+
+def run_queries(checks: int) -> None:
+    use_temp_data_dir()
+    rnd = random.Random(checks)
+    inventory = CashInventory()
+    for denom in DENOMS:
+        inventory.set_count(denom, 0)
+    inventory.set_count(1000, 3)
+    inventory.set_count(500, 1)
+    planner = DispensePlanner(DENOMS)
+    planner.update(inventory.get_counts())
+    amounts = [100 * rnd.randint(1, Config.MAX_WITHDRAW_AMOUNT_PER_DAY // 100) for _ in range(checks)]
+    print("suggestions for a nearly empty ATM (3x1000, 1x500):")
+    with timed("nearest_dispensable, cached bitset", checks):
+        for amount in amounts:
+            inventory.nearest_dispensable(amount)
+    with timed("max_dispensable, cached bitset", checks):
+        for _ in amounts:
+            inventory.max_dispensable()
+    with timed("nearest, planner scan", checks):
+        for amount in amounts:
+            scan_nearest(planner, amount)
+    with timed("bitset rebuild after a change", 100):
+        for i in range(100):
+            inventory.set_count(20, i % 2)
+            inventory.max_dispensable()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--no-check", action="store_true", help="skip the per-note DP cross-check")
+    args = parser.parse_args()
+    for notes in args.notes:
+        run(notes, args.checks, not args.no_check)
+    run_queries(args.checks)
+
+
+if __name__ == "__main__":
+    main()
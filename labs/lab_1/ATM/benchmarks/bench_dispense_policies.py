@@ -0,0 +1,78 @@
+"""Replay a synthetic withdrawal stream under each dispense policy until the first failure.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_dispense_policies.py [--notes 500] [--seeds 1 2 3] [--policies largest_first balance_fill]
+
+Every cassette starts with --notes notes. Withdrawals (multiples of 100, mostly small, a few
+large) are served in memory with DispensePlanner and the policy until the first amount that
+cannot be dispensed, which would be the first customer-facing "cannot dispense" error.
+Reports withdrawals served, how many were served before the first cassette ran empty (what
+usually triggers a cash-in-transit visit), cash paid out, notes left and replay time per withdrawal.
+"""
+
+import argparse
+import random
+
+from bench_utils import timed
+
+from atm.cash_handling.dispense_planner import DispensePlanner
+from atm.cash_handling.dispense_policy import POLICIES
+from atm.config import Config
+
+DENOMS = Config.ATM_CASH_DENOMINATIONS
+AMOUNTS = (100, 200, 300, 500, 700, 1000, 1500, 2000, 3000, 5000)
+WEIGHTS = (10, 14, 8, 14, 5, 14, 5, 8, 4, 3)
+
+
+def stream(seed: int):
+    rnd = random.Random(seed)
+    while True:
+        yield rnd.choices(AMOUNTS, WEIGHTS)[0]
+
+
+def replay(
+    policy_name: str, notes: int, seed: int, limit: int
+) -> tuple[int, int, int, dict[int, int]]:
+    policy = POLICIES[policy_name]()
+    planner = DispensePlanner(DENOMS)
+    counts = {d: notes for d in DENOMS}
+    planner.update(counts)
+    served = paid = 0
+    first_empty = None
+    for amount in stream(seed):
+        if served >= limit:
+            break
+        plan = policy.choose(planner, amount)
+        if plan is None:
+            break
+        for denom, count in plan.items():
+            counts[denom] -= count
+        planner.update(counts)
+        served += 1
+        paid += amount
+        if first_empty is None and not all(counts.values()):
+            first_empty = served
+    return served, first_empty or served, paid, counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES))
+    parser.add_argument("--limit", type=int, default=1_000_000, help="stop after this many withdrawals")
+    args = parser.parse_args()
+    total = args.notes * sum(DENOMS)
+    print(f"{args.notes} notes per cassette ({total} {Config.DEFAULT_CURRENCY}), seeds {args.seeds}:")
+    for name in args.policies:
+        results = [replay(name, args.notes, seed, args.limit) for seed in args.seeds]
+        served, first_empty, paid = (sum(r[i] for r in results) / len(results) for i in range(3))
+        with timed(f"{name}, replay time", int(served)):
+            replay(name, args.notes, args.seeds[0], int(served))
+        print(f"    {served:.0f} withdrawals until first failure, {first_empty:.0f} until a cassette "
+              f"is empty, {100 * paid / total:.1f}% of cash paid out")
+        print(f"    notes left (seed {args.seeds[0]}): " + ", ".join(f"{d}: {results[0][3][d]}" for d in DENOMS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Fleet cash scan over many ATM data directories: cold, cached and partly changed.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_fleet_cash.py [--atms 5000] [--changed 0.05] [--workers 0]
+
+Creates --atms data directories with an atm_state.json each, then times scan_fleet with an
+empty cache (every file parsed, in a process pool), with a warm cache (only stat calls) and
+after --changed of the machines wrote new state, plus the table queries.
+"""
+
+import argparse
+import os
+import random
+
+from bench_utils import timed, use_temp_data_dir
+
+from atm.cash_management.fleet_cash import discover_data_dirs, scan_fleet
+from atm.config import Config
+from atm.session_manager.state_saver import StateSaver
+
+
+def write_state(path, rnd: random.Random) -> None:
+    counts = {str(d): rnd.randint(0, Config.CASSETTE_CAPACITY) for d in Config.ATM_CASH_DENOMINATIONS}
+    counts["cassettes"] = [[d, counts[str(d)]] for d in Config.ATM_CASH_DENOMINATIONS]
+    StateSaver(path=path).save({"cash_inventory": counts})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--atms", type=int, default=5000)
+    parser.add_argument("--changed", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=0, help="0 = CPU count")
+    args = parser.parse_args()
+    root = use_temp_data_dir() / "fleet"
+    rnd = random.Random(1)
+    paths = []
+    for i in range(args.atms):
+        data_dir = root / f"atm{i:06d}"
+        data_dir.mkdir(parents=True)
+        paths.append(data_dir / Config.ATM_STATE_FILE.name)
+        write_state(paths[-1], rnd)
+    dirs = discover_data_dirs(root)
+    print(f"{len(dirs)} ATMs, {args.workers or os.cpu_count()} workers:")
+    with timed("cold scan (parse all)", len(dirs)):
+        table = scan_fleet(dirs, workers=args.workers)
+    with timed("cold scan, one process", len(dirs)):
+        Config.FLEET_CACHE_FILE.unlink()
+        scan_fleet(dirs, workers=1)
+    with timed("warm scan (cache hits)", len(dirs)):
+        scan_fleet(dirs, workers=args.workers)
+    for path in rnd.sample(paths, int(len(paths) * args.changed)):
+        write_state(path, rnd)
+    with timed(f"scan, {args.changed:.0%} changed", len(dirs)):
+        table = scan_fleet(dirs, workers=args.workers)
+    with timed("totals + below + top 10"):
+        totals = table.totals()
+        low = table.below(200_000)
+        top = table.top(10)
+    print(f"    {table.total_amount()} {Config.DEFAULT_CURRENCY} in total, {len(low)} ATMs below 200000, "
+          f"fullest {top[0][1]}; 1000 notes: {totals[1000]}")
+
+
+if __name__ == "__main__":
+    main()
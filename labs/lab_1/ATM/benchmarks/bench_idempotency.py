@@ -0,0 +1,66 @@
+"""Cost of idempotency keys on BankGateway withdrawals.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_idempotency.py [--ops 2000] [--keys 100000]
+
+Compares withdrawals without a key, with a fresh key (one extra fsync'd log record) and
+replayed keys (no balance change), then measures lookups in a full table of --keys keys.
+"""
+
+import argparse
+import uuid
+from decimal import Decimal
+
+from bench_utils import card_number, timed, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.idempotency_store import IdempotencyStore
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+
+
+def run_gateway(ops: int) -> None:
+    use_temp_data_dir()
+    write_accounts_json(Config.BANK_ACCOUNTS_FILE, 1000)
+    gw = BankGateway(MockBankRepository(), cache_size=0, withdrawal_limits=None)
+    card = card_number(1)
+    gw.deposit(card, Decimal(ops * 3))
+    amount = Decimal("1")
+    keys = [uuid.uuid4().hex for _ in range(ops)]
+    print(f"{ops} withdrawals:")
+    with timed("no key", ops):
+        for _ in range(ops):
+            gw.withdraw(card, amount, operation="payment")
+    with timed("fresh key", ops):
+        for key in keys:
+            gw.withdraw(card, amount, operation="payment", idempotency_key=key)
+    with timed("replayed key", ops):
+        for key in keys:
+            gw.withdraw(card, amount, operation="payment", idempotency_key=key)
+
+
+def run_table(keys: int) -> None:
+    store = IdempotencyStore(max_keys=keys, persist=False)
+    names = [f"atm-1:{i}" for i in range(keys)]
+    print(f"table of {keys} keys:")
+    with timed("remember (with eviction beyond max)", keys):
+        for name in names:
+            store.remember(name, "withdraw", True)
+        for name in names[:keys // 10]:
+            store.remember(name + ":new", "withdraw", True)
+    with timed("lookup", keys):
+        for name in names:
+            store.lookup(name, "withdraw")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=100_000)
+    args = parser.parse_args()
+    run_gateway(args.ops)
+    run_table(args.keys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Ledger queries: per-card offset index vs scanning the whole ledger file.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_ledger.py [--entries 10000 100000] [--cards 1000] [--queries 200]
+
+Entries are appended in batches (one fsync per batch) to keep set-up time reasonable.
+History: last 10 entries of a random card. Balance: snapshot plus deltas vs summing every entry.
+File scans run on 1/20 of the queries (compare the per-query times).
+"""
+
+import argparse
+import json
+import random
+from decimal import Decimal
+
+from bench_utils import card_number, timed, use_temp_data_dir
+
+from atm.bank_communication.account_ledger import AccountLedger
+from atm.config import Config
+
+
+def scan_history(card: str, limit: int) -> list[dict]:
+    with open(Config.BANK_LEDGER_FILE, "rb") as f:
+        entries = [data for data in map(json.loads, f) if data["card"] == card]
+    return entries[-limit:]
+
+
+def scan_balance(card: str) -> Decimal:
+    total = Decimal("0")
+    with open(Config.BANK_LEDGER_FILE, "rb") as f:
+        for data in map(json.loads, f):
+            if data["card"] == card:
+                total += Decimal(data["delta"])
+    return total
+
+
+def run(entries: int, cards: int, queries: int) -> None:
+    use_temp_data_dir()
+    rnd = random.Random(entries)
+    ledger = AccountLedger()
+    ledger.seed({card_number(i): Decimal("0") for i in range(cards)})
+    batch = 1000
+    for start in range(0, entries, batch):
+        movements = [(card_number(rnd.randrange(cards)), Decimal(rnd.randint(-50, 50)))
+                     for _ in range(min(batch, entries - start))]
+        ledger.append_many(movements, "deposit")
+    sample = [card_number(rnd.randrange(cards)) for _ in range(queries)]
+    scans = sample[:max(1, queries // 20)]
+    print(f"{entries} entries, {cards} cards:")
+    with timed("history, offset index", queries):
+        for card in sample:
+            ledger.history(card, limit=10)
+    with timed("history, file scan", len(scans)):
+        for card in scans:
+            scan_history(card, 10)
+    with timed("balance, snapshot + deltas", queries):
+        for card in sample:
+            ledger.balance(card)
+    with timed("balance, file scan", len(scans)):
+        for card in scans:
+            scan_balance(card)
+    ledger.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    for entries in args.entries:
+        run(entries, args.cards, args.queries)
+
+
+if __name__ == "__main__":
+    main()
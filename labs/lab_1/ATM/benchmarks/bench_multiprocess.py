@@ -0,0 +1,85 @@
+"""Several ATM processes sharing one bank_accounts.json (MockBankRepository shared mode).
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_multiprocess.py [--accounts 1000] [--procs 2 4 8 16] [--ops 100]
+
+Each process runs withdrawals, deposits and transfers through its own BankGateway; afterwards
+the total of all balances must equal the initial total plus deposits minus withdrawals.
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from bench_utils import card_number, use_data_dir, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+
+
+def atm_process(data_dir: str, seed: int, ops: int, accounts: int, net) -> None:
+    """One ATM: mixed operations on the shared file; adds its deposits minus withdrawals to `net`."""
+    use_data_dir(Path(data_dir))
+    repo = MockBankRepository(shared=True)
+    gw = BankGateway(repo, cache_size=0)
+    rnd = random.Random(seed)
+    cards = [card_number(i) for i in range(accounts) if i % 97]
+    delta = 0
+    for _ in range(ops):
+        card = rnd.choice(cards)
+        kind = rnd.random()
+        if kind < 0.4:
+            if gw.withdraw(card, Decimal("7")):
+                delta -= 7
+        elif kind < 0.7:
+            if gw.deposit(card, Decimal("5")):
+                delta += 5
+        else:
+            gw.transfer(card, rnd.choice(cards), Decimal("3"))
+    repo.close()
+    with net.get_lock():
+        net.value += delta
+
+
+def total_balance() -> Decimal:
+    repo = MockBankRepository()
+    total = sum(acc.balance for acc in repo.get_all_accounts().values())
+    repo.close()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--procs", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--ops", type=int, default=100)
+    args = parser.parse_args()
+    ctx = multiprocessing.get_context("spawn")
+
+    for procs in args.procs:
+        data_dir = use_temp_data_dir()
+        write_accounts_json(Config.BANK_ACCOUNTS_FILE, args.accounts)
+        initial = total_balance()
+        net = ctx.Value("q", 0)
+        workers = [ctx.Process(target=atm_process,
+                               args=(str(data_dir), i, args.ops, args.accounts, net))
+                   for i in range(procs)]
+        start = time.perf_counter()
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+        elapsed = time.perf_counter() - start
+        final = total_balance()
+        expected = initial + net.value
+        status = "OK" if final == expected else f"VIOLATED (off by {final - expected})"
+        print(f"  {procs:3d} processes  {procs * args.ops / elapsed:8.0f} ops/s  "
+              f"({elapsed:.2f} s incl. startup)  invariant {status}")
+
+
+if __name__ == "__main__":
+    main()
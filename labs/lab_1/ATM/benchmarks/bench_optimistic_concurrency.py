@@ -0,0 +1,74 @@
+"""Lock-based vs optimistic (versioned compare-and-set) withdraw/deposit under concurrent threads.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_optimistic_concurrency.py [--accounts 1 16 1000] [--threads 1 4 16] [--ops 500]
+
+Locked: thread-safe repository, the gateway holds the card lock around read-modify-write.
+Optimistic: no per-account locks; the balance is written with expected_version and re-read on
+conflict. Fewer accounts mean more contention (and more retries). The balance total must equal
+the initial total plus deposits minus withdrawals.
+"""
+
+import argparse
+import random
+import threading
+import time
+from decimal import Decimal
+
+from bench_utils import card_number, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+
+
+def run(threads: int, ops: int, accounts: int, optimistic: bool) -> None:
+    use_temp_data_dir()
+    write_accounts_json(Config.BANK_ACCOUNTS_FILE, max(accounts, 2))
+    repo = MockBankRepository(journal=True, thread_safe=not optimistic)
+    gw = BankGateway(repo, cache_size=0, optimistic=optimistic)
+    cards = [card_number(i) for i in range(max(accounts, 2))
+             if not repo.is_card_blocked(card_number(i))][:accounts]
+    initial = sum(acc.balance for acc in repo.get_all_accounts().values())
+    net = [Decimal("0")] * threads
+
+    def worker(index: int) -> None:
+        rnd = random.Random(index)
+        for _ in range(ops):
+            card = rnd.choice(cards)
+            if rnd.random() < 0.5:
+                if gw.withdraw(card, Decimal("7")):
+                    net[index] -= 7
+            elif gw.deposit(card, Decimal("5")):
+                net[index] += 5
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    final = sum(acc.balance for acc in repo.get_all_accounts().values())
+    status = "OK" if final == initial + sum(net) else "VIOLATED"
+    mode = "optimistic" if optimistic else "locked"
+    print(f"  {mode:<11} {accounts:5d} accounts {threads:3d} threads  "
+          f"{threads * ops / elapsed:10.0f} ops/s  retries {gw.cas_retries:6d}  invariant {status}")
+    repo.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1, 16, 1000])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--ops", type=int, default=500)
+    args = parser.parse_args()
+
+    for accounts in args.accounts:
+        for threads in args.threads:
+            run(threads, args.ops, accounts, optimistic=False)
+            run(threads, args.ops, accounts, optimistic=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Simulate how much note recycling extends the time between cash replenishments.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_recycling.py [--notes 200] [--deposit-share 0.3] [--per-day 150] [--seeds 1 2 3]
+
+Every cassette starts with --notes notes. A synthetic stream of customer events (withdrawals,
+and with probability --deposit-share a deposit of a few notes) runs against CashInventory and
+NoteRecycler until the ATM needs a cash-in-transit visit: the first withdrawal it cannot pay or
+the first deposit it cannot take. Compares recycling off (every deposit goes to the deposit bin)
+with recycling of all denominations, and reports events and days (at --per-day events) until
+the visit and why it was needed.
+"""
+
+import argparse
+import random
+from typing import Optional
+
+from bench_utils import timed, use_temp_data_dir
+
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_handling.note_recycler import NoteRecycler
+from atm.config import Config
+
+AMOUNTS = (100, 200, 300, 500, 700, 1000, 1500, 2000, 3000, 5000)
+WEIGHTS = (10, 14, 8, 14, 5, 14, 5, 8, 4, 3)
+DEPOSIT_DENOMS = (20, 50, 100, 200, 500, 1000)
+DEPOSIT_WEIGHTS = (10, 25, 30, 20, 10, 5)
+
+
+def simulate(notes: int, deposit_share: float, seed: int, recycle: bool) -> tuple[int, str, int, int]:
+    """Events until a visit is needed, the reason, cash paid out and cash taken in."""
+    use_temp_data_dir()
+    Config.ATM_STATE_FLUSH_INTERVAL_SECONDS = 3600.0  # type: ignore[misc]
+    inv = CashInventory()
+    for denom in inv.get_counts():
+        inv.set_count(denom, notes)
+    recycler = NoteRecycler(denominations=None if recycle else ())
+    rnd = random.Random(seed)
+    events = paid = taken = 0
+    reason: Optional[str] = None
+    while reason is None:
+        events += 1
+        if rnd.random() < deposit_share:
+            bundle: dict[int, int] = {}
+            for denom in rnd.choices(DEPOSIT_DENOMS, DEPOSIT_WEIGHTS, k=rnd.randint(1, 15)):
+                bundle[denom] = bundle.get(denom, 0) + 1
+            try:
+                recycler.place(inv, bundle)
+                taken += sum(d * k for d, k in bundle.items())
+            except ValueError:
+                reason = "deposit refused"
+        else:
+            amount = rnd.choices(AMOUNTS, WEIGHTS)[0]
+            if inv.can_dispense(amount):
+                inv.dispense(amount)
+                paid += amount
+            else:
+                reason = "cannot dispense"
+    return events, reason, paid, taken
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--deposit-share", type=float, default=0.3)
+    parser.add_argument("--per-day", type=int, default=150, help="customer events per day")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    args = parser.parse_args()
+    print(f"{args.notes} notes per cassette, {args.deposit_share:.0%} of events are deposits, "
+          f"seeds {args.seeds}:")
+    baseline = None
+    for label, recycle in (("recycling off", False), ("recycling on", True)):
+        results = [simulate(args.notes, args.deposit_share, seed, recycle) for seed in args.seeds]
+        events = sum(r[0] for r in results) / len(results)
+        with timed(f"{label}, simulation time", int(events)):
+            simulate(args.notes, args.deposit_share, args.seeds[0], recycle)
+        reasons = ", ".join(sorted({r[1] for r in results}))
+        paid = sum(r[2] for r in results) / len(results)
+        taken = sum(r[3] for r in results) / len(results)
+        gain = "" if baseline is None else f" ({events / baseline:.2f}x)"
+        print(f"    {events:.0f} events = {events / args.per_day:.1f} days until a visit{gain} "
+              f"({reasons}); paid out {paid:.0f}, taken in {taken:.0f} {Config.DEFAULT_CURRENCY}")
+        baseline = baseline or events
+
+
+if __name__ == "__main__":
+    main()
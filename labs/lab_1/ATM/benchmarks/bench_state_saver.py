@@ -0,0 +1,80 @@
+"""Cost of persisting the cash inventory after every cash operation.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_state_saver.py [--ops 2000] [--extra-kb 64]
+
+atm_state.json gets an extra section of --extra-kb kilobytes (other components' state) next
+to cash_inventory. Compares the old save (parse the whole file, rewrite it with indent=2)
+with StateSaver.update (only the cash section re-encoded, atomic write) and with updates
+coalesced by a flush interval.
+"""
+
+import argparse
+import json
+
+from bench_utils import timed, use_temp_data_dir
+
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.config import Config
+from atm.session_manager.state_saver import StateSaver
+
+
+def seed_state(extra_kb: int) -> None:
+    use_temp_data_dir()
+    extra = {f"key{i}": "x" * 100 for i in range(extra_kb * 1024 // 112)}
+    StateSaver().save({"other": extra})
+
+
+def move(inv: CashInventory, i: int) -> None:
+    """One cash movement: alternately load and take a note, so cassettes never fill up."""
+    if i % 2:
+        inv.remove_notes(100, 1)
+    else:
+        inv.add_notes(100, 1)
+
+
+def legacy_save(counts: dict[int, int]) -> None:
+    """Pre-cache save: read and parse the file, replace the section, rewrite everything."""
+    with open(Config.ATM_STATE_FILE, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    state["cash_inventory"] = {str(k): v for k, v in counts.items()}
+    with open(Config.ATM_STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--extra-kb", type=int, default=64)
+    args = parser.parse_args()
+    print(f"{args.ops} cash operations, {args.extra_kb} KB of other state:")
+
+    seed_state(args.extra_kb)
+    inv = CashInventory()
+    with timed("parse + full rewrite", args.ops):
+        for i in range(args.ops):
+            move(inv, i)
+            legacy_save(inv.get_counts())
+
+    seed_state(args.extra_kb)
+    inv = CashInventory()
+    with timed("section update (fsync)", args.ops):
+        for i in range(args.ops):
+            move(inv, i)
+            inv.save_state()
+    print(f"    {inv._saver.writes} writes")
+
+    seed_state(args.extra_kb)
+    inv = CashInventory()
+    inv._saver.flush_interval = 0.05
+    with timed("coalesced (50 ms)", args.ops):
+        for i in range(args.ops):
+            move(inv, i)
+            inv.save_state()
+        inv.close()
+    print(f"    {inv._saver.writes} writes")
+    assert CashInventory().get_counts() == inv.get_counts()
+
+
+if __name__ == "__main__":
+    main()
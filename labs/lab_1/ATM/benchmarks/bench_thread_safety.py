@@ -0,0 +1,79 @@
+"""Stress test of a shared BankGateway: N threads of mixed operations, throughput and balance invariant.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_thread_safety.py [--accounts 1000] [--threads 1 4 16] [--ops 500] [--unsafe]
+
+The total of all balances must equal the initial total plus deposits minus withdrawals
+(transfers move money without changing it). --unsafe also runs without per-account locks
+to show lost updates.
+"""
+
+import argparse
+import random
+import threading
+import time
+from decimal import Decimal
+
+from bench_utils import card_number, use_temp_data_dir, write_accounts_json
+
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+
+
+def run(threads: int, ops: int, accounts: int, thread_safe: bool) -> None:
+    use_temp_data_dir()
+    write_accounts_json(Config.BANK_ACCOUNTS_FILE, accounts)
+    repo = MockBankRepository(journal=True, thread_safe=thread_safe)
+    gw = BankGateway(repo, cache_size=0)
+    cards = [card_number(i) for i in range(accounts) if not repo.is_card_blocked(card_number(i))]
+    initial = sum(acc.balance for acc in repo.get_all_accounts().values())
+    net = [Decimal("0")] * threads
+
+    def worker(index: int) -> None:
+        rnd = random.Random(index)
+        for _ in range(ops):
+            card = rnd.choice(cards)
+            kind = rnd.random()
+            if kind < 0.4:
+                gw.get_balance(card)
+            elif kind < 0.6:
+                if gw.withdraw(card, Decimal("7")):
+                    net[index] -= 7
+            elif kind < 0.8:
+                if gw.deposit(card, Decimal("5")):
+                    net[index] += 5
+            else:
+                gw.transfer(card, rnd.choice(cards), Decimal("3"))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    final = sum(acc.balance for acc in repo.get_all_accounts().values())
+    expected = initial + sum(net)
+    status = "OK" if final == expected else f"VIOLATED (off by {final - expected})"
+    mode = "thread-safe" if thread_safe else "unsafe"
+    print(f"  {mode:<12} {threads:3d} threads  {threads * ops / elapsed:10.0f} ops/s  invariant {status}")
+    repo.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--ops", type=int, default=500)
+    parser.add_argument("--unsafe", action="store_true")
+    args = parser.parse_args()
+
+    for threads in args.threads:
+        run(threads, args.ops, args.accounts, thread_safe=True)
+        if args.unsafe:
+            run(threads, args.ops, args.accounts, thread_safe=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Shared helpers for benchmarks: temporary data dir, synthetic accounts, timing."""
+
+import json
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from atm.config import Config  # noqa: E402
+
+
+def use_data_dir(path: Path) -> Path:
+    """Point every Config data file into `path` (e.g. in a benchmark child process) and return it."""
+    for name in dir(Config):
+        value = getattr(Config, name)
+        if isinstance(value, Path) and name != "DATA_DIR":
+            setattr(Config, name, path / value.name)
+    Config.DATA_DIR = path  # type: ignore[misc]
+    return path
+
+
+def use_temp_data_dir() -> Path:
+    """Point every Config data file into a fresh temporary directory and return it."""
+    return use_data_dir(Path(tempfile.mkdtemp(prefix="atm_bench_")))
+
+
+def card_number(i: int) -> str:
+    """Return a synthetic 16-digit card number."""
+    return f"{4000000000000000 + i:016d}"
+
+
+def write_accounts_json(path: Path, count: int) -> None:
+    """Write bank_accounts.json with `count` synthetic accounts (MockBankRepository format)."""
+    raw = {}
+    for i in range(count):
+        num = card_number(i)
+        raw[num] = {
+            "card_number": num,
+            "pin_hash": f"hashed_pin_{i % 10000:04d}",
+            "balance": str(1000 + i % 5000),
+            "is_blocked": i % 97 == 0,
+            "is_retained": i % 997 == 0,
+            "owner_name": f"Client {i}",
+            "expiry_date": "12/28",
+        }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(raw, f, ensure_ascii=False, indent=2)
+
+
+@contextmanager
+def timed(label: str, ops: int = 1) -> Iterator[None]:
+    """Print wall time of the block (and per-operation time when ops > 1)."""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if ops > 1:
+        print(f"  {label:<32} {elapsed:9.3f} s  ({elapsed / ops * 1e6:10.1f} us/op)")
+    else:
+        print(f"  {label:<32} {elapsed:9.3f} s")
@@ -0,0 +1,108 @@
+"""Daily withdrawal limit counters with millions of cards: check cost and memory per card.
+
+Usage (from labs/lab_1/ATM):
+    python3 benchmarks/bench_withdrawal_limits.py [--cards 1000000 3000000] [--ops 1000000] [--hours 30]
+
+Simulates `--hours` hours of withdrawals spread over `--cards` cards (in memory, no log) and
+compares with a naive per-card list of (timestamp, amount) that is filtered on every check.
+Few cards (e.g. --cards 1000) show the naive check growing with the card's history.
+Memory per card is measured with tracemalloc on --memory-cards cards.
+"""
+
+import argparse
+import random
+import tracemalloc
+from decimal import Decimal
+
+from bench_utils import card_number, timed
+
+from atm.bank_communication.withdrawal_limits import WithdrawalLimits
+
+HOUR = 3600.0
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000 * HOUR
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NaiveLimits:
+    """Baseline: every withdrawal kept as (timestamp, amount); the window is summed on each check."""
+
+    def __init__(self, limit: Decimal, clock: Clock) -> None:
+        self.limit = limit
+        self.clock = clock
+        self.history: dict[str, list[tuple[float, Decimal]]] = {}
+
+    def try_consume(self, card: str, amount: Decimal) -> bool:
+        now = self.clock()
+        events = [e for e in self.history.get(card, []) if e[0] > now - 24 * HOUR]
+        if sum(a for _, a in events) + amount > self.limit:
+            return False
+        events.append((now, amount))
+        self.history[card] = events
+        return True
+
+
+def memory_per_card(factory, cards: int, rounds: int) -> float:
+    """Traced memory per card after every card withdrew `rounds` times within a day."""
+    clock = Clock()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    limits = factory(clock)
+    amount = Decimal("100")
+    numbers = [card_number(i) for i in range(cards)]
+    for _ in range(rounds):
+        for card in numbers:
+            limits.try_consume(card, amount)
+        clock.now += HOUR
+    del numbers
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / cards
+
+
+def run(cards: int, ops: int, hours: int) -> None:
+    print(f"{cards} cards, {ops} withdrawals over {hours} h:")
+    rnd = random.Random(cards)
+    numbers = [card_number(rnd.randrange(cards)) for _ in range(ops)]
+    amounts = [Decimal(100 * rnd.randint(1, 5)) for _ in range(ops)]
+    step = hours * HOUR / ops
+    for name, factory in FACTORIES:
+        clock = Clock()
+        limits = factory(clock)
+        with timed(name, ops):
+            for card, amount in zip(numbers, amounts):
+                clock.now += step
+                limits.try_consume(card, amount)
+        if isinstance(limits, WithdrawalLimits):
+            print(f"    active cards at the end: {limits.active_cards()}")
+
+
+FACTORIES = (
+    ("bucketed counters", lambda c: WithdrawalLimits(Decimal("50000"), persist=False, clock=c)),
+    ("naive event lists", lambda c: NaiveLimits(Decimal("50000"), c)),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cards", type=int, nargs="+", default=[1_000_000, 3_000_000])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--hours", type=int, default=30)
+    parser.add_argument("--memory-cards", type=int, default=200_000)
+    args = parser.parse_args()
+    for cards in args.cards:
+        run(cards, args.ops, args.hours)
+    print(f"memory per card ({args.memory_cards} cards, 1 and 10 withdrawals each):")
+    for name, factory in FACTORIES:
+        once = memory_per_card(factory, args.memory_cards, 1)
+        ten = memory_per_card(factory, args.memory_cards, 10)
+        print(f"  {name:<32} {once:6.0f} / {ten:6.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 """Main ATM orchestrator: composes subsystems and runs the interaction loop."""
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Union
 
 from .config import Config
 from .session_manager.logger import Logger
@@ -11,6 +11,7 @@ from .session_manager.atm_state_machine import (
     SessionEndingState,
 )
 from .bank_communication.bank_gateway import BankGateway
+from .bank_communication.remote_bank_gateway import RemoteBankGateway
 from .card_reader.card_reader import CardReader
 from .authentication.authentication_service import AuthenticationService
 from .cash_handling.cash_inventory import CashInventory
@@ -39,7 +40,7 @@ class ATM:
     """Central orchestrator for all ATM subsystems."""
 
     logger: Logger
-    bank_gateway: BankGateway
+    bank_gateway: Union[BankGateway, RemoteBankGateway]
     card_reader: CardReader
     auth_service: AuthenticationService
     session: Session
@@ -59,11 +60,18 @@ class ATM:
     sound_player: SoundPlayer
     receipt_printer: ReceiptPrinter
 
-    def __init__(self) -> None:
-        """Initialize all subsystems (logger, gateway, card reader, UI, state machine, etc.)."""
+    def __init__(self, bank_gateway: Optional[Union[BankGateway, RemoteBankGateway]] = None) -> None:
+        """
+        Initialize all subsystems (logger, gateway, card reader, UI, state machine, etc.).
+        bank_gateway: gateway shared with other terminals of the process; by default the
+        ATM builds its own from Config.BANK_BACKEND.
+        """
         Config.ensure_data_dir()
         self.logger = Logger(log_file=str(Config.DATA_DIR / "atm.log"))
-        self.bank_gateway = BankGateway()
+        if bank_gateway is None:
+            bank_gateway = (
+                RemoteBankGateway() if Config.BANK_BACKEND == "remote" else BankGateway())
+        self.bank_gateway = bank_gateway
         self.card_reader = CardReader()
         self.auth_service = AuthenticationService(self.bank_gateway)
         self.session = Session()
@@ -134,6 +142,7 @@ class ATM:
             if self.session.is_active:
                 self.session.end()
                 self.card_reader.eject_card()
+            self.cash_inventory.close()
             self.logger.info("ATM session ended")
             self.logger.close()
 
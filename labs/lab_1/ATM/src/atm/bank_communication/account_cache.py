@@ -0,0 +1,89 @@
+"""Bounded LRU cache of account lookups with optional TTL and hit/miss counters."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from .account_data import AccountData
+
+
+class AccountCache:
+    """
+    LRU cache card number -> AccountData (None is cached too, for unknown cards).
+    Entries older than ttl_seconds are treated as misses (ttl_seconds <= 0 disables expiry).
+    Safe to share between threads: a reader takes generation() before reading the backend
+    and passes it to put(), which is skipped if an invalidation happened in between.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create empty cache holding at most max_size entries."""
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[Optional[AccountData], float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        """Bumped by every invalidate() / clear()."""
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, card_number: str) -> tuple[bool, Optional[AccountData]]:
+        """Return (True, account) on hit, (False, None) on miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(card_number)
+            if entry is not None:
+                account, stored_at = entry
+                if self.ttl_seconds <= 0 or self._clock() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(card_number)
+                    self.hits += 1
+                    return True, account
+                del self._entries[card_number]
+            self.misses += 1
+            return False, None
+
+    def generation(self) -> int:
+        """Token for put(): take it before reading the account from the backend."""
+        with self._lock:
+            return self._generation
+
+    def put(
+        self, card_number: str, account: Optional[AccountData], generation: Optional[int] = None
+    ) -> None:
+        """
+        Store lookup result, evicting the least recently used entry if full. With a generation
+        token, nothing is stored if the cache was invalidated since (the result may be stale).
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[card_number] = (account, self._clock())
+            self._entries.move_to_end(card_number)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, card_number: str) -> None:
+        """Drop cached entry for the card (after it was changed)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(card_number, None)
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hits, misses and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -30,6 +30,9 @@ class AccountData:
     expiry_date: Optional[str] = None
     """Card expiry date, e.g. MM/YY."""
 
+    version: int = 0
+    """Incremented by the repository on every change of the account (optimistic concurrency)."""
+
     def __post_init__(self) -> None:
         """Validate data after initialization."""
         if not self.card_number:
@@ -39,3 +42,5 @@ class AccountData:
             raise ValueError("Card number must be exactly 16 digits")
         if self.balance < Decimal("0"):
             raise ValueError("Balance cannot be negative")
+        if self.version < 0:
+            raise ValueError("Version cannot be negative")
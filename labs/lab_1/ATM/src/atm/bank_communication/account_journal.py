@@ -0,0 +1,132 @@
+"""Append-only journal of account changes, replayed over the JSON snapshot on startup."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterator, Optional, TextIO
+
+
+def complete_lines(path: Path) -> Iterator[tuple[int, bytes]]:
+    """(end offset, line) of every line that ends in "\n"; a torn last line (crash during append) is not yielded."""
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            yield offset, line
+
+
+def truncate_tail(path: Path, end: int) -> None:
+    """Cut everything after offset `end` off the file, so later appends start on a clean line."""
+    try:
+        if end < path.stat().st_size:
+            os.truncate(path, end)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        raise RuntimeError(f"Cannot repair log {path}: {e}") from e
+
+
+def _records(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    """(end offset, record) of every complete line up to the first torn one."""
+    for offset, line in complete_lines(path):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            yield offset, record
+
+
+def _repair(path: Path) -> None:
+    """Cut a torn tail (crash during append) off the journal."""
+    if not path.exists():
+        return
+    end = 0
+    for end, _ in _records(path):
+        pass
+    truncate_tail(path, end)
+
+
+class AccountJournal:
+    """Append-only log of account records; one compact JSON line per repository mutation."""
+
+    def __init__(self, file_path: Path) -> None:
+        """Set journal path; the file is opened lazily on first append."""
+        self.file_path = file_path
+        self.rotated_path = file_path.with_name(file_path.name + ".compacting")
+        self._handle: Optional[TextIO] = None
+
+    def append(self, record: dict[str, Any]) -> None:
+        """
+        Append one record and fsync it, so it survives a crash right after the call.
+        A torn tail left by an earlier crash is cut off before the first append.
+        """
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        try:
+            if self._handle is None:
+                _repair(self.file_path)
+                self._handle = open(self.file_path, "a", encoding="utf-8")
+            self._handle.write(line + "\n")
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        except OSError as e:
+            raise RuntimeError(
+                f"Failed to append to journal {self.file_path}: {e}") from e
+
+    def size(self) -> int:
+        """Return current journal size in bytes (0 if no journal yet)."""
+        if self._handle is not None:
+            return self._handle.tell()
+        try:
+            return self.file_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def replay(self) -> Iterator[dict[str, Any]]:
+        """
+        Yield records in write order: rotated (compaction in progress) file first, then live file.
+        A torn last line (crash during append) ends replay of that file and is cut off it.
+        """
+        for path in (self.rotated_path, self.file_path):
+            if not path.exists():
+                continue
+            for _, record in _records(path):
+                yield record
+            _repair(path)
+
+    def has_records(self) -> bool:
+        """Return True if there is anything to replay."""
+        return self.size() > 0 or self.rotated_path.exists()
+
+    def rotate(self) -> None:
+        """
+        Move live records aside before a snapshot is written; new records go to a fresh file.
+        If an older rotated file is still present (interrupted compaction), live records are appended to it.
+        """
+        self.close()
+        if not self.file_path.exists():
+            return
+        try:
+            if self.rotated_path.exists():
+                _repair(self.rotated_path)
+                with open(self.rotated_path, "a", encoding="utf-8") as dst, \
+                        open(self.file_path, "r", encoding="utf-8") as src:
+                    dst.write(src.read())
+                self.file_path.unlink()
+            else:
+                os.replace(self.file_path, self.rotated_path)
+        except OSError as e:
+            raise RuntimeError(
+                f"Failed to rotate journal {self.file_path}: {e}") from e
+
+    def discard_rotated(self) -> None:
+        """Delete rotated records once they are covered by a fresh snapshot."""
+        self.rotated_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Close journal file if opened."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
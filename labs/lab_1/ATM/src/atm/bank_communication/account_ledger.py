@@ -0,0 +1,299 @@
+"""Append-only ledger of money movements with a per-card offset index and balance snapshots."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Optional
+
+from ..config import Config
+from .account_journal import complete_lines, truncate_tail
+from .account_store import from_minor_units, to_minor_units
+
+
+@dataclass(frozen=True)
+class LedgerEntry:
+    """One money movement on one card (negative delta = debit)."""
+
+    entry_id: int
+    card_number: str
+    delta: Decimal
+    timestamp: float
+    operation: str
+    """ATM operation that moved the money, e.g. "withdraw", "deposit", "transfer", "payment"."""
+
+
+class _CardIndex:
+    """Entries of one card in ledger order: ids, file offsets, timestamps, deltas in minor units."""
+
+    __slots__ = ("ids", "offsets", "times", "deltas")
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.offsets = array("q")
+        self.times = array("d")
+        self.deltas = array("q")
+
+    def add(self, entry_id: int, offset: int, timestamp: float, delta: int) -> None:
+        self.ids.append(entry_id)
+        self.offsets.append(offset)
+        self.times.append(timestamp)
+        self.deltas.append(delta)
+
+
+class AccountLedger:
+    """
+    Ledger file with one JSON line per entry; never rewritten, only appended to.
+    An in-memory index keeps each card's entries (file offsets, timestamps, deltas), so a
+    card's history is found by binary search and read with one seek per entry.
+    Balances are a periodic snapshot plus the card's deltas recorded after it. Every
+    Config.BANK_LEDGER_SNAPSHOT_EVERY entries a background thread writes a fresh snapshot,
+    so appends never wait for the O(cards) snapshot write.
+    """
+
+    def __init__(self, file_path: Optional[Path] = None, snapshot_path: Optional[Path] = None) -> None:
+        """Open the ledger (default: Config.BANK_LEDGER_FILE / BANK_LEDGER_SNAPSHOT_FILE) and index it."""
+        Config.ensure_data_dir()
+        self.file_path = file_path or Config.BANK_LEDGER_FILE
+        self.snapshot_path = snapshot_path or Config.BANK_LEDGER_SNAPSHOT_FILE
+        self._lock = threading.Lock()
+        self._index: dict[str, _CardIndex] = {}
+        self._snapshot_id = 0
+        self._snapshot: dict[str, int] = {}
+        """Balances in minor units as of entry _snapshot_id."""
+        self._has_snapshot = False
+        self._last_id = 0
+        self._last_time = 0.0
+        self._since_snapshot = 0
+        self._snapshot_lock = threading.Lock()
+        """Serializes snapshot writers, so an older snapshot never replaces a newer file."""
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._load_snapshot()
+        self._load_entries()
+        self._last_id = max(self._last_id, self._snapshot_id)
+        try:
+            self._handle: BinaryIO = open(self.file_path, "ab")
+        except OSError as e:
+            raise RuntimeError(f"Cannot open ledger {self.file_path}: {e}") from e
+
+    def _load_snapshot(self) -> None:
+        if not self.snapshot_path.exists():
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._snapshot_id = int(data["entry_id"])
+            self._snapshot = {card: int(minor) for card, minor in data["balances"].items()}
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise RuntimeError(
+                f"Failed to load ledger snapshot {self.snapshot_path}: {e}") from e
+        self._has_snapshot = True
+
+    def _load_entries(self) -> None:
+        """Index the ledger file; a torn last line (crash during append) is cut off."""
+        if not self.file_path.exists():
+            return
+        offset = 0
+        for end, line in complete_lines(self.file_path):
+            try:
+                data = json.loads(line)
+                self._index_entry(
+                    data["id"], offset, data["card"], data["ts"], to_minor_units(Decimal(data["delta"])))
+            except (ValueError, KeyError, TypeError):
+                break
+            offset = end
+        truncate_tail(self.file_path, offset)
+
+    def _index_entry(self, entry_id: int, offset: int, card_number: str, timestamp: float, delta: int) -> None:
+        index = self._index.get(card_number)
+        if index is None:
+            index = self._index[card_number] = _CardIndex()
+        index.add(entry_id, offset, timestamp, delta)
+        self._last_id = entry_id
+        self._last_time = timestamp
+        if entry_id > self._snapshot_id:
+            self._since_snapshot += 1
+
+    @property
+    def last_id(self) -> int:
+        """Id of the newest entry (0 if the ledger is empty)."""
+        return self._last_id
+
+    def is_empty(self) -> bool:
+        """True if there are neither entries nor a snapshot (nothing is known about balances)."""
+        return self._last_id == 0 and not self._has_snapshot
+
+    def seed(self, balances: dict[str, Decimal]) -> None:
+        """Record opening balances of an empty ledger as its first snapshot."""
+        with self._snapshot_lock, self._lock:
+            if not self.is_empty():
+                raise RuntimeError("Ledger already has entries or a snapshot")
+            self._snapshot = {card: to_minor_units(balance) for card, balance in balances.items()}
+            self._write_snapshot(self._snapshot_id, self._snapshot)
+            self._has_snapshot = True
+
+    def append(
+        self, card_number: str, delta: Decimal, operation: str, timestamp: Optional[float] = None
+    ) -> LedgerEntry:
+        """Append one entry and fsync it."""
+        return self.append_many([(card_number, delta)], operation, timestamp)[0]
+
+    def append_many(
+        self,
+        movements: Iterable[tuple[str, Decimal]],
+        operation: str,
+        timestamp: Optional[float] = None,
+    ) -> list[LedgerEntry]:
+        """Append entries of one operation (e.g. both legs of a transfer) with a single write and fsync."""
+        with self._lock:
+            # Timestamps never go backwards, so per-card time ranges can be binary searched.
+            ts = max(time.time() if timestamp is None else timestamp, self._last_time)
+            entries: list[LedgerEntry] = []
+            lines: list[bytes] = []
+            for card_number, delta in movements:
+                entry = LedgerEntry(self._last_id + len(entries) + 1, card_number, delta, ts, operation)
+                entries.append(entry)
+                lines.append(json.dumps(
+                    {"id": entry.entry_id, "card": card_number, "delta": str(delta),
+                     "ts": ts, "op": operation},
+                    ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+            if not entries:
+                return entries
+            offset = self._handle.tell()
+            try:
+                self._handle.write(b"".join(lines))
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+            except OSError as e:
+                raise RuntimeError(f"Failed to append to ledger {self.file_path}: {e}") from e
+            for entry, line in zip(entries, lines):
+                self._index_entry(entry.entry_id, offset, entry.card_number, ts, to_minor_units(entry.delta))
+                offset += len(line)
+            if (self._since_snapshot >= Config.BANK_LEDGER_SNAPSHOT_EVERY
+                    and not self._is_snapshotting()):
+                self._snapshot_thread = threading.Thread(
+                    target=self._roll_snapshot, args=(self._last_id,), daemon=True)
+                self._snapshot_thread.start()
+            return entries
+
+    def history(
+        self,
+        card_number: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> list[LedgerEntry]:
+        """
+        Entries of the card with since <= timestamp < until, oldest first; with limit only the
+        newest `limit` of them. Costs a binary search plus one read per returned entry.
+        """
+        with self._lock:
+            index = self._index.get(card_number)
+            if index is None:
+                return []
+            start = 0 if since is None else bisect_left(index.times, since)
+            stop = len(index.ids) if until is None else bisect_left(index.times, until)
+            if limit is not None:
+                start = max(start, stop - limit)
+            offsets = index.offsets[start:stop]
+        entries: list[LedgerEntry] = []
+        with open(self.file_path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                entries.append(self._entry_from_raw(json.loads(f.readline())))
+        return entries
+
+    @staticmethod
+    def _entry_from_raw(data: dict[str, Any]) -> LedgerEntry:
+        return LedgerEntry(data["id"], data["card"], Decimal(data["delta"]), data["ts"], data["op"])
+
+    def _balance_minor(self, card_number: str) -> Optional[int]:
+        """Snapshot balance plus the card's deltas after the snapshot; None if the card is unknown."""
+        base = self._snapshot.get(card_number)
+        index = self._index.get(card_number)
+        if index is None:
+            return base
+        start = bisect_right(index.ids, self._snapshot_id)
+        return (base or 0) + sum(index.deltas[start:])
+
+    def balance(self, card_number: str) -> Optional[Decimal]:
+        """Balance according to the ledger; None if the card never appeared in it."""
+        with self._lock:
+            minor = self._balance_minor(card_number)
+        return from_minor_units(minor) if minor is not None else None
+
+    def balances(self) -> dict[str, Decimal]:
+        """Balances of all cards known to the ledger (e.g. to rebuild or audit the account store)."""
+        with self._lock:
+            cards = self._snapshot.keys() | self._index.keys()
+            return {card: from_minor_units(self._balance_minor(card) or 0) for card in cards}
+
+    def snapshot(self) -> None:
+        """Write a fresh balance snapshot now (otherwise written every BANK_LEDGER_SNAPSHOT_EVERY entries)."""
+        self.wait_for_snapshot()
+        with self._lock:
+            entry_id = self._last_id
+        self._roll_snapshot(entry_id)
+
+    def _is_snapshotting(self) -> bool:
+        return self._snapshot_thread is not None and self._snapshot_thread.is_alive()
+
+    def wait_for_snapshot(self) -> None:
+        """Block until a running background snapshot (if any) finishes."""
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+
+    def _roll_snapshot(self, entry_id: int) -> None:
+        """
+        Write the balances as of entry_id and make them the base of balance lookups. Only the
+        card list is copied under the ledger lock; the per-card arrays are append-only and the
+        entries up to entry_id are already in them, so balances are summed without the lock.
+        """
+        with self._snapshot_lock:
+            with self._lock:
+                base_id, base = self._snapshot_id, self._snapshot
+                cards = list(self._index)
+            if entry_id <= base_id:
+                return
+            balances = dict(base)
+            for card in cards:
+                index = self._index[card]
+                start, stop = bisect_right(index.ids, base_id), bisect_right(index.ids, entry_id)
+                if start < stop:
+                    balances[card] = balances.get(card, 0) + sum(index.deltas[start:stop])
+            self._write_snapshot(entry_id, balances)
+            with self._lock:
+                self._snapshot_id, self._snapshot = entry_id, balances
+                self._since_snapshot = self._last_id - entry_id
+                self._has_snapshot = True
+
+    def _write_snapshot(self, entry_id: int, balances: dict[str, int]) -> None:
+        """Atomically replace the snapshot file with the given balances (minor units) as of entry_id."""
+        tmp_path: Optional[str] = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.snapshot_path.parent, prefix=self.snapshot_path.name, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"entry_id": entry_id, "balances": balances}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            tmp_path = None
+        except OSError as e:
+            raise RuntimeError(
+                f"Failed to write ledger snapshot {self.snapshot_path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Finish a running background snapshot and close the ledger file."""
+        self.wait_for_snapshot()
+        self._handle.close()
@@ -0,0 +1,38 @@
+"""Striped per-account locks for the thread-safe bank repository."""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class StripedLock:
+    """
+    Fixed set of re-entrant locks; a card number maps to one stripe by hash.
+    Several cards are locked in ascending stripe order, so concurrent multi-card
+    operations (transfer, batches) cannot deadlock.
+    """
+
+    def __init__(self, stripes: int) -> None:
+        """Create `stripes` locks."""
+        if stripes <= 0:
+            raise ValueError("Number of lock stripes must be positive")
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def stripe(self, card_number: str) -> int:
+        """Return stripe index of the card."""
+        return hash(card_number) % len(self._locks)
+
+    @contextmanager
+    def hold(self, *card_numbers: str) -> Iterator[None]:
+        """Hold the stripes of all given cards (each stripe once, in ascending order)."""
+        stripes = sorted({self.stripe(num) for num in card_numbers})
+        acquired: list[threading.RLock] = []
+        try:
+            for index in stripes:
+                lock = self._locks[index]
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
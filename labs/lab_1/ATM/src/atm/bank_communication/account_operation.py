@@ -0,0 +1,49 @@
+"""Single account change for batch jobs (BankRepository.apply_batch)."""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum, auto
+from typing import Optional
+
+
+class OperationType(Enum):
+    """Kind of change applied to one account."""
+
+    SET_BALANCE = auto()
+    ADJUST_BALANCE = auto()
+    SET_BLOCKED = auto()
+    SET_RETAINED = auto()
+    CHANGE_PIN = auto()
+
+
+@dataclass(frozen=True)
+class AccountOperation:
+    """One change in a batch; immutable (frozen=True)."""
+
+    type: OperationType
+    """What to change."""
+
+    card_number: str
+    """Card whose account is changed."""
+
+    amount: Optional[Decimal] = None
+    """New balance (SET_BALANCE) or signed delta (ADJUST_BALANCE, e.g. -2 for a fee)."""
+
+    flag: Optional[bool] = None
+    """New value of is_blocked / is_retained (SET_BLOCKED, SET_RETAINED)."""
+
+    pin: Optional[str] = None
+    """New PIN (CHANGE_PIN)."""
+
+    def __post_init__(self) -> None:
+        """Check that the field required by the operation type is set."""
+        if self.type in (OperationType.SET_BALANCE, OperationType.ADJUST_BALANCE):
+            if self.amount is None:
+                raise ValueError(f"{self.type.name} requires amount")
+            if self.type == OperationType.SET_BALANCE and self.amount < Decimal("0"):
+                raise ValueError("Balance cannot be negative")
+        elif self.type in (OperationType.SET_BLOCKED, OperationType.SET_RETAINED):
+            if self.flag is None:
+                raise ValueError(f"{self.type.name} requires flag")
+        elif self.pin is None:
+            raise ValueError(f"{self.type.name} requires pin")
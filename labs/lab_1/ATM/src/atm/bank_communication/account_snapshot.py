@@ -0,0 +1,182 @@
+"""Versioned binary snapshot of bank accounts for fast startup (mmap, lazily decoded strings)."""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .account_store import AccountStore
+
+MAGIC = b"ATMB"
+VERSION = 2
+CARD_WIDTH = 16
+PIN_HASH_WIDTH = 32
+OWNER_WIDTH = 64
+EXPIRY_WIDTH = 8
+NULL_OWNER = 1
+NULL_EXPIRY = 2
+
+_HEADER = struct.Struct("<4sHHHHQQq")
+"""magic, version, pin/owner/expiry widths, record count, source JSON size and mtime_ns."""
+
+_PENDING = object()
+
+
+class LazyStringColumn:
+    """
+    Fixed-width UTF-8 string column backed by the mapped snapshot.
+    Each item is decoded (and interned) on first access; writes replace the item in memory.
+    """
+
+    def __init__(
+        self,
+        buf: memoryview,
+        width: int,
+        count: int,
+        nulls: Optional[memoryview] = None,
+        null_bit: int = 0,
+    ) -> None:
+        self._buf = buf
+        self._width = width
+        self._nulls = nulls
+        self._null_bit = null_bit
+        self._items: list[object] = [_PENDING] * count
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        value = self._items[index]
+        if value is _PENDING:
+            value = self._decode(index)
+            self._items[index] = value
+        return value  # type: ignore[return-value]
+
+    def __setitem__(self, index: int, value: Optional[str]) -> None:
+        self._items[index] = value
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for i in range(len(self._items)):
+            yield self[i]
+
+    def append(self, value: Optional[str]) -> None:
+        self._items.append(value)
+
+    def pop(self) -> None:
+        self._items.pop()
+
+    def _decode(self, index: int) -> Optional[str]:
+        if self._nulls is not None and self._nulls[index] & self._null_bit:
+            return None
+        start = index * self._width
+        raw = bytes(self._buf[start:start + self._width]).rstrip(b"\0")
+        return sys.intern(raw.decode("utf-8"))
+
+
+def _encode_column(
+    values: list[Optional[str]], width: int
+) -> Optional[bytes]:
+    """Encode strings into a fixed-width column; None if any value does not fit."""
+    parts: list[bytes] = []
+    for value in values:
+        encoded = (value or "").encode("utf-8")
+        if len(encoded) > width:
+            return None
+        parts.append(encoded.ljust(width, b"\0"))
+    return b"".join(parts)
+
+
+def write_snapshot(path: Path, store: AccountStore, source: os.stat_result) -> bool:
+    """
+    Write store to a binary snapshot stamped with the source JSON size/mtime.
+    Returns False (and writes nothing) if some field does not fit the fixed widths.
+    """
+    cards, balances, versions, flags, pin_hashes, owners, expiry_dates = store.columns()
+    if any(len(card) != CARD_WIDTH or not card.isdigit() for card in cards):
+        return False
+    pin_col = _encode_column(pin_hashes, PIN_HASH_WIDTH)
+    owner_col = _encode_column(owners, OWNER_WIDTH)
+    expiry_col = _encode_column(expiry_dates, EXPIRY_WIDTH)
+    if pin_col is None or owner_col is None or expiry_col is None:
+        return False
+    nulls = bytes(
+        (NULL_OWNER if owner is None else 0) | (NULL_EXPIRY if expiry is None else 0)
+        for owner, expiry in zip(owners, expiry_dates))
+    balance_col = array("q", balances)
+    version_col = array("q", versions)
+    if sys.byteorder == "big":
+        balance_col.byteswap()
+        version_col.byteswap()
+    header = _HEADER.pack(
+        MAGIC, VERSION, PIN_HASH_WIDTH, OWNER_WIDTH, EXPIRY_WIDTH,
+        len(cards), source.st_size, source.st_mtime_ns)
+    tmp_path: Optional[str] = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            for chunk in (header, "".join(cards).encode("ascii"), balance_col.tobytes(),
+                          version_col.tobytes(), bytes(flags), nulls, pin_col, owner_col, expiry_col):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    except OSError:
+        return False
+    finally:
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
+    return True
+
+
+def load_snapshot(path: Path, source: os.stat_result) -> Optional[AccountStore]:
+    """
+    Map the snapshot and build an AccountStore from it without per-record parsing:
+    numeric columns are bulk-copied, string columns are decoded lazily.
+    Returns None if the snapshot is missing, of another version, or stale for `source`.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    buf = memoryview(mapped)
+    if len(buf) < _HEADER.size:
+        return None
+    (magic, version, pin_w, owner_w, expiry_w,
+     count, src_size, src_mtime) = _HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if src_size != source.st_size or src_mtime != source.st_mtime_ns:
+        return None
+    widths = (CARD_WIDTH, 8, 8, 1, 1, pin_w, owner_w, expiry_w)
+    if len(buf) != _HEADER.size + count * sum(widths):
+        return None
+    columns: list[memoryview] = []
+    offset = _HEADER.size
+    for width in widths:
+        columns.append(buf[offset:offset + count * width])
+        offset += count * width
+    card_col, balance_col, version_col, flag_col, null_col, pin_col, owner_col, expiry_col = columns
+
+    text = bytes(card_col).decode("ascii")
+    cards = [text[i:i + CARD_WIDTH] for i in range(0, len(text), CARD_WIDTH)]
+    balances = array("q")
+    balances.frombytes(balance_col)
+    versions = array("q")
+    versions.frombytes(version_col)
+    if sys.byteorder == "big":
+        balances.byteswap()
+        versions.byteswap()
+    return AccountStore.from_columns(
+        cards,
+        balances,
+        versions,
+        bytearray(flag_col),
+        LazyStringColumn(pin_col, pin_w, count),
+        LazyStringColumn(owner_col, owner_w, count, null_col, NULL_OWNER),
+        LazyStringColumn(expiry_col, expiry_w, count, null_col, NULL_EXPIRY),
+    )
@@ -0,0 +1,227 @@
+"""Compact in-memory account storage: parallel arrays indexed by slot, balances in minor units."""
+
+import sys
+from array import array
+from decimal import Decimal
+from typing import Any, Iterator, Optional
+
+from ..config import Config
+from .account_data import AccountData
+
+FLAG_BLOCKED = 1
+FLAG_RETAINED = 2
+
+
+def to_minor_units(amount: Decimal, rounding: Optional[str] = None) -> int:
+    """
+    Convert money amount to integer minor units (e.g. 12.34 -> 1234).
+    Finer precision raises ValueError, or is rounded if a rounding mode (e.g. ROUND_HALF_EVEN) is given.
+    """
+    scaled = amount * Config.CURRENCY_MINOR_UNITS
+    if rounding is not None:
+        return int(scaled.quantize(Decimal(1), rounding=rounding))
+    minor = int(scaled)
+    if minor != scaled:
+        raise ValueError(
+            f"Amount {amount} has more precision than {Config.DEFAULT_CURRENCY} allows")
+    return minor
+
+
+def from_minor_units(minor: int) -> Decimal:
+    """Convert integer minor units back to Decimal (e.g. 1234 -> 12.34)."""
+    return Decimal(minor) / Config.CURRENCY_MINOR_UNITS
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+class AccountStore:
+    """
+    Accounts kept as columns: each card gets a slot index, and every field lives in a
+    parallel array at that slot (int64 balance in minor units, int64 version, flag bits,
+    interned strings).
+    Mutations change one array element in place; AccountData is only built on read.
+    """
+
+    def __init__(self) -> None:
+        """Create empty store."""
+        self._slots: dict[str, int] = {}
+        self._cards: list[str] = []
+        self._balances = array("q")
+        self._versions = array("q")
+        self._flags = bytearray()
+        self._pin_hashes: list[str] = []
+        self._owners: list[Optional[str]] = []
+        self._expiry_dates: list[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __contains__(self, card_number: object) -> bool:
+        return card_number in self._slots
+
+    def slot(self, card_number: str) -> Optional[int]:
+        """Return slot index of the card, or None if not stored."""
+        return self._slots.get(card_number)
+
+    def cards(self) -> Iterator[str]:
+        """Iterate card numbers in slot order."""
+        return iter(self._cards)
+
+    def put(self, account: AccountData) -> tuple[int, bool]:
+        """Insert or overwrite account; return (slot, True if a new slot was appended)."""
+        flags = ((FLAG_BLOCKED if account.is_blocked else 0)
+                 | (FLAG_RETAINED if account.is_retained else 0))
+        balance = to_minor_units(account.balance)
+        slot = self._slots.get(account.card_number)
+        if slot is None:
+            slot = len(self._cards)
+            card = sys.intern(account.card_number)
+            self._slots[card] = slot
+            self._cards.append(card)
+            self._balances.append(balance)
+            self._versions.append(account.version)
+            self._flags.append(flags)
+            self._pin_hashes.append(sys.intern(account.pin_hash))
+            self._owners.append(_intern(account.owner_name))
+            self._expiry_dates.append(_intern(account.expiry_date))
+            return slot, True
+        self._balances[slot] = balance
+        self._versions[slot] = account.version
+        self._flags[slot] = flags
+        self._pin_hashes[slot] = sys.intern(account.pin_hash)
+        self._owners[slot] = _intern(account.owner_name)
+        self._expiry_dates[slot] = _intern(account.expiry_date)
+        return slot, False
+
+    def pop_last(self) -> None:
+        """Remove the most recently appended slot (undo of a failed insert)."""
+        card = self._cards.pop()
+        del self._slots[card]
+        self._balances.pop()
+        self._versions.pop()
+        self._flags.pop()
+        self._pin_hashes.pop()
+        self._owners.pop()
+        self._expiry_dates.pop()
+
+    def view(self, slot: int) -> AccountData:
+        """Materialize an immutable AccountData for the slot."""
+        flags = self._flags[slot]
+        return AccountData(
+            card_number=self._cards[slot],
+            pin_hash=self._pin_hashes[slot],
+            balance=from_minor_units(self._balances[slot]),
+            is_blocked=bool(flags & FLAG_BLOCKED),
+            is_retained=bool(flags & FLAG_RETAINED),
+            owner_name=self._owners[slot],
+            expiry_date=self._expiry_dates[slot],
+            version=self._versions[slot],
+        )
+
+    def card_number(self, slot: int) -> str:
+        return self._cards[slot]
+
+    def balance(self, slot: int) -> int:
+        """Balance in minor units."""
+        return self._balances[slot]
+
+    def set_balance(self, slot: int, minor: int) -> None:
+        """Set balance in minor units."""
+        self._balances[slot] = minor
+
+    def version(self, slot: int) -> int:
+        return self._versions[slot]
+
+    def set_version(self, slot: int, version: int) -> None:
+        self._versions[slot] = version
+
+    def flags(self, slot: int) -> int:
+        return self._flags[slot]
+
+    def set_flags(self, slot: int, flags: int) -> None:
+        self._flags[slot] = flags
+
+    def flagged_slots(self) -> Iterator[int]:
+        """Iterate slots that have any flag set (blocked or retained)."""
+        return (slot for slot, flags in enumerate(self._flags) if flags)
+
+    def is_blocked(self, slot: int) -> bool:
+        return bool(self._flags[slot] & FLAG_BLOCKED)
+
+    def is_retained(self, slot: int) -> bool:
+        return bool(self._flags[slot] & FLAG_RETAINED)
+
+    def pin_hash(self, slot: int) -> str:
+        return self._pin_hashes[slot]
+
+    def set_pin_hash(self, slot: int, pin_hash: str) -> None:
+        self._pin_hashes[slot] = sys.intern(pin_hash)
+
+    def raw(self, slot: int) -> dict[str, object]:
+        """Return JSON-compatible dict for the slot (bank_accounts.json format)."""
+        flags = self._flags[slot]
+        return {
+            "card_number": self._cards[slot],
+            "pin_hash": self._pin_hashes[slot],
+            "balance": str(from_minor_units(self._balances[slot])),
+            "is_blocked": bool(flags & FLAG_BLOCKED),
+            "is_retained": bool(flags & FLAG_RETAINED),
+            "owner_name": self._owners[slot],
+            "expiry_date": self._expiry_dates[slot],
+            "version": self._versions[slot],
+        }
+
+    @classmethod
+    def from_columns(
+        cls,
+        cards: list[str],
+        balances: array,
+        versions: array,
+        flags: bytearray,
+        pin_hashes: Any,
+        owners: Any,
+        expiry_dates: Any,
+    ) -> "AccountStore":
+        """
+        Build store directly from column data (e.g. a binary snapshot) without per-account validation.
+        String columns may be any list-like object supporting indexing, assignment, append and pop.
+        """
+        store = cls()
+        store._slots = dict(zip(cards, range(len(cards))))
+        store._cards = cards
+        store._balances = balances
+        store._versions = versions
+        store._flags = flags
+        store._pin_hashes = pin_hashes
+        store._owners = owners
+        store._expiry_dates = expiry_dates
+        return store
+
+    def columns(
+        self,
+    ) -> tuple[list[str], array, array, bytearray, list[str], list[Optional[str]], list[Optional[str]]]:
+        """Return (cards, balances, versions, flags, pin hashes, owners, expiry dates) columns for serialization."""
+        return (
+            self._cards,
+            self._balances,
+            self._versions,
+            self._flags,
+            list(self._pin_hashes),
+            list(self._owners),
+            list(self._expiry_dates),
+        )
+
+    def copy(self) -> "AccountStore":
+        """Return an independent copy (arrays are copied, strings are shared)."""
+        other = AccountStore()
+        other._slots = dict(self._slots)
+        other._cards = list(self._cards)
+        other._balances = array("q", self._balances)
+        other._versions = array("q", self._versions)
+        other._flags = bytearray(self._flags)
+        other._pin_hashes = list(self._pin_hashes)
+        other._owners = list(self._owners)
+        other._expiry_dates = list(self._expiry_dates)
+        return other
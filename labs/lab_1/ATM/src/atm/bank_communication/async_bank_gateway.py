@@ -0,0 +1,109 @@
+"""asyncio front-end for BankGateway: bank calls run off the event loop."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from .account_data import AccountData
+from .bank_gateway import BankGateway
+
+T = TypeVar("T")
+
+
+class AsyncBankGateway:
+    """
+    Awaitable counterparts of BankGateway methods.
+    Calls are executed one at a time on a dedicated worker thread, so a slow repository
+    never blocks the event loop and the (not thread-safe) repository sees no concurrent calls.
+    """
+
+    def __init__(
+        self,
+        gateway: Optional[BankGateway] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
+        """Wrap given gateway (or a new BankGateway); own a single-worker executor unless one is given."""
+        self.sync: BankGateway = gateway if gateway is not None else BankGateway()
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="bank-gateway")
+
+    async def _call(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def validate_pin(self, card_number: str, pin: str) -> bool:
+        """Check if PIN is correct for the given card."""
+        return await self._call(self.sync.validate_pin, card_number, pin)
+
+    async def is_card_blocked(self, card_number: str) -> bool:
+        """Check if the card is blocked."""
+        return await self._call(self.sync.is_card_blocked, card_number)
+
+    async def get_account(self, card_number: str) -> Optional[AccountData]:
+        """Get account data by card number."""
+        return await self._call(self.sync.get_account, card_number)
+
+    async def get_balance(self, card_number: str) -> Optional[Decimal]:
+        """Get current balance or None if card not found / blocked."""
+        return await self._call(self.sync.get_balance, card_number)
+
+    async def withdraw(
+        self,
+        card_number: str,
+        amount: Decimal,
+        expected_version: Optional[int] = None,
+        operation: str = "withdraw",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Withdraw money if possible."""
+        return await self._call(
+            self.sync.withdraw, card_number, amount, expected_version, operation, idempotency_key)
+
+    async def deposit(
+        self,
+        card_number: str,
+        amount: Decimal,
+        expected_version: Optional[int] = None,
+        operation: str = "deposit",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Deposit money."""
+        return await self._call(
+            self.sync.deposit, card_number, amount, expected_version, operation, idempotency_key)
+
+    async def transfer(
+        self,
+        from_card: str,
+        to_card: str,
+        amount: Decimal,
+        operation: str = "transfer",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Transfer amount from one account to another."""
+        return await self._call(
+            self.sync.transfer, from_card, to_card, amount, operation, idempotency_key)
+
+    async def change_pin(
+        self, card_number: str, new_pin: str, expected_version: Optional[int] = None
+    ) -> bool:
+        """Change PIN via bank repository."""
+        return await self._call(self.sync.change_pin, card_number, new_pin, expected_version)
+
+    async def block_card(self, card_number: str, expected_version: Optional[int] = None) -> bool:
+        """Block the card."""
+        return await self._call(self.sync.block_card, card_number, expected_version)
+
+    async def set_card_retained(
+        self, card_number: str, retained: bool, expected_version: Optional[int] = None
+    ) -> bool:
+        """Mark card as retained (seized by ATM) or not."""
+        return await self._call(
+            self.sync.set_card_retained, card_number, retained, expected_version)
+
+    def close(self) -> None:
+        """Shut down the worker thread (if owned); pending calls are completed first."""
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
@@ -1,75 +1,408 @@
 """Gateway to the bank (simulated via mock repository)."""
 
+from contextlib import contextmanager
 from decimal import Decimal
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 
+from ..config import Config
+from .account_cache import AccountCache
+from .account_locks import StripedLock
+from .account_ledger import AccountLedger, LedgerEntry
+from .account_operation import AccountOperation
+from .account_store import to_minor_units
+from .bank_repository import BankRepository, VersionConflictError
+from .idempotency_store import IdempotencyStore
 from .mock_bank_repo import MockBankRepository
+from .sqlite_bank_repo import SqliteBankRepository
+from .withdrawal_limits import WithdrawalLimits
 from .account_data import AccountData
 
 
+def create_repository(backend: Optional[str] = None, thread_safe: bool = False) -> BankRepository:
+    """
+    Repository for the backend ("json" or "sqlite", default Config.BANK_BACKEND).
+    thread_safe: the JSON store takes per-card locks, so one gateway can serve many threads
+    (SQLite guards its connection either way).
+    """
+    backend = Config.BANK_BACKEND if backend is None else backend
+    if backend == "json":
+        return MockBankRepository(thread_safe=thread_safe)
+    if backend == "sqlite":
+        return SqliteBankRepository()
+    raise ValueError(f"Unknown bank backend: {backend}")
+
+
 class BankGateway:
-    """Interface to the bank system (simulated via mock repository)."""
+    """
+    Interface to the bank system (simulated via mock repository).
+    Read-only lookups go through an optional read-through account cache; the gateway's
+    own mutating methods invalidate the affected cards. Money movements always read
+    the balance from the repository, never from the cache, in one atomic repository step
+    (adjust_balance: under the card lock in thread-safe mode, a transaction in SQLite).
+    In optimistic mode they take no card lock: the balance is written with a compare-and-set
+    on the account version and re-read on conflict.
+    With a ledger every successful money movement is also appended to it, labelled with
+    the ATM operation.
+    Cash withdrawals (operation "withdraw") are checked against the rolling daily limit;
+    a "withdraw_reversal" deposit gives the amount back to the limit.
+    withdraw, deposit and transfer accept an idempotency key: the first result is remembered
+    and a retry with the same key returns it without moving money again. The key is logged
+    as pending with the account versions before the money moves, so a retry after a crash
+    between the balance write and the result re-runs the operation only if the accounts are
+    unchanged, and raises RuntimeError (outcome unknown) if they changed.
+    """
+
+    def __init__(
+        self,
+        repo: Optional[BankRepository] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl_seconds: Optional[float] = None,
+        optimistic: Optional[bool] = None,
+        ledger: Optional[AccountLedger] = None,
+        withdrawal_limits: Optional[WithdrawalLimits] = None,
+        idempotency: Optional[IdempotencyStore] = None,
+    ) -> None:
+        """
+        Initialize gateway with given repository or the one selected by Config.BANK_BACKEND.
+        cache_size / cache_ttl_seconds default to Config.BANK_CACHE_SIZE / BANK_CACHE_TTL_SECONDS;
+        cache size 0 disables the cache, and there is no cache over a repository shared
+        between processes (BankRepository.is_shared()).
+        optimistic: compare-and-set money movements (default: Config.BANK_OPTIMISTIC_CONCURRENCY).
+        ledger: movement ledger (default: AccountLedger() if Config.BANK_LEDGER_ENABLED); an
+        empty ledger is seeded with the repository's current balances.
+        withdrawal_limits: daily cash limit counters (default: WithdrawalLimits() unless
+        Config.MAX_WITHDRAW_AMOUNT_PER_DAY is 0).
+        idempotency: dedupe table of idempotency keys (default: IdempotencyStore() unless
+        Config.BANK_IDEMPOTENCY_MAX_KEYS is 0).
+        """
+        self._repo = repo if repo is not None else create_repository()
+        size = Config.BANK_CACHE_SIZE if cache_size is None else cache_size
+        ttl = Config.BANK_CACHE_TTL_SECONDS if cache_ttl_seconds is None else cache_ttl_seconds
+        self.cache: Optional[AccountCache] = (
+            AccountCache(size, ttl) if size > 0 and not self._repo.is_shared() else None)
+        self.optimistic = (
+            Config.BANK_OPTIMISTIC_CONCURRENCY if optimistic is None else optimistic)
+        self.cas_retries = 0
+        """Compare-and-set conflicts retried by optimistic withdraw/deposit."""
+        if ledger is None and Config.BANK_LEDGER_ENABLED:
+            ledger = AccountLedger()
+        self.ledger: Optional[AccountLedger] = ledger
+        if ledger is not None and ledger.is_empty():
+            ledger.seed({num: acc.balance for num, acc in self._repo.get_all_accounts().items()})
+        if withdrawal_limits is None and Config.MAX_WITHDRAW_AMOUNT_PER_DAY > 0:
+            withdrawal_limits = WithdrawalLimits()
+        self.withdrawal_limits: Optional[WithdrawalLimits] = withdrawal_limits
+        if idempotency is None and Config.BANK_IDEMPOTENCY_MAX_KEYS > 0:
+            idempotency = IdempotencyStore()
+        self.idempotency: Optional[IdempotencyStore] = idempotency
+        self._key_locks = StripedLock(Config.BANK_LOCK_STRIPES)
+
+    def _cached_account(self, card_number: str) -> Optional[AccountData]:
+        """Get account through the cache (or straight from the repository if disabled)."""
+        if self.cache is None:
+            return self._repo.get_account(card_number)
+        hit, account = self.cache.get(card_number)
+        if not hit:
+            generation = self.cache.generation()
+            account = self._repo.get_account(card_number)
+            self.cache.put(card_number, account, generation)
+        return account
 
-    def __init__(self) -> None:
-        """Initialize gateway with mock repository."""
-        self._repo = MockBankRepository()
+    def _invalidate(self, *card_numbers: str) -> None:
+        if self.cache is not None:
+            for card_number in card_numbers:
+                self.cache.invalidate(card_number)
+
+    @contextmanager
+    def _invalidating(self, *card_numbers: str) -> Iterator[None]:
+        """
+        Drop the cards from the cache after the block's repository write (also if it raises),
+        so a lookup racing with the write cannot put the old account back into the cache.
+        """
+        try:
+            yield
+        finally:
+            self._invalidate(*card_numbers)
 
     def validate_pin(self, card_number: str, pin: str) -> bool:
         """Check if PIN is correct for the given card."""
-        return self._repo.validate_pin(card_number, pin)
+        if self.cache is None:
+            return self._repo.validate_pin(card_number, pin)
+        account = self._cached_account(card_number)
+        return account is not None and account.pin_hash == f"hashed_pin_{pin}"
 
     def is_card_blocked(self, card_number: str) -> bool:
         """Check if the card is blocked."""
-        account = self._repo.get_account(card_number)
+        if self.cache is None:
+            return self._repo.is_card_blocked(card_number)
+        account = self._cached_account(card_number)
         return account is not None and account.is_blocked
 
-    def block_card(self, card_number: str) -> bool:
+    def block_card(self, card_number: str, expected_version: Optional[int] = None) -> bool:
         """Block the card after too many failed attempts."""
-        return self._repo.block_card(card_number)
+        with self._invalidating(card_number):
+            return self._repo.block_card(card_number, expected_version)
 
     def get_balance(self, card_number: str) -> Optional[Decimal]:
         """Get current balance or None if card not found / blocked."""
-        account = self._repo.get_account(card_number)
+        account = self._cached_account(card_number)
         if account and not account.is_blocked:
             return account.balance
         return None
 
-    def withdraw(self, card_number: str, amount: Decimal) -> bool:
-        """Withdraw money if possible."""
-        balance = self.get_balance(card_number)
-        if balance is None or balance < amount:
-            return False
-        return self._repo.update_balance(card_number, balance - amount)
+    def _record(self, operation: str, *movements: tuple[str, Decimal]) -> None:
+        """Append movements of one operation to the ledger (if any)."""
+        if self.ledger is not None:
+            self.ledger.append_many(movements, operation)
+
+    @contextmanager
+    def _recording_changes(self, card_numbers: list[str], operation: str) -> Iterator[None]:
+        """Record balance differences of the cards made by the block (bulk writes) in the ledger."""
+        if self.ledger is None:
+            yield
+            return
+        with self._repo.lock_cards(*card_numbers):
+            before = self._repo.get_accounts(card_numbers)
+            yield
+            after = self._repo.get_accounts(card_numbers)
+        movements = []
+        for card_number, account in after.items():
+            old = before.get(card_number)
+            delta = account.balance - (old.balance if old is not None else Decimal("0"))
+            if delta:
+                movements.append((card_number, delta))
+        self._record(operation, *movements)
+
+    def _versions(self, card_numbers: tuple[str, ...]) -> dict[str, Optional[int]]:
+        accounts = self._repo.get_accounts(card_numbers)
+        return {card: accounts[card].version if card in accounts else None for card in card_numbers}
 
-    def deposit(self, card_number: str, amount: Decimal) -> bool:
-        """Deposit money."""
-        balance = self.get_balance(card_number)
-        if balance is None:
+    def _once(
+        self, key: Optional[str], request: str, cards: tuple[str, ...], action: Callable[[], bool]
+    ) -> bool:
+        """
+        Run the money movement on the cards once per idempotency key; a repeated key returns
+        the recorded result (ValueError if it was used for a different request). Exceptions
+        are not recorded. A key left pending (crash or exception during the movement) is run
+        again if the cards' versions are still those logged before; RuntimeError otherwise,
+        since the movement may have been applied.
+        """
+        if key is None or self.idempotency is None:
+            return action()
+        with self._key_locks.hold(key):
+            result = self.idempotency.lookup(key, request)
+            if result is not None:
+                return result
+            versions = self._versions(cards)
+            pending = self.idempotency.pending(key)
+            if pending is not None and pending != versions:
+                raise RuntimeError(
+                    f"Outcome of the operation with idempotency key {key!r} is unknown: "
+                    "the accounts changed after it started")
+            self.idempotency.begin(key, request, versions)
+            result = action()
+            self.idempotency.remember(key, request, result)
+            return result
+
+    def withdraw(
+        self,
+        card_number: str,
+        amount: Decimal,
+        expected_version: Optional[int] = None,
+        operation: str = "withdraw",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """
+        Withdraw money if possible.
+        With expected_version the withdrawal is a single compare-and-set that raises
+        VersionConflictError if the account changed since the caller read it.
+        operation labels the ledger entry (e.g. "payment"); only "withdraw" counts towards
+        the daily cash limit, and False is returned when the limit would be exceeded.
+        A repeated idempotency_key returns the first result without debiting again.
+        """
+        return self._once(
+            idempotency_key, f"{operation} {card_number} {to_minor_units(amount)}", (card_number,),
+            lambda: self._withdraw(card_number, amount, expected_version, operation))
+
+    def _withdraw(
+        self, card_number: str, amount: Decimal, expected_version: Optional[int], operation: str
+    ) -> bool:
+        limits = self.withdrawal_limits if operation == "withdraw" else None
+        if limits is not None and not limits.try_consume(card_number, amount):
             return False
-        return self._repo.update_balance(card_number, balance + amount)
+        ok = False
+        try:
+            with self._invalidating(card_number):
+                ok = self._adjust_balance(card_number, -amount, expected_version)
+        finally:
+            if not ok and limits is not None:
+                limits.release(card_number, amount)
+        if ok:
+            self._record(operation, (card_number, -amount))
+        return ok
+
+    def deposit(
+        self,
+        card_number: str,
+        amount: Decimal,
+        expected_version: Optional[int] = None,
+        operation: str = "deposit",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Deposit money (expected_version, operation and idempotency_key as in withdraw)."""
+        return self._once(
+            idempotency_key, f"{operation} {card_number} {to_minor_units(amount)}", (card_number,),
+            lambda: self._deposit(card_number, amount, expected_version, operation))
 
-    def change_pin(self, card_number: str, new_pin: str) -> bool:
+    def _deposit(
+        self, card_number: str, amount: Decimal, expected_version: Optional[int], operation: str
+    ) -> bool:
+        with self._invalidating(card_number):
+            if not self._adjust_balance(card_number, amount, expected_version):
+                return False
+        if operation == "withdraw_reversal" and self.withdrawal_limits is not None:
+            self.withdrawal_limits.release(card_number, amount)
+        self._record(operation, (card_number, amount))
+        return True
+
+    def get_remaining_withdrawal_limit(self, card_number: str) -> Optional[Decimal]:
+        """Cash the card may still withdraw today; None if there is no daily limit."""
+        if self.withdrawal_limits is None:
+            return None
+        return self.withdrawal_limits.remaining(card_number)
+
+    def _adjust_balance(
+        self, card_number: str, delta: Decimal, expected_version: Optional[int]
+    ) -> bool:
+        """
+        Read-modify-write of the balance: one atomic repository step (under the card lock, or
+        a database transaction), or optimistically.
+        """
+        if expected_version is None and not self.optimistic:
+            return self._repo.adjust_balance(card_number, delta)
+        conflict: Optional[VersionConflictError] = None
+        for _ in range(Config.BANK_CAS_MAX_RETRIES if expected_version is None else 1):
+            account = self._repo.get_account(card_number)
+            if account is None:
+                return False
+            if expected_version is not None and account.version != expected_version:
+                raise VersionConflictError(card_number, expected_version, account.version)
+            if account.is_blocked or (delta < 0 and account.balance + delta < 0):
+                return False
+            try:
+                return self._repo.update_balance(
+                    card_number, account.balance + delta, account.version)
+            except VersionConflictError as e:
+                if expected_version is not None:
+                    raise
+                conflict = e
+                self.cas_retries += 1
+        assert conflict is not None
+        raise conflict
+
+    def change_pin(
+        self, card_number: str, new_pin: str, expected_version: Optional[int] = None
+    ) -> bool:
         """Change PIN via bank repository."""
-        return self._repo.change_pin(card_number, new_pin)
+        with self._invalidating(card_number):
+            return self._repo.change_pin(card_number, new_pin, expected_version)
 
     def get_account(self, card_number: str) -> Optional[AccountData]:
         """Get account data by card number (e.g. for expiry date)."""
-        return self._repo.get_account(card_number)
+        return self._cached_account(card_number)
+
+    def get_accounts(self, card_numbers: Iterable[str]) -> dict[str, AccountData]:
+        """Get accounts of many cards; cache misses are fetched with one repository call."""
+        cards = list(dict.fromkeys(card_numbers))
+        if self.cache is None:
+            return self._repo.get_accounts(cards)
+        result: dict[str, AccountData] = {}
+        missing: list[str] = []
+        for card_number in cards:
+            hit, account = self.cache.get(card_number)
+            if not hit:
+                missing.append(card_number)
+            elif account is not None:
+                result[card_number] = account
+        if missing:
+            generation = self.cache.generation()
+            fetched = self._repo.get_accounts(missing)
+            for card_number in missing:
+                account = fetched.get(card_number)
+                self.cache.put(card_number, account, generation)
+                if account is not None:
+                    result[card_number] = account
+        return result
 
-    def set_card_retained(self, card_number: str, retained: bool) -> bool:
+    def add_accounts(self, accounts: Iterable[AccountData]) -> int:
+        """Add or update many accounts with a single write (seeding, migration)."""
+        batch = list(accounts)
+        with self._recording_changes([account.card_number for account in batch], "adjust"):
+            with self._invalidating(*(account.card_number for account in batch)):
+                count = self._repo.add_accounts(batch)
+        return count
+
+    def apply_batch(self, operations: Iterable[AccountOperation]) -> int:
+        """Apply many account operations with a single write (mass unblock, fees); all or nothing."""
+        ops = list(operations)
+        with self._recording_changes(list(dict.fromkeys(op.card_number for op in ops)), "batch"):
+            with self._invalidating(*(op.card_number for op in ops)):
+                count = self._repo.apply_batch(ops)
+        return count
+
+    def set_card_retained(
+        self, card_number: str, retained: bool, expected_version: Optional[int] = None
+    ) -> bool:
         """Mark card as retained (seized by ATM) or not."""
-        return self._repo.set_card_retained(card_number, retained)
+        with self._invalidating(card_number):
+            return self._repo.set_card_retained(card_number, retained, expected_version)
 
     def get_retained_card_numbers(self) -> list[str]:
         """Return card numbers that are currently retained in the machine."""
         return self._repo.get_retained_card_numbers()
 
+    def get_blocked_card_numbers(self) -> list[str]:
+        """Return card numbers that are currently blocked."""
+        return self._repo.get_blocked_card_numbers()
+
+    def count_retained(self) -> int:
+        """Return number of cards currently retained in the machine."""
+        return self._repo.count_retained()
+
     def collect_retained_cards(self, card_numbers: list[str]) -> None:
         """Mark cards as not retained and unblock (after technician collects)."""
-        self._repo.collect_retained_cards(card_numbers)
+        with self._invalidating(*card_numbers):
+            self._repo.collect_retained_cards(card_numbers)
 
     def transfer(
-        self, from_card: str, to_card: str, amount: Decimal
+        self,
+        from_card: str,
+        to_card: str,
+        amount: Decimal,
+        operation: str = "transfer",
+        idempotency_key: Optional[str] = None,
     ) -> bool:
-        """Transfer amount from one account to another."""
-        return self._repo.transfer(from_card, to_card, amount)
+        """Transfer amount from one account to another (idempotency_key as in withdraw)."""
+        return self._once(
+            idempotency_key, f"{operation} {from_card} {to_card} {to_minor_units(amount)}",
+            (from_card, to_card), lambda: self._transfer(from_card, to_card, amount, operation))
+
+    def _transfer(self, from_card: str, to_card: str, amount: Decimal, operation: str) -> bool:
+        with self._invalidating(from_card, to_card):
+            if not self._repo.transfer(from_card, to_card, amount):
+                return False
+        if from_card != to_card:
+            self._record(operation, (from_card, -amount), (to_card, amount))
+        return True
+
+    def get_history(
+        self,
+        card_number: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> list[LedgerEntry]:
+        """Ledger entries of the card (see AccountLedger.history); RuntimeError without a ledger."""
+        if self.ledger is None:
+            raise RuntimeError("Ledger is not enabled")
+        return self.ledger.history(card_number, since, until, limit)
@@ -0,0 +1,132 @@
+"""Wire format between RemoteBankGateway and BankServer: one JSON object per line."""
+
+import json
+from decimal import Decimal
+from typing import Any
+
+from .account_data import AccountData
+from .account_ledger import LedgerEntry
+from .account_operation import AccountOperation, OperationType
+from .bank_repository import VersionConflictError
+
+GATEWAY_METHODS: frozenset[str] = frozenset({
+    "validate_pin",
+    "is_card_blocked",
+    "block_card",
+    "get_balance",
+    "withdraw",
+    "deposit",
+    "change_pin",
+    "get_account",
+    "set_card_retained",
+    "get_retained_card_numbers",
+    "get_blocked_card_numbers",
+    "count_retained",
+    "collect_retained_cards",
+    "transfer",
+    "get_accounts",
+    "add_accounts",
+    "apply_batch",
+    "get_history",
+    "get_remaining_withdrawal_limit",
+})
+"""BankGateway methods callable over the wire."""
+
+ERROR_TYPES: dict[str, type[Exception]] = {
+    "ValueError": ValueError,
+    "RuntimeError": RuntimeError,
+    "VersionConflictError": VersionConflictError,
+}
+"""Exception types re-raised as-is on the client (anything else becomes RuntimeError)."""
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, AccountData):
+        return {"$account": {
+            "card_number": value.card_number,
+            "pin_hash": value.pin_hash,
+            "balance": str(value.balance),
+            "is_blocked": value.is_blocked,
+            "is_retained": value.is_retained,
+            "owner_name": value.owner_name,
+            "expiry_date": value.expiry_date,
+            "version": value.version,
+        }}
+    if isinstance(value, LedgerEntry):
+        return {"$ledger": {
+            "id": value.entry_id,
+            "card": value.card_number,
+            "delta": str(value.delta),
+            "ts": value.timestamp,
+            "op": value.operation,
+        }}
+    if isinstance(value, AccountOperation):
+        return {"$operation": {
+            "type": value.type.name,
+            "card_number": value.card_number,
+            "amount": value.amount,
+            "flag": value.flag,
+            "pin": value.pin,
+        }}
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _object_hook(obj: dict[str, Any]) -> Any:
+    if "$decimal" in obj:
+        return Decimal(obj["$decimal"])
+    if "$account" in obj:
+        data = obj["$account"]
+        return AccountData(
+            card_number=data["card_number"],
+            pin_hash=data["pin_hash"],
+            balance=Decimal(data["balance"]),
+            is_blocked=data["is_blocked"],
+            is_retained=data["is_retained"],
+            owner_name=data["owner_name"],
+            expiry_date=data["expiry_date"],
+            version=data.get("version", 0),
+        )
+    if "$ledger" in obj:
+        data = obj["$ledger"]
+        return LedgerEntry(data["id"], data["card"], Decimal(data["delta"]), data["ts"], data["op"])
+    if "$operation" in obj:
+        data = obj["$operation"]
+        return AccountOperation(
+            type=OperationType[data["type"]],
+            card_number=data["card_number"],
+            amount=data["amount"],
+            flag=data["flag"],
+            pin=data["pin"],
+        )
+    return obj
+
+
+def error_response(request_id: Any, error: Exception) -> dict[str, Any]:
+    """Response message reporting `error` (types outside ERROR_TYPES are sent as RuntimeError)."""
+    error_type = type(error).__name__ if type(error).__name__ in ERROR_TYPES else "RuntimeError"
+    response = {"id": request_id, "error": str(error), "type": error_type}
+    if isinstance(error, VersionConflictError):
+        response["conflict"] = [error.card_number, error.expected, error.actual]
+    return response
+
+
+def response_error(response: dict[str, Any]) -> Exception:
+    """Rebuild the exception reported by an error response."""
+    if response.get("type") == "VersionConflictError" and "conflict" in response:
+        return VersionConflictError(*response["conflict"])
+    return ERROR_TYPES.get(response.get("type", ""), RuntimeError)(response["error"])
+
+
+def encode(message: dict[str, Any]) -> bytes:
+    """Encode message as one newline-terminated line."""
+    return json.dumps(message, default=_default, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> dict[str, Any]:
+    """Decode one line; raises ValueError on malformed input."""
+    message = json.loads(line, object_hook=_object_hook)
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    return message
@@ -0,0 +1,162 @@
+"""Abstract bank repository: the storage interface used by BankGateway."""
+
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, nullcontext
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from .account_data import AccountData
+from .account_operation import AccountOperation
+
+
+def demo_accounts() -> list[AccountData]:
+    """Demo accounts created when the bank storage is empty. Card numbers are 16 digits."""
+    expiry = "12/28"
+    return [
+        AccountData("1234567890123456", "hashed_pin_0000", Decimal("10000"), False, False, "Client One", expiry),
+        AccountData("1111111111111111", "hashed_pin_1234", Decimal("5000"), False, False, "Client Two", expiry),
+        AccountData("9999999999999999", "hashed_pin_0000", Decimal("0"), True, False, "Blocked Card", expiry),
+        AccountData("1000000000000001", "hashed_pin_1111", Decimal("0"), False, False, "Incassator", expiry),
+        AccountData("1000000000000002", "hashed_pin_2222", Decimal("0"), False, False, "Technician", expiry),
+    ]
+
+
+class VersionConflictError(RuntimeError):
+    """The account changed since the caller read it (expected version does not match)."""
+
+    def __init__(self, card_number: str, expected: int, actual: int) -> None:
+        super().__init__(f"Account {card_number} is at version {actual}, expected {expected}")
+        self.card_number = card_number
+        self.expected = expected
+        self.actual = actual
+
+
+class BankRepository(ABC):
+    """Base class for bank account storage backends (JSON file, SQLite)."""
+
+    def is_shared(self) -> bool:
+        """True if other processes may change the accounts (reads cannot be cached)."""
+        return False
+
+    @abstractmethod
+    def get_account(self, card_number: str) -> Optional[AccountData]:
+        """Get account by card number; None if not found."""
+        pass
+
+    @abstractmethod
+    def get_all_accounts(self) -> dict[str, AccountData]:
+        """Return a copy of all accounts."""
+        pass
+
+    @abstractmethod
+    def add_account(self, account: AccountData) -> None:
+        """Add or update account."""
+        pass
+
+    @abstractmethod
+    def add_accounts(self, accounts: Iterable[AccountData]) -> int:
+        """Add or update many accounts with a single write; returns their number."""
+        pass
+
+    def get_accounts(self, card_numbers: Iterable[str]) -> dict[str, AccountData]:
+        """Return accounts of the given cards; unknown cards are left out."""
+        result: dict[str, AccountData] = {}
+        for card_number in card_numbers:
+            account = self.get_account(card_number)
+            if account is not None:
+                result[card_number] = account
+        return result
+
+    @abstractmethod
+    def apply_batch(self, operations: Iterable[AccountOperation]) -> int:
+        """
+        Apply operations in order and persist them with a single write; returns their number.
+        If any operation is invalid (unknown or blocked card, negative balance), ValueError is
+        raised and nothing is changed.
+        """
+        pass
+
+    @abstractmethod
+    def update_balance(
+        self, card_number: str, new_balance: Decimal, expected_version: Optional[int] = None
+    ) -> bool:
+        """
+        Set balance; False if card not found or blocked.
+        With expected_version the write is a compare-and-set: VersionConflictError is raised
+        if the account version differs (the same applies to the other single-card mutators).
+        """
+        pass
+
+    def adjust_balance(self, card_number: str, delta: Decimal) -> bool:
+        """
+        Add delta to the balance as one atomic read-modify-write; False if the card is not
+        found or blocked, or if a debit exceeds the balance.
+        """
+        with self.lock_cards(card_number):
+            account = self.get_account(card_number)
+            if account is None or account.is_blocked or (delta < 0 and account.balance + delta < 0):
+                return False
+            return self.update_balance(card_number, account.balance + delta)
+
+    @abstractmethod
+    def block_card(self, card_number: str, expected_version: Optional[int] = None) -> bool:
+        """Block the card; False if card not found."""
+        pass
+
+    @abstractmethod
+    def set_card_retained(
+        self, card_number: str, retained: bool, expected_version: Optional[int] = None
+    ) -> bool:
+        """Mark card as retained (seized by ATM) or not; False if card not found."""
+        pass
+
+    @abstractmethod
+    def get_retained_card_numbers(self) -> list[str]:
+        """Return card numbers that are currently retained."""
+        pass
+
+    def get_blocked_card_numbers(self) -> list[str]:
+        """Return card numbers that are currently blocked."""
+        return [num for num, acc in self.get_all_accounts().items() if acc.is_blocked]
+
+    def count_retained(self) -> int:
+        """Return number of retained cards."""
+        return len(self.get_retained_card_numbers())
+
+    def is_card_blocked(self, card_number: str) -> bool:
+        """Return True if the card exists and is blocked."""
+        account = self.get_account(card_number)
+        return account is not None and account.is_blocked
+
+    @abstractmethod
+    def collect_retained_cards(self, card_numbers: list[str]) -> None:
+        """Mark cards as not retained and unblock."""
+        pass
+
+    @abstractmethod
+    def validate_pin(self, card_number: str, pin: str) -> bool:
+        """Return True if PIN matches the card."""
+        pass
+
+    @abstractmethod
+    def change_pin(
+        self, card_number: str, new_pin: str, expected_version: Optional[int] = None
+    ) -> bool:
+        """Change PIN; False if card not found or blocked."""
+        pass
+
+    @abstractmethod
+    def transfer(self, from_card: str, to_card: str, amount: Decimal) -> bool:
+        """Move amount between two cards; False if not possible."""
+        pass
+
+    def lock_cards(self, *card_numbers: str) -> AbstractContextManager[None]:
+        """
+        Lock the accounts of the given cards for a read-modify-write sequence (e.g. in BankGateway).
+        Re-entrant; no-op unless the repository runs in thread-safe mode.
+        """
+        return nullcontext()
+
+    def close(self) -> None:
+        """Release storage resources (files, connections)."""
+        pass
@@ -0,0 +1,115 @@
+"""Local bank simulator: serves one account store to many ATM processes over TCP."""
+
+import argparse
+import socketserver
+import threading
+from typing import Any, Optional
+
+from ..config import Config
+from .bank_gateway import BankGateway, create_repository
+from .bank_protocol import GATEWAY_METHODS, decode, encode, error_response
+
+
+class _BankRequestHandler(socketserver.StreamRequestHandler):
+    """Answers requests of one connection in order (clients may pipeline)."""
+
+    server: "BankServer"
+    disable_nagle_algorithm = True
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            response = self.server.dispatch(line)
+            try:
+                self.wfile.write(encode(response))
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class BankServer(socketserver.ThreadingTCPServer):
+    """
+    TCP server wrapping a BankGateway shared by the connection threads. There is no server-wide
+    lock: the gateway runs on a thread-safe repository (per-card striped locks for the JSON
+    store, transactions for SQLite), so read-modify-write operations (withdraw, deposit,
+    transfer) are atomic per card while calls on other cards run in parallel.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        gateway: Optional[BankGateway] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        backend: Optional[str] = None,
+    ) -> None:
+        """
+        Bind to host:port (defaults from Config; port 0 picks a free port). Without a gateway
+        one is built on the `backend` repository ("json" or "sqlite", default
+        Config.BANK_BACKEND), the JSON store in thread-safe mode; "remote" is what ATMs set
+        to reach this server, so here it means the JSON store. A given gateway must be safe
+        to call from many threads.
+        """
+        if gateway is None:
+            backend = backend or Config.BANK_BACKEND
+            gateway = BankGateway(
+                create_repository("json" if backend == "remote" else backend, thread_safe=True))
+        self.gateway = gateway
+        self._thread: Optional[threading.Thread] = None
+        super().__init__(
+            (host or Config.BANK_SERVER_HOST,
+             Config.BANK_SERVER_PORT if port is None else port),
+            _BankRequestHandler,
+        )
+
+    @property
+    def port(self) -> int:
+        """Port the server is bound to."""
+        return self.server_address[1]
+
+    def dispatch(self, line: bytes) -> dict[str, Any]:
+        """Execute one encoded request and return the response message."""
+        request_id = None
+        try:
+            request = decode(line)
+            request_id = request.get("id")
+            method = request.get("method")
+            if method not in GATEWAY_METHODS:
+                raise ValueError(f"Unknown method: {method}")
+            result = getattr(self.gateway, method)(*request.get("args", []))
+            return {"id": request_id, "result": result}
+        except Exception as e:
+            return error_response(request_id, e)
+
+    def start(self) -> None:
+        """Serve in a background daemon thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.1},
+            name="bank-server", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local bank simulator.")
+    parser.add_argument("--host", default=Config.BANK_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.BANK_SERVER_PORT)
+    parser.add_argument("--backend", choices=("json", "sqlite"),
+                        help="account storage (default: Config.BANK_BACKEND; \"remote\" means json)")
+    args = parser.parse_args()
+    server = BankServer(host=args.host, port=args.port, backend=args.backend)
+    print(f"Bank server listening on {args.host}:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
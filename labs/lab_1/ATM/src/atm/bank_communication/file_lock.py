@@ -0,0 +1,51 @@
+"""Advisory inter-process lock on a lock file (fcntl.flock), re-entrant within the process."""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+    _FCNTL_AVAILABLE = True
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    _FCNTL_AVAILABLE = False
+
+
+class FileLock:
+    """
+    Exclusive lock shared by all processes that open the same lock file.
+    Threads of one process are serialized by an in-process lock first; nested holds by the
+    same thread only lock the file once.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open (create) the lock file; RuntimeError if file locking is not available."""
+        if not _FCNTL_AVAILABLE:
+            raise RuntimeError("Inter-process file locking requires fcntl (POSIX)")
+        self.path = path
+        try:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise RuntimeError(f"Cannot open lock file {path}: {e}") from e
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """Hold the lock for the duration of the block."""
+        with self._thread_lock:
+            if self._depth == 0:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Close the lock file (releases the lock if held)."""
+        os.close(self._fd)
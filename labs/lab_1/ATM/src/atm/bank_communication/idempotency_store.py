@@ -0,0 +1,190 @@
+"""Bounded dedupe table of idempotency keys for money operations, persisted in an append-only log."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional
+
+from ..config import Config
+from .account_journal import complete_lines, truncate_tail
+
+
+class IdempotencyStore:
+    """
+    Result of every money operation submitted with an idempotency key, so that a retried
+    call returns the first result instead of moving money again.
+    Keys are kept in insertion order with their timestamp: keys older than ttl_seconds and,
+    beyond max_keys, the oldest keys are evicted, so lookups and inserts are O(1) and memory
+    is bounded. Every key is appended to a log (Config.BANK_IDEMPOTENCY_FILE) that is replayed
+    on start and rewritten from the live keys once it holds twice as many records.
+    Before the money moves, begin() logs the key as pending with the versions of the accounts
+    involved; a key still pending after a crash tells the caller to compare those versions
+    with the current ones (unchanged: the operation never ran).
+    """
+
+    def __init__(
+        self,
+        max_keys: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        path: Optional[Path] = None,
+        persist: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        max_keys / ttl_seconds default to Config.BANK_IDEMPOTENCY_MAX_KEYS / BANK_IDEMPOTENCY_TTL_SECONDS.
+        persist: keep the log at `path` (default Config.BANK_IDEMPOTENCY_FILE); False keeps keys in memory only.
+        """
+        self.max_keys = Config.BANK_IDEMPOTENCY_MAX_KEYS if max_keys is None else max_keys
+        if self.max_keys <= 0:
+            raise ValueError("Idempotency store must hold at least one key")
+        self.ttl_seconds = (
+            Config.BANK_IDEMPOTENCY_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str, Optional[bool], Optional[dict[str, Any]]]] = OrderedDict()
+        """Key -> (timestamp, request fingerprint, result or None while pending, account versions), oldest first."""
+        self._last_ts = 0.0
+        self.path: Optional[Path] = (path or Config.BANK_IDEMPOTENCY_FILE) if persist else None
+        self._handle: Optional[BinaryIO] = None
+        self._records = 0
+        if self.path is not None:
+            self._replay()
+            self._handle = self._open()
+
+    def _open(self) -> BinaryIO:
+        assert self.path is not None
+        try:
+            return open(self.path, "ab")
+        except OSError as e:
+            raise RuntimeError(f"Cannot open idempotency log {self.path}: {e}") from e
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(self._clock())
+            return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired keys and the oldest keys beyond max_keys."""
+        entries = self._entries
+        horizon = now - self.ttl_seconds
+        while entries:
+            ts = next(iter(entries.values()))[0]
+            if ts > horizon and len(entries) <= self.max_keys:
+                break
+            entries.popitem(last=False)
+
+    def lookup(self, key: str, fingerprint: str) -> Optional[bool]:
+        """
+        Result recorded for the key, or None if the key is new (or evicted) or still pending.
+        ValueError if the key was used for a different request (fingerprint).
+        """
+        with self._lock:
+            self._evict(self._clock())
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] != fingerprint:
+            raise ValueError(f"Idempotency key {key!r} was already used for another operation")
+        return entry[2]
+
+    def pending(self, key: str) -> Optional[dict[str, Any]]:
+        """Account versions logged by begin() if the key has no result yet, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[2] is not None:
+            return None
+        return entry[3]
+
+    def begin(self, key: str, fingerprint: str, versions: dict[str, Any]) -> None:
+        """Log the key as pending, with the versions of the accounts before the money moves."""
+        self._put(key, fingerprint, None, versions)
+
+    def remember(self, key: str, fingerprint: str, result: bool) -> None:
+        """Record the result of the request made with the key."""
+        self._put(key, fingerprint, result, None)
+
+    def _put(self, key: str, fingerprint: str, result: Optional[bool], versions: Optional[dict[str, Any]]) -> None:
+        with self._lock:
+            ts = self._last_ts = max(self._clock(), self._last_ts)
+            self._entries[key] = (ts, fingerprint, result, versions)
+            self._entries.move_to_end(key)
+            self._evict(ts)
+            self._log(key, ts, fingerprint, result, versions)
+
+    @staticmethod
+    def _line(key: str, ts: float, fingerprint: str, result: Optional[bool],
+              versions: Optional[dict[str, Any]]) -> str:
+        data: dict[str, Any] = {"key": key, "ts": ts, "fp": fingerprint, "ok": result}
+        if versions is not None:
+            data["v"] = versions
+        return json.dumps(data, separators=(",", ":"))
+
+    def _log(self, key: str, ts: float, fingerprint: str, result: Optional[bool],
+             versions: Optional[dict[str, Any]]) -> None:
+        if self._handle is None:
+            return
+        if self._handle.closed:  # a compaction failed to reopen the log
+            self._handle = self._open()
+        line = self._line(key, ts, fingerprint, result, versions)
+        try:
+            self._handle.write(line.encode("utf-8") + b"\n")
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        except OSError as e:
+            raise RuntimeError(f"Failed to append to idempotency log {self.path}: {e}") from e
+        self._records += 1
+        if self._records >= 2 * max(len(self._entries), self.max_keys):
+            self._compact()
+
+    def _replay(self) -> None:
+        """Rebuild the table from the log; a torn last line is ignored and cut off, so appends start on a clean line."""
+        assert self.path is not None
+        if not self.path.exists():
+            return
+        end = 0
+        for offset, line in complete_lines(self.path):
+            try:
+                data = json.loads(line)
+                key, ts, fingerprint, result = data["key"], data["ts"], data["fp"], data["ok"]
+                versions = data.get("v")
+            except (ValueError, KeyError, TypeError, AttributeError):
+                break
+            end = offset
+            self._records += 1
+            self._entries[key] = (ts, fingerprint, result, versions)
+            self._entries.move_to_end(key)
+            self._last_ts = max(self._last_ts, ts)
+        truncate_tail(self.path, end)
+        self._evict(self._clock())
+
+    def _compact(self) -> None:
+        """Atomically rewrite the log with the live keys only."""
+        assert self.path is not None and self._handle is not None
+        lines = [self._line(key, *entry) + "\n" for key, entry in self._entries.items()]
+        tmp_path: Optional[str] = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write("".join(lines).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._handle.close()
+            os.replace(tmp_path, self.path)
+            tmp_path = None
+        except OSError as e:
+            raise RuntimeError(f"Failed to compact idempotency log {self.path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+        self._handle = self._open()
+        self._records = len(lines)
+
+    def close(self) -> None:
+        """Close the log file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
@@ -1,53 +1,147 @@
 """Simulated bank repository with JSON persistence for accounts and cards."""
 
 import json
-from dataclasses import asdict
-from decimal import Decimal
+import os
+import tempfile
+import threading
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
+from decimal import ROUND_HALF_EVEN, Decimal
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 from ..config import Config
 from .account_data import AccountData
+from .account_journal import AccountJournal
+from .account_locks import StripedLock
+from .file_lock import FileLock
+from .account_operation import AccountOperation, OperationType
+from .account_snapshot import load_snapshot, write_snapshot
+from .account_store import (
+    FLAG_BLOCKED,
+    FLAG_RETAINED,
+    AccountStore,
+    from_minor_units,
+    to_minor_units,
+)
+from .bank_repository import BankRepository, VersionConflictError, demo_accounts
 
 
-class MockBankRepository:
-    """Simulated bank database using JSON file for persistence; changes saved immediately."""
+class MockBankRepository(BankRepository):
+    """
+    Simulated bank database using JSON file for persistence; changes saved immediately.
+    Accounts are held in a compact AccountStore and changed in place; AccountData
+    objects are only built when an account is read.
+    In journal mode each change is appended to a journal instead of rewriting the whole file;
+    the JSON file is then a snapshot that is refreshed by background compaction.
+    Changes and their persistence are serialized by a write lock; in thread-safe mode every
+    operation also holds striped per-account locks, so terminals can share one repository.
+    In shared mode several processes use one bank_accounts.json: changes run under an
+    inter-process file lock, and accounts are reloaded only when another process replaced the file.
+    Every committed change increments the version of the touched accounts; single-card mutators
+    accept an expected version and raise VersionConflictError instead of overwriting a newer state.
+    """
 
-    def __init__(self) -> None:
-        """Load or create accounts file and seed demo data if empty."""
+    def __init__(
+        self,
+        journal: Optional[bool] = None,
+        thread_safe: Optional[bool] = None,
+        shared: Optional[bool] = None,
+    ) -> None:
+        """
+        Load or create accounts file and seed demo data if empty.
+        journal: enable journal mode (default: Config.BANK_JOURNAL_ENABLED).
+        thread_safe: enable per-account locks (default: Config.BANK_THREAD_SAFE).
+        shared: enable inter-process locking and change detection (default: Config.BANK_SHARED_FILE).
+        """
         Config.ensure_data_dir()
         self.file_path: Path = Config.BANK_ACCOUNTS_FILE
-        self._accounts = self._load_accounts()
-        if not self._accounts:
-            self._seed_demo_accounts()
-            self._save_accounts()
+        self._journal = AccountJournal(Config.BANK_JOURNAL_FILE)
+        self._journal_enabled = (
+            Config.BANK_JOURNAL_ENABLED if journal is None else journal)
+        self._journal_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        """Serializes in-place changes with their persistence and guards the indexes."""
+        self._card_locks: Optional[StripedLock] = (
+            StripedLock(Config.BANK_LOCK_STRIPES)
+            if (Config.BANK_THREAD_SAFE if thread_safe is None else thread_safe) else None)
+        self._compaction_thread: Optional[threading.Thread] = None
+        shared = Config.BANK_SHARED_FILE if shared is None else shared
+        if shared and self._journal_enabled:
+            raise ValueError("Journal mode cannot be used with a shared accounts file")
+        self._file_lock: Optional[FileLock] = FileLock(Config.BANK_LOCK_FILE) if shared else None
+        self._loaded_signature: Optional[tuple[int, int, int]] = None
+        """(inode, mtime_ns, size) of bank_accounts.json as last loaded or written by this process."""
+        self._retained_cards: dict[str, None] = {}
+        """Secondary index: retained card numbers (dict used as insertion-ordered set)."""
+        self._blocked_cards: dict[str, None] = {}
+        """Secondary index: blocked card numbers."""
+        with self._file_lock.hold() if self._file_lock is not None else nullcontext():
+            self._loaded_signature = self._file_signature()
+            self._store = self._load_accounts()
+            if not len(self._store):
+                self._seed_demo_accounts()
+                self._save_accounts()
+            elif not self._journal_enabled and self._journal.has_records():
+                self._save_accounts()
+                self._journal.discard_rotated()
+                self._journal.file_path.unlink(missing_ok=True)
+        self._rebuild_indexes()
+
+    @staticmethod
+    def _account_from_raw(data: dict[str, Any]) -> AccountData:
+        """
+        Build AccountData from its JSON representation. A balance stored with more than
+        minor-unit precision (written before balances were kept in minor units) is rounded
+        half to even rather than dropping the account.
+        """
+        return AccountData(
+            card_number=data["card_number"],
+            pin_hash=data["pin_hash"],
+            balance=from_minor_units(to_minor_units(Decimal(data["balance"]), ROUND_HALF_EVEN)),
+            is_blocked=data["is_blocked"],
+            is_retained=data.get("is_retained", False),
+            owner_name=data.get("owner_name"),
+            expiry_date=data.get("expiry_date"),
+            version=data.get("version", 0),
+        )
 
-    def _load_accounts(self) -> dict[str, AccountData]:
+    def _load_accounts(self) -> AccountStore:
         """
-        Load accounts from JSON file.
-        Returns empty dict if file not found or invalid.
+        Load accounts from the binary snapshot if it matches the JSON file, otherwise from
+        the JSON file (regenerating the snapshot); then replay journal records on top.
+        Returns empty store if file not found or invalid.
         """
+        store: Optional[AccountStore] = None
+        if self.file_path.exists() and Config.BANK_SNAPSHOT_ENABLED:
+            store = load_snapshot(Config.BANK_SNAPSHOT_FILE, self.file_path.stat())
+        if store is None:
+            signature = self._file_signature()
+            store = self._load_json()
+            if (len(store) and Config.BANK_SNAPSHOT_ENABLED
+                    and self._file_signature() == signature):
+                write_snapshot(Config.BANK_SNAPSHOT_FILE, store, self.file_path.stat())
+        for record in self._journal.replay():
+            for data in record.get("accounts", []):
+                try:
+                    store.put(self._account_from_raw(data))
+                except (ValueError, KeyError):
+                    continue
+        return store
+
+    def _load_json(self) -> AccountStore:
+        """Parse and validate accounts from the JSON file; invalid entries are skipped."""
+        store = AccountStore()
         if not self.file_path.exists():
-            return {}
+            return store
         try:
             with open(self.file_path, "r", encoding="utf-8") as f:
                 raw_data = json.load(f)
-            accounts: dict[str, AccountData] = {}
-            for card_num, data in raw_data.items():
+            for data in raw_data.values():
                 try:
-                    acc = AccountData(
-                        card_number=data["card_number"],
-                        pin_hash=data["pin_hash"],
-                        balance=Decimal(data["balance"]),
-                        is_blocked=data["is_blocked"],
-                        is_retained=data.get("is_retained", False),
-                        owner_name=data.get("owner_name"),
-                        expiry_date=data.get("expiry_date"),
-                    )
-                    accounts[card_num] = acc
+                    store.put(self._account_from_raw(data))
                 except (ValueError, KeyError):
                     continue
-            return accounts
+            return store
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             raise RuntimeError(
                 f"Failed to load bank accounts from {self.file_path}: {e}") from e
@@ -55,110 +149,304 @@ class MockBankRepository:
             raise RuntimeError(
                 f"Unexpected error loading bank accounts: {e}") from e
 
-    def _save_accounts(self) -> None:
+    def _save_accounts(self, store: Optional[AccountStore] = None) -> None:
         """
-        Save current accounts to JSON file.
-        Converts Decimal to str for JSON compatibility.
+        Save current accounts (or the given snapshot of them) to JSON file.
+        Writes a temp file in the same directory and renames it over the target,
+        so readers see either the old or the new file, never a torn one.
+        The binary snapshot is regenerated to match the new JSON file.
         """
-        raw_data: dict[str, dict] = {}
-        for card_num, account in self._accounts.items():
-            raw_data[card_num] = asdict(account)
-            raw_data[card_num]["balance"] = str(raw_data[card_num]["balance"])
+        if store is None:
+            store = self._store
+        raw_data: dict[str, dict] = {
+            store.card_number(slot): store.raw(slot) for slot in range(len(store))}
+        tmp_path: Optional[str] = None
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.file_path.parent, prefix=self.file_path.name, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
                 json.dump(raw_data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+            tmp_path = None
+            if store is self._store:
+                self._loaded_signature = self._file_signature()
         except Exception as e:
             raise RuntimeError(
                 f"Failed to save bank accounts to {self.file_path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+        if Config.BANK_SNAPSHOT_ENABLED:
+            write_snapshot(Config.BANK_SNAPSHOT_FILE, store, self.file_path.stat())
+
+    def _file_signature(self) -> Optional[tuple[int, int, int]]:
+        """(inode, mtime_ns, size) of bank_accounts.json; None if it does not exist."""
+        try:
+            st = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh(self) -> None:
+        """Shared mode: reload accounts if another process replaced bank_accounts.json."""
+        if self._file_lock is None:
+            return
+        signature = self._file_signature()
+        if signature == self._loaded_signature:
+            return
+        with self._write_lock:
+            if signature == self._loaded_signature:
+                return
+            store = self._load_accounts()
+            if len(store):
+                self._store = store
+                self._rebuild_indexes()
+            self._loaded_signature = signature
+
+    def lock_cards(self, *card_numbers: str) -> AbstractContextManager[None]:
+        """
+        Hold per-account locks of the given cards (thread-safe mode) and the inter-process
+        file lock with a fresh view of the accounts (shared mode); no-op otherwise.
+        """
+        if self._card_locks is None and self._file_lock is None:
+            return nullcontext()
+        return self._hold(card_numbers)
+
+    @contextmanager
+    def _hold(self, card_numbers: tuple[str, ...]) -> Iterator[None]:
+        with ExitStack() as stack:
+            if self._card_locks is not None:
+                stack.enter_context(self._card_locks.hold(*card_numbers))
+            if self._file_lock is not None:
+                stack.enter_context(self._file_lock.hold())
+                self._refresh()
+            yield
+
+    @contextmanager
+    def _changing(self, *card_numbers: str) -> Iterator[None]:
+        """Hold card locks and the write lock around an in-place change and its commit."""
+        with self.lock_cards(*card_numbers), self._write_lock:
+            yield
+
+    @contextmanager
+    def _reading(self, *card_numbers: str) -> Iterator[None]:
+        """Pick up other processes' changes (shared mode) and hold card locks (thread-safe mode)."""
+        self._refresh()
+        if self._card_locks is None:
+            yield
+        else:
+            with self._card_locks.hold(*card_numbers):
+                yield
+
+    def _commit(self, slots: list[int], undo: Callable[[], None]) -> None:
+        """
+        Bump the versions of accounts already changed in place at `slots` and persist them as
+        one unit with a single write. If persisting fails, the versions are restored, `undo`
+        restores the previous in-memory values and the error is re-raised.
+        """
+        slots = list(dict.fromkeys(slots))
+        versions = [self._store.version(slot) for slot in slots]
+        for slot, version in zip(slots, versions):
+            self._store.set_version(slot, version + 1)
+        try:
+            self._persist(slots)
+        except RuntimeError:
+            for slot, version in zip(slots, versions):
+                self._store.set_version(slot, version)
+            undo()
+            raise
+        for slot in slots:
+            self._index(slot)
+
+    def _check_version(self, slot: int, expected_version: Optional[int]) -> None:
+        """Raise VersionConflictError if expected_version is given and differs from the slot's."""
+        if expected_version is not None and self._store.version(slot) != expected_version:
+            raise VersionConflictError(
+                self._store.card_number(slot), expected_version, self._store.version(slot))
+
+    def _put(self, account: AccountData) -> tuple[int, bool, Optional[AccountData]]:
+        """
+        Store the account; an existing account keeps at least its current version, so the
+        commit still moves it forward. Returns (slot, appended, previous account).
+        """
+        slot = self._store.slot(account.card_number)
+        previous = self._store.view(slot) if slot is not None else None
+        slot, appended = self._store.put(account)
+        if previous is not None and previous.version > account.version:
+            self._store.set_version(slot, previous.version)
+        return slot, appended, previous
+
+    def _index(self, slot: int) -> None:
+        """Update retained/blocked indexes for one slot."""
+        num = self._store.card_number(slot)
+        if self._store.is_retained(slot):
+            self._retained_cards[num] = None
+        else:
+            self._retained_cards.pop(num, None)
+        if self._store.is_blocked(slot):
+            self._blocked_cards[num] = None
+        else:
+            self._blocked_cards.pop(num, None)
+
+    def _rebuild_indexes(self) -> None:
+        """Build retained/blocked indexes from scratch (after load)."""
+        self._retained_cards.clear()
+        self._blocked_cards.clear()
+        for slot in self._store.flagged_slots():
+            self._index(slot)
+
+    def _persist(self, slots: list[int]) -> None:
+        """
+        Persist one mutation: a journal record in journal mode, otherwise a full file rewrite.
+        Starts background compaction when the journal grows past Config.BANK_JOURNAL_COMPACT_BYTES.
+        """
+        if not self._journal_enabled:
+            self._save_accounts()
+            return
+        with self._journal_lock:
+            self._journal.append(
+                {"accounts": [self._store.raw(slot) for slot in slots]})
+            if (self._journal.size() >= Config.BANK_JOURNAL_COMPACT_BYTES
+                    and not self._is_compacting()):
+                self._journal.rotate()
+                snapshot = self._store.copy()
+                self._compaction_thread = threading.Thread(
+                    target=self._write_snapshot, args=(snapshot,), daemon=True)
+                self._compaction_thread.start()
+
+    def _is_compacting(self) -> bool:
+        return (self._compaction_thread is not None
+                and self._compaction_thread.is_alive())
+
+    def _write_snapshot(self, snapshot: AccountStore) -> None:
+        """Write snapshot taken at rotation time, then drop the rotated journal it covers."""
+        self._save_accounts(snapshot)
+        self._journal.discard_rotated()
+
+    def compact(self) -> None:
+        """Synchronously fold the journal into a fresh JSON snapshot."""
+        self.wait_for_compaction()
+        with self._write_lock, self._journal_lock:
+            self._journal.rotate()
+            self._write_snapshot(self._store.copy())
+
+    def wait_for_compaction(self) -> None:
+        """Block until a running background compaction (if any) finishes."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+
+    def close(self) -> None:
+        """Finish pending compaction and close the journal and lock files."""
+        self.wait_for_compaction()
+        self._journal.close()
+        if self._file_lock is not None:
+            self._file_lock.close()
+
+    def is_shared(self) -> bool:
+        """True in shared mode (other processes change bank_accounts.json)."""
+        return self._file_lock is not None
 
     def get_account(self, card_number: str) -> Optional[AccountData]:
         """
         Get account by card number.
         Returns None if card not found.
         """
-        return self._accounts.get(card_number)
+        with self._reading(card_number):
+            store = self._store
+            slot = store.slot(card_number)
+            return store.view(slot) if slot is not None else None
 
-    def update_balance(self, card_number: str, new_balance: Decimal) -> bool:
+    def update_balance(
+        self, card_number: str, new_balance: Decimal, expected_version: Optional[int] = None
+    ) -> bool:
         """
         Update account balance and save to disk.
         Returns True if successful, False if card not found or blocked.
+        Raises VersionConflictError if expected_version is given and the account has moved on.
         """
-        account = self.get_account(card_number)
-        if account is None or account.is_blocked:
-            return False
-        updated = AccountData(
-            card_number=account.card_number,
-            pin_hash=account.pin_hash,
-            balance=new_balance,
-            is_blocked=account.is_blocked,
-            is_retained=account.is_retained,
-            owner_name=account.owner_name,
-            expiry_date=account.expiry_date,
-        )
-        self._accounts[card_number] = updated
-        self._save_accounts()
-        return True
+        if new_balance < Decimal("0"):
+            raise ValueError("Balance cannot be negative")
+        with self._changing(card_number):
+            slot = self._store.slot(card_number)
+            if slot is None:
+                return False
+            self._check_version(slot, expected_version)
+            if self._store.is_blocked(slot):
+                return False
+            old = self._store.balance(slot)
+            self._store.set_balance(slot, to_minor_units(new_balance))
+            self._commit([slot], lambda: self._store.set_balance(slot, old))
+            return True
 
-    def block_card(self, card_number: str) -> bool:
+    def _set_flag(
+        self, card_number: str, flag: int, value: bool, expected_version: Optional[int]
+    ) -> bool:
+        """Set or clear one flag bit in place and save; False if card not found."""
+        with self._changing(card_number):
+            slot = self._store.slot(card_number)
+            if slot is None:
+                return False
+            self._check_version(slot, expected_version)
+            old = self._store.flags(slot)
+            self._store.set_flags(slot, old | flag if value else old & ~flag)
+            self._commit([slot], lambda: self._store.set_flags(slot, old))
+            return True
+
+    def block_card(self, card_number: str, expected_version: Optional[int] = None) -> bool:
         """
         Block the card and save to disk.
         Returns True if successful, False if card not found.
         """
-        account = self.get_account(card_number)
-        if account is None:
-            return False
-        updated = AccountData(
-            card_number=account.card_number,
-            pin_hash=account.pin_hash,
-            balance=account.balance,
-            is_blocked=True,
-            is_retained=account.is_retained,
-            owner_name=account.owner_name,
-            expiry_date=account.expiry_date,
-        )
-        self._accounts[card_number] = updated
-        self._save_accounts()
-        return True
+        return self._set_flag(card_number, FLAG_BLOCKED, True, expected_version)
 
-    def set_card_retained(self, card_number: str, retained: bool) -> bool:
+    def set_card_retained(
+        self, card_number: str, retained: bool, expected_version: Optional[int] = None
+    ) -> bool:
         """Mark card as retained (seized by ATM) or not. Saves to disk."""
-        account = self.get_account(card_number)
-        if account is None:
-            return False
-        updated = AccountData(
-            card_number=account.card_number,
-            pin_hash=account.pin_hash,
-            balance=account.balance,
-            is_blocked=account.is_blocked,
-            is_retained=retained,
-            owner_name=account.owner_name,
-            expiry_date=account.expiry_date,
-        )
-        self._accounts[card_number] = updated
-        self._save_accounts()
-        return True
+        return self._set_flag(card_number, FLAG_RETAINED, retained, expected_version)
 
     def get_retained_card_numbers(self) -> list[str]:
         """Return list of card numbers that are currently retained (in the machine)."""
-        return [num for num, acc in self._accounts.items() if acc.is_retained]
+        self._refresh()
+        with self._write_lock:
+            return list(self._retained_cards)
+
+    def get_blocked_card_numbers(self) -> list[str]:
+        """Return list of card numbers that are currently blocked."""
+        self._refresh()
+        with self._write_lock:
+            return list(self._blocked_cards)
+
+    def count_retained(self) -> int:
+        """Return number of retained cards."""
+        self._refresh()
+        return len(self._retained_cards)
+
+    def is_card_blocked(self, card_number: str) -> bool:
+        """Return True if the card exists and is blocked."""
+        self._refresh()
+        return card_number in self._blocked_cards
 
     def collect_retained_cards(self, card_numbers: list[str]) -> None:
         """Mark cards as not retained and unblock. Used when technician collects."""
-        for card_number in card_numbers:
-            account = self.get_account(card_number)
-            if account is None:
-                continue
-            updated = AccountData(
-                card_number=account.card_number,
-                pin_hash=account.pin_hash,
-                balance=account.balance,
-                is_blocked=False,
-                is_retained=False,
-                owner_name=account.owner_name,
-                expiry_date=account.expiry_date,
-            )
-            self._accounts[card_number] = updated
-        self._save_accounts()
+        with self._changing(*card_numbers):
+            slots: list[int] = []
+            old_flags: list[int] = []
+            for card_number in card_numbers:
+                slot = self._store.slot(card_number)
+                if slot is None:
+                    continue
+                slots.append(slot)
+                old_flags.append(self._store.flags(slot))
+                self._store.set_flags(slot, 0)
+
+            def undo() -> None:
+                for slot, flags in zip(slots, old_flags):
+                    self._store.set_flags(slot, flags)
+            self._commit(slots, undo)
 
     def validate_pin(self, card_number: str, pin: str) -> bool:
         """
@@ -166,66 +454,169 @@ class MockBankRepository:
         In simulation we compare plain string (in real life - hash verification).
         Returns True if PIN matches.
         """
-        account = self.get_account(card_number)
-        if account is None:
+        self._refresh()
+        store = self._store
+        slot = store.slot(card_number)
+        if slot is None:
             return False
-        return account.pin_hash == f"hashed_pin_{pin}"
+        return store.pin_hash(slot) == f"hashed_pin_{pin}"
 
     def add_account(self, account: AccountData) -> None:
         """
         Add or update account and save to disk.
         """
-        self._accounts[account.card_number] = account
-        self._save_accounts()
+        with self._changing(account.card_number):
+            slot, appended, previous = self._put(account)
+
+            def undo() -> None:
+                if appended:
+                    self._store.pop_last()
+                elif previous is not None:
+                    self._store.put(previous)
+            self._commit([slot], undo)
+
+    def add_accounts(self, accounts: Iterable[AccountData]) -> int:
+        """Add or update many accounts and save them with a single write."""
+        batch = list(accounts)
+        for account in batch:
+            if not isinstance(account, AccountData):
+                raise ValueError(f"Not an account: {account!r}")
+        slots: dict[int, None] = {}
+        undo_log: list[tuple[bool, Optional[AccountData]]] = []
+
+        def undo() -> None:
+            for appended, previous in reversed(undo_log):
+                if appended:
+                    self._store.pop_last()
+                elif previous is not None:
+                    self._store.put(previous)
+        with self._changing(*(account.card_number for account in batch)):
+            for account in batch:
+                slot, appended, previous = self._put(account)
+                undo_log.append((appended, previous))
+                slots[slot] = None
+            if slots:
+                self._commit(list(slots), undo)
+        return len(batch)
+
+    def get_accounts(self, card_numbers: Iterable[str]) -> dict[str, AccountData]:
+        """Return accounts of the given cards; unknown cards are left out."""
+        result: dict[str, AccountData] = {}
+        for card_number in card_numbers:
+            account = self.get_account(card_number)
+            if account is not None:
+                result[card_number] = account
+        return result
+
+    def _apply_operation(self, slot: int, op: AccountOperation) -> None:
+        """Apply one batch operation in place; ValueError if it is not allowed."""
+        store = self._store
+        if op.type == OperationType.SET_BLOCKED:
+            flags = store.flags(slot)
+            store.set_flags(slot, flags | FLAG_BLOCKED if op.flag else flags & ~FLAG_BLOCKED)
+            return
+        if op.type == OperationType.SET_RETAINED:
+            flags = store.flags(slot)
+            store.set_flags(slot, flags | FLAG_RETAINED if op.flag else flags & ~FLAG_RETAINED)
+            return
+        if store.is_blocked(slot):
+            raise ValueError("card is blocked")
+        if op.type == OperationType.CHANGE_PIN:
+            store.set_pin_hash(slot, f"hashed_pin_{op.pin}")
+            return
+        minor = to_minor_units(op.amount)
+        if op.type == OperationType.ADJUST_BALANCE:
+            minor += store.balance(slot)
+            if minor < 0:
+                raise ValueError("insufficient funds")
+        store.set_balance(slot, minor)
+
+    def apply_batch(self, operations: Iterable[AccountOperation]) -> int:
+        """
+        Apply operations in order in memory and save them with a single write.
+        On the first invalid operation all changes are rolled back and ValueError is raised.
+        """
+        ops = list(operations)
+        saved: dict[int, tuple[int, int, str]] = {}  # slot -> balance, flags, PIN hash before the batch
+
+        def undo() -> None:
+            for slot, (balance, flags, pin_hash) in saved.items():
+                self._store.set_balance(slot, balance)
+                self._store.set_flags(slot, flags)
+                self._store.set_pin_hash(slot, pin_hash)
+        with self._changing(*(op.card_number for op in ops)):
+            for index, op in enumerate(ops):
+                slot = self._store.slot(op.card_number)
+                try:
+                    if slot is None:
+                        raise ValueError("card not found")
+                    if slot not in saved:
+                        saved[slot] = (self._store.balance(slot), self._store.flags(slot),
+                                       self._store.pin_hash(slot))
+                    self._apply_operation(slot, op)
+                except ValueError as e:
+                    undo()
+                    raise ValueError(
+                        f"Batch operation {index} ({op.type.name} {op.card_number}): {e}") from e
+            if saved:
+                self._commit(list(saved), undo)
+        return len(ops)
 
     def _seed_demo_accounts(self) -> None:
         """Create demo accounts when no bank_accounts.json exists. Card numbers are 16 digits."""
-        expiry = "12/28"
-        demos = [
-            AccountData("1234567890123456", "hashed_pin_0000", Decimal("10000"), False, False, "Client One", expiry),
-            AccountData("1111111111111111", "hashed_pin_1234", Decimal("5000"), False, False, "Client Two", expiry),
-            AccountData("9999999999999999", "hashed_pin_0000", Decimal("0"), True, False, "Blocked Card", expiry),
-            AccountData("1000000000000001", "hashed_pin_1111", Decimal("0"), False, False, "Incassator", expiry),
-            AccountData("1000000000000002", "hashed_pin_2222", Decimal("0"), False, False, "Technician", expiry),
-        ]
-        for acc in demos:
-            self._accounts[acc.card_number] = acc
+        for acc in demo_accounts():
+            self._store.put(acc)
 
     def get_all_accounts(self) -> dict[str, AccountData]:
         """
         Return a copy of all accounts (for debugging or admin purposes).
         """
-        return dict(self._accounts)
+        self._refresh()
+        with self._write_lock:
+            return {self._store.card_number(slot): self._store.view(slot)
+                    for slot in range(len(self._store))}
 
-    def change_pin(self, card_number: str, new_pin: str) -> bool:
+    def change_pin(
+        self, card_number: str, new_pin: str, expected_version: Optional[int] = None
+    ) -> bool:
         """Change PIN hash for the card."""
-        account = self.get_account(card_number)
-        if account is None or account.is_blocked:
-            return False
-        new_hash = f"hashed_pin_{new_pin}"
-        updated = AccountData(
-            card_number=account.card_number,
-            pin_hash=new_hash,
-            balance=account.balance,
-            is_blocked=account.is_blocked,
-            is_retained=account.is_retained,
-            owner_name=account.owner_name,
-            expiry_date=account.expiry_date,
-        )
-        self._accounts[card_number] = updated
-        self._save_accounts()
-        return True
+        with self._changing(card_number):
+            slot = self._store.slot(card_number)
+            if slot is None:
+                return False
+            self._check_version(slot, expected_version)
+            if self._store.is_blocked(slot):
+                return False
+            old = self._store.pin_hash(slot)
+            self._store.set_pin_hash(slot, f"hashed_pin_{new_pin}")
+            self._commit([slot], lambda: self._store.set_pin_hash(slot, old))
+            return True
 
     def transfer(
         self, from_card: str, to_card: str, amount: Decimal
     ) -> bool:
-        """Transfer amount from one card to another. Saves to disk."""
-        from_acc = self.get_account(from_card)
-        to_acc = self.get_account(to_card)
-        if from_acc is None or to_acc is None or from_acc.is_blocked or to_acc.is_blocked:
-            return False
-        if from_acc.balance < amount or amount <= 0:
-            return False
-        self.update_balance(from_card, from_acc.balance - amount)
-        self.update_balance(to_card, to_acc.balance + amount)
-        return True
+        """Transfer amount from one card to another. Both accounts are saved in one write."""
+        with self._changing(from_card, to_card):
+            from_slot = self._store.slot(from_card)
+            to_slot = self._store.slot(to_card)
+            if from_slot is None or to_slot is None:
+                return False
+            if self._store.is_blocked(from_slot) or self._store.is_blocked(to_slot):
+                return False
+            if amount <= 0:
+                return False
+            minor = to_minor_units(amount)
+            from_old = self._store.balance(from_slot)
+            to_old = self._store.balance(to_slot)
+            if from_old < minor:
+                return False
+            if from_slot == to_slot:
+                return True
+            self._store.set_balance(from_slot, from_old - minor)
+            self._store.set_balance(to_slot, to_old + minor)
+
+            def undo() -> None:
+                self._store.set_balance(from_slot, from_old)
+                self._store.set_balance(to_slot, to_old)
+            self._commit([from_slot, to_slot], undo)
+            return True
@@ -0,0 +1,257 @@
+"""Client of BankServer with the same method surface as BankGateway."""
+
+import itertools
+import queue
+import socket
+import threading
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+
+from ..config import Config
+from .account_data import AccountData
+from .account_ledger import LedgerEntry
+from .account_operation import AccountOperation
+from .bank_protocol import decode, encode, response_error
+
+
+class BankConnectionError(RuntimeError):
+    """The call did not complete: no free connection, lost connection or timeout."""
+
+
+class _Connection:
+    """One TCP connection to the bank server."""
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+
+    def close(self) -> None:
+        try:
+            self.rfile.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RemoteBankGateway:
+    """
+    Bank gateway talking to BankServer over localhost TCP.
+    Keeps a pool of up to pool_size connections shared by threads; every call has a timeout,
+    and pipeline() sends a batch of calls in one write before reading the answers.
+    Server-side errors are re-raised as ValueError / RuntimeError; connection failures and
+    timeouts raise BankConnectionError. Money movements with an idempotency key are repeated
+    after such a failure (Config.BANK_SERVER_RETRIES times), since the server executes them once.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Connection settings default to Config.BANK_SERVER_*; connections are opened lazily."""
+        self.host = host or Config.BANK_SERVER_HOST
+        self.port = Config.BANK_SERVER_PORT if port is None else port
+        self.pool_size = pool_size or Config.BANK_SERVER_POOL_SIZE
+        self.timeout = Config.BANK_SERVER_TIMEOUT_SECONDS if timeout is None else timeout
+        self._idle: queue.LifoQueue[_Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    def _acquire(self, timeout: float) -> _Connection:
+        if self._closed:
+            raise RuntimeError("Bank gateway is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise BankConnectionError("Timed out waiting for a free bank connection")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return _Connection(self.host, self.port, timeout)
+        except OSError as e:
+            self._slots.release()
+            raise BankConnectionError(f"Cannot connect to bank at {self.host}:{self.port}: {e}") from e
+
+    def _release(self, conn: _Connection, healthy: bool) -> None:
+        if healthy and not self._closed:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def pipeline(
+        self, calls: list[tuple[str, tuple[Any, ...]]], timeout: Optional[float] = None
+    ) -> list[Any]:
+        """
+        Send all calls (method, args) on one connection in a single write, then read the results.
+        Raises the first server-side error after all responses have been read.
+        """
+        if not calls:
+            return []
+        timeout = self.timeout if timeout is None else timeout
+        conn = self._acquire(timeout)
+        healthy = False
+        responses: list[dict[str, Any]] = []
+        try:
+            ids = [next(self._ids) for _ in calls]
+            conn.sock.settimeout(timeout)
+            conn.sock.sendall(b"".join(
+                encode({"id": i, "method": method, "args": list(args)})
+                for i, (method, args) in zip(ids, calls)))
+            for request_id in ids:
+                line = conn.rfile.readline()
+                if not line:
+                    raise BankConnectionError("Bank server closed the connection")
+                response = decode(line)
+                if response.get("id") != request_id:
+                    raise BankConnectionError("Bank server response out of order")
+                responses.append(response)
+            healthy = True
+        except socket.timeout as e:
+            raise BankConnectionError(f"Bank call timed out after {timeout} s") from e
+        except (OSError, ValueError) as e:
+            raise BankConnectionError(f"Bank connection failed: {e}") from e
+        finally:
+            self._release(conn, healthy)
+        for response in responses:
+            if "error" in response:
+                raise response_error(response)
+        return [response.get("result") for response in responses]
+
+    def call(self, method: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Call one gateway method on the server."""
+        return self.pipeline([(method, args)], timeout)[0]
+
+    def _call_idempotent(self, method: str, key: Optional[str], *args: Any) -> Any:
+        """Call a money movement; with an idempotency key retry it after connection failures."""
+        retries = 0 if key is None else Config.BANK_SERVER_RETRIES
+        while True:
+            try:
+                return self.call(method, *args, key)
+            except BankConnectionError:
+                if retries <= 0:
+                    raise
+                retries -= 1
+
+    def validate_pin(self, card_number: str, pin: str) -> bool:
+        """Check if PIN is correct for the given card."""
+        return self.call("validate_pin", card_number, pin)
+
+    def is_card_blocked(self, card_number: str) -> bool:
+        """Check if the card is blocked."""
+        return self.call("is_card_blocked", card_number)
+
+    def block_card(self, card_number: str, expected_version: Optional[int] = None) -> bool:
+        """Block the card after too many failed attempts."""
+        return self.call("block_card", card_number, expected_version)
+
+    def get_balance(self, card_number: str) -> Optional[Decimal]:
+        """Get current balance or None if card not found / blocked."""
+        return self.call("get_balance", card_number)
+
+    def withdraw(
+        self,
+        card_number: str,
+        amount: Decimal,
+        expected_version: Optional[int] = None,
+        operation: str = "withdraw",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Withdraw money if possible (VersionConflictError if expected_version is stale)."""
+        return self._call_idempotent(
+            "withdraw", idempotency_key, card_number, amount, expected_version, operation)
+
+    def deposit(
+        self,
+        card_number: str,
+        amount: Decimal,
+        expected_version: Optional[int] = None,
+        operation: str = "deposit",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Deposit money."""
+        return self._call_idempotent(
+            "deposit", idempotency_key, card_number, amount, expected_version, operation)
+
+    def get_remaining_withdrawal_limit(self, card_number: str) -> Optional[Decimal]:
+        """Cash the card may still withdraw today; None if the bank has no daily limit."""
+        return self.call("get_remaining_withdrawal_limit", card_number)
+
+    def change_pin(
+        self, card_number: str, new_pin: str, expected_version: Optional[int] = None
+    ) -> bool:
+        """Change PIN via bank repository."""
+        return self.call("change_pin", card_number, new_pin, expected_version)
+
+    def get_account(self, card_number: str) -> Optional[AccountData]:
+        """Get account data by card number (e.g. for expiry date)."""
+        return self.call("get_account", card_number)
+
+    def get_accounts(self, card_numbers: Iterable[str]) -> dict[str, AccountData]:
+        """Get accounts of many cards in one round trip."""
+        return self.call("get_accounts", list(card_numbers))
+
+    def add_accounts(self, accounts: Iterable[AccountData]) -> int:
+        """Add or update many accounts with a single write on the server."""
+        return self.call("add_accounts", list(accounts))
+
+    def apply_batch(self, operations: Iterable[AccountOperation]) -> int:
+        """Apply many account operations with a single write on the server; all or nothing."""
+        return self.call("apply_batch", list(operations))
+
+    def set_card_retained(
+        self, card_number: str, retained: bool, expected_version: Optional[int] = None
+    ) -> bool:
+        """Mark card as retained (seized by ATM) or not."""
+        return self.call("set_card_retained", card_number, retained, expected_version)
+
+    def get_retained_card_numbers(self) -> list[str]:
+        """Return card numbers that are currently retained in the machine."""
+        return self.call("get_retained_card_numbers")
+
+    def get_blocked_card_numbers(self) -> list[str]:
+        """Return card numbers that are currently blocked."""
+        return self.call("get_blocked_card_numbers")
+
+    def count_retained(self) -> int:
+        """Return number of cards currently retained in the machine."""
+        return self.call("count_retained")
+
+    def collect_retained_cards(self, card_numbers: list[str]) -> None:
+        """Mark cards as not retained and unblock (after technician collects)."""
+        self.call("collect_retained_cards", card_numbers)
+
+    def transfer(
+        self,
+        from_card: str,
+        to_card: str,
+        amount: Decimal,
+        operation: str = "transfer",
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Transfer amount from one account to another."""
+        return self._call_idempotent(
+            "transfer", idempotency_key, from_card, to_card, amount, operation)
+
+    def get_history(
+        self,
+        card_number: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> list[LedgerEntry]:
+        """Ledger entries of the card kept by the bank server."""
+        return self.call("get_history", card_number, since, until, limit)
+
+    def close(self) -> None:
+        """Close all idle connections; connections in use are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,477 @@
+"""Bank repository backed by SQLite: one indexed statement or one transaction per operation."""
+
+import argparse
+import functools
+import json
+import sqlite3
+import threading
+from dataclasses import replace
+from decimal import ROUND_HALF_EVEN, Decimal
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, TypeVar, cast
+
+from ..config import Config
+from .account_data import AccountData
+from .account_operation import AccountOperation, OperationType
+from .account_store import from_minor_units, to_minor_units
+from .bank_repository import BankRepository, VersionConflictError, demo_accounts
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    card_number TEXT PRIMARY KEY,
+    pin_hash    TEXT NOT NULL,
+    balance     TEXT NOT NULL,
+    is_blocked  INTEGER NOT NULL DEFAULT 0,
+    is_retained INTEGER NOT NULL DEFAULT 0,
+    owner_name  TEXT,
+    expiry_date TEXT,
+    version     INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_accounts_blocked
+    ON accounts(card_number) WHERE is_blocked = 1;
+CREATE INDEX IF NOT EXISTS idx_accounts_retained
+    ON accounts(card_number) WHERE is_retained = 1;
+"""
+
+_COLUMNS = (
+    "card_number, pin_hash, balance, is_blocked, is_retained, owner_name, expiry_date, version"
+)
+
+_IN_CHUNK = 500
+"""Card numbers per `IN (...)` lookup (stays below SQLite's bound-parameter limit)."""
+
+def _money(amount: Decimal) -> str:
+    """Balance as stored: whole minor units, like the JSON backend (ValueError on finer precision)."""
+    return str(from_minor_units(to_minor_units(amount)))
+
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _locked(method: _F) -> _F:
+    """Run the method under the repository's connection lock."""
+
+    @functools.wraps(method)
+    def wrapper(self: "SqliteBankRepository", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return cast(_F, wrapper)
+
+
+class SqliteBankRepository(BankRepository):
+    """
+    Bank database in an SQLite file (Config.BANK_DB_FILE).
+    Balances are stored as decimal strings in whole minor units (cents), like the JSON backend.
+    Every change increments the row's version column (optimistic concurrency).
+    The connection is shared by threads, so every statement or transaction on it runs under
+    one lock; read-modify-writes (adjust_balance, transfer, batches, compare-and-set) are
+    BEGIN IMMEDIATE transactions, so processes sharing the database cannot lose updates.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None) -> None:
+        """
+        Open (or create) the database. If it is empty, import Config.BANK_ACCOUNTS_FILE
+        when present, otherwise seed demo accounts.
+        """
+        Config.ensure_data_dir()
+        self.db_path: Path = db_path or Config.BANK_DB_FILE
+        self._lock = threading.RLock()
+        self.created = False
+        """True if the database was empty and has just been filled (imported or seeded)."""
+        try:
+            self._conn = sqlite3.connect(
+                str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._migrate()
+        except sqlite3.Error as e:
+            raise RuntimeError(
+                f"Failed to open bank database {self.db_path}: {e}") from e
+        if self._count() == 0:
+            self.created = True
+            if Config.BANK_ACCOUNTS_FILE.exists():
+                self.import_json(Config.BANK_ACCOUNTS_FILE)
+            else:
+                self._insert_accounts(demo_accounts())
+
+    def is_shared(self) -> bool:
+        """Other processes may open the same database file."""
+        return True
+
+    @_locked
+    def _migrate(self) -> None:
+        """Add columns missing in databases created by older versions."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(accounts)")}
+        if "version" not in columns:
+            with self._conn:
+                self._conn.execute(
+                    "ALTER TABLE accounts ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    @_locked
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+
+    @staticmethod
+    def _row_to_account(row: tuple[Any, ...]) -> AccountData:
+        return AccountData(
+            card_number=row[0],
+            pin_hash=row[1],
+            balance=Decimal(row[2]),
+            is_blocked=bool(row[3]),
+            is_retained=bool(row[4]),
+            owner_name=row[5],
+            expiry_date=row[6],
+            version=row[7],
+        )
+
+    @staticmethod
+    def _account_to_row(account: AccountData) -> tuple[Any, ...]:
+        return (
+            account.card_number,
+            account.pin_hash,
+            str(account.balance),
+            int(account.is_blocked),
+            int(account.is_retained),
+            account.owner_name,
+            account.expiry_date,
+            account.version,
+        )
+
+    @_locked
+    def _insert_accounts(self, accounts: list[AccountData]) -> None:
+        """Insert or replace many accounts in one transaction, keeping their versions (seed, import)."""
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO accounts ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._account_to_row(acc) for acc in accounts],
+            )
+
+    @_locked
+    def _upsert_accounts(self, accounts: list[AccountData]) -> None:
+        """
+        Add or update many accounts in one transaction as a change: the stored version
+        becomes one more than the larger of the given and the current version.
+        """
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO accounts ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(card_number) DO UPDATE SET "
+                "pin_hash = excluded.pin_hash, balance = excluded.balance, "
+                "is_blocked = excluded.is_blocked, is_retained = excluded.is_retained, "
+                "owner_name = excluded.owner_name, expiry_date = excluded.expiry_date, "
+                "version = MAX(accounts.version + 1, excluded.version)",
+                [self._account_to_row(replace(acc, version=acc.version + 1)) for acc in accounts],
+            )
+
+    @_locked
+    def _update_card(
+        self,
+        assignments: str,
+        params: tuple[Any, ...],
+        card_number: str,
+        expected_version: Optional[int],
+        unblocked_only: bool = False,
+    ) -> bool:
+        """
+        Run `UPDATE accounts SET <assignments>` on one card and bump its version.
+        With expected_version the version is checked first in the same transaction.
+        """
+        where = "card_number = ? AND is_blocked = 0" if unblocked_only else "card_number = ?"
+        with self._conn:
+            if expected_version is not None:
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute(
+                    "SELECT version FROM accounts WHERE card_number = ?", (card_number,)
+                ).fetchone()
+                if row is None:
+                    return False
+                if row[0] != expected_version:
+                    raise VersionConflictError(card_number, expected_version, row[0])
+            cur = self._conn.execute(
+                f"UPDATE accounts SET {assignments}, version = version + 1 WHERE {where}",
+                (*params, card_number),
+            )
+        return cur.rowcount == 1
+
+    def import_json(self, json_path: Path) -> int:
+        """
+        Migrate accounts from a bank_accounts.json file (MockBankRepository format).
+        Invalid entries are skipped; balances are rounded to minor units (half to even) as on a JSON load.
+        Returns number of imported accounts.
+        """
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                raw_data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise RuntimeError(
+                f"Failed to import bank accounts from {json_path}: {e}") from e
+        accounts: list[AccountData] = []
+        for data in raw_data.values():
+            try:
+                accounts.append(AccountData(
+                    card_number=data["card_number"],
+                    pin_hash=data["pin_hash"],
+                    balance=from_minor_units(
+                        to_minor_units(Decimal(data["balance"]), ROUND_HALF_EVEN)),
+                    is_blocked=data["is_blocked"],
+                    is_retained=data.get("is_retained", False),
+                    owner_name=data.get("owner_name"),
+                    expiry_date=data.get("expiry_date"),
+                    version=data.get("version", 0),
+                ))
+            except (ValueError, KeyError, TypeError):
+                continue
+        self._insert_accounts(accounts)
+        return len(accounts)
+
+    @_locked
+    def get_account(self, card_number: str) -> Optional[AccountData]:
+        """Get account by card number (primary key lookup)."""
+        row = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM accounts WHERE card_number = ?",
+            (card_number,),
+        ).fetchone()
+        return self._row_to_account(row) if row else None
+
+    @_locked
+    def get_all_accounts(self) -> dict[str, AccountData]:
+        """Return all accounts (for debugging or admin purposes)."""
+        rows = self._conn.execute(f"SELECT {_COLUMNS} FROM accounts")
+        return {row[0]: self._row_to_account(row) for row in rows}
+
+    def add_account(self, account: AccountData) -> None:
+        """Add or update account."""
+        self._upsert_accounts([account])
+
+    def add_accounts(self, accounts: Iterable[AccountData]) -> int:
+        """Add or update many accounts in one transaction."""
+        batch = list(accounts)
+        for account in batch:
+            if not isinstance(account, AccountData):
+                raise ValueError(f"Not an account: {account!r}")
+        self._upsert_accounts(batch)
+        return len(batch)
+
+    @_locked
+    def _select_accounts(self, card_numbers: list[str]) -> list[tuple[Any, ...]]:
+        rows: list[tuple[Any, ...]] = []
+        for start in range(0, len(card_numbers), _IN_CHUNK):
+            chunk = card_numbers[start:start + _IN_CHUNK]
+            rows.extend(self._conn.execute(
+                f"SELECT {_COLUMNS} FROM accounts WHERE card_number IN "
+                f"({', '.join('?' * len(chunk))})",
+                chunk,
+            ))
+        return rows
+
+    def get_accounts(self, card_numbers: Iterable[str]) -> dict[str, AccountData]:
+        """Return accounts of the given cards with chunked `IN` lookups."""
+        rows = self._select_accounts(list(dict.fromkeys(card_numbers)))
+        return {row[0]: self._row_to_account(row) for row in rows}
+
+    @_locked
+    def apply_batch(self, operations: Iterable[AccountOperation]) -> int:
+        """
+        Apply operations in order in one transaction; the touched rows are read once,
+        changed in memory and written back with one executemany.
+        """
+        ops = list(operations)
+        if not ops:
+            return 0
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            state: dict[str, list[Any]] = {
+                row[0]: [Decimal(row[2]), bool(row[3]), bool(row[4]), row[1]]
+                for row in self._select_accounts(
+                    list(dict.fromkeys(op.card_number for op in ops)))
+            }
+            for index, op in enumerate(ops):
+                try:
+                    self._apply_operation(state.get(op.card_number), op)
+                except ValueError as e:
+                    raise ValueError(
+                        f"Batch operation {index} ({op.type.name} {op.card_number}): {e}") from e
+            self._conn.executemany(
+                "UPDATE accounts SET balance = ?, is_blocked = ?, is_retained = ?, pin_hash = ?, "
+                "version = version + 1 WHERE card_number = ?",
+                [(_money(balance), int(blocked), int(retained), pin_hash, num)
+                 for num, (balance, blocked, retained, pin_hash) in state.items()],
+            )
+        return len(ops)
+
+    @staticmethod
+    def _apply_operation(account: Optional[list[Any]], op: AccountOperation) -> None:
+        """Apply one operation to [balance, is_blocked, is_retained, pin_hash]; ValueError if not allowed."""
+        if account is None:
+            raise ValueError("card not found")
+        if op.type == OperationType.SET_BLOCKED:
+            account[1] = op.flag
+            return
+        if op.type == OperationType.SET_RETAINED:
+            account[2] = op.flag
+            return
+        if account[1]:
+            raise ValueError("card is blocked")
+        if op.type == OperationType.CHANGE_PIN:
+            account[3] = f"hashed_pin_{op.pin}"
+            return
+        amount = from_minor_units(to_minor_units(op.amount))
+        if op.type == OperationType.SET_BALANCE:
+            account[0] = amount
+        else:
+            if account[0] + amount < 0:
+                raise ValueError("insufficient funds")
+            account[0] += amount
+
+    def update_balance(
+        self, card_number: str, new_balance: Decimal, expected_version: Optional[int] = None
+    ) -> bool:
+        """Set balance of a non-blocked card in one statement."""
+        return self._update_card(
+            "balance = ?", (_money(new_balance),), card_number, expected_version, unblocked_only=True)
+
+    @_locked
+    def adjust_balance(self, card_number: str, delta: Decimal) -> bool:
+        """Add delta to the balance of a non-blocked card in one BEGIN IMMEDIATE transaction."""
+        delta = from_minor_units(to_minor_units(delta))
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT balance FROM accounts WHERE card_number = ? AND is_blocked = 0",
+                (card_number,),
+            ).fetchone()
+            if row is None:
+                return False
+            balance = Decimal(row[0]) + delta
+            if delta < 0 and balance < 0:
+                return False
+            self._conn.execute(
+                "UPDATE accounts SET balance = ?, version = version + 1 WHERE card_number = ?",
+                (_money(balance), card_number),
+            )
+        return True
+
+    def block_card(self, card_number: str, expected_version: Optional[int] = None) -> bool:
+        """Block the card."""
+        return self._update_card("is_blocked = 1", (), card_number, expected_version)
+
+    def set_card_retained(
+        self, card_number: str, retained: bool, expected_version: Optional[int] = None
+    ) -> bool:
+        """Mark card as retained (seized by ATM) or not."""
+        return self._update_card(
+            "is_retained = ?", (int(retained),), card_number, expected_version)
+
+    @_locked
+    def get_retained_card_numbers(self) -> list[str]:
+        """Return retained card numbers (served by the partial index)."""
+        rows = self._conn.execute(
+            "SELECT card_number FROM accounts WHERE is_retained = 1")
+        return [row[0] for row in rows]
+
+    @_locked
+    def get_blocked_card_numbers(self) -> list[str]:
+        """Return blocked card numbers (served by the partial index)."""
+        rows = self._conn.execute(
+            "SELECT card_number FROM accounts WHERE is_blocked = 1")
+        return [row[0] for row in rows]
+
+    @_locked
+    def count_retained(self) -> int:
+        """Count retained cards (served by the partial index)."""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM accounts WHERE is_retained = 1").fetchone()[0]
+
+    @_locked
+    def is_card_blocked(self, card_number: str) -> bool:
+        """Return True if the card exists and is blocked."""
+        row = self._conn.execute(
+            "SELECT is_blocked FROM accounts WHERE card_number = ?",
+            (card_number,),
+        ).fetchone()
+        return row is not None and bool(row[0])
+
+    @_locked
+    def collect_retained_cards(self, card_numbers: list[str]) -> None:
+        """Mark cards as not retained and unblock, in one transaction."""
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE accounts SET is_retained = 0, is_blocked = 0, version = version + 1 "
+                "WHERE card_number = ?",
+                [(num,) for num in card_numbers],
+            )
+
+    @_locked
+    def validate_pin(self, card_number: str, pin: str) -> bool:
+        """Validate PIN for the card (simulated hash comparison)."""
+        row = self._conn.execute(
+            "SELECT pin_hash FROM accounts WHERE card_number = ?",
+            (card_number,),
+        ).fetchone()
+        return row is not None and row[0] == f"hashed_pin_{pin}"
+
+    def change_pin(
+        self, card_number: str, new_pin: str, expected_version: Optional[int] = None
+    ) -> bool:
+        """Change PIN hash of a non-blocked card."""
+        return self._update_card(
+            "pin_hash = ?", (f"hashed_pin_{new_pin}",), card_number, expected_version,
+            unblocked_only=True)
+
+    @_locked
+    def transfer(
+        self, from_card: str, to_card: str, amount: Decimal
+    ) -> bool:
+        """Transfer amount between two non-blocked cards in one transaction."""
+        if amount <= 0:
+            return False
+        amount = from_minor_units(to_minor_units(amount))
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = dict(self._conn.execute(
+                "SELECT card_number, balance FROM accounts "
+                "WHERE card_number IN (?, ?) AND is_blocked = 0",
+                (from_card, to_card),
+            ).fetchall())
+            if from_card not in rows or to_card not in rows:
+                return False
+            from_balance = Decimal(rows[from_card])
+            if from_balance < amount:
+                return False
+            to_balance = Decimal(rows[to_card])
+            if from_card == to_card:
+                return True
+            self._conn.executemany(
+                "UPDATE accounts SET balance = ?, version = version + 1 WHERE card_number = ?",
+                [(_money(from_balance - amount), from_card),
+                 (_money(to_balance + amount), to_card)],
+            )
+        return True
+
+    @_locked
+    def close(self) -> None:
+        """Close database connection."""
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate bank_accounts.json into the SQLite bank database.")
+    parser.add_argument("--force", action="store_true",
+                        help="import into a database that already holds accounts "
+                             "(their balances and versions are replaced by the JSON values)")
+    args = parser.parse_args()
+    repo = SqliteBankRepository()
+    try:
+        if repo.created:
+            print(f"Created {repo.db_path} with {repo._count()} accounts")
+        elif args.force:
+            count = repo.import_json(Config.BANK_ACCOUNTS_FILE)
+            print(f"Imported {count} accounts into {repo.db_path}")
+        else:
+            raise SystemExit(
+                f"{repo.db_path} already holds accounts; use --force to overwrite them "
+                f"from {Config.BANK_ACCOUNTS_FILE}")
+    finally:
+        repo.close()
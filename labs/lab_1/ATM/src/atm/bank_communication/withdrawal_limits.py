@@ -0,0 +1,298 @@
+"""Per-card rolling daily withdrawal totals in fixed time buckets, persisted in an append-only log."""
+
+import os
+import tempfile
+import threading
+import time
+from array import array
+from decimal import Decimal
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Union
+
+from ..config import Config
+from .account_journal import complete_lines, truncate_tail
+from .account_store import from_minor_units, to_minor_units
+
+_Key = Union[int, str]
+
+
+def _key(card_number: str) -> _Key:
+    """Card numbers are kept as ints (smaller than 16-character strings)."""
+    return int(card_number) if card_number.isdigit() else card_number
+
+
+class WithdrawalLimits:
+    """
+    Withdrawn amount per card over the last Config.WITHDRAWAL_LIMIT_BUCKETS buckets of
+    Config.WITHDRAWAL_LIMIT_BUCKET_SECONDS (24 hourly buckets by default).
+    Each card that withdrew within the window owns a slot: a ring of int32 bucket sums in one
+    shared array, the index of its newest bucket and the window total. Checking or recording a
+    withdrawal touches at most one ring, so it is O(1); slots of cards idle for a whole window
+    are recycled, so memory follows the number of recently active cards.
+    Every change is appended to a log (Config.WITHDRAWAL_LIMITS_FILE) that is replayed on start
+    and rewritten from the live state once it grows past Config.WITHDRAWAL_LIMIT_COMPACT_RECORDS.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[Decimal] = None,
+        path: Optional[Path] = None,
+        persist: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        limit: allowed amount per window (default Config.MAX_WITHDRAW_AMOUNT_PER_DAY).
+        persist: keep the log at `path` (default Config.WITHDRAWAL_LIMITS_FILE); False keeps counters in memory only.
+        """
+        self.limit = Decimal(Config.MAX_WITHDRAW_AMOUNT_PER_DAY) if limit is None else limit
+        self._limit_minor = to_minor_units(self.limit)
+        if not 0 <= self._limit_minor < 2 ** 31:
+            raise ValueError(f"Withdrawal limit out of range: {self.limit}")
+        self._width = Config.WITHDRAWAL_LIMIT_BUCKETS
+        self._bucket_seconds = Config.WITHDRAWAL_LIMIT_BUCKET_SECONDS
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._slots: dict[_Key, int] = {}
+        self._keys: list[Optional[_Key]] = []
+        """Card of each slot (None for a free slot)."""
+        self._newest = array("q")
+        self._totals = array("q")
+        self._buckets = array("i")
+        """Bucket sums in minor units; a bucket never exceeds the limit, which fits in int32."""
+        self._empty_ring = array("i", [0]) * self._width
+        self._free: list[int] = []
+        self._expiring: dict[int, array] = {}
+        """Bucket -> slots that advanced to it; a slot expires if that bucket is still its newest."""
+        self._swept = self._now() - self._width
+        self.path: Optional[Path] = (path or Config.WITHDRAWAL_LIMITS_FILE) if persist else None
+        self._handle: Optional[BinaryIO] = None
+        self._records = 0
+        self._compact_at = Config.WITHDRAWAL_LIMIT_COMPACT_RECORDS
+        if self.path is not None:
+            self._replay()
+            self._handle = self._open()
+
+    def _open(self) -> BinaryIO:
+        assert self.path is not None
+        try:
+            return open(self.path, "ab")
+        except OSError as e:
+            raise RuntimeError(f"Cannot open withdrawal limits log {self.path}: {e}") from e
+
+    def _now(self) -> int:
+        return int(self._clock() // self._bucket_seconds)
+
+    def _watch(self, slot: int, bucket: int) -> None:
+        slots = self._expiring.get(bucket)
+        if slots is None:
+            slots = self._expiring[bucket] = array("q")
+        slots.append(slot)
+
+    def _slot(self, key: _Key, bucket: int) -> int:
+        """Slot of the card, allocating (or recycling) one if needed."""
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+            self._newest[slot] = bucket
+            self._totals[slot] = 0
+            start = slot * self._width
+            self._buckets[start:start + self._width] = self._empty_ring
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._newest.append(bucket)
+            self._totals.append(0)
+            self._buckets.extend(self._empty_ring)
+        self._slots[key] = slot
+        self._watch(slot, bucket)
+        return slot
+
+    def _advance(self, slot: int, bucket: int) -> None:
+        """Move the slot's ring forward to `bucket`, dropping buckets that left the window."""
+        newest = self._newest[slot]
+        if bucket <= newest:
+            return
+        width = self._width
+        start = slot * width
+        if bucket - newest >= width:
+            self._buckets[start:start + width] = self._empty_ring
+            self._totals[slot] = 0
+        else:
+            buckets = self._buckets
+            dropped = 0
+            for b in range(newest + 1, bucket + 1):
+                i = start + b % width
+                dropped += buckets[i]
+                buckets[i] = 0
+            self._totals[slot] -= dropped
+        self._newest[slot] = bucket
+        self._watch(slot, bucket)
+
+    def _expire(self, now: int) -> None:
+        """Recycle slots whose newest bucket has left the window (each bucket is swept once)."""
+        while self._swept <= now - self._width:
+            slots = self._expiring.pop(self._swept, None)
+            if slots is not None:
+                for slot in slots:
+                    key = self._keys[slot]
+                    if key is not None and self._newest[slot] == self._swept:
+                        del self._slots[key]
+                        self._keys[slot] = None
+                        self._free.append(slot)
+            self._swept += 1
+            if not self._expiring:
+                self._swept = max(self._swept, now - self._width + 1)
+
+    def _add(self, slot: int, bucket: int, minor: int) -> None:
+        """Add (or, if negative, take back from the newest buckets) `minor` at `bucket`."""
+        start = slot * self._width
+        if minor >= 0:
+            self._buckets[start + bucket % self._width] += minor
+            self._totals[slot] += minor
+            return
+        remaining = -minor
+        for b in range(bucket, bucket - self._width, -1):
+            i = start + b % self._width
+            taken = min(self._buckets[i], remaining)
+            self._buckets[i] -= taken
+            self._totals[slot] -= taken
+            remaining -= taken
+            if not remaining:
+                break
+
+    def withdrawn(self, card_number: str) -> Decimal:
+        """Amount withdrawn from the card within the current window."""
+        with self._lock:
+            now = self._now()
+            self._expire(now)
+            slot = self._slots.get(_key(card_number))
+            if slot is None:
+                return Decimal("0")
+            self._advance(slot, now)
+            return from_minor_units(self._totals[slot])
+
+    def remaining(self, card_number: str) -> Decimal:
+        """Amount the card may still withdraw within the current window."""
+        return max(self.limit - self.withdrawn(card_number), Decimal("0"))
+
+    def try_consume(self, card_number: str, amount: Decimal) -> bool:
+        """Record the withdrawal if it fits into the card's limit; False (nothing recorded) otherwise."""
+        minor = to_minor_units(amount)
+        key = _key(card_number)
+        with self._lock:
+            now = self._now()
+            self._expire(now)
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._advance(slot, now)
+                if self._totals[slot] + minor > self._limit_minor:
+                    return False
+            elif minor > self._limit_minor:
+                return False
+            else:
+                slot = self._slot(key, now)
+            self._add(slot, now, minor)
+            self._log(key, now, minor)
+            return True
+
+    def release(self, card_number: str, amount: Decimal) -> None:
+        """Give back a recorded amount (withdrawal failed or was reversed)."""
+        minor = to_minor_units(amount)
+        key = _key(card_number)
+        with self._lock:
+            now = self._now()
+            self._expire(now)
+            slot = self._slots.get(key)
+            if slot is None:
+                return
+            self._advance(slot, now)
+            self._add(slot, now, -minor)
+            self._log(key, now, -minor)
+
+    def active_cards(self) -> int:
+        """Number of cards holding a slot (withdrew within the window)."""
+        with self._lock:
+            self._expire(self._now())
+            return len(self._slots)
+
+    def _log(self, key: _Key, bucket: int, minor: int) -> None:
+        if self._handle is None:
+            return
+        if self._handle.closed:  # a compaction failed to reopen the log
+            self._handle = self._open()
+        try:
+            self._handle.write(f"{key} {bucket} {minor}\n".encode("ascii"))
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        except OSError as e:
+            raise RuntimeError(f"Failed to append to withdrawal limits log {self.path}: {e}") from e
+        self._records += 1
+        if self._records >= self._compact_at:
+            self._compact()
+
+    def _replay(self) -> None:
+        """
+        Rebuild counters from the log; records outside the window are skipped. A torn last line
+        (no trailing newline: it may hold a cut-off amount) is ignored and cut off, so appends
+        start on a clean line.
+        """
+        assert self.path is not None
+        if not self.path.exists():
+            return
+        now = self._now()
+        end = 0
+        for offset, line in complete_lines(self.path):
+            try:
+                key_str, bucket_str, minor_str = line.decode("ascii").split()
+                bucket, minor = int(bucket_str), int(minor_str)
+            except ValueError:
+                break
+            end = offset
+            self._records += 1
+            if now - self._width < bucket <= now:
+                slot = self._slot(_key(key_str), bucket)
+                self._advance(slot, bucket)
+                self._add(slot, bucket, minor)
+        truncate_tail(self.path, end)
+        self._expire(now)
+
+    def _compact(self) -> None:
+        """Atomically rewrite the log with one record per non-empty bucket of the live window."""
+        assert self.path is not None and self._handle is not None
+        now = self._now()
+        self._expire(now)
+        lines: list[str] = []
+        for key, slot in self._slots.items():
+            self._advance(slot, now)
+            start = slot * self._width
+            for b in range(now - self._width + 1, now + 1):
+                minor = self._buckets[start + b % self._width]
+                if minor:
+                    lines.append(f"{key} {b} {minor}\n")
+        tmp_path: Optional[str] = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write("".join(lines).encode("ascii"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._handle.close()
+            os.replace(tmp_path, self.path)
+            tmp_path = None
+        except OSError as e:
+            raise RuntimeError(f"Failed to compact withdrawal limits log {self.path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+        self._handle = self._open()
+        self._records = len(lines)
+        self._compact_at = max(Config.WITHDRAWAL_LIMIT_COMPACT_RECORDS, 2 * len(lines))
+
+    def close(self) -> None:
+        """Close the log file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
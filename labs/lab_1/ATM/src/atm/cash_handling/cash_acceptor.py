@@ -1,30 +1,33 @@
 """Cash acceptor: accept deposited notes and update inventory."""
 
-from ..config import Config
+from typing import Optional
+
 from ..session_manager.logger import Logger
 from .cash_inventory import CashInventory
+from .note_recycler import NoteRecycler
 
 
 class CashAcceptor:
     """Simulates accepting cash deposits into the ATM."""
 
-    def __init__(self, inventory: CashInventory) -> None:
-        """Store reference to cash inventory."""
+    def __init__(self, inventory: CashInventory, recycler: Optional[NoteRecycler] = None) -> None:
+        """Store reference to cash inventory and the recycler (default from Config)."""
         self.inventory = inventory
+        self.recycler = recycler if recycler is not None else NoteRecycler()
         self.logger = Logger()
 
-    def accept(self, denominations: dict[str, int]) -> int:
-        """Accept cash as {denomination: count}; return total amount accepted."""
-        total = 0
-        for denom, count in denominations.items():
-            if denom not in Config.ATM_CASH_DENOMINATIONS:
-                raise ValueError(f"Unsupported denomination: {denom}")
-            if count < 0:
-                raise ValueError("Count cannot be negative")
-            self.inventory._cassettes[denom] += count
-            total += denom * count
-
+    def accept(self, denominations: dict[int, int]) -> int:
+        """
+        Accept cash as {denomination: count}; return total amount accepted.
+        The recycler puts the notes into the cassettes, the deposit bin or the reject bin;
+        if they do not fit, nothing is accepted (ValueError).
+        """
+        placement = self.recycler.place(self.inventory, denominations)
+        total = sum(denom * count for denom, count in denominations.items())
         self.inventory.save_state()
         self.logger.info(
-            f"Accepted cash: {total} BYN, breakdown: {denominations}")
+            f"Accepted cash: {total} BYN, breakdown: {denominations}, "
+            f"recycled: {placement.recycled}, to deposit bin: {placement.deposited}")
+        if placement.rejected:
+            self.logger.warning(f"Deposit bin full, notes sent to reject bin: {placement.rejected}")
         return total
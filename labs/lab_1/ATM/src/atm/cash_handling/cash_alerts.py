@@ -0,0 +1,243 @@
+"""Low/empty/full cash alerts: watermark checks on every cash movement, delivered off the cash path."""
+
+import json
+import queue
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional, Sequence, TextIO, Union
+
+from ..config import Config
+from ..session_manager.logger import Logger
+
+LEVELS = ("empty", "low", "normal", "full")
+"""Watermark levels, in order of fill."""
+EMPTY, LOW, NORMAL, FULL = range(len(LEVELS))
+
+
+@dataclass(frozen=True)
+class CashAlert:
+    """A cassette or bin crossed a watermark."""
+
+    timestamp: float
+    source: str
+    """"cassette", "deposit_bin" or "reject_bin"."""
+    denomination: Optional[int]
+    """Denomination of the cassettes (None for bins)."""
+    level: str
+    previous: str
+    notes: int
+    capacity: int
+
+
+class AlertSink(ABC):
+    """Destination of cash alerts; send() runs on the dispatcher thread."""
+
+    @abstractmethod
+    def send(self, alert: CashAlert) -> None:
+        """Deliver one alert."""
+
+    def close(self) -> None:
+        """Release resources."""
+
+
+class LogAlertSink(AlertSink):
+    """Alerts as log warnings."""
+
+    def __init__(self, logger: Optional[Logger] = None) -> None:
+        """Log through logger (default a console Logger)."""
+        self.logger = logger if logger is not None else Logger()
+
+    def send(self, alert: CashAlert) -> None:
+        """Log one warning line."""
+        what = f"{alert.denomination} cassettes" if alert.denomination is not None else alert.source
+        self.logger.warning(
+            f"Cash alert: {what} {alert.previous} -> {alert.level} ({alert.notes}/{alert.capacity} notes)")
+
+
+class FileAlertSink(AlertSink):
+    """Alerts appended as JSON lines (default Config.CASH_ALERTS_FILE)."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """The file is opened on the first alert."""
+        self.path = path or Config.CASH_ALERTS_FILE
+        self._handle: Optional[TextIO] = None
+
+    def send(self, alert: CashAlert) -> None:
+        """Append one JSON line."""
+        if self._handle is None:
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(json.dumps(asdict(alert), separators=(",", ":")) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        """Close the file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class SocketAlertSink(AlertSink):
+    """Alerts as JSON datagrams to a local socket: (host, port) for UDP or a Unix socket path."""
+
+    def __init__(self, address: Union[tuple[str, int], str, None] = None) -> None:
+        """address defaults to Config.CASH_ALERT_SOCKET."""
+        self.address = Config.CASH_ALERT_SOCKET if address is None else address
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_DGRAM)
+
+    def send(self, alert: CashAlert) -> None:
+        """Send one datagram."""
+        self._sock.sendto(json.dumps(asdict(alert)).encode("utf-8"), self.address)
+
+    def close(self) -> None:
+        """Close the socket."""
+        self._sock.close()
+
+
+class AlertDispatcher:
+    """
+    Bounded queue of alerts drained by one daemon thread (started on the first alert) that
+    hands them to every sink. emit() never blocks: when the queue is full the alert is
+    dropped and counted. A failing sink is counted and does not stop the others.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sinks: Sequence[AlertSink], queue_size: Optional[int] = None) -> None:
+        """queue_size defaults to Config.CASH_ALERT_QUEUE_SIZE."""
+        self.sinks = list(sinks)
+        self._queue: queue.Queue = queue.Queue(
+            Config.CASH_ALERT_QUEUE_SIZE if queue_size is None else queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+        """Alerts lost because the queue was full."""
+        self.failed = 0
+        """Deliveries a sink raised on."""
+
+    def emit(self, alert: CashAlert) -> None:
+        """Queue an alert for delivery without waiting."""
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="cash-alerts", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            alert = self._queue.get()
+            try:
+                if alert is self._STOP:
+                    return
+                for sink in self.sinks:
+                    try:
+                        sink.send(alert)
+                    except Exception:
+                        self.failed += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every queued alert was delivered."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Deliver queued alerts, stop the thread and close the sinks."""
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+        for sink in self.sinks:
+            sink.close()
+
+
+def create_alert_dispatcher(sinks: Optional[Sequence[str]] = None) -> Optional[AlertDispatcher]:
+    """Dispatcher for sink names "log", "file", "socket" (default Config.CASH_ALERT_SINKS); None if there are none."""
+    names = Config.CASH_ALERT_SINKS if sinks is None else sinks
+    factories: dict[str, Callable[[], AlertSink]] = {
+        "log": LogAlertSink, "file": FileAlertSink, "socket": SocketAlertSink}
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        raise ValueError(f"Unknown alert sink: {unknown[0]}")
+    return AlertDispatcher([factories[name]() for name in names]) if names else None
+
+
+class WatermarkMonitor:
+    """
+    Watermark level of every denomination's cassettes and of the bins. A cassette group is
+    empty at 0 notes, low below low_fill of its capacity and full from full_fill; a bin is
+    only normal or full. Levels are kept in an array, and update() looks only at the one
+    denomination that changed, so the check is O(1) per cash movement; an alert is emitted
+    when the level differs from the last one.
+    """
+
+    def __init__(
+        self,
+        denominations: Sequence[int],
+        capacities: Sequence[int],
+        dispatcher: Optional[AlertDispatcher],
+        low_fill: Optional[float] = None,
+        full_fill: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Watermarks default to Config.CASH_LOW_FILL / CASH_FULL_FILL; no alerts without a dispatcher."""
+        low_fill = Config.CASH_LOW_FILL if low_fill is None else low_fill
+        self.full_fill = Config.CASH_FULL_FILL if full_fill is None else full_fill
+        self.dispatcher = dispatcher
+        self._clock = clock
+        self.denominations = list(denominations)
+        self.capacities = list(capacities)
+        self._low = array("q", (int(c * low_fill) for c in capacities))
+        self._full = array("q", (max(1, int(c * self.full_fill)) for c in capacities))
+        self._levels = array("b", bytes(len(self.denominations)))
+        self._bin_levels: dict[str, int] = {}
+
+    def _level(self, i: int, notes: int) -> int:
+        if notes <= 0:
+            return EMPTY
+        if notes >= self._full[i]:
+            return FULL
+        if notes < self._low[i]:
+            return LOW
+        return NORMAL
+
+    def reset(self, totals: Sequence[int]) -> None:
+        """Take the current notes as the baseline without alerting."""
+        for i, notes in enumerate(totals):
+            self._levels[i] = self._level(i, notes)
+
+    def update(self, i: int, notes: int) -> None:
+        """New notes of the i-th denomination; alerts if its level changed."""
+        level = self._level(i, notes)
+        previous = self._levels[i]
+        if level != previous:
+            self._levels[i] = level
+            if self.dispatcher is not None:
+                self.dispatcher.emit(CashAlert(
+                    self._clock(), "cassette", self.denominations[i], LEVELS[level],
+                    LEVELS[previous], notes, self.capacities[i]))
+
+    def level(self, i: int) -> str:
+        """Current level of the i-th denomination."""
+        return LEVELS[self._levels[i]]
+
+    def update_bin(self, name: str, notes: int, capacity: int, alert: bool = True) -> None:
+        """New notes of a bin; alerts (unless alert is False) if it became full or stopped being full."""
+        level = FULL if notes >= max(1, int(capacity * self.full_fill)) else NORMAL
+        previous = self._bin_levels.get(name, NORMAL)
+        if level != previous:
+            self._bin_levels[name] = level
+            if alert and self.dispatcher is not None:
+                self.dispatcher.emit(CashAlert(
+                    self._clock(), name, None, LEVELS[level], LEVELS[previous], notes, capacity))
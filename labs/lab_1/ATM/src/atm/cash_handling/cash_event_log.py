@@ -0,0 +1,144 @@
+"""Append-only history of note movements (dispenses, recycled deposits) for demand forecasting."""
+
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Mapping, Optional
+
+from ..bank_communication.account_journal import complete_lines, truncate_tail
+from ..config import Config
+
+
+@dataclass(frozen=True)
+class CashEvent:
+    """Notes that left or re-entered the dispense cassettes at one moment."""
+
+    timestamp: float
+    kind: str
+    """"dispense" (notes paid out) or "recycle" (deposited notes put back into the cassettes)."""
+    notes: dict[int, int]
+
+
+def _parse(line: bytes) -> Optional[CashEvent]:
+    """Event of one log line, or None if the line is not a valid event."""
+    try:
+        data = json.loads(line)
+        return CashEvent(
+            float(data["ts"]), str(data["kind"]),
+            {int(d): int(k) for d, k in data["notes"].items()})
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+class CashEventLog:
+    """
+    Appends one JSON line per cash event to Config.CASH_EVENTS_FILE. The history only feeds
+    forecasts, so lines are flushed but not fsynced: a crash may lose the last few events,
+    never the cash counts themselves (those are in the ATM state file).
+    On open a torn last line is cut off, and events older than Config.FORECAST_HISTORY_DAYS
+    are dropped; while open, the file is trimmed again once its oldest event is a day past
+    that window, so it stays bounded by the history the forecast reads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        persist: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """persist: append to `path` (default Config.CASH_EVENTS_FILE); False records nothing."""
+        self._clock = clock
+        self.path: Optional[Path] = (path or Config.CASH_EVENTS_FILE) if persist else None
+        self._handle: Optional[BinaryIO] = None
+        self._oldest: Optional[float] = None
+        """Timestamp of the first event in the file (None if there is none)."""
+        if self.path is not None:
+            self._trim()
+            self._handle = self._open()
+
+    def _open(self) -> BinaryIO:
+        assert self.path is not None
+        try:
+            return open(self.path, "ab")
+        except OSError as e:
+            raise RuntimeError(f"Cannot open cash event log {self.path}: {e}") from e
+
+    def _trim(self) -> None:
+        """Cut a torn tail off the file and drop events older than the history window."""
+        assert self.path is not None
+        if not self.path.exists():
+            return
+        horizon = self._clock() - Config.FORECAST_HISTORY_DAYS * 86400
+        start = end = 0
+        self._oldest = None
+        for offset, line in complete_lines(self.path):
+            event = _parse(line)
+            if event is None:
+                break
+            if event.timestamp < horizon and self._oldest is None:
+                start = offset
+            elif self._oldest is None:
+                self._oldest = event.timestamp
+            end = offset
+        if not start:
+            truncate_tail(self.path, end)
+            return
+        tmp_path: Optional[str] = None
+        try:
+            with open(self.path, "rb") as src:
+                src.seek(start)
+                kept = src.read(end - start)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(kept)
+            os.replace(tmp_path, self.path)
+            tmp_path = None
+        except OSError as e:
+            raise RuntimeError(f"Failed to trim cash event log {self.path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+    def record(self, kind: str, notes: Mapping[int, int]) -> None:
+        """Append an event of the kind with {denomination: count} notes (nothing for no notes)."""
+        if self._handle is None or not notes:
+            return
+        if self._handle.closed:  # a trim failed to reopen the log
+            self._handle = self._open()
+        ts = self._clock()
+        line = json.dumps(
+            {"ts": ts, "kind": kind, "notes": {str(d): k for d, k in notes.items()}},
+            separators=(",", ":"))
+        try:
+            self._handle.write(line.encode("utf-8") + b"\n")
+            self._handle.flush()
+        except OSError as e:
+            raise RuntimeError(f"Failed to append to cash event log {self.path}: {e}") from e
+        if self._oldest is None:
+            self._oldest = ts
+        elif ts - self._oldest > (Config.FORECAST_HISTORY_DAYS + 1) * 86400:
+            self._handle.close()
+            self._trim()
+            self._handle = self._open()
+
+    def close(self) -> None:
+        """Close the log file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def read_cash_events(path: Optional[Path] = None, since: float = 0.0) -> Iterator[CashEvent]:
+    """Events from the log (default Config.CASH_EVENTS_FILE) at or after `since`; a torn line ends the history."""
+    path = path or Config.CASH_EVENTS_FILE
+    if not path.exists():
+        return
+    for _, line in complete_lines(path):
+        event = _parse(line)
+        if event is None:
+            break
+        if event.timestamp >= since:
+            yield event
@@ -1,79 +1,295 @@
 """Cash inventory: denominations in cassettes and dispense logic."""
 
-import json
-from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Optional
 
 from ..config import Config
 from ..session_manager.state_saver import StateSaver
+from .cash_alerts import AlertDispatcher, WatermarkMonitor, create_alert_dispatcher
+from .cash_event_log import CashEventLog
+from .cassettes import CassetteBank, NoteBin, cassette_layout
+from .dispense_planner import DispensePlanner
+from .dispense_policy import DispensePolicy, create_policy
+
+
+@dataclass(frozen=True)
+class NoteAvailability:
+    """Notes of one denomination in the ATM by where they are."""
+
+    denomination: int
+    dispensable: int
+    """In the dispense cassettes."""
+    deposit_bin: int
+    reject_bin: int
+
+    @property
+    def total(self) -> int:
+        """Notes of the denomination anywhere in the ATM."""
+        return self.dispensable + self.deposit_bin + self.reject_bin
 
 
 class CashInventory:
-    """Manages cash denominations inside the ATM."""
+    """
+    Manages cash denominations inside the ATM.
+    Notes sit in bounded dispense cassettes (CassetteBank, layout from Config) with int32
+    counters. Deposited notes are either recycled into the cassettes or kept in the deposit
+    bin (NoteRecycler decides); the reject bin takes what the deposit bin cannot.
+    get_counts / get_count and all dispense math see the cassettes only; availability()
+    shows every denomination across cassettes and bins.
+    Amounts are paid out with a bounded change-making plan (DispensePlanner), so any amount
+    that some combination of the available notes makes can be dispensed; the dispense
+    policy picks which combination.
+    Every change of note counts bumps `version`; the bitset of dispensable withdrawal
+    amounts behind is_dispensable / nearest_dispensable / max_dispensable is rebuilt
+    lazily on the first query after a change.
+    Every cash movement checks the watermarks of the denomination or bin it touched and
+    queues an alert when a level changes (WatermarkMonitor, AlertDispatcher).
+    """
 
-    def __init__(self) -> None:
-        """Initialize cassettes from config and load persisted state."""
-        self._cassettes: dict[int, int] = {
-            denom: 50 for denom in Config.ATM_CASH_DENOMINATIONS}
+    def __init__(
+        self,
+        policy: Optional[DispensePolicy] = None,
+        alerts: Optional[AlertDispatcher] = None,
+    ) -> None:
+        """
+        Initialize cassettes from config and load persisted state; policy defaults to
+        Config.DISPENSE_POLICY, alerts to the sinks of Config.CASH_ALERT_SINKS.
+        """
+        self.cassettes = CassetteBank(Config.ATM_CASH_DENOMINATIONS, cassette_layout())
+        for denom in self.cassettes.denominations:
+            self.cassettes.set_total(denom, min(50, self.cassettes.capacity(denom)))
+        self.deposit_bin = NoteBin(Config.ATM_CASH_DENOMINATIONS, Config.DEPOSIT_BIN_CAPACITY)
+        self.reject_bin = NoteBin(Config.ATM_CASH_DENOMINATIONS, Config.REJECT_BIN_CAPACITY)
+        self._planner = DispensePlanner(self.cassettes.denominations)
+        self.policy = policy if policy is not None else create_policy()
+        self.version = 0
+        """Incremented on every change of note counts."""
+        self._dispensable_bits = 0
+        self._dispensable_version = -1
         self._saver = StateSaver()
+        self.events = CashEventLog()
+        """History of dispensed and recycled notes for the depletion forecast."""
         self._load_state()
+        self.alerts = alerts if alerts is not None else create_alert_dispatcher()
+        self.watermarks = WatermarkMonitor(
+            self.cassettes.denominations, self.cassettes.capacity_totals, self.alerts)
+        """Low/empty/full levels; the loaded state is the baseline and does not alert."""
+        self.watermarks.reset(self.cassettes.totals)
+        self.watermarks.update_bin("deposit_bin", self.deposit_bin.notes, self.deposit_bin.capacity, alert=False)
+        self.watermarks.update_bin("reject_bin", self.reject_bin.notes, self.reject_bin.capacity, alert=False)
+
+    def _watch(self, denom: int) -> None:
+        """Check the watermarks of one denomination after its notes changed."""
+        i = self.cassettes.index(denom)
+        self.watermarks.update(i, self.cassettes.totals[i])
+
+    def _watch_bin(self, name: str, bin_: NoteBin) -> None:
+        self.watermarks.update_bin(name, bin_.notes, bin_.capacity)
 
     def _load_state(self) -> None:
-        """Load cash inventory from persistent storage."""
-        state = self._saver.load()
-        cash_state = state.get("cash_inventory", {})
-        for denom_str, count in cash_state.items():
+        """
+        Load cash inventory from persistent storage. Per-cassette counts are used when the
+        saved layout matches the configured one, otherwise the per-denomination totals are
+        spread over the cassettes; counts beyond capacity are clamped.
+        """
+        cash_state = self._saver.section("cash_inventory", {})
+        saved = cash_state.get("cassettes")
+        if isinstance(saved, list) and [d for d, _ in saved] == [d for d, _ in self.cassettes.layout]:
+            for cassette, (_, count) in enumerate(saved):
+                self.cassettes.set_cassette(
+                    cassette, min(max(0, int(count)), self.cassettes.capacities[cassette]))
+        else:
+            for denom_str, count in cash_state.items():
+                try:
+                    denom = int(denom_str)
+                    if denom in self.cassettes.denominations:
+                        self.cassettes.set_total(
+                            denom, min(max(0, int(count)), self.cassettes.capacity(denom)))
+                except (TypeError, ValueError):
+                    pass
+        self._load_bin(self.deposit_bin, cash_state.get("deposit_bin", {}))
+        self._load_bin(self.reject_bin, cash_state.get("reject_bin", {}))
+        self.version += 1
+
+    @staticmethod
+    def _load_bin(bin_: NoteBin, saved: dict[str, Any]) -> None:
+        for denom_str, count in saved.items():
             try:
-                denom = int(denom_str)
-                if denom in self._cassettes:
-                    self._cassettes[denom] = max(0, count)
-            except ValueError:
+                bin_.add(int(denom_str), min(max(0, int(count)), bin_.room()))
+            except (TypeError, ValueError):
                 pass
 
     def save_state(self) -> None:
-        """Save current cash state."""
-        state = self._saver.load()
-        state["cash_inventory"] = {
-            str(k): v for k, v in self._cassettes.items()}
-        self._saver.save(state)
+        """Save current cash state (only the cash_inventory section is rewritten)."""
+        state: dict[str, Any] = {str(k): v for k, v in self.cassettes.as_dict().items()}
+        state["cassettes"] = [
+            [denom, count] for (denom, _), count in zip(self.cassettes.layout, self.cassettes.counts)]
+        state["deposit_bin"] = {str(k): v for k, v in self.deposit_bin.as_dict().items()}
+        state["reject_bin"] = {str(k): v for k, v in self.reject_bin.as_dict().items()}
+        self._saver.update("cash_inventory", state)
+
+    def close(self) -> None:
+        """Write cash state changes still pending, close the event log and deliver queued alerts."""
+        self._saver.close()
+        self.events.close()
+        if self.alerts is not None:
+            self.alerts.close()
 
     def get_available_amount(self) -> int:
-        """Total cash available in ATM."""
-        return sum(denom * count for denom, count in self._cassettes.items())
+        """Total cash available for dispensing (the cassettes; the reject bin is not dispensed)."""
+        return self.cassettes.amount()
+
+    def get_count(self, denom: int) -> int:
+        """Number of notes of the denomination in its cassettes (0 for unknown denominations)."""
+        return self.cassettes.total(denom)
+
+    def get_counts(self) -> dict[int, int]:
+        """Copy of {denomination: count} for all denominations."""
+        return self.cassettes.as_dict()
+
+    def get_capacity(self, denom: int) -> int:
+        """Notes all cassettes of the denomination hold."""
+        return self.cassettes.capacity(denom)
+
+    def get_room(self, denom: int) -> int:
+        """Notes of the denomination that still fit into its cassettes."""
+        return self.cassettes.room(denom)
+
+    def set_count(self, denom: int, count: int, cassette: Optional[int] = None) -> None:
+        """
+        Set number of notes of the denomination, or of its cassette-th cassette (0-based in
+        layout order) when given; ValueError beyond capacity (call save_state() to persist).
+        """
+        if cassette is None:
+            self.cassettes.set_total(denom, count)
+        else:
+            slots = self.cassettes.cassettes(denom)
+            if not 0 <= cassette < len(slots):
+                raise ValueError(f"Unknown cassette {cassette} for {denom} notes")
+            self.cassettes.set_cassette(slots[cassette], count)
+        self.version += 1
+        self._watch(denom)
+
+    def add_notes(self, denom: int, count: int) -> None:
+        """Put notes into the cassettes; ValueError if they do not fit (call save_state() to persist)."""
+        self.cassettes.add(denom, count)
+        self.version += 1
+        self._watch(denom)
+
+    def remove_notes(self, denom: int, count: int) -> None:
+        """Take notes out of the cassettes (call save_state() to persist)."""
+        self.cassettes.remove(denom, count)
+        self.version += 1
+        self._watch(denom)
+
+    def deposit_notes(self, denom: int, count: int) -> None:
+        """Put notes into the deposit bin; ValueError if it is full (call save_state() to persist)."""
+        self.deposit_bin.add(denom, count)
+        self._watch_bin("deposit_bin", self.deposit_bin)
+
+    def get_deposited(self) -> dict[int, int]:
+        """{denomination: count} of the notes in the deposit bin."""
+        return self.deposit_bin.as_dict()
+
+    def empty_deposit_bin(self) -> dict[int, int]:
+        """Take all notes out of the deposit bin (call save_state() to persist)."""
+        notes = self.deposit_bin.empty()
+        self._watch_bin("deposit_bin", self.deposit_bin)
+        return notes
+
+    def reject_notes(self, denom: int, count: int) -> None:
+        """Put notes into the reject bin; ValueError if it is full (call save_state() to persist)."""
+        self.reject_bin.add(denom, count)
+        self._watch_bin("reject_bin", self.reject_bin)
+
+    def get_rejected(self) -> dict[int, int]:
+        """{denomination: count} of the notes in the reject bin."""
+        return self.reject_bin.as_dict()
+
+    def empty_reject_bin(self) -> dict[int, int]:
+        """Take all notes out of the reject bin (call save_state() to persist)."""
+        notes = self.reject_bin.empty()
+        self._watch_bin("reject_bin", self.reject_bin)
+        return notes
+
+    def availability(self) -> dict[int, NoteAvailability]:
+        """Notes of every denomination in the cassettes, the deposit bin and the reject bin."""
+        return {
+            denom: NoteAvailability(denom, dispensable, deposited, rejected)
+            for denom, dispensable, deposited, rejected in zip(
+                self.cassettes.denominations, self.cassettes.totals,
+                self.deposit_bin.counts, self.reject_bin.counts)
+        }
+
+    def _synced_planner(self) -> DispensePlanner:
+        """Planner updated with the current counts (only changed layers are rebuilt)."""
+        self._planner.update(self.cassettes.totals)
+        return self._planner
 
     def can_dispense(self, amount: int) -> bool:
-        """Check if we can dispense exact amount with available denominations."""
-        if amount % 100 != 0:
-            return False
-        remaining = amount
-        for denom in sorted(self._cassettes.keys(), reverse=True):
-            if denom > remaining:
-                continue
-            count_needed = remaining // denom
-            if count_needed <= self._cassettes[denom]:
-                remaining -= count_needed * denom
-            else:
-                remaining -= self._cassettes[denom] * denom
-        return remaining == 0
+        """Check if some combination of available notes makes exactly the amount."""
+        return self._synced_planner().can_pay(amount)
+
+    def plan_dispense(self, amount: int) -> Optional[dict[int, int]]:
+        """Notes the policy would dispense for the amount, or None if it cannot be made."""
+        return self.policy.choose(self._synced_planner(), amount)
 
     def dispense(self, amount: int) -> dict[int, int]:
         """Dispense cash and update inventory."""
-        if not self.can_dispense(amount):
+        dispensed = self.plan_dispense(amount)
+        if dispensed is None:
             raise ValueError(
                 "Cannot dispense requested amount with available notes")
+        for denom, count in dispensed.items():
+            self.cassettes.remove(denom, count)
+            self._watch(denom)
+        self.version += 1
+        self.save_state()
+        self.events.record("dispense", dispensed)
+        return dispensed
 
-        dispensed: dict[int, int] = {}
-        remaining = amount
-        for denom in sorted(self._cassettes.keys(), reverse=True):
-            if denom > remaining:
-                continue
-            count = min(remaining // denom, self._cassettes[denom])
-            if count > 0:
-                dispensed[denom] = count
-                self._cassettes[denom] -= count
-                remaining -= count * denom
+    def _dispensable(self) -> int:
+        """
+        Bitset of dispensable withdrawal amounts: bit k stands for k * WITHDRAW_AMOUNT_MULTIPLE,
+        from MIN_WITHDRAW_AMOUNT up to MAX_WITHDRAW_AMOUNT_PER_DAY (or all cash if there is no limit).
+        """
+        if self._dispensable_version != self.version:
+            planner = self._synced_planner()
+            step = Config.WITHDRAW_AMOUNT_MULTIPLE
+            top = Config.MAX_WITHDRAW_AMOUNT_PER_DAY or self.get_available_amount()
+            first = -(-Config.MIN_WITHDRAW_AMOUNT // step)
+            flags = ["1" if planner.can_pay(k * step) else "0"
+                     for k in range(top // step, first - 1, -1)]
+            self._dispensable_bits = int("".join(flags), 2) << first if flags else 0
+            self._dispensable_version = self.version
+        return self._dispensable_bits
 
-        if remaining != 0:
-            raise RuntimeError("Dispense logic error")
+    def is_dispensable(self, amount: int) -> bool:
+        """True if amount is a valid withdrawal amount the notes can make."""
+        step = Config.WITHDRAW_AMOUNT_MULTIPLE
+        return amount >= 0 and amount % step == 0 and (self._dispensable() >> (amount // step)) & 1 == 1
 
-        self.save_state()
-        return dispensed
+    def nearest_dispensable(self, amount: int) -> Optional[int]:
+        """Dispensable withdrawal amount closest to amount (the lower one on a tie); None if there is none."""
+        bits = self._dispensable()
+        if not bits:
+            return None
+        step = Config.WITHDRAW_AMOUNT_MULTIPLE
+        below: Optional[int] = None
+        if amount >= 0:
+            k = amount // step
+            lower = (bits & ((2 << k) - 1)).bit_length() - 1
+            if lower >= 0:
+                below = lower * step
+        above: Optional[int] = None
+        k = max(0, -(-amount // step))
+        higher = bits >> k
+        if higher:
+            above = (k + (higher & -higher).bit_length() - 1) * step
+        if below is None or (above is not None and above - amount < amount - below):
+            return above
+        return below
+
+    def max_dispensable(self) -> int:
+        """Largest dispensable withdrawal amount (0 if there is none)."""
+        return max(0, self._dispensable().bit_length() - 1) * Config.WITHDRAW_AMOUNT_MULTIPLE
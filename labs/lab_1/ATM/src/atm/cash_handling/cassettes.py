@@ -0,0 +1,194 @@
+"""Physical note storage: bounded dispense cassettes and note bins with array-backed counters."""
+
+from array import array
+from operator import mul
+from typing import Iterable, Optional, Sequence
+
+from ..config import Config
+
+_MAX_NOTES = 2**31 - 1
+"""Counters are int32, so no cassette or bin holds more notes than this."""
+
+
+def cassette_layout() -> list[tuple[int, int]]:
+    """(denomination, capacity) of every dispense cassette (Config.CASSETTE_LAYOUT or one per denomination)."""
+    if Config.CASSETTE_LAYOUT:
+        return list(Config.CASSETTE_LAYOUT)
+    return [(denom, Config.CASSETTE_CAPACITY) for denom in Config.ATM_CASH_DENOMINATIONS]
+
+
+def capacity_by_denomination(layout: Optional[Sequence[tuple[int, int]]] = None) -> dict[int, int]:
+    """Total capacity of the cassettes of every denomination in the layout (default cassette_layout())."""
+    result: dict[int, int] = {}
+    for denom, capacity in cassette_layout() if layout is None else layout:
+        result[denom] = result.get(denom, 0) + capacity
+    return result
+
+
+class CassetteBank:
+    """
+    Dispense cassettes: each holds notes of one denomination up to its capacity, and a
+    denomination may have several cassettes. Counts are int32 in one array indexed by
+    cassette; per-denomination totals are kept alongside in ascending denomination order,
+    so totals (what the dispense planner reads) and the cash amount are single passes
+    over flat arrays. Notes are loaded into a denomination's cassettes in layout order and
+    taken from them in the same order, so the first cassette empties first.
+    """
+
+    def __init__(self, denominations: Iterable[int], layout: Sequence[tuple[int, int]]) -> None:
+        """Empty cassettes; every cassette's denomination must be one of denominations."""
+        self.denominations: list[int] = sorted(set(denominations))
+        self._index = {denom: i for i, denom in enumerate(self.denominations)}
+        self.layout: list[tuple[int, int]] = list(layout)
+        self._slots: list[list[int]] = [[] for _ in self.denominations]
+        """Cassette indices of every denomination, in layout order."""
+        for cassette, (denom, capacity) in enumerate(self.layout):
+            if denom not in self._index:
+                raise ValueError(f"Unsupported denomination: {denom}")
+            if not 0 <= capacity <= _MAX_NOTES:
+                raise ValueError(f"Cassette capacity must be between 0 and {_MAX_NOTES}")
+            self._slots[self._index[denom]].append(cassette)
+        self.capacities = array("i", (capacity for _, capacity in self.layout))
+        self.counts = array("i", bytes(4 * len(self.layout)))
+        """Notes in every cassette."""
+        self.totals = array("q", bytes(8 * len(self.denominations)))
+        """Notes of every denomination (ascending), the sum of its cassettes."""
+        self.capacity_totals = array("q", bytes(8 * len(self.denominations)))
+        for i, slots in enumerate(self._slots):
+            self.capacity_totals[i] = sum(self.capacities[c] for c in slots)
+
+    def index(self, denom: int) -> int:
+        """Position of the denomination in totals / capacity_totals."""
+        try:
+            return self._index[denom]
+        except KeyError:
+            raise ValueError(f"Unsupported denomination: {denom}") from None
+
+    def total(self, denom: int) -> int:
+        """Notes of the denomination in all its cassettes (0 for unknown denominations)."""
+        i = self._index.get(denom)
+        return 0 if i is None else self.totals[i]
+
+    def capacity(self, denom: int) -> int:
+        """Notes all cassettes of the denomination hold."""
+        return self.capacity_totals[self.index(denom)]
+
+    def room(self, denom: int) -> int:
+        """Notes of the denomination that still fit into its cassettes."""
+        i = self.index(denom)
+        return self.capacity_totals[i] - self.totals[i]
+
+    def amount(self) -> int:
+        """Cash in all cassettes."""
+        return sum(map(mul, self.denominations, self.totals))
+
+    def as_dict(self) -> dict[int, int]:
+        """{denomination: notes} for all denominations."""
+        return dict(zip(self.denominations, self.totals))
+
+    def cassettes(self, denom: int) -> list[int]:
+        """Cassette indices of the denomination in layout order."""
+        return list(self._slots[self.index(denom)])
+
+    def add(self, denom: int, count: int) -> None:
+        """Load notes into the denomination's cassettes; ValueError if they do not fit."""
+        i = self.index(denom)
+        if count < 0:
+            raise ValueError("Count cannot be negative")
+        if count > self.capacity_totals[i] - self.totals[i]:
+            raise ValueError(
+                f"Cassettes for {denom} notes are full: room for {self.room(denom)}, got {count}")
+        self.totals[i] += count
+        for cassette in self._slots[i]:
+            if not count:
+                break
+            take = min(count, self.capacities[cassette] - self.counts[cassette])
+            self.counts[cassette] += take
+            count -= take
+
+    def remove(self, denom: int, count: int) -> None:
+        """Take notes from the denomination's cassettes; ValueError if there are not enough."""
+        i = self.index(denom)
+        if count < 0:
+            raise ValueError("Count cannot be negative")
+        if count > self.totals[i]:
+            raise ValueError(f"Not enough {denom} notes in cassette")
+        self.totals[i] -= count
+        for cassette in self._slots[i]:
+            if not count:
+                break
+            take = min(count, self.counts[cassette])
+            self.counts[cassette] -= take
+            count -= take
+
+    def set_total(self, denom: int, count: int) -> None:
+        """Set the denomination's notes, filling its cassettes in layout order."""
+        i = self.index(denom)
+        if count < 0:
+            raise ValueError("Count cannot be negative")
+        if count > self.capacity_totals[i]:
+            raise ValueError(
+                f"Cassettes for {denom} notes hold at most {self.capacity(denom)} notes")
+        for cassette in self._slots[i]:
+            self.counts[cassette] = 0
+        self.totals[i] = 0
+        self.add(denom, count)
+
+    def set_cassette(self, cassette: int, count: int) -> None:
+        """Set the notes of one cassette (a cassette swap)."""
+        if not 0 <= cassette < len(self.layout):
+            raise ValueError(f"Unknown cassette: {cassette}")
+        if not 0 <= count <= self.capacities[cassette]:
+            raise ValueError(
+                f"Cassette {cassette} holds between 0 and {self.capacities[cassette]} notes")
+        i = self._index[self.layout[cassette][0]]
+        self.totals[i] += count - self.counts[cassette]
+        self.counts[cassette] = count
+
+
+class NoteBin:
+    """
+    Bin of mixed notes (e.g. the reject bin for deposited notes that do not fit into the
+    cassettes): int32 counts per denomination, bounded by a total capacity in notes.
+    """
+
+    def __init__(self, denominations: Iterable[int], capacity: int) -> None:
+        """Empty bin holding at most capacity notes."""
+        self.denominations: list[int] = sorted(set(denominations))
+        self._index = {denom: i for i, denom in enumerate(self.denominations)}
+        if not 0 <= capacity <= _MAX_NOTES:
+            raise ValueError(f"Bin capacity must be between 0 and {_MAX_NOTES}")
+        self.capacity = capacity
+        self.counts = array("i", bytes(4 * len(self.denominations)))
+        self.notes = 0
+        """Notes in the bin."""
+
+    def room(self) -> int:
+        """Notes that still fit."""
+        return self.capacity - self.notes
+
+    def amount(self) -> int:
+        """Cash in the bin."""
+        return sum(map(mul, self.denominations, self.counts))
+
+    def as_dict(self) -> dict[int, int]:
+        """{denomination: notes} of the denominations present."""
+        return {denom: count for denom, count in zip(self.denominations, self.counts) if count}
+
+    def add(self, denom: int, count: int) -> None:
+        """Put notes into the bin; ValueError if they do not fit."""
+        if denom not in self._index:
+            raise ValueError(f"Unsupported denomination: {denom}")
+        if count < 0:
+            raise ValueError("Count cannot be negative")
+        if count > self.room():
+            raise ValueError(f"Bin is full: room for {self.room()} notes, got {count}")
+        self.counts[self._index[denom]] += count
+        self.notes += count
+
+    def empty(self) -> dict[int, int]:
+        """Take all notes out; returns what was in the bin."""
+        content = self.as_dict()
+        self.counts = array("i", bytes(4 * len(self.denominations)))
+        self.notes = 0
+        return content
@@ -0,0 +1,155 @@
+"""Bounded change-making: which amounts the cassettes can pay out and with which notes."""
+
+from math import gcd
+from typing import Iterable, Mapping, Optional, Sequence, Union
+
+
+class DispensePlanner:
+    """
+    Reachability table of payable amounts for given note counts (bounded knapsack).
+    Amounts are counted in units of the denominations' gcd. Layer i is a bitset (an int)
+    of the amounts payable with the i smallest denominations; a denomination is added by
+    shift-or with its note count split into powers of two, i.e. O(log count) big-int
+    operations. When counts change only the layers from the smallest changed denomination
+    upward are rebuilt. A layer that is probed is converted to little-endian bytes once,
+    so a feasibility check is one byte lookup instead of a shift of the whole bitset.
+    """
+
+    def __init__(self, denominations: Iterable[int]) -> None:
+        """Planner for the denominations with all counts 0."""
+        self.denominations: list[int] = sorted(set(denominations))
+        if not self.denominations or self.denominations[0] <= 0:
+            raise ValueError("Denominations must be positive")
+        self.unit = gcd(*self.denominations)
+        self._steps = [denom // self.unit for denom in self.denominations]
+        self._counts = [0] * len(self.denominations)
+        self._layers = [1] * (len(self.denominations) + 1)
+        """_layers[i]: bit a is set if a * unit is payable with the i smallest denominations."""
+        self._tables: list[Optional[bytes]] = [None] * (len(self.denominations) + 1)
+        """_layers as bytes (bit a is bit a % 8 of byte a // 8), built on first probe."""
+
+    def update(self, counts: Union[Mapping[int, int], Sequence[int]]) -> None:
+        """
+        Take new note counts and rebuild the affected layers. counts is {denomination: count}
+        (missing denominations count as 0) or counts in ascending denomination order.
+        """
+        if isinstance(counts, Mapping):
+            counts = [counts.get(denom, 0) for denom in self.denominations]
+        first: Optional[int] = None
+        for i, count in enumerate(counts):
+            count = max(0, count)
+            if count != self._counts[i]:
+                self._counts[i] = count
+                if first is None:
+                    first = i
+        if first is not None:
+            self._rebuild(first)
+
+    def _rebuild(self, start: int) -> None:
+        for i in range(start, len(self.denominations)):
+            bits = self._layers[i]
+            step = self._steps[i]
+            remaining = self._counts[i]
+            chunk = 1
+            while remaining > 0:
+                take = min(chunk, remaining)
+                bits |= bits << (step * take)
+                remaining -= take
+                chunk *= 2
+            self._layers[i + 1] = bits
+            self._tables[i + 1] = None
+
+    def _table(self, i: int) -> bytes:
+        table = self._tables[i]
+        if table is None:
+            bits = self._layers[i]
+            table = self._tables[i] = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        return table
+
+    @staticmethod
+    def _has(table: bytes, a: int) -> bool:
+        index = a >> 3
+        return index < len(table) and (table[index] >> (a & 7)) & 1 == 1
+
+    def can_pay(self, amount: int) -> bool:
+        """True if some combination of the available notes sums to amount exactly."""
+        if amount < 0 or amount % self.unit:
+            return False
+        return self._has(self._table(len(self.denominations)), amount // self.unit)
+
+    def plan(self, amount: int) -> Optional[dict[int, int]]:
+        """
+        Notes {denomination: count} paying amount, or None if it cannot be paid.
+        Going from the largest denomination down, each takes as many notes as it can while
+        the rest stays payable by the smaller ones (the greedy plan whenever greedy works).
+        """
+        if not self.can_pay(amount):
+            return None
+        remaining = amount // self.unit
+        result: dict[int, int] = {}
+        for i in range(len(self.denominations) - 1, -1, -1):
+            step = self._steps[i]
+            below = self._table(i)
+            count = min(self._counts[i], remaining // step)
+            while not self._has(below, remaining - count * step):
+                count -= 1
+            if count:
+                result[self.denominations[i]] = count
+                remaining -= count * step
+        return result
+
+    def _feasible(self, i: int, remaining: int, count: int, down: bool) -> int:
+        """Nearest count of denomination i from `count` (downward or upward) leaving a rest the smaller ones pay."""
+        below = self._table(i)
+        step = self._steps[i]
+        direction = -1 if down else 1
+        while not self._has(below, remaining - count * step):
+            count += direction
+        return count
+
+    def _spread(self, i: int, remaining: int, branching: int) -> list[int]:
+        """Up to `branching` feasible counts of denomination i between the fewest and most notes, most first."""
+        step = self._steps[i]
+        if i == 0:
+            return [remaining // step]
+        most = self._feasible(i, remaining, min(self._counts[i], remaining // step), down=True)
+        if branching == 1:
+            return [most]
+        fewest = self._feasible(i, remaining, 0, down=False)
+        counts: list[int] = []
+        for j in range(branching):
+            target = most - (most - fewest) * j // (branching - 1)
+            count = self._feasible(i, remaining, target, down=True)
+            if count not in counts:
+                counts.append(count)
+        return counts
+
+    def candidates(self, amount: int, branching: int, limit: int) -> list[tuple[int, ...]]:
+        """
+        Up to `limit` different plans for amount, each as note counts in ascending denomination
+        order. Going from the largest denomination down, each level tries up to `branching` counts
+        spread between the fewest and the most notes that leave a payable rest (most first), so
+        every branch ends in a valid plan and the first plan is plan()'s.
+        """
+        if not self.can_pay(amount):
+            return []
+        result: list[tuple[int, ...]] = []
+        plan = [0] * len(self.denominations)
+
+        def visit(i: int, remaining: int) -> None:
+            if i < 0:
+                result.append(tuple(plan))
+                return
+            for count in self._spread(i, remaining, branching):
+                if len(result) >= limit:
+                    return
+                plan[i] = count
+                visit(i - 1, remaining - count * self._steps[i])
+            plan[i] = 0
+
+        visit(len(self.denominations) - 1, amount // self.unit)
+        return result
+
+    def counts(self) -> tuple[int, ...]:
+        """Current note counts in ascending denomination order."""
+        return tuple(self._counts)
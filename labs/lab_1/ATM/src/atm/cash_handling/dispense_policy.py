@@ -0,0 +1,147 @@
+"""Dispense policies: which of the possible note combinations to pay an amount with."""
+
+from abc import ABC, abstractmethod
+from typing import Mapping, Optional
+
+from ..config import Config
+from .cassettes import capacity_by_denomination
+from .dispense_planner import DispensePlanner
+
+
+class DispensePolicy(ABC):
+    """
+    Chooses a plan among candidate plans from DispensePlanner.candidates.
+    Candidates are scored column-wise: columns[i] holds the counts of the i-th smallest
+    denomination in every candidate, so a score is a few passes over flat lists.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def scores(
+        self,
+        denominations: list[int],
+        counts: tuple[int, ...],
+        columns: list[tuple[int, ...]],
+    ) -> list[float]:
+        """Score of every candidate (lower is better); counts are the notes before dispensing."""
+
+    def choose(self, planner: DispensePlanner, amount: int) -> Optional[dict[int, int]]:
+        """Best plan {denomination: count} for amount, or None if it cannot be paid."""
+        candidates = planner.candidates(
+            amount, Config.DISPENSE_BRANCHING, Config.DISPENSE_CANDIDATES)
+        if not candidates:
+            return None
+        columns = list(zip(*candidates))
+        scores = self.scores(planner.denominations, planner.counts(), columns)
+        best = candidates[min(range(len(candidates)), key=scores.__getitem__)]
+        return {d: k for d, k in zip(planner.denominations, best) if k}
+
+
+class LargestFirstPolicy(DispensePolicy):
+    """As many notes of the largest denomination as possible, then the next one (the classic ATM rule)."""
+
+    name = "largest_first"
+
+    def scores(
+        self,
+        denominations: list[int],
+        counts: tuple[int, ...],
+        columns: list[tuple[int, ...]],
+    ) -> list[float]:
+        """Lexicographic: more notes of a larger denomination always wins."""
+        base = max(counts) + 1
+        result = [0] * len(columns[0])
+        for column in reversed(columns):
+            result = [score * base - k for score, k in zip(result, column)]
+        return result
+
+    def choose(self, planner: DispensePlanner, amount: int) -> Optional[dict[int, int]]:
+        """The planner's own plan is already largest-first; no candidates needed."""
+        return planner.plan(amount)
+
+
+class MinimumNotesPolicy(DispensePolicy):
+    """Fewest notes in total (fastest to count out, least wear)."""
+
+    name = "min_notes"
+
+    def scores(
+        self,
+        denominations: list[int],
+        counts: tuple[int, ...],
+        columns: list[tuple[int, ...]],
+    ) -> list[float]:
+        """Total number of notes."""
+        return [float(sum(notes)) for notes in zip(*columns)]
+
+
+class BalanceFillPolicy(DispensePolicy):
+    """
+    Keep the cassettes' fill ratios (notes left / capacity) as even as possible, so no
+    denomination runs out long before the others.
+    """
+
+    name = "balance_fill"
+
+    def __init__(self, capacities: Optional[Mapping[int, int]] = None) -> None:
+        """capacities: notes per denomination (default: all its cassettes in the configured layout)."""
+        self.capacities = capacities
+
+    def scores(
+        self,
+        denominations: list[int],
+        counts: tuple[int, ...],
+        columns: list[tuple[int, ...]],
+    ) -> list[float]:
+        """Variance of the fill ratios after dispensing."""
+        by_denom = capacity_by_denomination() if self.capacities is None else self.capacities
+        capacities = [max(1, by_denom.get(d, 0)) for d in denominations]
+        ratios = [
+            [(count - k) / capacity for k in column]
+            for count, capacity, column in zip(counts, capacities, columns)
+        ]
+        n = len(ratios)
+        result = []
+        for row in zip(*ratios):
+            mean = sum(row) / n
+            result.append(sum((r - mean) ** 2 for r in row))
+        return result
+
+
+class PreserveSmallChangePolicy(DispensePolicy):
+    """
+    Spare the small denominations: the cost of a plan is the share of each cassette it
+    uses, weighted by how small the denomination is, so the ATM can keep paying odd amounts.
+    """
+
+    name = "preserve_small"
+
+    def scores(
+        self,
+        denominations: list[int],
+        counts: tuple[int, ...],
+        columns: list[tuple[int, ...]],
+    ) -> list[float]:
+        """Sum of used cassette shares weighted by largest denomination / denomination."""
+        largest = denominations[-1]
+        result = [0.0] * len(columns[0])
+        for denom, count, column in zip(denominations, counts, columns):
+            weight = largest / denom / max(count, 1)
+            result = [score + k * weight for score, k in zip(result, column)]
+        return result
+
+
+POLICIES: dict[str, type[DispensePolicy]] = {
+    policy.name: policy
+    for policy in (LargestFirstPolicy, MinimumNotesPolicy, BalanceFillPolicy, PreserveSmallChangePolicy)
+}
+
+
+def create_policy(name: Optional[str] = None) -> DispensePolicy:
+    """Policy registered under name (default Config.DISPENSE_POLICY)."""
+    name = Config.DISPENSE_POLICY if name is None else name
+    try:
+        return POLICIES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown dispense policy: {name}") from None
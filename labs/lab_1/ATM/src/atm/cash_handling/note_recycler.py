@@ -0,0 +1,87 @@
+"""Note recycling: which deposited notes go into the dispense cassettes and which into the deposit bin."""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from ..config import Config
+
+if TYPE_CHECKING:
+    from .cash_inventory import CashInventory
+
+
+@dataclass(frozen=True)
+class DepositPlacement:
+    """Where the notes of one deposit went, as {denomination: count} per destination."""
+
+    recycled: dict[int, int] = field(default_factory=dict)
+    """Into the dispense cassettes (can be paid out again)."""
+    deposited: dict[int, int] = field(default_factory=dict)
+    """Into the deposit bin (kept until collection)."""
+    rejected: dict[int, int] = field(default_factory=dict)
+    """Into the reject bin (the deposit bin was full)."""
+
+
+class NoteRecycler:
+    """
+    Routes accepted notes. A denomination is recycled if it is one of the recycled
+    denominations and its cassettes are filled below max_fill of their capacity; only the
+    notes that fit below that mark are recycled. The rest goes to the deposit bin, and what
+    the deposit bin cannot take to the reject bin; if that is full too, the deposit is refused.
+    """
+
+    def __init__(
+        self,
+        denominations: Optional[Iterable[int]] = None,
+        max_fill: Optional[float] = None,
+    ) -> None:
+        """Defaults: Config.RECYCLE_DENOMINATIONS and Config.RECYCLE_MAX_FILL."""
+        self.denominations = frozenset(
+            Config.RECYCLE_DENOMINATIONS if denominations is None else denominations)
+        self.max_fill = Config.RECYCLE_MAX_FILL if max_fill is None else max_fill
+
+    def recyclable(self, inventory: "CashInventory", denom: int) -> int:
+        """Notes of the denomination that may still be recycled into the cassettes."""
+        if denom not in self.denominations:
+            return 0
+        limit = int(inventory.get_capacity(denom) * self.max_fill)
+        return max(0, limit - inventory.get_count(denom))
+
+    def place(self, inventory: "CashInventory", denominations: dict[int, int]) -> DepositPlacement:
+        """
+        Move accepted notes {denomination: count} into the inventory and report where they
+        went (call save_state() to persist). ValueError, with nothing moved, for unsupported
+        denominations, negative counts or when the notes do not fit anywhere.
+        """
+        recycled: dict[int, int] = {}
+        rest: dict[int, int] = {}
+        for denom, count in denominations.items():
+            if denom not in Config.ATM_CASH_DENOMINATIONS:
+                raise ValueError(f"Unsupported denomination: {denom}")
+            if count < 0:
+                raise ValueError("Count cannot be negative")
+            take = min(count, self.recyclable(inventory, denom))
+            if take:
+                recycled[denom] = take
+            if count > take:
+                rest[denom] = count - take
+        deposited: dict[int, int] = {}
+        rejected: dict[int, int] = {}
+        room = inventory.deposit_bin.room()
+        for denom, count in rest.items():
+            take = min(count, room)
+            room -= take
+            if take:
+                deposited[denom] = take
+            if count > take:
+                rejected[denom] = count - take
+        if sum(rejected.values()) > inventory.reject_bin.room():
+            raise ValueError("ATM is full and cannot accept these notes")
+
+        for denom, count in recycled.items():
+            inventory.add_notes(denom, count)
+        inventory.events.record("recycle", recycled)
+        for denom, count in deposited.items():
+            inventory.deposit_notes(denom, count)
+        for denom, count in rejected.items():
+            inventory.reject_notes(denom, count)
+        return DepositPlacement(recycled, deposited, rejected)
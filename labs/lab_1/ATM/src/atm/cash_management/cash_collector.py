@@ -21,9 +21,20 @@ class CashCollector:
         """Remove cash from cassettes."""
         for denom, count in denominations.items():
             if denom in Config.ATM_CASH_DENOMINATIONS:
-                if self.inventory._cassettes[denom] >= count:
-                    self.inventory._cassettes[denom] -= count
-                else:
-                    raise ValueError(f"Not enough {denom} notes in cassette")
+                self.inventory.remove_notes(denom, count)
         self.inventory.save_state()
         self.logger.info(f"Cash collected: {denominations}")
+
+    def collect_deposit_bin(self) -> dict[int, int]:
+        """Empty the deposit bin; returns {denomination: count} taken out."""
+        collected = self.inventory.empty_deposit_bin()
+        self.inventory.save_state()
+        self.logger.info(f"Deposit bin collected: {collected}")
+        return collected
+
+    def collect_reject_bin(self) -> dict[int, int]:
+        """Empty the reject bin; returns {denomination: count} taken out."""
+        collected = self.inventory.empty_reject_bin()
+        self.inventory.save_state()
+        self.logger.info(f"Reject bin collected: {collected}")
+        return collected
@@ -0,0 +1,208 @@
+"""Cash depletion forecast and replenishment mix from the history of cash events."""
+
+import math
+import random
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+from ..cash_handling.cash_event_log import CashEvent, read_cash_events
+from ..config import Config
+
+HOURS_PER_WEEK = 7 * 24
+
+
+def hour_of_week(timestamp: float) -> int:
+    """Local hour of the week: 0 is Monday 00:00-01:00, 167 is Sunday 23:00-24:00."""
+    t = time.localtime(timestamp)
+    return t.tm_wday * 24 + t.tm_hour
+
+
+@dataclass(frozen=True)
+class DepletionForecast:
+    """When the notes of one denomination run out, over all simulated scenarios."""
+
+    denomination: int
+    notes: int
+    """Notes at the start of the forecast."""
+    median_hours: Optional[int]
+    """Hours until empty in the median scenario (None: lasts beyond the horizon)."""
+    p10_hours: Optional[int]
+    """Hours until empty that only 10% of scenarios undercut (None: beyond the horizon)."""
+    empty_probability: float
+    """Share of scenarios in which the denomination runs out within the horizon."""
+
+
+class DemandModel:
+    """
+    Net notes taken from the cassettes per denomination (dispensed minus recycled) in every
+    hour of the history, quiet hours included as zeros, grouped by hour of the week. One
+    int32 column per denomination, indexed by history hour.
+    """
+
+    def __init__(self, denominations: Iterable[int], start_hour: int, columns: list[array]) -> None:
+        """columns[j][i]: net notes of the j-th denomination in hour start_hour + i (hours since the epoch)."""
+        self.denominations: list[int] = sorted(set(denominations))
+        self.start_hour = start_hour
+        self.columns = columns
+        self.hours = len(columns[0]) if columns else 0
+        self._buckets: list[list[int]] = [[] for _ in range(HOURS_PER_WEEK)]
+        """History hours of every hour of the week."""
+        for i in range(self.hours):
+            self._buckets[hour_of_week((start_hour + i) * 3600)].append(i)
+        self._all = list(range(self.hours))
+
+    @classmethod
+    def from_events(
+        cls,
+        events: Iterable[CashEvent],
+        denominations: Iterable[int],
+        end: Optional[float] = None,
+    ) -> "DemandModel":
+        """Model of the events' hours, from the first event's hour to end (default the last event)."""
+        denominations = sorted(set(denominations))
+        index = {denom: j for j, denom in enumerate(denominations)}
+        net: dict[int, list[int]] = {}
+        for event in events:
+            sign = 1 if event.kind == "dispense" else -1 if event.kind == "recycle" else 0
+            if not sign:
+                continue
+            row = net.setdefault(int(event.timestamp // 3600), [0] * len(denominations))
+            for denom, count in event.notes.items():
+                if denom in index:
+                    row[index[denom]] += sign * count
+        if not net:
+            return cls(denominations, 0, [array("i") for _ in denominations])
+        first = min(net)
+        last = max(max(net), int(end // 3600) if end is not None else first)
+        zero = [0] * len(denominations)
+        rows = [net.get(hour, zero) for hour in range(first, last + 1)]
+        return cls(denominations, first, [array("i", column) for column in zip(*rows)])
+
+    def bucket(self, hour: int) -> list[int]:
+        """History hours with the same hour of the week as `hour` (all hours if there are none)."""
+        return self._buckets[hour_of_week(hour * 3600)] or self._all
+
+    def mean_demand(self) -> dict[int, list[float]]:
+        """Mean net notes per hour of the week for every denomination (the demand curves)."""
+        result: dict[int, list[float]] = {}
+        for denom, column in zip(self.denominations, self.columns):
+            result[denom] = [
+                sum(column[i] for i in hours) / len(hours) if hours else 0.0
+                for hours in self._buckets]
+        return result
+
+
+class CashForecaster:
+    """
+    Monte Carlo forecast: a scenario draws every future hour from the history hours with
+    the same hour of the week (a seasonal bootstrap), for all denominations at once. Per
+    scenario and denomination the running maximum of the cumulative net demand is built
+    with two itertools.accumulate passes over an int array, so the hour the notes run out
+    is a bisect and the notes needed for a period are a lookup; only those two numbers are
+    kept per scenario.
+    """
+
+    def __init__(
+        self,
+        model: DemandModel,
+        scenarios: Optional[int] = None,
+        horizon_hours: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Defaults: Config.FORECAST_SCENARIOS and Config.FORECAST_HORIZON_HOURS; seed makes runs repeatable."""
+        self.model = model
+        self.scenarios = Config.FORECAST_SCENARIOS if scenarios is None else scenarios
+        self.horizon_hours = Config.FORECAST_HORIZON_HOURS if horizon_hours is None else horizon_hours
+        if self.scenarios <= 0 or self.horizon_hours <= 0:
+            raise ValueError("Forecast needs at least one scenario and one hour")
+        self.seed = seed
+
+    @classmethod
+    def from_history(
+        cls,
+        path: Optional[Path] = None,
+        now: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> "CashForecaster":
+        """Forecaster over the last Config.FORECAST_HISTORY_DAYS of the cash event log."""
+        now = time.time() if now is None else now
+        events = read_cash_events(path, since=now - Config.FORECAST_HISTORY_DAYS * 86400)
+        return cls(DemandModel.from_events(events, Config.ATM_CASH_DENOMINATIONS, end=now), seed=seed)
+
+    def _simulate(
+        self, start: float, counts: Mapping[int, int], cover: int
+    ) -> tuple[list[array], list[array]]:
+        """
+        Per denomination and scenario: the hour the notes run out (horizon + 1 if they last)
+        and the most notes needed at any point of the first `cover` hours.
+        """
+        model = self.model
+        if not model.hours:
+            never = [self.horizon_hours + 1] * self.scenarios
+            return ([array("i", never) for _ in model.denominations],
+                    [array("q", bytes(8 * self.scenarios)) for _ in model.denominations])
+        empty = [array("i") for _ in model.denominations]
+        needed = [array("q") for _ in model.denominations]
+        first = int(start // 3600)
+        buckets = [model.bucket(first + h) for h in range(self.horizon_hours)]
+        notes = [counts.get(denom, 0) for denom in model.denominations]
+        draw = random.Random(self.seed).random
+        for _ in range(self.scenarios):
+            rows = [bucket[int(draw() * len(bucket))] for bucket in buckets]
+            for j, column in enumerate(model.columns):
+                peak = list(accumulate(accumulate(map(column.__getitem__, rows)), max))
+                empty[j].append(bisect_right(peak, notes[j]) + 1)
+                needed[j].append(peak[cover - 1])
+        return empty, needed
+
+    def forecast(
+        self, counts: Mapping[int, int], start: Optional[float] = None
+    ) -> dict[int, DepletionForecast]:
+        """Depletion forecast of every denomination for the notes {denomination: count} at start (default now)."""
+        start = time.time() if start is None else start
+        never = self.horizon_hours + 1
+        empty, _ = self._simulate(start, counts, self.horizon_hours)
+        result: dict[int, DepletionForecast] = {}
+        for denom, hours in zip(self.model.denominations, empty):
+            ordered = sorted(hours)
+
+            def at(q: float) -> Optional[int]:
+                value = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+                return None if value >= never else value
+
+            result[denom] = DepletionForecast(
+                denom, counts.get(denom, 0), at(0.5), at(0.1),
+                sum(1 for h in ordered if h < never) / len(ordered))
+        return result
+
+    def recommend_mix(
+        self,
+        counts: Mapping[int, int],
+        room: Mapping[int, int],
+        cover_hours: Optional[int] = None,
+        service_level: Optional[float] = None,
+        start: Optional[float] = None,
+    ) -> dict[int, int]:
+        """
+        Notes {denomination: count} to load so that, in service_level of the scenarios, no
+        denomination runs out within cover_hours (defaults Config.FORECAST_COVER_HOURS and
+        Config.FORECAST_SERVICE_LEVEL); capped by the room left in the cassettes.
+        The result can be passed to CashReplenisher.replenish.
+        """
+        cover = min(self.horizon_hours, Config.FORECAST_COVER_HOURS if cover_hours is None else cover_hours)
+        level = Config.FORECAST_SERVICE_LEVEL if service_level is None else service_level
+        start = time.time() if start is None else start
+        _, needed = self._simulate(start, counts, cover)
+        mix: dict[int, int] = {}
+        for denom, peaks in zip(self.model.denominations, needed):
+            ordered = sorted(peaks)
+            need = ordered[max(0, math.ceil(level * len(ordered)) - 1)]
+            load = min(room.get(denom, 0), need - counts.get(denom, 0))
+            if load > 0:
+                mix[denom] = load
+        return mix
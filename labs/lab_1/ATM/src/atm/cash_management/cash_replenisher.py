@@ -1,9 +1,10 @@
 """Cash replenishment by incassator (with authentication)."""
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from ..config import Config
 from ..session_manager.logger import Logger
+from .cash_forecast import CashForecaster
 from .cash_replenisher_auth import CashReplenisherAuthenticator
 
 if TYPE_CHECKING:
@@ -23,12 +24,26 @@ class CashReplenisher:
         self.authenticator = authenticator
         self.logger = Logger()
 
+    def recommend_mix(self, forecaster: Optional[CashForecaster] = None) -> dict[int, int]:
+        """Notes to load, from the depletion forecast over the cash event history (see CashForecaster)."""
+        forecaster = forecaster if forecaster is not None else CashForecaster.from_history()
+        counts = self.inventory.get_counts()
+        return forecaster.recommend_mix(counts, {d: self.inventory.get_room(d) for d in counts})
+
     def replenish(self, denominations: dict[int, int], user_id: str, pin: str) -> None:
-        """Replenish with authentication."""
+        """Replenish with authentication; ValueError (nothing loaded) if notes do not fit into the cassettes."""
         if not self.authenticator.authenticate(user_id, pin):
             raise RuntimeError("Authentication failed for replenisher")
+        for denom, count in denominations.items():
+            if denom not in Config.ATM_CASH_DENOMINATIONS:
+                continue
+            if count < 0:
+                raise ValueError("Count cannot be negative")
+            if count > self.inventory.get_room(denom):
+                raise ValueError(
+                    f"Cassettes for {denom} notes have room for {self.inventory.get_room(denom)} notes")
         for denom, count in denominations.items():
             if denom in Config.ATM_CASH_DENOMINATIONS:
-                self.inventory._cassettes[denom] += count
+                self.inventory.add_notes(denom, count)
         self.inventory.save_state()
         self.logger.info(f"Cash replenished by {user_id}: {denominations}")
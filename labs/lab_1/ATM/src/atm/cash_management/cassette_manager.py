@@ -1,6 +1,6 @@
 """Cassette management: replace denomination counts."""
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from ..session_manager.logger import Logger
 
@@ -16,10 +16,13 @@ class CassetteManager:
         self.inventory = inventory
         self.logger = Logger()
 
-    def replace_cassette(self, denom: int, new_count: int) -> None:
-        """Replace a cassette with new count."""
-        if denom in self.inventory._cassettes:
-            self.inventory._cassettes[denom] = new_count
+    def replace_cassette(self, denom: int, new_count: int, cassette: Optional[int] = None) -> None:
+        """
+        Replace a cassette with new count: the cassette-th cassette of the denomination
+        (0-based), or all of them as one when there is no index.
+        """
+        if denom in self.inventory.get_counts():
+            self.inventory.set_count(denom, new_count, cassette)
             self.inventory.save_state()
             self.logger.info(
                 f"Cassette {denom} replaced with {new_count} notes")
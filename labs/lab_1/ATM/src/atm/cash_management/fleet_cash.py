@@ -0,0 +1,208 @@
+"""Fleet-wide cash position: cassette totals of many ATMs (one data directory each) in one table."""
+
+import argparse
+import heapq
+import json
+import os
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import mul
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+from ..config import Config
+
+_MAX_NOTES = 2**31 - 1
+"""Counts are clamped to the cassette counter range, so a corrupt file cannot overflow a column."""
+
+
+def _read_counts(path: str, denominations: Sequence[int]) -> Optional[list[int]]:
+    """Notes per denomination in the cash_inventory section of a state file; None if unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        section = state.get("cash_inventory", {})
+        return [max(0, min(int(section.get(str(denom), 0)), _MAX_NOTES)) for denom in denominations]
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class FleetCashTable:
+    """
+    Columnar table ATM x denomination: ATM ids (data directories) in scan order and one
+    int64 column of notes per denomination, plus the cash amount per ATM. Queries are
+    passes over the columns.
+    """
+
+    def __init__(self, denominations: Iterable[int]) -> None:
+        """Empty table for the denominations."""
+        self.denominations: list[int] = sorted(set(denominations))
+        self.atms: list[str] = []
+        self.columns: dict[int, array] = {denom: array("q") for denom in self.denominations}
+        self.amounts = array("q")
+        """Cash in the cassettes of every ATM."""
+        self.missing: list[str] = []
+        """ATMs without a state file."""
+        self.invalid: list[str] = []
+        """ATMs whose state file could not be read."""
+
+    def __len__(self) -> int:
+        return len(self.atms)
+
+    def append(self, atm: str, counts: Sequence[int]) -> None:
+        """Add one ATM's notes in ascending denomination order."""
+        self.atms.append(atm)
+        for denom, count in zip(self.denominations, counts):
+            self.columns[denom].append(count)
+        self.amounts.append(sum(map(mul, self.denominations, counts)))
+
+    def totals(self) -> dict[int, int]:
+        """Notes of every denomination across the fleet."""
+        return {denom: sum(column) for denom, column in self.columns.items()}
+
+    def total_amount(self) -> int:
+        """Cash across the fleet."""
+        return sum(self.amounts)
+
+    def _values(self, denom: Optional[int]) -> array:
+        if denom is None:
+            return self.amounts
+        try:
+            return self.columns[denom]
+        except KeyError:
+            raise ValueError(f"Unsupported denomination: {denom}") from None
+
+    def below(self, threshold: int, denom: Optional[int] = None) -> list[str]:
+        """ATMs with less cash than threshold, or fewer notes of denom when given."""
+        values = self._values(denom)
+        return [atm for atm, value in zip(self.atms, values) if value < threshold]
+
+    def top(self, n: int, denom: Optional[int] = None) -> list[tuple[str, int]]:
+        """The n fullest ATMs by cash (or notes of denom) as (atm, value), fullest first."""
+        values = self._values(denom)
+        return heapq.nlargest(n, zip(self.atms, values), key=lambda item: item[1])
+
+
+def _load_cache(path: Path) -> dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(path: Path, cache: dict[str, Any]) -> None:
+    """Atomically replace the cache file."""
+    tmp_path: Optional[str] = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        tmp_path = None
+    except OSError as e:
+        raise RuntimeError(f"Failed to save fleet cache to {path}: {e}") from e
+    finally:
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+def discover_data_dirs(root: Path) -> list[Path]:
+    """Subdirectories of root that hold an ATM state file, sorted."""
+    name = Config.ATM_STATE_FILE.name
+    return sorted(entry.parent for entry in root.glob(f"*/{name}"))
+
+
+def scan_fleet(
+    data_dirs: Iterable[Path],
+    cache_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+    parallel_min_files: Optional[int] = None,
+) -> FleetCashTable:
+    """
+    Table of the cassette totals of every data directory's state file.
+    A state file whose mtime and size match the cache (cache_path, default
+    Config.FLEET_CACHE_FILE) is not read; the changed ones are parsed in a process pool of
+    `workers` processes (default Config.FLEET_WORKERS, 0 = CPU count) when there are at least
+    parallel_min_files of them (default Config.FLEET_PARALLEL_MIN_FILES), in this process
+    otherwise. The cache is rewritten only if something changed.
+    """
+    cache_path = Config.FLEET_CACHE_FILE if cache_path is None else cache_path
+    workers = Config.FLEET_WORKERS if workers is None else workers
+    min_files = Config.FLEET_PARALLEL_MIN_FILES if parallel_min_files is None else parallel_min_files
+    table = FleetCashTable(Config.ATM_CASH_DENOMINATIONS)
+    denoms = table.denominations
+    cache = _load_cache(cache_path)
+    if cache.get("denominations") != denoms:
+        cache = {"denominations": denoms, "files": {}}
+    files: dict[str, list[Any]] = cache["files"]
+    name = Config.ATM_STATE_FILE.name
+
+    changed = False
+    entries: list[tuple[str, Optional[list[int]]]] = []
+    stale: list[tuple[int, str, list[int]]] = []
+    """(position in entries, path, [mtime_ns, size]) of files to parse."""
+    for data_dir in data_dirs:
+        atm = str(data_dir)
+        path = os.path.join(atm, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            table.missing.append(atm)
+            changed |= files.pop(path, None) is not None
+            continue
+        signature = [st.st_mtime_ns, st.st_size]
+        cached = files.get(path)
+        if cached is not None and cached[:2] == signature:
+            entries.append((atm, cached[2]))
+        else:
+            stale.append((len(entries), path, signature))
+            entries.append((atm, None))
+
+    if stale:
+        paths = [path for _, path, _ in stale]
+        processes = workers or os.cpu_count() or 1
+        if len(stale) >= min_files and processes > 1:
+            chunk = max(1, len(paths) // (4 * processes))
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                parsed = list(pool.map(_read_counts, paths, repeat(denoms), chunksize=chunk))
+        else:
+            parsed = [_read_counts(path, denoms) for path in paths]
+        for (position, path, signature), counts in zip(stale, parsed):
+            entries[position] = (entries[position][0], counts)
+            if counts is None:
+                files.pop(path, None)
+            else:
+                files[path] = signature + [counts]
+
+    for atm, counts in entries:
+        if counts is None:
+            table.invalid.append(atm)
+        else:
+            table.append(atm, counts)
+    if stale or changed:
+        _save_cache(cache_path, cache)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cash position of a fleet of ATM data directories.")
+    parser.add_argument("dirs", nargs="*", type=Path, help="ATM data directories")
+    parser.add_argument("--root", type=Path, help="scan every subdirectory holding a state file")
+    parser.add_argument("--threshold", type=int, default=0, help="list ATMs with less cash than this")
+    parser.add_argument("--top", type=int, default=10, help="show the N fullest ATMs")
+    args = parser.parse_args()
+    fleet_dirs = list(args.dirs) + (discover_data_dirs(args.root) if args.root else [])
+    fleet = scan_fleet(fleet_dirs)
+    print(f"{len(fleet)} ATMs, {fleet.total_amount()} {Config.DEFAULT_CURRENCY}")
+    for denomination, notes in fleet.totals().items():
+        print(f"  {denomination:>5}: {notes} notes")
+    if args.threshold:
+        print(f"Below {args.threshold}: {', '.join(fleet.below(args.threshold)) or '-'}")
+    for atm_id, amount in fleet.top(args.top):
+        print(f"  {amount:>10}  {atm_id}")
+    for atm_id in fleet.missing + fleet.invalid:
+        print(f"  no readable state: {atm_id}")
@@ -11,16 +11,128 @@ class Config:
 
     DATA_DIR: Final[Path] = _PROJECT_ROOT / "data"
     ATM_STATE_FILE: Final[Path] = DATA_DIR / "atm_state.json"
+    CASH_EVENTS_FILE: Final[Path] = DATA_DIR / "cash_events.jsonl"
+    """History of dispensed and recycled notes (input of the cash depletion forecast)."""
+    FLEET_CACHE_FILE: Final[Path] = DATA_DIR / "fleet_cache.json"
+    """Cassette totals of scanned ATM state files keyed by path, mtime and size (fleet_cash)."""
+    FLEET_WORKERS: Final[int] = 0
+    FLEET_PARALLEL_MIN_FILES: Final[int] = 256
+    """Fleet scans parse changed state files in FLEET_WORKERS processes (0 = CPU count) from this many files on."""
+    CASH_ALERTS_FILE: Final[Path] = DATA_DIR / "cash_alerts.jsonl"
+    ATM_STATE_FLUSH_INTERVAL_SECONDS: Final[float] = 0.0
+    """Minimum time between writes of the ATM state file; changes in between are coalesced (0 writes every change)."""
     BANK_ACCOUNTS_FILE: Final[Path] = DATA_DIR / "bank_accounts.json"
+    BANK_SNAPSHOT_FILE: Final[Path] = DATA_DIR / "bank_accounts.bin"
+    BANK_SNAPSHOT_ENABLED: Final[bool] = True
+    """Keep a binary snapshot next to bank_accounts.json for fast startup."""
+    BANK_DB_FILE: Final[Path] = DATA_DIR / "bank_accounts.db"
+    BANK_BACKEND: Final[str] = "json"
+    """Bank storage backend: "json" (MockBankRepository), "sqlite" (SqliteBankRepository) or "remote" (RemoteBankGateway to BankServer)."""
+    BANK_JOURNAL_FILE: Final[Path] = DATA_DIR / "bank_accounts.journal"
+    BANK_JOURNAL_ENABLED: Final[bool] = False
+    """Journal mode: append one record per change instead of rewriting bank_accounts.json."""
+    BANK_JOURNAL_COMPACT_BYTES: Final[int] = 1024 * 1024
+    """Journal size after which a fresh snapshot is written in the background."""
+    BANK_LEDGER_ENABLED: Final[bool] = False
+    """Record every money movement of BankGateway in an append-only ledger."""
+    BANK_LEDGER_FILE: Final[Path] = DATA_DIR / "bank_ledger.jsonl"
+    BANK_LEDGER_SNAPSHOT_FILE: Final[Path] = DATA_DIR / "bank_ledger_snapshot.json"
+    BANK_LEDGER_SNAPSHOT_EVERY: Final[int] = 1000
+    """Ledger entries after which a fresh balance snapshot is written."""
+    BANK_IDEMPOTENCY_FILE: Final[Path] = DATA_DIR / "bank_idempotency.jsonl"
+    BANK_IDEMPOTENCY_MAX_KEYS: Final[int] = 100_000
+    """Idempotency keys of money operations remembered by BankGateway (0 disables deduplication)."""
+    BANK_IDEMPOTENCY_TTL_SECONDS: Final[float] = 24 * 3600.0
+    """Age after which an idempotency key is forgotten and a retry would run again."""
+    BANK_THREAD_SAFE: Final[bool] = False
+    """Thread-safe MockBankRepository: striped per-account locks for terminals sharing one repository."""
+    BANK_LOCK_STRIPES: Final[int] = 64
+    """Number of per-account lock stripes in thread-safe mode."""
+    BANK_OPTIMISTIC_CONCURRENCY: Final[bool] = False
+    """BankGateway withdraw/deposit use versioned compare-and-set with retries instead of card locks."""
+    BANK_CAS_MAX_RETRIES: Final[int] = 32
+    """Attempts of an optimistic withdraw/deposit before VersionConflictError is raised."""
+    BANK_SHARED_FILE: Final[bool] = False
+    """Several ATM processes share bank_accounts.json: lock changes across processes, reload on external change."""
+    BANK_LOCK_FILE: Final[Path] = DATA_DIR / "bank_accounts.lock"
+    BANK_CACHE_SIZE: Final[int] = 0
+    """
+    Accounts kept in BankGateway's read-through cache (0, the default, disables the cache).
+    Never used over a repository other processes change (shared JSON file, SQLite): a cached
+    account could miss a block or PIN change for up to BANK_CACHE_TTL_SECONDS.
+    """
+    BANK_CACHE_TTL_SECONDS: Final[float] = 5.0
+    """Age after which a cached account is re-read from the repository (0 means no expiry)."""
+    BANK_SERVER_HOST: Final[str] = "127.0.0.1"
+    BANK_SERVER_PORT: Final[int] = 8765
+    """Address of the local bank simulator (BankServer) used when BANK_BACKEND is "remote"."""
+    BANK_SERVER_POOL_SIZE: Final[int] = 4
+    """Maximum open connections per RemoteBankGateway."""
+    BANK_SERVER_TIMEOUT_SECONDS: Final[float] = 5.0
+    """Timeout of one call to the bank server."""
+    BANK_SERVER_RETRIES: Final[int] = 2
+    """Repeats of a withdraw/deposit/transfer with an idempotency key after a timeout or lost connection."""
     MAX_PIN_ATTEMPTS: Final[int] = 3
     PIN_LENGTH: Final[int] = 4
     MIN_WITHDRAW_AMOUNT: Final[int] = 100
+    WITHDRAW_AMOUNT_MULTIPLE: Final[int] = 100
+    """Cash withdrawals must be a multiple of this amount."""
+    FAST_CASH_AMOUNTS: Final[tuple[int, ...]] = (200, 500, 1000, 2000, 5000)
+    """Preset withdrawal amounts offered when the ATM can dispense them."""
     MAX_WITHDRAW_AMOUNT_PER_DAY: Final[int] = 50000
+    """Cash withdrawal limit per card over a rolling day (enforced by BankGateway)."""
+    WITHDRAWAL_LIMITS_FILE: Final[Path] = DATA_DIR / "withdrawal_limits.log"
+    WITHDRAWAL_LIMIT_BUCKETS: Final[int] = 24
+    WITHDRAWAL_LIMIT_BUCKET_SECONDS: Final[int] = 3600
+    """The rolling day is WITHDRAWAL_LIMIT_BUCKETS buckets of this many seconds."""
+    WITHDRAWAL_LIMIT_COMPACT_RECORDS: Final[int] = 100_000
+    """Withdrawal limits log records after which the log is rewritten from the live counters."""
     SESSION_TIMEOUT_SECONDS: Final[int] = 60
     """Inactivity timeout: session ends after this many seconds without user input."""
+    TERMINAL_STEP_TIMEOUT_SECONDS: Final[float] = 2 * SESSION_TIMEOUT_SECONDS
+    """
+    A step of an asyncio-driven terminal that shows no activity for this long while a card is
+    inserted (e.g. stuck in a bank call) ends the session; input timeouts fire well before.
+    """
     DEFAULT_CURRENCY: Final[str] = "BYN"
+    CURRENCY_MINOR_UNITS: Final[int] = 100
+    """Minor units per currency unit (kopecks per ruble); balances are stored as integers of these."""
     ATM_CASH_DENOMINATIONS: Final[tuple[int, ...]] = (
         20, 50, 100, 200, 500, 1000)
+    CASSETTE_CAPACITY: Final[int] = 2000
+    """Notes one cassette holds unless CASSETTE_LAYOUT says otherwise."""
+    CASSETTE_LAYOUT: Final[tuple[tuple[int, int], ...]] = ()
+    """(denomination, capacity) of every dispense cassette, several per denomination allowed; empty means one cassette of CASSETTE_CAPACITY per denomination."""
+    CASH_LOW_FILL: Final[float] = 0.1
+    CASH_FULL_FILL: Final[float] = 0.95
+    """Watermarks: a denomination's cassettes are low below CASH_LOW_FILL of capacity and full from CASH_FULL_FILL (bins: full only)."""
+    CASH_ALERT_SINKS: Final[tuple[str, ...]] = ("file",)
+    """Where cash alerts go: "log", "file" (CASH_ALERTS_FILE), "socket" (CASH_ALERT_SOCKET); empty disables alerts."""
+    CASH_ALERT_SOCKET: Final[tuple[str, int]] = ("127.0.0.1", 9099)
+    """UDP address of the "socket" alert sink."""
+    CASH_ALERT_QUEUE_SIZE: Final[int] = 1000
+    """Undelivered cash alerts kept; further alerts are dropped rather than delay a cash movement."""
+    DEPOSIT_BIN_CAPACITY: Final[int] = 2000
+    """Notes the deposit bin holds (deposited notes that are not recycled)."""
+    REJECT_BIN_CAPACITY: Final[int] = 500
+    """Notes the reject bin holds (deposited notes that fit neither into the cassettes nor the deposit bin)."""
+    RECYCLE_DENOMINATIONS: Final[tuple[int, ...]] = (20, 50, 100, 200, 500, 1000)
+    """Denominations whose deposited notes are recycled into the dispense cassettes (empty disables recycling)."""
+    RECYCLE_MAX_FILL: Final[float] = 0.9
+    """Deposited notes are recycled only while the denomination's cassettes are below this share of capacity."""
+    FORECAST_HISTORY_DAYS: Final[int] = 56
+    """Days of cash event history the depletion forecast learns from."""
+    FORECAST_SCENARIOS: Final[int] = 2000
+    FORECAST_HORIZON_HOURS: Final[int] = 14 * 24
+    """Monte Carlo scenarios of the depletion forecast and how many hours each covers."""
+    FORECAST_COVER_HOURS: Final[int] = 7 * 24
+    FORECAST_SERVICE_LEVEL: Final[float] = 0.95
+    """A recommended replenishment lasts FORECAST_COVER_HOURS in this share of scenarios."""
+    DISPENSE_POLICY: Final[str] = "largest_first"
+    """Note selection: "largest_first", "min_notes", "balance_fill" or "preserve_small"."""
+    DISPENSE_BRANCHING: Final[int] = 4
+    DISPENSE_CANDIDATES: Final[int] = 256
+    """Candidate plans scored by a dispense policy: up to DISPENSE_BRANCHING counts per denomination, at most this many plans."""
     MSG_WELCOME: Final[str] = "Welcome to the ATM"
     MSG_INSERT_CARD: Final[str] = "Enter card number (16 digits): "
     MSG_ENTER_PIN: Final[str] = "Enter PIN: "
@@ -31,6 +143,9 @@ class Config:
     MSG_TIMEOUT: Final[str] = "Session timed out due to inactivity."
     MSG_INSUFFICIENT_FUNDS: Final[str] = "Insufficient funds."
     MSG_INVALID_AMOUNT: Final[str] = "Invalid amount. Must be multiple of 100."
+    MSG_DAILY_LIMIT_EXCEEDED: Final[str] = "Daily withdrawal limit exceeded. Available today: {}"
+    MSG_CANNOT_DISPENSE: Final[str] = "Cannot dispense {} with the notes available. Nearest: {}, maximum: {}."
+    MSG_NO_CASH: Final[str] = "Sorry, no cash is available in this ATM."
     MSG_PRESS_ENTER: Final[str] = "Press Enter to continue..."
     MSG_PRINT_RECEIPT: Final[str] = "Print receipt? (y/n): "
 
@@ -0,0 +1,130 @@
+"""asyncio driver for the client state machine: many terminals in one process."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Union
+
+from ..atm import ATM
+from ..bank_communication.bank_gateway import BankGateway, create_repository
+from ..bank_communication.remote_bank_gateway import RemoteBankGateway
+from ..config import Config
+from .atm_state_machine import ATMStateMachine
+
+
+class AsyncStateMachineDriver:
+    """
+    Runs the client loop of one terminal (ATMStateMachine.handle steps) without blocking the event loop.
+    Each step runs on the terminal's own worker thread, so blocking input, bank calls and disk writes
+    of one terminal do not stall the others.
+    A step that shows no activity (session timer not reset) for step_timeout seconds while a card is
+    inserted cannot be interrupted, so the driver ends the session instead: it ejects the card and
+    ends the session, which leaves the stuck thread nothing to act on, and stops the terminal.
+    """
+
+    def __init__(
+        self,
+        state_machine: ATMStateMachine,
+        executor: Optional[ThreadPoolExecutor] = None,
+        step_timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Drive given state machine; own a single-worker executor unless one is given.
+        step_timeout defaults to Config.TERMINAL_STEP_TIMEOUT_SECONDS.
+        """
+        self.state_machine = state_machine
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="atm-terminal")
+        self.step_timeout = (
+            Config.TERMINAL_STEP_TIMEOUT_SECONDS if step_timeout is None else step_timeout)
+
+    def _holds_card(self) -> bool:
+        atm = self.state_machine.atm
+        return atm.session.is_active or atm.card_reader.get_current_card() is not None
+
+    async def step(self) -> None:
+        """
+        Execute one step of the current state.
+        TimeoutError if it shows no activity for step_timeout seconds while a card is inserted
+        (the step keeps running on its thread).
+        """
+        future = asyncio.wrap_future(self._executor.submit(self.state_machine.handle))
+        timer = self.state_machine.atm.session_timer
+        poll = min(1.0, self.step_timeout)
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=poll)
+            if done:
+                return future.result()
+            idle = time.time() - timer.last_activity
+            if idle > self.step_timeout and self._holds_card():
+                raise TimeoutError(f"Terminal step made no progress for {idle:.1f} s")
+
+    def _end_session(self) -> None:
+        """Eject the card and end the session of a terminal whose step is stuck."""
+        atm = self.state_machine.atm
+        atm.display.show_message(Config.MSG_TIMEOUT)
+        atm.card_reader.eject_card()
+        if atm.session.is_active:
+            atm.session.end()
+
+    async def run(
+        self,
+        stop: Optional[asyncio.Event] = None,
+        max_steps: Optional[int] = None,
+    ) -> int:
+        """
+        Run steps until stop is set, max_steps is reached or a step fails or gets stuck (as ATM
+        client loop); a stuck step ends the session. Returns the number of completed steps.
+        """
+        atm = self.state_machine.atm
+        steps = 0
+        while (stop is None or not stop.is_set()) and (max_steps is None or steps < max_steps):
+            atm.session_timer.reset()
+            try:
+                await self.step()
+            except TimeoutError as e:
+                atm.logger.error(f"{e}; ending the session")
+                self._end_session()
+                break
+            except Exception as e:
+                atm.logger.error(f"Error in client loop: {e}")
+                atm.display.show_message(str(e))
+                break
+            steps += 1
+            if atm.session_timer.check_timeout():
+                atm.logger.info("Timeout detected in main loop")
+        return steps
+
+    def close(self) -> None:
+        """Shut down the worker thread (if owned)."""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+
+def shared_gateway() -> Union[BankGateway, RemoteBankGateway]:
+    """
+    One gateway for all terminals of the process: a RemoteBankGateway (connection pool) when
+    Config.BANK_BACKEND is "remote", otherwise a BankGateway on a thread-safe repository, so
+    terminals do not each load and rewrite their own copy of the accounts.
+    """
+    if Config.BANK_BACKEND == "remote":
+        return RemoteBankGateway()
+    return BankGateway(create_repository(thread_safe=True))
+
+
+def create_terminals(
+    count: int, gateway: Optional[Union[BankGateway, RemoteBankGateway]] = None
+) -> list[AsyncStateMachineDriver]:
+    """Drivers of `count` terminals (ATM objects) sharing one bank gateway (default shared_gateway())."""
+    gateway = shared_gateway() if gateway is None else gateway
+    return [AsyncStateMachineDriver(ATM(bank_gateway=gateway).state_machine) for _ in range(count)]
+
+
+async def run_terminals(
+    drivers: Iterable[AsyncStateMachineDriver],
+    stop: Optional[asyncio.Event] = None,
+    max_steps: Optional[int] = None,
+) -> list[int]:
+    """Run several terminals concurrently; return completed steps per terminal."""
+    return list(await asyncio.gather(*(d.run(stop, max_steps) for d in drivers)))
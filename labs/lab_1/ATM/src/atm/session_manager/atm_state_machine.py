@@ -324,38 +324,48 @@ class AuthenticatedState(State):
 class WithdrawalState(State):
     """State for cash withdrawal."""
 
+    def _fast_cash(self, remaining: Decimal | None) -> list[int]:
+        """Preset amounts the ATM can dispense now and the daily limit allows."""
+        inventory = self.context.atm.cash_inventory
+        return [amount for amount in Config.FAST_CASH_AMOUNTS
+                if inventory.is_dispensable(amount) and (remaining is None or amount <= remaining)]
+
     def handle(self) -> None:
-        amount_str = self.context.atm.read_line_with_timeout(
-            "Enter amount (multiple of 100): ")
+        from ..transaction.withdrawal import WithdrawalTransaction
+
+        atm = self.context.atm
+        card_number = atm.card_reader.get_current_card().number
+        remaining = atm.bank_gateway.get_remaining_withdrawal_limit(card_number)
+        presets = self._fast_cash(remaining)
+        if presets:
+            atm.display.show_message("Fast cash: " + "  ".join(
+                f"{i}) {amount}" for i, amount in enumerate(presets, 1)))
+        amount_str = atm.read_line_with_timeout(
+            f"Enter amount (multiple of {Config.WITHDRAW_AMOUNT_MULTIPLE})"
+            + (" or fast cash number: " if presets else ": "))
         if amount_str is None:
             return
         amount_str = amount_str.strip()
-        self.context.atm.reset_timer()
-        atm = self.context.atm
-        result_msg = ""
-        amount_used: int | None = None
-        success = False
+        atm.reset_timer()
+        ok = False
+        msg = Config.MSG_INVALID_AMOUNT
+        amount: int | None = None
         try:
             amount = int(amount_str)
-            if amount % 100 != 0 or amount < Config.MIN_WITHDRAW_AMOUNT:
-                raise ValueError(Config.MSG_INVALID_AMOUNT)
-            success = atm.bank_gateway.withdraw(
-                atm.card_reader.get_current_card().number,
-                Decimal(amount)
-            )
-            if success:
-                atm.cash_dispenser.dispense(amount)
-                result_msg = f"Withdrawal successful. Take your {amount} {Config.DEFAULT_CURRENCY}"
-                atm.display.show_message(result_msg)
-                amount_used = amount
-            else:
-                result_msg = Config.MSG_INSUFFICIENT_FUNDS
-                atm.display.show_message(result_msg)
-        except ValueError as e:
-            result_msg = str(e)
-            atm.display.show_message(result_msg)
+        except ValueError:
+            pass
+        if amount is not None:
+            if 1 <= amount <= len(presets):
+                amount = presets[amount - 1]
+            # The transaction checks limit and notes, keeps one idempotency key for the bank
+            # call and reverses the debit if the dispenser fails.
+            t = WithdrawalTransaction(atm, Decimal(amount))
+            ok = t.execute()
+            msg = t.get_result_message()
+        if not ok:
+            atm.display.show_message(msg)
         if not _beep_receipt_and_wait(
-            atm, success, "Withdrawal", result_msg, amount=amount_used
+            atm, ok, "Withdrawal", msg, amount=amount if ok else None
         ):
             return
         self.context.change_state(AuthenticatedState(self.context))
@@ -1,37 +1,129 @@
 """Save and load ATM state (e.g. cash inventory) to/from JSON."""
 
 import json
-from typing import Any
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
 
 from ..config import Config
 
 
 class StateSaver:
-    """Handles saving and loading ATM state to/from JSON."""
+    """
+    Handles saving and loading ATM state to/from JSON.
+    The file is a JSON object of sections (e.g. "cash_inventory"), read once and then kept in
+    memory together with each section's encoded JSON. A component replaces its own section
+    with update(), which marks only that section dirty; flush() re-encodes the dirty sections,
+    joins them with the cached encodings of the others and writes the file through a temp file
+    and rename, so readers see either the old or the new state, never a torn file.
+    With a flush interval, updates within the interval after a write are coalesced into one
+    write by the next update after it or by flush() / close().
+    The saver assumes it is the only writer of its file.
+    """
 
-    def __init__(self) -> None:
-        """Ensure data dir exists and set state file path."""
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        flush_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Ensure data dir exists and set state file path (default Config.ATM_STATE_FILE)."""
         Config.ensure_data_dir()
-        self.file_path = Config.ATM_STATE_FILE
+        self.file_path = Config.ATM_STATE_FILE if path is None else path
+        self.flush_interval = (
+            Config.ATM_STATE_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval)
+        self._clock = clock
+        self._state: Optional[dict[str, Any]] = None
+        self._encoded: dict[str, str] = {}
+        """Encoded JSON of clean sections (encoded on first flush that needs them)."""
+        self._dirty: set[str] = set()
+        self._last_flush: Optional[float] = None
+        self.writes = 0
+        """Number of times the file was written."""
 
-    def save(self, state: dict[str, Any]) -> None:
-        """Save current state to file."""
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            raise RuntimeError(
-                f"Failed to save state to {self.file_path}: {e}") from e
+    def _loaded(self) -> dict[str, Any]:
+        if self._state is None:
+            self._state = self._read()
+        return self._state
 
-    def load(self) -> dict[str, Any]:
-        """Load state from file. Returns empty dict if file not found."""
+    def _read(self) -> dict[str, Any]:
         if not self.file_path.exists():
             return {}
         try:
             with open(self.file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+                state = json.load(f)
         except json.JSONDecodeError as e:
             raise RuntimeError(f"Invalid JSON in {self.file_path}: {e}") from e
         except Exception as e:
             raise RuntimeError(
                 f"Failed to load state from {self.file_path}: {e}") from e
+        if not isinstance(state, dict):
+            raise RuntimeError(f"Invalid state in {self.file_path}: expected an object")
+        return state
+
+    def load(self) -> dict[str, Any]:
+        """Copy of the state (read from file on first use). Returns empty dict if file not found."""
+        return dict(self._loaded())
+
+    def section(self, name: str, default: Any = None) -> Any:
+        """Cached value of one section (default if missing)."""
+        return self._loaded().get(name, default)
+
+    def update(self, name: str, value: Any) -> None:
+        """Replace one section and mark it dirty; written now or, with a flush interval, coalesced."""
+        self._loaded()[name] = value
+        self._dirty.add(name)
+        if (self.flush_interval <= 0 or self._last_flush is None
+                or self._clock() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def save(self, state: dict[str, Any]) -> None:
+        """Replace the whole state and write it to file now."""
+        self._state = dict(state)
+        self._encoded = {}
+        self._dirty = set(self._state)
+        self.flush()
+
+    @property
+    def dirty(self) -> bool:
+        """True if some section has changes not yet written."""
+        return bool(self._dirty)
+
+    def flush(self) -> None:
+        """Write pending changes (only dirty sections are re-encoded)."""
+        if not self._dirty:
+            return
+        for name in self._dirty:
+            self._encoded.pop(name, None)
+        parts = []
+        for name, value in self._loaded().items():
+            encoded = self._encoded.get(name)
+            if encoded is None:
+                encoded = self._encoded[name] = json.dumps(value, ensure_ascii=False)
+            parts.append(f"{json.dumps(name, ensure_ascii=False)}: {encoded}")
+        data = "{" + ", ".join(parts) + "}\n"
+        tmp_path: Optional[str] = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.file_path.parent, prefix=self.file_path.name, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+            tmp_path = None
+        except Exception as e:
+            raise RuntimeError(
+                f"Failed to save state to {self.file_path}: {e}") from e
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+        self._dirty.clear()
+        self._last_flush = self._clock()
+        self.writes += 1
+
+    def close(self) -> None:
+        """Write pending changes."""
+        self.flush()
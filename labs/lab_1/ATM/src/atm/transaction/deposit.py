@@ -40,7 +40,7 @@ class DepositTransaction(Transaction):
                 raise RuntimeError("No card during deposit")
 
             success = self.atm.bank_gateway.deposit(
-                card.number, Decimal(accepted))
+                card.number, Decimal(accepted), idempotency_key=self.idempotency_key)
             if success:
                 self.atm.display.show_message(
                     f"Deposited {accepted} {Config.DEFAULT_CURRENCY}")
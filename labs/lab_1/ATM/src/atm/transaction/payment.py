@@ -30,7 +30,9 @@ class PaymentTransaction(Transaction):
             self.error_message = "No card inserted"
             return False
 
-        if not self.atm.bank_gateway.withdraw(card.number, self.amount):
+        if not self.atm.bank_gateway.withdraw(
+                card.number, self.amount, operation="payment",
+                idempotency_key=self.idempotency_key):
             self.error_message = "Insufficient funds or payment failed"
             return False
 
@@ -1,5 +1,6 @@
 """Abstract base transaction and common result helpers."""
 
+import uuid
 from abc import ABC, abstractmethod
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any
@@ -17,6 +18,8 @@ class Transaction(ABC):
         self.amount = amount
         self.success: bool = False
         self.error_message: str | None = None
+        self.idempotency_key: str = uuid.uuid4().hex
+        """Sent with the bank call, so executing the transaction again cannot move money twice."""
 
     @abstractmethod
     def execute(self) -> bool:
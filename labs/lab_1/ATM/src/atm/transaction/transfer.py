@@ -36,7 +36,8 @@ class TransferTransaction(Transaction):
             self.error_message = "Recipient card number must be 16 digits"
             return False
 
-        if not self.atm.bank_gateway.transfer(from_card, to_card, self.amount):
+        if not self.atm.bank_gateway.transfer(
+                from_card, to_card, self.amount, idempotency_key=self.idempotency_key):
             self.error_message = "Transfer failed (insufficient funds or invalid recipient)"
             return False
 
@@ -1,5 +1,6 @@
 """Withdrawal transaction: debit account and dispense cash."""
 
+import uuid
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
@@ -8,6 +9,15 @@ from ..config import Config
 
 if TYPE_CHECKING:
     from ..atm import ATM
+    from ..cash_handling.cash_inventory import CashInventory
+
+
+def cannot_dispense_message(inventory: "CashInventory", amount: int) -> str:
+    """Explain that amount cannot be dispensed and suggest the nearest and largest possible amounts."""
+    nearest = inventory.nearest_dispensable(amount)
+    if nearest is None:
+        return Config.MSG_NO_CASH
+    return Config.MSG_CANNOT_DISPENSE.format(amount, nearest, inventory.max_dispensable())
 
 
 class WithdrawalTransaction(Transaction):
@@ -25,8 +35,8 @@ class WithdrawalTransaction(Transaction):
             self.error_message = "Amount must be positive"
             return False
 
-        if self.amount % 100 != 0:
-            self.error_message = "Amount must be multiple of 100"
+        if self.amount % Config.WITHDRAW_AMOUNT_MULTIPLE != 0:
+            self.error_message = f"Amount must be multiple of {Config.WITHDRAW_AMOUNT_MULTIPLE}"
             return False
 
         if self.amount < Config.MIN_WITHDRAW_AMOUNT:
@@ -38,7 +48,17 @@ class WithdrawalTransaction(Transaction):
             self.error_message = "No card inserted"
             return False
 
-        if not self.atm.bank_gateway.withdraw(card.number, self.amount):
+        remaining = self.atm.bank_gateway.get_remaining_withdrawal_limit(card.number)
+        if remaining is not None and self.amount > remaining:
+            self.error_message = Config.MSG_DAILY_LIMIT_EXCEEDED.format(remaining)
+            return False
+
+        if not self.atm.cash_inventory.is_dispensable(int(self.amount)):
+            self.error_message = cannot_dispense_message(self.atm.cash_inventory, int(self.amount))
+            return False
+
+        if not self.atm.bank_gateway.withdraw(
+                card.number, self.amount, idempotency_key=self.idempotency_key):
             self.error_message = "Insufficient funds or withdrawal failed"
             return False
 
@@ -50,7 +70,11 @@ class WithdrawalTransaction(Transaction):
             self.log_transaction()
             return True
         except ValueError as e:
-            self.atm.bank_gateway.deposit(card.number, self.amount)
+            self.atm.bank_gateway.deposit(
+                card.number, self.amount, operation="withdraw_reversal",
+                idempotency_key=f"{self.idempotency_key}:reversal")
+            # The debit was reversed: executing again is a new withdrawal.
+            self.idempotency_key = uuid.uuid4().hex
             self.error_message = str(e)
             self.atm.display.show_message(
                 "Cash dispenser error. Transaction cancelled.")
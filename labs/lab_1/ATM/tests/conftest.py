@@ -15,5 +15,38 @@ def temp_data_dir(monkeypatch):
     monkeypatch.setattr(
         config_module.Config, "BANK_ACCOUNTS_FILE", tmp / "bank_accounts.json"
     )
+    monkeypatch.setattr(
+        config_module.Config, "BANK_SNAPSHOT_FILE", tmp / "bank_accounts.bin"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "BANK_DB_FILE", tmp / "bank_accounts.db"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "BANK_JOURNAL_FILE", tmp / "bank_accounts.journal"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "BANK_LOCK_FILE", tmp / "bank_accounts.lock"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "BANK_LEDGER_FILE", tmp / "bank_ledger.jsonl"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "BANK_LEDGER_SNAPSHOT_FILE", tmp / "bank_ledger_snapshot.json"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "WITHDRAWAL_LIMITS_FILE", tmp / "withdrawal_limits.log"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "BANK_IDEMPOTENCY_FILE", tmp / "bank_idempotency.jsonl"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "CASH_EVENTS_FILE", tmp / "cash_events.jsonl"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "FLEET_CACHE_FILE", tmp / "fleet_cache.json"
+    )
+    monkeypatch.setattr(
+        config_module.Config, "CASH_ALERTS_FILE", tmp / "cash_alerts.jsonl"
+    )
     config_module.Config.ensure_data_dir()
     yield tmp
@@ -0,0 +1,174 @@
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_cache import AccountCache
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.sqlite_bank_repo import SqliteBankRepository
+
+
+def make_account(card: str, balance: str = "100") -> AccountData:
+    return AccountData(card, "hashed_pin_1234", Decimal(balance))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingRepo(MockBankRepository):
+    """Mock repository counting get_account calls."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+
+    def get_account(self, card_number):
+        self.reads += 1
+        return super().get_account(card_number)
+
+
+class TestAccountCache:
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            AccountCache(0)
+
+    def test_hit_miss_counters(self):
+        cache = AccountCache(4)
+        assert cache.get("1111111111111111") == (False, None)
+        cache.put("1111111111111111", make_account("1111111111111111"))
+        hit, account = cache.get("1111111111111111")
+        assert hit is True
+        assert account.balance == Decimal("100")
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_unknown_card_cached_as_none(self):
+        cache = AccountCache(4)
+        cache.put("0000000000000000", None)
+        assert cache.get("0000000000000000") == (True, None)
+
+    def test_lru_eviction(self):
+        cache = AccountCache(2)
+        cache.put("1111111111111111", make_account("1111111111111111"))
+        cache.put("2222222222222222", make_account("2222222222222222"))
+        cache.get("1111111111111111")
+        cache.put("3333333333333333", make_account("3333333333333333"))
+        assert cache.get("2222222222222222")[0] is False
+        assert cache.get("1111111111111111")[0] is True
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = AccountCache(4, ttl_seconds=10.0, clock=clock)
+        cache.put("1111111111111111", make_account("1111111111111111"))
+        clock.now = 9.9
+        assert cache.get("1111111111111111")[0] is True
+        clock.now = 10.0
+        assert cache.get("1111111111111111")[0] is False
+        assert len(cache) == 0
+
+    def test_put_after_invalidation_is_skipped(self):
+        cache = AccountCache(4)
+        generation = cache.generation()
+        cache.invalidate("a")
+        cache.put("a", None, generation)
+        assert cache.get("a") == (False, None)
+        cache.put("a", None, cache.generation())
+        assert cache.get("a") == (True, None)
+
+    def test_invalidate_and_clear(self):
+        cache = AccountCache(4)
+        cache.put("1111111111111111", make_account("1111111111111111"))
+        cache.put("2222222222222222", make_account("2222222222222222"))
+        cache.invalidate("1111111111111111")
+        assert cache.get("1111111111111111")[0] is False
+        cache.clear()
+        assert len(cache) == 0
+
+
+class RacingRepo(MockBankRepository):
+    """Runs `race` right after reading an account, like a writer thread interleaving."""
+
+    race = None
+
+    def get_account(self, card_number):
+        account = super().get_account(card_number)
+        if self.race is not None:
+            race, self.race = self.race, None
+            race()
+        return account
+
+
+class TestBankGatewayCache:
+    def test_session_reads_backend_once(self):
+        repo = CountingRepo()
+        gw = BankGateway(repo, cache_size=16)
+        card = "1234567890123456"
+        gw.get_account(card)
+        assert gw.is_card_blocked(card) is False
+        assert gw.validate_pin(card, "0000") is True
+        assert gw.validate_pin(card, "1234") is False
+        assert gw.get_balance(card) == Decimal("10000")
+        assert gw.get_balance(card) == Decimal("10000")
+        assert repo.reads == 1
+        assert gw.cache.hits == 5
+
+    def test_mutations_invalidate(self):
+        gw = BankGateway(MockBankRepository(), cache_size=16)
+        card = "1234567890123456"
+        assert gw.get_balance(card) == Decimal("10000")
+        assert gw.withdraw(card, Decimal("100")) is True
+        assert gw.get_balance(card) == Decimal("9900")
+        assert gw.change_pin(card, "4321") is True
+        assert gw.validate_pin(card, "4321") is True
+        assert gw.block_card(card) is True
+        assert gw.is_card_blocked(card) is True
+        assert gw.get_balance(card) is None
+
+    def test_write_racing_with_lookup_leaves_no_stale_entry(self):
+        repo = RacingRepo()
+        gw = BankGateway(repo, cache_size=16)
+        card = "1234567890123456"
+        repo.race = lambda: gw.block_card(card)
+        assert gw.is_card_blocked(card) is False
+        assert gw.is_card_blocked(card) is True
+
+    def test_transfer_invalidates_both_cards(self):
+        gw = BankGateway(MockBankRepository(), cache_size=16)
+        src, dst = "1234567890123456", "1111111111111111"
+        before = gw.get_balance(dst)
+        gw.get_balance(src)
+        assert gw.transfer(src, dst, Decimal("50")) is True
+        assert gw.get_balance(src) == Decimal("9950")
+        assert gw.get_balance(dst) == before + Decimal("50")
+
+    def test_withdraw_reads_repository_not_cache(self):
+        repo = MockBankRepository()
+        gw = BankGateway(repo, cache_size=16)
+        card = "1234567890123456"
+        gw.get_balance(card)
+        repo.update_balance(card, Decimal("50"))
+        assert gw.withdraw(card, Decimal("100")) is False
+        assert gw.get_balance(card) == Decimal("50")
+
+    def test_cache_disabled(self):
+        repo = CountingRepo()
+        gw = BankGateway(repo, cache_size=0)
+        assert gw.cache is None
+        gw.get_balance("1234567890123456")
+        gw.get_balance("1234567890123456")
+        assert repo.reads == 2
+
+    def test_cache_off_by_default(self):
+        assert BankGateway(MockBankRepository()).cache is None
+
+    def test_no_cache_over_shared_repository(self):
+        assert BankGateway(MockBankRepository(shared=True), cache_size=16).cache is None
+        repo = SqliteBankRepository()
+        assert BankGateway(repo, cache_size=16).cache is None
+        repo.close()
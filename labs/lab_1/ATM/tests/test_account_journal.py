@@ -0,0 +1,135 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_journal import AccountJournal
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+
+
+class TestAccountJournal:
+    def test_append_and_replay(self, temp_data_dir):
+        journal = AccountJournal(temp_data_dir / "j.journal")
+        journal.append({"accounts": [{"n": 1}]})
+        journal.append({"accounts": [{"n": 2}]})
+        journal.close()
+        assert [r["accounts"][0]["n"] for r in journal.replay()] == [1, 2]
+        line = (temp_data_dir / "j.journal").read_text(encoding="utf-8").splitlines()[0]
+        assert " " not in line
+
+    def test_replay_stops_at_torn_line(self, temp_data_dir):
+        path = temp_data_dir / "j.journal"
+        path.write_text('{"accounts": []}\n{"accou', encoding="utf-8")
+        assert len(list(AccountJournal(path).replay())) == 1
+        assert path.read_text(encoding="utf-8") == '{"accounts": []}\n'
+
+    def test_append_after_torn_tail(self, temp_data_dir):
+        path = temp_data_dir / "j.journal"
+        path.write_text('{"n":1}\n{"n":', encoding="utf-8")
+        journal = AccountJournal(path)
+        journal.append({"n": 2})
+        journal.close()
+        assert [r["n"] for r in journal.replay()] == [1, 2]
+
+    def test_rotate_onto_torn_compacting_file(self, temp_data_dir):
+        journal = AccountJournal(temp_data_dir / "j.journal")
+        journal.rotated_path.write_text('{"n":1}\n{"n', encoding="utf-8")
+        journal.append({"n": 2})
+        journal.rotate()
+        assert [r["n"] for r in journal.replay()] == [1, 2]
+
+    def test_rotate_keeps_order(self, temp_data_dir):
+        journal = AccountJournal(temp_data_dir / "j.journal")
+        journal.append({"n": 1})
+        journal.rotate()
+        journal.append({"n": 2})
+        journal.rotate()
+        journal.append({"n": 3})
+        journal.close()
+        assert [r["n"] for r in journal.replay()] == [1, 2, 3]
+        journal.discard_rotated()
+        assert [r["n"] for r in journal.replay()] == [3]
+
+
+class TestMockBankRepositoryJournalMode:
+    def test_mutation_appends_instead_of_rewriting(self, temp_data_dir):
+        repo = MockBankRepository(journal=True)
+        snapshot = (temp_data_dir / "bank_accounts.json").read_text(encoding="utf-8")
+        repo.update_balance("1234567890123456", Decimal("42"))
+        repo.block_card("1111111111111111")
+        repo.close()
+        assert (temp_data_dir / "bank_accounts.json").read_text(encoding="utf-8") == snapshot
+        lines = (temp_data_dir / "bank_accounts.journal").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+
+    def test_replay_on_startup(self, temp_data_dir):
+        repo = MockBankRepository(journal=True)
+        repo.update_balance("1234567890123456", Decimal("42"))
+        repo.set_card_retained("1111111111111111", True)
+        repo.close()
+        repo2 = MockBankRepository(journal=True)
+        assert repo2.get_account("1234567890123456").balance == Decimal("42")
+        assert repo2.get_account("1111111111111111").is_retained is True
+
+    def test_write_after_torn_tail_survives_restart(self, temp_data_dir):
+        card = "1234567890123456"
+        repo = MockBankRepository(journal=True)
+        repo.update_balance(card, Decimal("111"))
+        repo.close()
+        with open(Config.BANK_JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write('{"accounts":[{"card_nu')
+        repo = MockBankRepository(journal=True)
+        assert repo.get_account(card).balance == Decimal("111")
+        repo.update_balance(card, Decimal("222"))
+        repo.close()
+        assert MockBankRepository(journal=True).get_account(card).balance == Decimal("222")
+
+    def test_collect_retained_is_one_record(self, temp_data_dir):
+        repo = MockBankRepository(journal=True)
+        repo.collect_retained_cards(["1234567890123456", "9999999999999999"])
+        repo.close()
+        lines = (temp_data_dir / "bank_accounts.journal").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert len(json.loads(lines[0])["accounts"]) == 2
+
+    def test_compact(self, temp_data_dir):
+        repo = MockBankRepository(journal=True)
+        repo.update_balance("1234567890123456", Decimal("7"))
+        repo.compact()
+        repo.close()
+        raw = json.loads((temp_data_dir / "bank_accounts.json").read_text(encoding="utf-8"))
+        assert raw["1234567890123456"]["balance"] == "7"
+        assert not (temp_data_dir / "bank_accounts.journal").exists()
+        assert MockBankRepository(journal=True).get_account(
+            "1234567890123456").balance == Decimal("7")
+
+    def test_background_compaction_past_threshold(self, temp_data_dir, monkeypatch):
+        monkeypatch.setattr(Config, "BANK_JOURNAL_COMPACT_BYTES", 1)
+        repo = MockBankRepository(journal=True)
+        repo.update_balance("1234567890123456", Decimal("1"))
+        repo.wait_for_compaction()
+        repo.update_balance("1234567890123456", Decimal("2"))
+        repo.close()
+        raw = json.loads((temp_data_dir / "bank_accounts.json").read_text(encoding="utf-8"))
+        assert raw["1234567890123456"]["balance"] in ("1", "2")
+        assert MockBankRepository(journal=True).get_account(
+            "1234567890123456").balance == Decimal("2")
+
+    def test_leftover_journal_folded_when_journal_disabled(self, temp_data_dir):
+        repo = MockBankRepository(journal=True)
+        repo.update_balance("1234567890123456", Decimal("9"))
+        repo.close()
+        repo2 = MockBankRepository(journal=False)
+        assert repo2.get_account("1234567890123456").balance == Decimal("9")
+        assert not (temp_data_dir / "bank_accounts.journal").exists()
+        raw = json.loads((temp_data_dir / "bank_accounts.json").read_text(encoding="utf-8"))
+        assert raw["1234567890123456"]["balance"] == "9"
+
+    def test_transfer_is_one_record(self, temp_data_dir):
+        repo = MockBankRepository(journal=True)
+        repo.transfer("1234567890123456", "1111111111111111", Decimal("10"))
+        repo.close()
+        lines = (temp_data_dir / "bank_accounts.journal").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert len(json.loads(lines[0])["accounts"]) == 2
@@ -0,0 +1,168 @@
+import json
+import threading
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.account_ledger import AccountLedger
+from atm.bank_communication.account_operation import AccountOperation, OperationType
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.bank_server import BankServer
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.remote_bank_gateway import RemoteBankGateway
+from atm.config import Config
+
+CLIENT = "1234567890123456"
+OTHER = "1111111111111111"
+
+
+class TestAccountLedger:
+    def test_history_per_card_in_order(self):
+        ledger = AccountLedger()
+        ledger.append(CLIENT, Decimal("-100"), "withdraw", timestamp=10.0)
+        ledger.append_many([(CLIENT, Decimal("-5")), (OTHER, Decimal("5"))], "transfer", timestamp=20.0)
+        ledger.append(CLIENT, Decimal("50.25"), "deposit", timestamp=30.0)
+        history = ledger.history(CLIENT)
+        assert [e.entry_id for e in history] == [1, 2, 4]
+        assert [e.operation for e in history] == ["withdraw", "transfer", "deposit"]
+        assert history[2].delta == Decimal("50.25")
+        assert [e.entry_id for e in ledger.history(OTHER)] == [3]
+        assert ledger.history("0000000000000000") == []
+
+    def test_history_time_window_and_limit(self):
+        ledger = AccountLedger()
+        for ts in range(1, 11):
+            ledger.append(CLIENT, Decimal("1"), "deposit", timestamp=float(ts))
+        assert [e.timestamp for e in ledger.history(CLIENT, since=3, until=6)] == [3.0, 4.0, 5.0]
+        assert [e.timestamp for e in ledger.history(CLIENT, limit=2)] == [9.0, 10.0]
+        assert [e.timestamp for e in ledger.history(CLIENT, until=5, limit=2)] == [3.0, 4.0]
+
+    def test_timestamps_never_go_backwards(self):
+        ledger = AccountLedger()
+        ledger.append(CLIENT, Decimal("1"), "deposit", timestamp=100.0)
+        entry = ledger.append(CLIENT, Decimal("1"), "deposit", timestamp=50.0)
+        assert entry.timestamp == 100.0
+
+    def test_reopen_rebuilds_index(self):
+        ledger = AccountLedger()
+        ledger.append(CLIENT, Decimal("-1"), "withdraw")
+        ledger.append(OTHER, Decimal("2"), "deposit")
+        ledger.close()
+        reopened = AccountLedger()
+        assert reopened.last_id == 2
+        assert reopened.append(CLIENT, Decimal("3"), "deposit").entry_id == 3
+        assert [e.delta for e in reopened.history(CLIENT)] == [Decimal("-1"), Decimal("3")]
+
+    def test_torn_last_line_cut_off(self):
+        ledger = AccountLedger()
+        ledger.append(CLIENT, Decimal("-1"), "withdraw")
+        ledger.close()
+        with open(Config.BANK_LEDGER_FILE, "ab") as f:
+            f.write(b'{"id":2,"card":"12345')
+        reopened = AccountLedger()
+        assert reopened.last_id == 1
+        reopened.append(CLIENT, Decimal("4"), "deposit")
+        reopened.close()
+        assert [e.entry_id for e in AccountLedger().history(CLIENT)] == [1, 2]
+
+    def test_valid_last_line_without_newline_cut_off(self):
+        ledger = AccountLedger()
+        ledger.append(CLIENT, Decimal("-1"), "withdraw")
+        ledger.close()
+        with open(Config.BANK_LEDGER_FILE, "ab") as f:
+            f.write(b'{"id":2,"card":"1234567890123456","delta":"-1","ts":1.0,"op":"withdraw"}')
+        reopened = AccountLedger()
+        assert reopened.last_id == 1
+        reopened.append(CLIENT, Decimal("4"), "deposit")
+        reopened.close()
+        assert [e.delta for e in AccountLedger().history(CLIENT)] == [Decimal("-1"), Decimal("4")]
+
+    def test_balance_is_snapshot_plus_deltas(self, monkeypatch):
+        monkeypatch.setattr(Config, "BANK_LEDGER_SNAPSHOT_EVERY", 3)
+        ledger = AccountLedger()
+        ledger.seed({CLIENT: Decimal("100"), OTHER: Decimal("0")})
+        with pytest.raises(RuntimeError):
+            ledger.seed({})
+        for _ in range(4):
+            ledger.append(CLIENT, Decimal("-10"), "withdraw")
+        ledger.wait_for_snapshot()
+        with open(Config.BANK_LEDGER_SNAPSHOT_FILE, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        assert snapshot["entry_id"] == 3
+        assert snapshot["balances"][CLIENT] == 7000
+        assert ledger.balance(CLIENT) == Decimal("60")
+        assert ledger.balance("0000000000000000") is None
+        ledger.close()
+        reopened = AccountLedger()
+        assert reopened.balances() == {CLIENT: Decimal("60"), OTHER: Decimal("0")}
+
+
+    def test_snapshot_written_off_the_append_path(self, monkeypatch):
+        monkeypatch.setattr(Config, "BANK_LEDGER_SNAPSHOT_EVERY", 2)
+        ledger = AccountLedger()
+        release = threading.Event()
+        real_write = ledger._write_snapshot
+
+        def slow_write(entry_id, balances):
+            release.wait(5)
+            real_write(entry_id, balances)
+
+        ledger._write_snapshot = slow_write
+        for _ in range(5):
+            ledger.append(CLIENT, Decimal("-10"), "withdraw")
+        assert ledger.balance(CLIENT) == Decimal("-50")
+        release.set()
+        ledger.close()
+        with open(Config.BANK_LEDGER_SNAPSHOT_FILE, encoding="utf-8") as f:
+            assert json.load(f) == {"entry_id": 2, "balances": {CLIENT: -2000}}
+        assert AccountLedger().balance(CLIENT) == Decimal("-50")
+
+class TestGatewayLedger:
+    def test_movements_recorded(self):
+        repo = MockBankRepository()
+        gw = BankGateway(repo, cache_size=0, ledger=AccountLedger())
+        assert gw.withdraw(CLIENT, Decimal("100"))
+        assert gw.withdraw(CLIENT, Decimal("30"), operation="payment")
+        assert not gw.withdraw(CLIENT, Decimal("1000000"))
+        assert gw.deposit(OTHER, Decimal("20"))
+        assert gw.transfer(CLIENT, OTHER, Decimal("70"))
+        history = gw.get_history(CLIENT)
+        assert [(e.operation, e.delta) for e in history] == [
+            ("withdraw", Decimal("-100")), ("payment", Decimal("-30")), ("transfer", Decimal("-70"))]
+        assert [e.operation for e in gw.get_history(OTHER)] == ["deposit", "transfer"]
+
+    def test_ledger_balances_match_repository(self):
+        repo = MockBankRepository()
+        gw = BankGateway(repo, cache_size=0, ledger=AccountLedger())
+        gw.withdraw(CLIENT, Decimal("100"))
+        gw.transfer(CLIENT, OTHER, Decimal("7.5"))
+        gw.add_accounts([AccountData("2222222222222222", "hashed_pin_0000", Decimal("300"))])
+        gw.apply_batch([AccountOperation(OperationType.ADJUST_BALANCE, OTHER, amount=Decimal("-1")),
+                        AccountOperation(OperationType.SET_BALANCE, CLIENT, amount=Decimal("5"))])
+        expected = {num: acc.balance for num, acc in repo.get_all_accounts().items()}
+        assert gw.ledger.balances() == expected
+
+    def test_enabled_by_config(self, monkeypatch):
+        monkeypatch.setattr(Config, "BANK_LEDGER_ENABLED", True)
+        gw = BankGateway(MockBankRepository(), cache_size=0)
+        gw.deposit(CLIENT, Decimal("1"))
+        assert gw.ledger.balance(CLIENT) == Decimal("10001")
+        assert Config.BANK_LEDGER_FILE.exists()
+
+    def test_history_requires_ledger(self):
+        with pytest.raises(RuntimeError):
+            BankGateway(MockBankRepository()).get_history(CLIENT)
+
+    def test_history_over_bank_server(self):
+        gateway = BankGateway(MockBankRepository(), cache_size=0, ledger=AccountLedger())
+        server = BankServer(gateway, port=0)
+        server.start()
+        client = RemoteBankGateway(port=server.port)
+        try:
+            assert client.withdraw(CLIENT, Decimal("10"), operation="payment")
+            [entry] = client.get_history(CLIENT)
+            assert (entry.card_number, entry.delta, entry.operation) == (CLIENT, Decimal("-10"), "payment")
+        finally:
+            client.close()
+            server.stop()
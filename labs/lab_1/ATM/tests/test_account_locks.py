@@ -0,0 +1,78 @@
+import threading
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_locks import StripedLock
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+
+CLIENT = "1234567890123456"
+OTHER = "1111111111111111"
+
+
+def run_threads(target, count=8):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+class TestStripedLock:
+    def test_invalid_stripes(self):
+        with pytest.raises(ValueError):
+            StripedLock(0)
+
+    def test_reentrant_and_released(self):
+        locks = StripedLock(4)
+        with locks.hold(CLIENT, OTHER):
+            with locks.hold(CLIENT):
+                pass
+        acquired = []
+
+        def other_thread(_):
+            with locks.hold(OTHER, CLIENT):
+                acquired.append(True)
+        run_threads(other_thread, 1)
+        assert acquired == [True]
+
+    def test_opposite_order_does_not_deadlock(self):
+        locks = StripedLock(64)
+        counter = [0]
+
+        def worker(i):
+            pair = (CLIENT, OTHER) if i % 2 else (OTHER, CLIENT)
+            for _ in range(200):
+                with locks.hold(*pair):
+                    counter[0] += 1
+        run_threads(worker)
+        assert counter[0] == 8 * 200
+
+
+class TestThreadSafeRepository:
+    def test_concurrent_withdrawals_not_lost(self):
+        gw = BankGateway(MockBankRepository(journal=True, thread_safe=True), cache_size=0)
+
+        def worker(_):
+            for _ in range(20):
+                assert gw.withdraw(CLIENT, Decimal("1"))
+        run_threads(worker)
+        assert gw.get_balance(CLIENT) == Decimal("9840")
+        gw._repo.close()
+        assert MockBankRepository(journal=True).get_account(CLIENT).balance == Decimal("9840")
+
+    def test_concurrent_transfers_conserve_total(self):
+        repo = MockBankRepository(journal=True, thread_safe=True)
+        gw = BankGateway(repo, cache_size=16)
+        total = gw.get_balance(CLIENT) + gw.get_balance(OTHER)
+
+        def worker(i):
+            src, dst = (CLIENT, OTHER) if i % 2 else (OTHER, CLIENT)
+            for _ in range(20):
+                gw.transfer(src, dst, Decimal("3"))
+                gw.deposit(dst, Decimal("1"))
+                gw.withdraw(dst, Decimal("1"))
+        run_threads(worker)
+        assert gw.get_balance(CLIENT) + gw.get_balance(OTHER) == total
+        repo.close()
@@ -0,0 +1,88 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.account_snapshot import load_snapshot, write_snapshot
+from atm.bank_communication.account_store import AccountStore
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+
+
+@pytest.fixture
+def source(temp_data_dir):
+    path = temp_data_dir / "source.json"
+    path.write_text("{}", encoding="utf-8")
+    return path
+
+
+def make_store() -> AccountStore:
+    store = AccountStore()
+    store.put(AccountData("1234567890123456", "hashed_pin_0000", Decimal("10.5"), False, True, "Owner", "12/28"))
+    store.put(AccountData("1111111111111111", "hashed_pin_1234", Decimal("0"), True, False, None, None))
+    return store
+
+
+class TestAccountSnapshot:
+    def test_round_trip(self, temp_data_dir, source):
+        path = temp_data_dir / "s.bin"
+        assert write_snapshot(path, make_store(), source.stat()) is True
+        loaded = load_snapshot(path, source.stat())
+        assert loaded is not None
+        assert len(loaded) == 2
+        original = make_store()
+        for num in ("1234567890123456", "1111111111111111"):
+            assert loaded.view(loaded.slot(num)) == original.view(original.slot(num))
+
+    def test_stale_snapshot_ignored(self, temp_data_dir, source):
+        path = temp_data_dir / "s.bin"
+        write_snapshot(path, make_store(), source.stat())
+        source.write_text('{"changed": 1}', encoding="utf-8")
+        assert load_snapshot(path, source.stat()) is None
+
+    def test_missing_or_corrupt_snapshot(self, temp_data_dir, source):
+        path = temp_data_dir / "s.bin"
+        assert load_snapshot(path, source.stat()) is None
+        path.write_bytes(b"XXXX" + bytes(64))
+        assert load_snapshot(path, source.stat()) is None
+
+    def test_too_wide_field_not_written(self, temp_data_dir, source):
+        store = AccountStore()
+        store.put(AccountData("1234567890123456", "h", Decimal("1"), owner_name="x" * 100))
+        path = temp_data_dir / "s.bin"
+        assert write_snapshot(path, store, source.stat()) is False
+        assert not path.exists()
+
+    def test_strings_decoded_lazily_and_writable(self, temp_data_dir, source):
+        path = temp_data_dir / "s.bin"
+        write_snapshot(path, make_store(), source.stat())
+        loaded = load_snapshot(path, source.stat())
+        slot = loaded.slot("1234567890123456")
+        loaded.set_pin_hash(slot, "hashed_pin_9999")
+        loaded.put(AccountData("2222222222222222", "hashed_pin_1", Decimal("1")))
+        assert loaded.view(slot).pin_hash == "hashed_pin_9999"
+        assert loaded.view(slot).owner_name == "Owner"
+        assert loaded.copy().view(loaded.slot("2222222222222222")).balance == Decimal("1")
+
+
+class TestMockBankRepositorySnapshot:
+    def test_snapshot_written_and_used(self, temp_data_dir, monkeypatch):
+        repo = MockBankRepository()
+        repo.update_balance("1234567890123456", Decimal("55"))
+        assert (temp_data_dir / "bank_accounts.bin").exists()
+
+        def no_json(self):
+            raise AssertionError("JSON should not be parsed")
+        monkeypatch.setattr(MockBankRepository, "_load_json", no_json)
+        repo2 = MockBankRepository()
+        assert repo2.get_account("1234567890123456").balance == Decimal("55")
+        assert repo2.get_blocked_card_numbers() == ["9999999999999999"]
+
+    def test_snapshot_regenerated_after_external_json_edit(self, temp_data_dir):
+        MockBankRepository()
+        path = temp_data_dir / "bank_accounts.json"
+        text = path.read_text(encoding="utf-8").replace('"10000"', '"10001"')
+        path.write_text(text, encoding="utf-8")
+        repo = MockBankRepository()
+        assert repo.get_account("1234567890123456").balance == Decimal("10001")
+        assert load_snapshot(temp_data_dir / "bank_accounts.bin", os.stat(path)) is not None
@@ -0,0 +1,84 @@
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import pytest
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.account_store import (
+    AccountStore,
+    from_minor_units,
+    to_minor_units,
+)
+
+
+def make_account(num: str = "1234567890123456", balance: str = "12.34") -> AccountData:
+    return AccountData(num, "hashed_pin_0000", Decimal(balance), False, True, "Owner", "12/28")
+
+
+class TestMinorUnits:
+    def test_round_trip(self):
+        assert to_minor_units(Decimal("12.34")) == 1234
+        assert from_minor_units(1234) == Decimal("12.34")
+        assert str(from_minor_units(1000000)) == "10000"
+
+    def test_sub_minor_amount_rejected(self):
+        with pytest.raises(ValueError):
+            to_minor_units(Decimal("0.001"))
+
+    def test_rounding_mode(self):
+        assert to_minor_units(Decimal("0.005"), ROUND_HALF_EVEN) == 0
+        assert to_minor_units(Decimal("0.015"), ROUND_HALF_EVEN) == 2
+        assert to_minor_units(Decimal("12.34"), ROUND_HALF_EVEN) == 1234
+
+
+class TestAccountStore:
+    def test_put_and_view(self):
+        store = AccountStore()
+        slot, appended = store.put(make_account())
+        assert appended is True
+        assert "1234567890123456" in store
+        assert len(store) == 1
+        assert store.view(slot) == make_account()
+        assert store.balance(slot) == 1234
+
+    def test_put_overwrites_same_slot(self):
+        store = AccountStore()
+        slot, _ = store.put(make_account())
+        slot2, appended = store.put(make_account(balance="1"))
+        assert (slot2, appended) == (slot, False)
+        assert store.view(slot).balance == Decimal("1")
+
+    def test_in_place_mutations(self):
+        store = AccountStore()
+        slot, _ = store.put(make_account())
+        store.set_balance(slot, 500)
+        store.set_flags(slot, 1)
+        store.set_pin_hash(slot, "hashed_pin_1111")
+        acc = store.view(slot)
+        assert acc.balance == Decimal("5")
+        assert acc.is_blocked is True
+        assert acc.is_retained is False
+        assert acc.pin_hash == "hashed_pin_1111"
+
+    def test_pop_last_and_copy(self):
+        store = AccountStore()
+        store.put(make_account())
+        copy = store.copy()
+        store.put(make_account("1111111111111111"))
+        store.pop_last()
+        assert store.slot("1111111111111111") is None
+        store.set_balance(0, 1)
+        assert copy.balance(0) == 1234
+
+    def test_raw_matches_json_format(self):
+        store = AccountStore()
+        slot, _ = store.put(make_account())
+        assert store.raw(slot) == {
+            "card_number": "1234567890123456",
+            "pin_hash": "hashed_pin_0000",
+            "balance": "12.34",
+            "is_blocked": False,
+            "is_retained": True,
+            "owner_name": "Owner",
+            "expiry_date": "12/28",
+            "version": 0,
+        }
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from atm.atm import ATM
+from atm.bank_communication.async_bank_gateway import AsyncBankGateway
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.config import Config
+from atm.session_manager.async_driver import AsyncStateMachineDriver, create_terminals, run_terminals
+from atm.session_manager.session_type import SessionType
+
+CLIENT = "1234567890123456"
+
+
+class SlowRepo(MockBankRepository):
+    """Mock repository with a blocking delay on every read."""
+
+    def get_account(self, card_number):
+        time.sleep(0.1)
+        return super().get_account(card_number)
+
+
+class TestAsyncBankGateway:
+    def test_operations(self):
+        async def scenario():
+            gw = AsyncBankGateway(BankGateway(cache_size=0))
+            try:
+                card = "1234567890123456"
+                assert await gw.validate_pin(card, "0000") is True
+                assert await gw.withdraw(card, Decimal("100")) is True
+                assert await gw.deposit(card, Decimal("50")) is True
+                assert await gw.transfer(card, "1111111111111111", Decimal("50")) is True
+                assert await gw.get_balance(card) == Decimal("9900")
+                assert await gw.is_card_blocked("9999999999999999") is True
+            finally:
+                gw.close()
+
+        asyncio.run(scenario())
+
+    def test_slow_bank_does_not_block_loop(self):
+        async def scenario():
+            gw = AsyncBankGateway(BankGateway(SlowRepo(), cache_size=0))
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                for _ in range(5):
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            try:
+                balance, _ = await asyncio.gather(gw.get_balance("1234567890123456"), ticker())
+            finally:
+                gw.close()
+            assert balance == Decimal("10000")
+            assert ticks == 5
+
+        asyncio.run(scenario())
+
+
+class TestAsyncStateMachineDriver:
+    def test_run_max_steps(self):
+        atm = ATM()
+        driver = AsyncStateMachineDriver(atm.state_machine)
+        with patch.object(atm.display, "ask_input", return_value="123"):
+            steps = asyncio.run(driver.run(max_steps=3))
+        driver.close()
+        atm.logger.close()
+        assert steps == 3
+        assert atm.state_machine.current_state.__class__.__name__ == "NoCardState"
+
+    def test_card_insert_moves_state(self):
+        atm = ATM()
+        driver = AsyncStateMachineDriver(atm.state_machine)
+        with patch.object(atm.display, "ask_input", return_value="1234567890123456"):
+            asyncio.run(driver.run(max_steps=1))
+        driver.close()
+        atm.logger.close()
+        assert atm.state_machine.current_state.__class__.__name__ == "CardInsertedState"
+
+    def test_terminals_run_concurrently(self):
+        atms = [ATM(), ATM()]
+        drivers = [AsyncStateMachineDriver(a.state_machine) for a in atms]
+        for a in atms:
+            a.state_machine.handle = lambda: time.sleep(0.1)
+        start = time.perf_counter()
+        steps = asyncio.run(run_terminals(drivers, max_steps=2))
+        elapsed = time.perf_counter() - start
+        for d, a in zip(drivers, atms):
+            d.close()
+            a.logger.close()
+        assert steps == [2, 2]
+        assert elapsed < 0.35
+
+    def test_failing_step_stops_terminal(self):
+        atm = ATM()
+        driver = AsyncStateMachineDriver(atm.state_machine)
+
+        def fail():
+            raise RuntimeError("boom")
+        atm.state_machine.handle = fail
+        with patch.object(atm.display, "show_message") as show:
+            steps = asyncio.run(driver.run())
+        driver.close()
+        atm.logger.close()
+        assert steps == 0
+        show.assert_called_with("boom")
+
+    def test_stuck_step_ends_session(self):
+        atm = ATM()
+        atm.card_reader.insert_card(CLIENT)
+        atm.session.start(SessionType.CLIENT, CLIENT)
+        release = threading.Event()
+        atm.state_machine.handle = lambda: release.wait(5)
+        driver = AsyncStateMachineDriver(atm.state_machine, step_timeout=0.1)
+        with patch.object(atm.display, "show_message") as show:
+            steps = asyncio.run(driver.run())
+        release.set()
+        driver.close()
+        atm.logger.close()
+        assert steps == 0
+        assert atm.card_reader.get_current_card() is None
+        assert not atm.session.is_active
+        show.assert_called_with(Config.MSG_TIMEOUT)
+
+    def test_waiting_for_card_is_not_a_timeout(self):
+        atm = ATM()
+        atm.state_machine.handle = lambda: time.sleep(0.3)
+        driver = AsyncStateMachineDriver(atm.state_machine, step_timeout=0.1)
+        steps = asyncio.run(driver.run(max_steps=1))
+        driver.close()
+        atm.logger.close()
+        assert steps == 1
+
+    def test_terminals_share_one_gateway(self):
+        drivers = create_terminals(2)
+        first, second = (d.state_machine.atm for d in drivers)
+        assert first.bank_gateway is second.bank_gateway
+        assert first.bank_gateway._repo._card_locks is not None
+        assert first.bank_gateway.withdraw(CLIENT, Decimal("100"))
+        assert second.bank_gateway.get_balance(CLIENT) == Decimal("9900")
+        assert MockBankRepository().get_account(CLIENT).balance == Decimal("9900")
+        for d in drivers:
+            d.close()
+            d.state_machine.atm.logger.close()
@@ -49,3 +49,10 @@ class TestBankGateway:
         ) is True
         assert gw.get_balance("1234567890123456") == Decimal("9800")
         assert gw.get_balance("1111111111111111") == Decimal("5200")
+
+    def test_blocked_and_retained_queries(self):
+        gw = BankGateway()
+        assert gw.get_blocked_card_numbers() == ["9999999999999999"]
+        assert gw.count_retained() == 0
+        gw.set_card_retained("1111111111111111", True)
+        assert gw.count_retained() == 1
@@ -0,0 +1,177 @@
+import socket
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.account_operation import AccountOperation, OperationType
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.bank_protocol import decode, encode
+from atm.bank_communication.bank_server import BankServer
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.remote_bank_gateway import RemoteBankGateway
+from atm.bank_communication.sqlite_bank_repo import SqliteBankRepository
+from atm.config import Config
+
+
+class SlowGateway(BankGateway):
+    def get_balance(self, card_number):
+        time.sleep(0.5)
+        return super().get_balance(card_number)
+
+
+@pytest.fixture
+def server():
+    srv = BankServer(port=0)
+    srv.start()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def client(server):
+    gw = RemoteBankGateway(port=server.port, pool_size=4, timeout=2.0)
+    yield gw
+    gw.close()
+
+
+class TestBankProtocol:
+    def test_round_trip_decimal_and_account(self):
+        account = AccountData("1234567890123456", "hashed_pin_0000", Decimal("1.50"), owner_name="X")
+        message = decode(encode({"id": 1, "result": [Decimal("2.5"), account, None]}))
+        assert message["result"] == [Decimal("2.5"), account, None]
+
+    def test_malformed_line(self):
+        with pytest.raises(ValueError):
+            decode(b"[1, 2]")
+
+
+class TestRemoteBankGateway:
+    def test_reads_and_writes(self, client):
+        card = "1234567890123456"
+        assert client.validate_pin(card, "0000") is True
+        assert client.get_balance(card) == Decimal("10000")
+        assert client.withdraw(card, Decimal("100")) is True
+        assert client.deposit(card, Decimal("0.50")) is True
+        assert client.get_balance(card) == Decimal("9900.50")
+        assert client.transfer(card, "1111111111111111", Decimal("0.50")) is True
+        account = client.get_account(card)
+        assert isinstance(account, AccountData)
+        assert account.balance == Decimal("9900")
+        assert client.get_account("0000000000000000") is None
+        assert client.get_blocked_card_numbers() == ["9999999999999999"]
+
+    def test_retained_cards(self, client):
+        assert client.set_card_retained("1111111111111111", True) is True
+        assert client.count_retained() == 1
+        assert client.get_retained_card_numbers() == ["1111111111111111"]
+        client.collect_retained_cards(["1111111111111111"])
+        assert client.count_retained() == 0
+
+    def test_pipeline(self, client):
+        card = "1234567890123456"
+        results = client.pipeline([
+            ("withdraw", (card, Decimal("100"))),
+            ("get_balance", (card,)),
+            ("is_card_blocked", ("9999999999999999",)),
+        ])
+        assert results == [True, Decimal("9900"), True]
+
+    def test_bulk_operations(self, client):
+        assert client.add_accounts([AccountData("5000000000000000", "h", Decimal("3"))]) == 1
+        ops = [AccountOperation(OperationType.ADJUST_BALANCE, "5000000000000000", amount=Decimal("-1")),
+               AccountOperation(OperationType.SET_BLOCKED, "5000000000000000", flag=True)]
+        assert client.apply_batch(ops) == 2
+        accounts = client.get_accounts(["5000000000000000", "0000000000000000"])
+        assert list(accounts) == ["5000000000000000"]
+        assert accounts["5000000000000000"].balance == Decimal("2")
+        assert accounts["5000000000000000"].is_blocked is True
+
+    def test_server_errors_reraised(self, client):
+        with pytest.raises(ValueError):
+            client.deposit("1234567890123456", Decimal("0.001"))
+        with pytest.raises(ValueError, match="Unknown method"):
+            client.call("_repo")
+        assert client.get_balance("1234567890123456") == Decimal("10000")
+
+    def test_state_shared_between_clients(self, server, client):
+        other = RemoteBankGateway(port=server.port)
+        try:
+            client.withdraw("1234567890123456", Decimal("100"))
+            assert other.get_balance("1234567890123456") == Decimal("9900")
+        finally:
+            other.close()
+
+    def test_concurrent_withdrawals_are_atomic(self, client):
+        card = "1234567890123456"
+
+        def worker():
+            for _ in range(10):
+                client.withdraw(card, Decimal("1"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert client.get_balance(card) == Decimal("9920")
+
+    def test_slow_call_does_not_block_other_atms(self):
+        srv = BankServer(SlowGateway(), port=0)
+        srv.start()
+        slow = RemoteBankGateway(port=srv.port, timeout=2.0)
+        fast = RemoteBankGateway(port=srv.port, timeout=2.0)
+        try:
+            t = threading.Thread(target=slow.get_balance, args=("1234567890123456",))
+            t.start()
+            time.sleep(0.1)
+            start = time.monotonic()
+            assert fast.call("count_retained") == 0
+            assert time.monotonic() - start < 0.3
+            t.join()
+        finally:
+            slow.close()
+            fast.close()
+            srv.stop()
+
+    def test_default_gateway_is_thread_safe(self, server):
+        assert server.gateway._repo._card_locks is not None
+
+    def test_starts_from_atm_config(self, monkeypatch):
+        monkeypatch.setattr(Config, "BANK_BACKEND", "remote")
+        srv = BankServer(port=0)
+        assert isinstance(srv.gateway._repo, MockBankRepository)
+        srv.server_close()
+        srv = BankServer(port=0, backend="sqlite")
+        assert isinstance(srv.gateway._repo, SqliteBankRepository)
+        srv.gateway._repo.close()
+        srv.server_close()
+        with pytest.raises(ValueError, match="Unknown bank backend"):
+            BankServer(port=0, backend="paper")
+
+    def test_call_timeout(self):
+        srv = BankServer(SlowGateway(), port=0)
+        srv.start()
+        gw = RemoteBankGateway(port=srv.port, timeout=0.1)
+        try:
+            with pytest.raises(RuntimeError, match="timed out"):
+                gw.get_balance("1234567890123456")
+            assert gw.call("count_retained", timeout=2.0) == 0
+        finally:
+            gw.close()
+            srv.stop()
+
+    def test_connection_refused(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        gw = RemoteBankGateway(port=port, timeout=0.5)
+        with pytest.raises(RuntimeError, match="Cannot connect"):
+            gw.get_balance("1234567890123456")
+
+    def test_pool_reuses_connections(self, client):
+        for _ in range(5):
+            client.get_balance("1234567890123456")
+        assert client._idle.qsize() == 1
@@ -0,0 +1,124 @@
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.account_operation import AccountOperation, OperationType
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.sqlite_bank_repo import SqliteBankRepository
+
+CLIENT = "1234567890123456"
+OTHER = "1111111111111111"
+BLOCKED = "9999999999999999"
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def repo(request):
+    repo = MockBankRepository() if request.param == "json" else SqliteBankRepository()
+    yield repo
+    repo.close()
+
+
+def reopen(repo):
+    repo.close()
+    return MockBankRepository() if isinstance(repo, MockBankRepository) else SqliteBankRepository()
+
+
+class TestAccountOperation:
+    def test_required_fields(self):
+        with pytest.raises(ValueError):
+            AccountOperation(OperationType.SET_BALANCE, CLIENT)
+        with pytest.raises(ValueError):
+            AccountOperation(OperationType.SET_BLOCKED, CLIENT)
+        with pytest.raises(ValueError):
+            AccountOperation(OperationType.CHANGE_PIN, CLIENT)
+        with pytest.raises(ValueError):
+            AccountOperation(OperationType.SET_BALANCE, CLIENT, amount=Decimal("-1"))
+
+
+class TestBulkOperations:
+    def test_get_accounts(self, repo):
+        accounts = repo.get_accounts([CLIENT, "0000000000000000", OTHER])
+        assert set(accounts) == {CLIENT, OTHER}
+        assert accounts[CLIENT].balance == Decimal("10000")
+
+    def test_add_accounts_persisted(self, repo):
+        new = [AccountData(f"{5000000000000000 + i:016d}", "hashed_pin_0000", Decimal(i)) for i in range(50)]
+        assert repo.add_accounts(new) == 50
+        repo = reopen(repo)
+        assert len(repo.get_accounts(a.card_number for a in new)) == 50
+        repo.close()
+
+    def test_add_accounts_rejects_invalid_item(self, repo):
+        with pytest.raises(ValueError):
+            repo.add_accounts([AccountData("5000000000000000", "h", Decimal("1")), {"card_number": "x"}])
+        assert repo.get_account("5000000000000000") is None
+
+    def test_apply_batch(self, repo):
+        ops = [
+            AccountOperation(OperationType.ADJUST_BALANCE, CLIENT, amount=Decimal("-2.50")),
+            AccountOperation(OperationType.ADJUST_BALANCE, CLIENT, amount=Decimal("-2.50")),
+            AccountOperation(OperationType.SET_BALANCE, OTHER, amount=Decimal("7")),
+            AccountOperation(OperationType.SET_BLOCKED, BLOCKED, flag=False),
+            AccountOperation(OperationType.CHANGE_PIN, BLOCKED, pin="4321"),
+            AccountOperation(OperationType.SET_RETAINED, OTHER, flag=True),
+        ]
+        assert repo.apply_batch(ops) == 6
+        repo = reopen(repo)
+        assert repo.get_account(CLIENT).balance == Decimal("9995")
+        assert repo.get_account(OTHER).balance == Decimal("7")
+        assert repo.get_account(OTHER).is_retained is True
+        assert repo.is_card_blocked(BLOCKED) is False
+        assert repo.validate_pin(BLOCKED, "4321") is True
+        repo.close()
+
+    @pytest.mark.parametrize("bad", [
+        AccountOperation(OperationType.SET_BALANCE, "0000000000000000", amount=Decimal("1")),
+        AccountOperation(OperationType.ADJUST_BALANCE, BLOCKED, amount=Decimal("1")),
+        AccountOperation(OperationType.ADJUST_BALANCE, OTHER, amount=Decimal("-5000.01")),
+    ])
+    def test_apply_batch_all_or_nothing(self, repo, bad):
+        ops = [
+            AccountOperation(OperationType.ADJUST_BALANCE, CLIENT, amount=Decimal("-1")),
+            AccountOperation(OperationType.SET_BLOCKED, OTHER, flag=True),
+            bad,
+        ]
+        with pytest.raises(ValueError, match="Batch operation 2"):
+            repo.apply_batch(ops)
+        assert repo.get_account(CLIENT).balance == Decimal("10000")
+        assert repo.is_card_blocked(OTHER) is False
+        repo = reopen(repo)
+        assert repo.get_account(CLIENT).balance == Decimal("10000")
+        repo.close()
+
+    def test_mock_batch_is_single_write(self, monkeypatch):
+        repo = MockBankRepository()
+        calls = []
+        original = repo._save_accounts
+        monkeypatch.setattr(repo, "_save_accounts", lambda *a: calls.append(1) or original(*a))
+        repo.add_accounts(AccountData(f"{5000000000000000 + i:016d}", "h", Decimal(1)) for i in range(20))
+        repo.apply_batch(
+            AccountOperation(OperationType.ADJUST_BALANCE, f"{5000000000000000 + i:016d}", amount=Decimal("-1"))
+            for i in range(20))
+        assert calls == [1, 1]
+
+
+class TestBankGatewayBulk:
+    def test_get_accounts_fills_cache(self):
+        gw = BankGateway(MockBankRepository(), cache_size=16)
+        gw.get_balance(CLIENT)
+        accounts = gw.get_accounts([CLIENT, OTHER, "0000000000000000"])
+        assert set(accounts) == {CLIENT, OTHER}
+        assert gw.cache.stats() == {"hits": 1, "misses": 3, "size": 3}
+        gw.get_accounts([CLIENT, OTHER, "0000000000000000"])
+        assert gw.cache.hits == 4
+
+    def test_batch_invalidates_cache(self):
+        gw = BankGateway(MockBankRepository(), cache_size=16)
+        assert gw.get_balance(CLIENT) == Decimal("10000")
+        gw.apply_batch([AccountOperation(OperationType.ADJUST_BALANCE, CLIENT, amount=Decimal("-10"))])
+        assert gw.get_balance(CLIENT) == Decimal("9990")
+        assert gw.get_account("5000000000000000") is None
+        gw.add_accounts([AccountData("5000000000000000", "h", Decimal("3"))])
+        assert gw.get_balance("5000000000000000") == Decimal("3")
@@ -0,0 +1,184 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from atm.cash_handling.cash_alerts import (
+    AlertDispatcher,
+    AlertSink,
+    CashAlert,
+    FileAlertSink,
+    SocketAlertSink,
+    WatermarkMonitor,
+    create_alert_dispatcher,
+)
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_handling.note_recycler import NoteRecycler
+from atm.cash_management.cash_collector import CashCollector
+from atm.cash_management.cassette_manager import CassetteManager
+from atm.config import Config
+
+
+class ListSink(AlertSink):
+    def __init__(self):
+        self.alerts = []
+
+    def send(self, alert):
+        self.alerts.append(alert)
+
+
+class BlockingSink(AlertSink):
+    def __init__(self):
+        self.release = threading.Event()
+
+    def send(self, alert):
+        self.release.wait(5)
+
+
+class FailingSink(AlertSink):
+    def send(self, alert):
+        raise OSError("sink down")
+
+
+def make_alert(level="low"):
+    return CashAlert(0.0, "cassette", 100, level, "normal", 10, 200)
+
+
+def inventory_with_sink():
+    sink = ListSink()
+    dispatcher = AlertDispatcher([sink])
+    return CashInventory(alerts=dispatcher), dispatcher, sink
+
+
+class TestWatermarkMonitor:
+    def test_levels_and_alerts_on_change_only(self):
+        sink = ListSink()
+        dispatcher = AlertDispatcher([sink])
+        monitor = WatermarkMonitor([50, 100], [100, 200], dispatcher, low_fill=0.1, full_fill=0.9)
+        monitor.reset([50, 100])
+        assert monitor.level(0) == "normal"
+        monitor.update(1, 99)
+        monitor.update(1, 19)
+        monitor.update(1, 15)
+        monitor.update(1, 0)
+        monitor.update(0, 90)
+        dispatcher.flush()
+        assert [(a.denomination, a.previous, a.level, a.notes) for a in sink.alerts] == [
+            (100, "normal", "low", 19), (100, "low", "empty", 0), (50, "normal", "full", 90)]
+        assert sink.alerts[0].capacity == 200
+        dispatcher.close()
+
+    def test_bins_are_full_or_normal(self):
+        sink = ListSink()
+        dispatcher = AlertDispatcher([sink])
+        monitor = WatermarkMonitor([], [], dispatcher, full_fill=0.9)
+        monitor.update_bin("reject_bin", 95, 100, alert=False)
+        monitor.update_bin("reject_bin", 96, 100)
+        monitor.update_bin("reject_bin", 0, 100)
+        dispatcher.flush()
+        assert [(a.source, a.denomination, a.level) for a in sink.alerts] == [("reject_bin", None, "normal")]
+        dispatcher.close()
+
+    def test_without_dispatcher_levels_are_kept(self):
+        monitor = WatermarkMonitor([100], [200], None)
+        monitor.update(0, 0)
+        assert monitor.level(0) == "empty"
+
+
+class TestInventoryAlerts:
+    def test_loaded_state_does_not_alert(self):
+        first = CashInventory(alerts=AlertDispatcher([]))
+        first.set_count(100, 0)
+        first.save_state()
+        first.close()
+        inv, dispatcher, sink = inventory_with_sink()
+        assert inv.watermarks.level(inv.cassettes.index(100)) == "empty"
+        dispatcher.flush()
+        assert sink.alerts == []
+        inv.close()
+
+    def test_dispense_to_empty_and_replace(self):
+        inv, dispatcher, sink = inventory_with_sink()
+        for denom in Config.ATM_CASH_DENOMINATIONS:
+            inv.set_count(denom, 0)
+        inv.set_count(100, 1)
+        inv.dispense(100)
+        CassetteManager(inv).replace_cassette(100, Config.CASSETTE_CAPACITY)
+        inv.close()
+        alerts = [(a.denomination, a.level) for a in sink.alerts if a.denomination == 100]
+        assert alerts[-3:] == [(100, "low"), (100, "empty"), (100, "full")]
+
+    def test_other_denominations_are_not_rechecked(self):
+        inv, dispatcher, sink = inventory_with_sink()
+        inv.set_count(500, 0)
+        inv.add_notes(100, 1)
+        inv.remove_notes(100, 1)
+        dispatcher.flush()
+        assert [a.denomination for a in sink.alerts] == [500]
+        inv.close()
+
+    def test_deposit_bin_full_and_collected(self, monkeypatch):
+        monkeypatch.setattr(Config, "DEPOSIT_BIN_CAPACITY", 10)
+        inv, dispatcher, sink = inventory_with_sink()
+        NoteRecycler(denominations=()).place(inv, {100: 10})
+        CashCollector(inv).collect_deposit_bin()
+        inv.close()
+        assert [(a.source, a.previous, a.level) for a in sink.alerts] == [
+            ("deposit_bin", "normal", "full"), ("deposit_bin", "full", "normal")]
+
+    def test_default_sink_writes_alerts_file(self):
+        inv = CashInventory()
+        inv.set_count(200, 0)
+        inv.close()
+        lines = Config.CASH_ALERTS_FILE.read_text(encoding="utf-8").splitlines()
+        alert = json.loads(lines[-1])
+        assert (alert["denomination"], alert["level"]) == (200, "empty")
+
+
+class TestAlertDispatcher:
+    def test_full_queue_drops_without_blocking(self):
+        sink = BlockingSink()
+        dispatcher = AlertDispatcher([sink], queue_size=2)
+        for _ in range(10):
+            dispatcher.emit(make_alert())
+        assert dispatcher.dropped >= 7
+        sink.release.set()
+        dispatcher.close()
+
+    def test_failing_sink_does_not_stop_others(self):
+        good = ListSink()
+        dispatcher = AlertDispatcher([FailingSink(), good])
+        dispatcher.emit(make_alert())
+        dispatcher.emit(make_alert("empty"))
+        dispatcher.close()
+        assert dispatcher.failed == 2
+        assert [a.level for a in good.alerts] == ["low", "empty"]
+
+    def test_file_sink(self, tmp_path):
+        path = tmp_path / "alerts.jsonl"
+        dispatcher = AlertDispatcher([FileAlertSink(path)])
+        dispatcher.emit(make_alert())
+        dispatcher.flush()
+        assert json.loads(path.read_text(encoding="utf-8"))["level"] == "low"
+        dispatcher.close()
+
+    def test_socket_sink(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(5)
+        try:
+            dispatcher = AlertDispatcher([SocketAlertSink(receiver.getsockname())])
+            dispatcher.emit(make_alert("full"))
+            dispatcher.close()
+            assert json.loads(receiver.recv(4096))["level"] == "full"
+        finally:
+            receiver.close()
+
+    def test_create_from_names(self):
+        assert create_alert_dispatcher([]) is None
+        dispatcher = create_alert_dispatcher(["log", "file"])
+        assert [type(s).__name__ for s in dispatcher.sinks] == ["LogAlertSink", "FileAlertSink"]
+        dispatcher.close()
+        with pytest.raises(ValueError, match="Unknown alert sink"):
+            create_alert_dispatcher(["pager"])
@@ -0,0 +1,121 @@
+import time
+from unittest.mock import MagicMock
+
+from atm.cash_handling.cash_acceptor import CashAcceptor
+from atm.cash_handling.cash_event_log import CashEvent, CashEventLog, read_cash_events
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_management.cash_forecast import CashForecaster, DemandModel, hour_of_week
+from atm.cash_management.cash_replenisher import CashReplenisher
+from atm.config import Config
+
+MONDAY = time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1))
+"""Monday 2024-01-01 00:00 local time."""
+DENOMS = (50, 100)
+
+
+def hourly(notes, hours, start=MONDAY):
+    return [CashEvent(start + h * 3600 + 60, "dispense", dict(notes)) for h in range(hours)]
+
+
+class TestCashEventLog:
+    def test_round_trip_and_torn_line(self):
+        log = CashEventLog(clock=lambda: 100.0)
+        log.record("dispense", {100: 2})
+        log.record("recycle", {})
+        log.close()
+        with open(Config.CASH_EVENTS_FILE, "ab") as f:
+            f.write(b'{"ts": 1')
+        assert list(read_cash_events()) == [CashEvent(100.0, "dispense", {100: 2})]
+        assert list(read_cash_events(since=101.0)) == []
+
+    def test_write_after_torn_tail_survives_restart(self):
+        CashEventLog(clock=lambda: 100.0).close()
+        with open(Config.CASH_EVENTS_FILE, "ab") as f:
+            f.write(b'{"ts":100.0,"kind":"dispense","notes":{"100":1}}')
+        log = CashEventLog(clock=lambda: 200.0)
+        log.record("dispense", {50: 3})
+        log.close()
+        assert list(read_cash_events()) == [CashEvent(200.0, "dispense", {50: 3})]
+
+    def test_events_outside_history_window_dropped(self):
+        day = 86400.0
+        clock = [MONDAY]
+        log = CashEventLog(clock=lambda: clock[0])
+        for _ in range(Config.FORECAST_HISTORY_DAYS + 3):
+            log.record("dispense", {100: 1})
+            clock[0] += day
+        log.close()
+        kept = [e.timestamp for e in read_cash_events()]
+        assert MONDAY not in kept
+        assert kept[-1] == clock[0] - day
+        assert len(kept) <= Config.FORECAST_HISTORY_DAYS + 2
+        CashEventLog(clock=lambda: clock[0]).close()
+        assert min(e.timestamp for e in read_cash_events()) >= clock[0] - Config.FORECAST_HISTORY_DAYS * day
+
+    def test_inventory_records_dispense_and_recycle(self):
+        inv = CashInventory()
+        dispensed = inv.dispense(300)
+        CashAcceptor(inv).accept({50: 2})
+        kinds = [(e.kind, e.notes) for e in read_cash_events()]
+        assert kinds == [("dispense", dispensed), ("recycle", {50: 2})]
+
+
+class TestDemandModel:
+    def test_quiet_hours_and_net_demand(self):
+        events = [
+            CashEvent(MONDAY + 60, "dispense", {100: 5, 50: 1}),
+            CashEvent(MONDAY + 120, "recycle", {100: 2}),
+            CashEvent(MONDAY + 3 * 3600, "dispense", {100: 1, 20: 9}),
+        ]
+        model = DemandModel.from_events(events, DENOMS, end=MONDAY + 5 * 3600)
+        assert model.hours == 6
+        assert list(model.columns[1]) == [3, 0, 0, 1, 0, 0]
+        assert list(model.columns[0]) == [1, 0, 0, 0, 0, 0]
+        assert model.mean_demand()[100][hour_of_week(MONDAY)] == 3.0
+
+    def test_empty_history(self):
+        model = DemandModel.from_events([], DENOMS)
+        forecast = CashForecaster(model, scenarios=10, horizon_hours=5).forecast({100: 0}, start=MONDAY)
+        assert forecast[100].median_hours is None
+        assert forecast[100].empty_probability == 0.0
+
+
+class TestCashForecaster:
+    def make(self, events, **kwargs):
+        model = DemandModel.from_events(events, DENOMS)
+        return CashForecaster(model, seed=1, **kwargs)
+
+    def test_constant_demand(self):
+        forecaster = self.make(hourly({100: 10}, 14 * 24), scenarios=50, horizon_hours=48)
+        forecast = forecaster.forecast({100: 55, 50: 3}, start=MONDAY)
+        assert forecast[100].median_hours == 6
+        assert forecast[100].p10_hours == 6
+        assert forecast[100].empty_probability == 1.0
+        assert forecast[50].median_hours is None
+        assert forecast[50].empty_probability == 0.0
+
+    def test_seasonal_demand(self):
+        events = [CashEvent(MONDAY + week * 7 * 86400 + 10 * 3600, "dispense", {100: 20})
+                  for week in range(3)]
+        forecaster = self.make(events, scenarios=20, horizon_hours=24)
+        assert forecaster.forecast({100: 5}, start=MONDAY + 7 * 86400)[100].median_hours == 11
+        assert forecaster.forecast({100: 5}, start=MONDAY + 7 * 86400 + 11 * 3600)[100].median_hours is None
+
+    def test_recommend_mix(self):
+        forecaster = self.make(hourly({100: 10, 50: 1}, 14 * 24), scenarios=50, horizon_hours=48)
+        mix = forecaster.recommend_mix(
+            {100: 50, 50: 30}, {100: 150, 50: 100}, cover_hours=24, start=MONDAY)
+        assert mix == {100: 150}
+        mix = forecaster.recommend_mix({100: 50, 50: 0}, {100: 1000, 50: 1000}, cover_hours=24, start=MONDAY)
+        assert mix == {100: 190, 50: 24}
+
+    def test_replenisher_recommendation(self):
+        log = CashEventLog(clock=lambda: MONDAY + 60)
+        log.record("dispense", {1000: 4})
+        log.close()
+        inv = CashInventory()
+        rep = CashReplenisher(inv, MagicMock())
+        forecaster = CashForecaster.from_history(now=MONDAY + 3600, seed=3)
+        mix = rep.recommend_mix(forecaster)
+        assert set(mix) <= {1000}
+        assert all(0 < count <= inv.get_room(denom) for denom, count in mix.items())
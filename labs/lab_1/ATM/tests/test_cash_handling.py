@@ -3,6 +3,7 @@ import pytest
 from atm.cash_handling.cash_inventory import CashInventory
 from atm.cash_handling.cash_dispenser import CashDispenser
 from atm.cash_handling.cash_acceptor import CashAcceptor
+from atm.config import Config
 
 
 class TestCashInventory:
@@ -17,7 +18,7 @@ class TestCashInventory:
     def test_dispense_updates_state(self):
         inv = CashInventory()
         if not inv.can_dispense(100):
-            inv._cassettes[100] = 10
+            inv.set_count(100, 10)
         before = inv.get_available_amount()
         d = inv.dispense(100)
         assert d == {100: 1}
@@ -25,19 +26,55 @@ class TestCashInventory:
 
     def test_dispense_invalid_raises(self):
         inv = CashInventory()
-        for k in inv._cassettes:
-            inv._cassettes[k] = 0
+        for k in inv.get_counts():
+            inv.set_count(k, 0)
         with pytest.raises(ValueError):
             inv.dispense(100)
 
 
+class TestDispensableAmounts:
+    def make_inventory(self, **counts):
+        inv = CashInventory()
+        for denom in inv.get_counts():
+            inv.set_count(denom, counts.get(f"n{denom}", 0))
+        return inv
+
+    def test_nearest_and_max(self):
+        inv = self.make_inventory(n500=2, n200=1)
+        assert inv.is_dispensable(700)
+        assert not inv.is_dispensable(300)
+        assert not inv.is_dispensable(750)
+        assert inv.nearest_dispensable(300) == 200
+        assert inv.nearest_dispensable(350) == 200
+        assert inv.nearest_dispensable(450) == 500
+        assert inv.nearest_dispensable(5000) == 1200
+        assert inv.nearest_dispensable(-100) == 200
+        assert inv.max_dispensable() == 1200
+
+    def test_rebuilt_when_counts_change(self):
+        inv = self.make_inventory(n100=1)
+        version = inv.version
+        assert inv.max_dispensable() == 100
+        inv.add_notes(1000, 1)
+        assert inv.version > version
+        assert inv.max_dispensable() == 1100
+        inv.dispense(1100)
+        assert inv.nearest_dispensable(100) is None
+        assert inv.max_dispensable() == 0
+
+    def test_capped_at_daily_limit(self):
+        inv = self.make_inventory(n1000=100)
+        assert inv.max_dispensable() == Config.MAX_WITHDRAW_AMOUNT_PER_DAY
+        assert not inv.is_dispensable(Config.MAX_WITHDRAW_AMOUNT_PER_DAY + 1000)
+
+
 class TestCashDispenser:
     def test_dispense(self):
         inv = CashInventory()
-        inv._cassettes[100] = 10
+        inv.set_count(100, 10)
         disp = CashDispenser(inv)
         disp.dispense(100)
-        assert inv._cassettes[100] == 9
+        assert inv.get_count(100) == 9
 
     def test_dispense_zero_raises(self):
         inv = CashInventory()
@@ -49,8 +86,8 @@ class TestCashDispenser:
 class TestCashAcceptor:
     def test_accept(self):
         inv = CashInventory()
-        before = inv._cassettes.get(100, 0)
+        before = inv.get_count(100)
         acc = CashAcceptor(inv)
         total = acc.accept({100: 5})
         assert total == 500
-        assert inv._cassettes[100] == before + 5
+        assert inv.get_count(100) == before + 5
@@ -7,6 +7,7 @@ from atm.cash_management.cash_replenisher import CashReplenisher
 from atm.cash_management.cash_collector import CashCollector
 from atm.cash_management.cassette_manager import CassetteManager
 from atm.cash_management.cash_replenisher_auth import CashReplenisherAuthenticator
+from atm.config import Config
 
 
 class TestCashReplenisher:
@@ -26,16 +27,16 @@ class TestCashReplenisher:
         inv = CashInventory()
         rep = CashReplenisher(inv, auth)
         rep.replenish({100: 10}, "1000000000000001", "1111")
-        assert inv._cassettes[100] >= 10
+        assert inv.get_count(100) >= 10
 
 
 class TestCashCollector:
     def test_collect(self):
         inv = CashInventory()
-        inv._cassettes[100] = 20
+        inv.set_count(100, 20)
         coll = CashCollector(inv)
         coll.collect({100: 5})
-        assert inv._cassettes[100] == 15
+        assert inv.get_count(100) == 15
 
 
 class TestCassetteManager:
@@ -43,4 +44,25 @@ class TestCassetteManager:
         inv = CashInventory()
         mgr = CassetteManager(inv)
         mgr.replace_cassette(100, 99)
-        assert inv._cassettes[100] == 99
+        assert inv.get_count(100) == 99
+
+    def test_replace_one_of_several_cassettes(self, monkeypatch):
+        monkeypatch.setattr(Config, "CASSETTE_LAYOUT", ((100, 50), (100, 50)))
+        inv = CashInventory()
+        inv.set_count(100, 70)
+        CassetteManager(inv).replace_cassette(100, 50, cassette=1)
+        assert inv.get_count(100) == 100
+        with pytest.raises(ValueError):
+            CassetteManager(inv).replace_cassette(100, 50, cassette=2)
+
+
+class TestReplenishCapacity:
+    def test_overfill_rejected(self):
+        auth_svc = MagicMock()
+        auth_svc.authenticate.return_value = True
+        inv = CashInventory()
+        rep = CashReplenisher(inv, CashReplenisherAuthenticator(auth_svc))
+        before = inv.get_counts()
+        with pytest.raises(ValueError, match="room"):
+            rep.replenish({50: 10, 100: Config.CASSETTE_CAPACITY}, "1000000000000001", "1111")
+        assert inv.get_counts() == before
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from atm.cash_handling.cash_acceptor import CashAcceptor
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_handling.cassettes import CassetteBank, NoteBin, capacity_by_denomination
+from atm.cash_handling.note_recycler import NoteRecycler
+from atm.cash_management.cash_collector import CashCollector
+from atm.config import Config
+
+DENOMS = (20, 50, 100)
+
+
+class TestCassetteBank:
+    def make_bank(self):
+        return CassetteBank(DENOMS, [(100, 10), (20, 5), (100, 4)])
+
+    def test_add_fills_cassettes_in_order(self):
+        bank = self.make_bank()
+        bank.add(100, 12)
+        assert list(bank.counts) == [10, 0, 2]
+        assert bank.total(100) == 12
+        assert bank.room(100) == 2
+        assert bank.capacity(100) == 14
+        with pytest.raises(ValueError, match="full"):
+            bank.add(100, 3)
+        assert bank.total(100) == 12
+
+    def test_remove_drains_first_cassette(self):
+        bank = self.make_bank()
+        bank.add(100, 12)
+        bank.remove(100, 11)
+        assert list(bank.counts) == [0, 0, 1]
+        with pytest.raises(ValueError, match="Not enough"):
+            bank.remove(100, 2)
+
+    def test_set_total_and_cassette(self):
+        bank = self.make_bank()
+        bank.set_total(100, 13)
+        assert list(bank.counts) == [10, 0, 3]
+        bank.set_cassette(0, 0)
+        assert bank.total(100) == 3
+        assert bank.as_dict() == {20: 0, 50: 0, 100: 3}
+        with pytest.raises(ValueError):
+            bank.set_cassette(1, 6)
+        with pytest.raises(ValueError):
+            bank.set_total(100, 15)
+        with pytest.raises(ValueError):
+            bank.set_total(50, 1)
+
+    def test_amount_and_capacities(self):
+        bank = self.make_bank()
+        bank.add(20, 5)
+        bank.add(100, 2)
+        assert bank.amount() == 300
+        assert capacity_by_denomination(bank.layout) == {100: 14, 20: 5}
+
+    def test_invalid_layout(self):
+        with pytest.raises(ValueError):
+            CassetteBank(DENOMS, [(30, 10)])
+        with pytest.raises(ValueError):
+            CassetteBank(DENOMS, [(20, 2**31)])
+
+
+class TestNoteBin:
+    def test_bounded(self):
+        bin_ = NoteBin(DENOMS, 5)
+        bin_.add(20, 3)
+        bin_.add(100, 2)
+        assert bin_.amount() == 260
+        with pytest.raises(ValueError, match="full"):
+            bin_.add(50, 1)
+        assert bin_.empty() == {20: 3, 100: 2}
+        assert bin_.notes == 0 and bin_.as_dict() == {}
+
+
+class TestInventoryCapacity:
+    def test_layout_from_config(self, monkeypatch):
+        monkeypatch.setattr(Config, "CASSETTE_LAYOUT", ((100, 30), (100, 30), (20, 10)))
+        inv = CashInventory()
+        assert inv.get_capacity(100) == 60
+        assert inv.get_capacity(1000) == 0
+        assert inv.get_counts()[1000] == 0
+        inv.set_count(100, 40)
+        inv.set_count(100, 5, cassette=1)
+        assert inv.get_count(100) == 35
+        with pytest.raises(ValueError):
+            inv.add_notes(100, 26)
+        inv.save_state()
+        assert CashInventory().get_count(100) == 35
+        assert list(CashInventory().cassettes.counts) == [30, 5, 10]
+
+    def test_legacy_state_is_clamped(self):
+        Config.ATM_STATE_FILE.write_text(
+            json.dumps({"cash_inventory": {"100": 10**64, "50": -3, "20": 7}}), encoding="utf-8")
+        inv = CashInventory()
+        assert inv.get_count(100) == Config.CASSETTE_CAPACITY
+        assert inv.get_count(50) == 0
+        assert inv.get_count(20) == 7
+        assert inv.can_dispense(140)
+
+    def test_acceptor_overflows_into_reject_bin(self, monkeypatch):
+        monkeypatch.setattr(Config, "REJECT_BIN_CAPACITY", 10)
+        monkeypatch.setattr(Config, "DEPOSIT_BIN_CAPACITY", 0)
+        inv = CashInventory()
+        inv.set_count(100, Config.CASSETTE_CAPACITY - 2)
+        acc = CashAcceptor(inv, NoteRecycler(max_fill=1.0))
+        assert acc.accept({100: 5, 50: 1}) == 550
+        assert inv.get_count(100) == Config.CASSETTE_CAPACITY
+        assert inv.get_rejected() == {100: 3}
+        with pytest.raises(ValueError, match="full"):
+            acc.accept({100: 8})
+        assert inv.get_rejected() == {100: 3}
+        reloaded = CashInventory()
+        assert reloaded.get_rejected() == {100: 3}
+        assert CashCollector(reloaded).collect_reject_bin() == {100: 3}
+        assert CashInventory().get_rejected() == {}
@@ -0,0 +1,91 @@
+import itertools
+import random
+
+import pytest
+
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_handling.dispense_planner import DispensePlanner
+
+DENOMS = (20, 50, 100, 200, 500, 1000)
+
+
+def brute_force_amounts(counts: dict[int, int]) -> set[int]:
+    """Every amount some combination of the notes makes."""
+    ranges = [range(counts[d] + 1) for d in DENOMS]
+    return {sum(d * k for d, k in zip(DENOMS, combo)) for combo in itertools.product(*ranges)}
+
+
+class TestDispensePlanner:
+    def test_amounts_greedy_misses(self):
+        planner = DispensePlanner(DENOMS)
+        planner.update({20: 4, 50: 1, 100: 5})
+        assert planner.plan(60) == {20: 3}
+        assert planner.plan(130) == {50: 1, 20: 4}
+        assert planner.plan(30) is None
+        assert planner.plan(110) == {50: 1, 20: 3}
+        assert planner.plan(80) == {20: 4}
+        assert planner.plan(300) == {100: 3}
+        assert not planner.can_pay(15)
+        assert not planner.can_pay(-20)
+        assert planner.plan(0) == {}
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(7)
+        planner = DispensePlanner(DENOMS)
+        for _ in range(30):
+            counts = {d: rnd.randint(0, 3) for d in DENOMS}
+            planner.update(counts)
+            payable = brute_force_amounts(counts)
+            for amount in range(0, sum(d * k for d, k in counts.items()) + 20, 10):
+                plan = planner.plan(amount)
+                assert planner.can_pay(amount) == (amount in payable)
+                assert (plan is not None) == (amount in payable)
+                if plan is not None:
+                    assert sum(d * k for d, k in plan.items()) == amount
+                    assert all(k <= counts[d] for d, k in plan.items())
+
+    def test_incremental_update_equals_fresh_table(self):
+        rnd = random.Random(3)
+        planner = DispensePlanner(DENOMS)
+        counts = {d: 5 for d in DENOMS}
+        for _ in range(50):
+            counts[rnd.choice(DENOMS)] = rnd.randint(0, 8)
+            planner.update(counts)
+            fresh = DispensePlanner(DENOMS)
+            fresh.update(counts)
+            assert planner._layers == fresh._layers
+
+    def test_invalid_denominations(self):
+        with pytest.raises(ValueError):
+            DispensePlanner([])
+        with pytest.raises(ValueError):
+            DispensePlanner([0, 100])
+
+
+class TestInventoryPlanning:
+    def test_dispenses_small_notes(self):
+        inv = CashInventory()
+        for denom in inv.get_counts():
+            inv.set_count(denom, 0)
+        inv.set_count(20, 5)
+        inv.set_count(50, 1)
+        assert inv.can_dispense(130)
+        assert inv.dispense(130) == {50: 1, 20: 4}
+        assert inv.get_counts()[20] == 1
+        assert not inv.can_dispense(40)
+        with pytest.raises(ValueError):
+            inv.dispense(40)
+
+    def test_mutators(self):
+        inv = CashInventory()
+        inv.set_count(100, 3)
+        inv.add_notes(100, 2)
+        inv.remove_notes(100, 4)
+        assert inv.get_count(100) == 1
+        with pytest.raises(ValueError, match="Not enough"):
+            inv.remove_notes(100, 2)
+        with pytest.raises(ValueError):
+            inv.add_notes(30, 1)
+        with pytest.raises(ValueError):
+            inv.set_count(100, -1)
+        assert inv.get_count(30) == 0
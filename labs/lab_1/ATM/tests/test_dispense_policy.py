@@ -0,0 +1,101 @@
+import itertools
+
+import pytest
+
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_handling.dispense_planner import DispensePlanner
+from atm.cash_handling.dispense_policy import (
+    BalanceFillPolicy,
+    LargestFirstPolicy,
+    MinimumNotesPolicy,
+    PreserveSmallChangePolicy,
+    create_policy,
+)
+from atm.config import Config
+
+DENOMS = (20, 50, 100, 200, 500, 1000)
+
+
+def make_planner(counts, denoms=DENOMS):
+    planner = DispensePlanner(denoms)
+    planner.update(counts)
+    return planner
+
+
+def all_plans(counts, amount, denoms):
+    ranges = [range(counts.get(d, 0) + 1) for d in denoms]
+    return [combo for combo in itertools.product(*ranges)
+            if sum(d * k for d, k in zip(denoms, combo)) == amount]
+
+
+class TestCandidates:
+    def test_valid_distinct_and_plan_first(self):
+        counts = {20: 30, 50: 20, 100: 20, 200: 10, 500: 4, 1000: 2}
+        planner = make_planner(counts)
+        candidates = planner.candidates(2340, branching=4, limit=100)
+        assert 1 < len(candidates) <= 100
+        assert len(set(candidates)) == len(candidates)
+        for plan in candidates:
+            assert sum(d * k for d, k in zip(DENOMS, plan)) == 2340
+            assert all(k <= counts[d] for d, k in zip(DENOMS, plan))
+        first = {d: k for d, k in zip(DENOMS, candidates[0]) if k}
+        assert first == planner.plan(2340)
+        assert planner.candidates(30, branching=4, limit=100) == []
+
+    def test_small_inventory_fully_enumerated(self):
+        denoms = (20, 50, 100)
+        counts = {20: 3, 50: 3, 100: 3}
+        planner = make_planner(counts, denoms)
+        for amount in range(0, 521, 10):
+            found = set(planner.candidates(amount, branching=4, limit=256))
+            assert found == set(all_plans(counts, amount, denoms))
+
+
+class TestPolicies:
+    def test_largest_first_scores_match_plan(self):
+        planner = make_planner({20: 10, 50: 10, 100: 10, 200: 5, 500: 2, 1000: 1})
+        policy = LargestFirstPolicy()
+        for amount in (60, 130, 880, 1990, 2740):
+            assert super(LargestFirstPolicy, policy).choose(planner, amount) == planner.plan(amount)
+
+    @pytest.mark.parametrize("policy", [MinimumNotesPolicy(), BalanceFillPolicy(), PreserveSmallChangePolicy()])
+    def test_optimal_on_small_inventory(self, policy):
+        denoms = (20, 50, 100)
+        counts = {20: 3, 50: 3, 100: 3}
+        planner = DispensePlanner(denoms)
+        planner.update(counts)
+        for amount in range(60, 521, 10):
+            plans = all_plans(counts, amount, denoms)
+            if not plans:
+                continue
+            columns = list(zip(*plans))
+            best = min(policy.scores(list(denoms), planner.counts(), columns))
+            chosen = policy.choose(planner, amount)
+            chosen_plan = tuple(chosen.get(d, 0) for d in denoms)
+            assert policy.scores(list(denoms), planner.counts(), [(k,) for k in chosen_plan]) == [best]
+
+    def test_balance_fill_drains_fullest_cassette(self):
+        planner = make_planner({100: 20, 1000: 1})
+        assert LargestFirstPolicy().choose(planner, 1000) == {1000: 1}
+        assert BalanceFillPolicy().choose(planner, 1000) == {100: 10}
+
+    def test_preserve_small_spares_small_notes(self):
+        planner = make_planner({20: 10, 50: 4, 100: 1})
+        assert PreserveSmallChangePolicy().choose(planner, 200) == {100: 1, 50: 2}
+        assert MinimumNotesPolicy().choose(planner, 200) == {100: 1, 50: 2}
+
+    def test_create_policy(self, monkeypatch):
+        assert isinstance(create_policy(), LargestFirstPolicy)
+        monkeypatch.setattr(Config, "DISPENSE_POLICY", "balance_fill")
+        assert isinstance(create_policy(), BalanceFillPolicy)
+        with pytest.raises(ValueError):
+            create_policy("random")
+
+    def test_inventory_uses_policy(self):
+        inv = CashInventory(policy=BalanceFillPolicy())
+        for denom in inv.get_counts():
+            inv.set_count(denom, 0)
+        inv.set_count(100, 20)
+        inv.set_count(1000, 1)
+        assert inv.dispense(1000) == {100: 10}
+        assert inv.get_count(100) == 10
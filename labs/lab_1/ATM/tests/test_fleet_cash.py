@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+from atm.cash_management import fleet_cash
+from atm.cash_management.fleet_cash import FleetCashTable, discover_data_dirs, scan_fleet
+from atm.config import Config
+from atm.session_manager.state_saver import StateSaver
+
+
+def write_atm(root, name, counts):
+    data_dir = root / name
+    data_dir.mkdir(exist_ok=True)
+    section = {str(denom): count for denom, count in counts.items()}
+    section["cassettes"] = [[denom, count] for denom, count in counts.items()]
+    StateSaver(path=data_dir / Config.ATM_STATE_FILE.name).save({"cash_inventory": section})
+    return data_dir
+
+
+@pytest.fixture
+def fleet_root(temp_data_dir):
+    root = temp_data_dir / "fleet"
+    root.mkdir()
+    write_atm(root, "atm1", {100: 10, 1000: 2})
+    write_atm(root, "atm2", {20: 5, 500: 1})
+    write_atm(root, "atm3", {1000: 30})
+    return root
+
+
+class TestFleetCashTable:
+    def test_queries(self):
+        table = FleetCashTable((20, 100))
+        table.append("a", [10, 1])
+        table.append("b", [0, 7])
+        assert table.totals() == {20: 10, 100: 8}
+        assert table.total_amount() == 1000
+        assert table.below(500) == ["a"]
+        assert table.below(5, denom=100) == ["a"]
+        assert table.top(1) == [("b", 700)]
+        assert table.top(5, denom=20) == [("a", 10), ("b", 0)]
+        with pytest.raises(ValueError):
+            table.below(1, denom=50)
+
+
+class TestScanFleet:
+    def test_scan(self, fleet_root):
+        (fleet_root / "broken").mkdir()
+        (fleet_root / "broken" / Config.ATM_STATE_FILE.name).write_text("{", encoding="utf-8")
+        dirs = discover_data_dirs(fleet_root) + [fleet_root / "gone"]
+        table = scan_fleet(dirs)
+        assert table.atms == [str(fleet_root / name) for name in ("atm1", "atm2", "atm3")]
+        assert table.totals()[1000] == 32
+        assert table.amounts.tolist() == [3000, 600, 30000]
+        assert table.invalid == [str(fleet_root / "broken")]
+        assert table.missing == [str(fleet_root / "gone")]
+        assert table.top(1)[0][0].endswith("atm3")
+
+    def test_cache_reused_until_file_changes(self, fleet_root, monkeypatch):
+        dirs = discover_data_dirs(fleet_root)
+        scan_fleet(dirs)
+        cache = json.loads(Config.FLEET_CACHE_FILE.read_text(encoding="utf-8"))
+        assert len(cache["files"]) == 3
+        reads = []
+        real = fleet_cash._read_counts
+        monkeypatch.setattr(fleet_cash, "_read_counts", lambda path, d: reads.append(path) or real(path, d))
+        assert scan_fleet(dirs).totals()[1000] == 32
+        assert reads == []
+        path = write_atm(fleet_root, "atm1", {100: 10}) / Config.ATM_STATE_FILE.name
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert scan_fleet(dirs).totals()[1000] == 30
+        assert reads == [str(path)]
+
+    def test_process_pool(self, fleet_root):
+        dirs = discover_data_dirs(fleet_root)
+        table = scan_fleet(dirs, workers=2, parallel_min_files=1)
+        assert table.totals() == scan_fleet(dirs, workers=1).totals()
+        assert len(table) == 3
+
+    def test_huge_counts_clamped(self, fleet_root):
+        write_atm(fleet_root, "legacy", {100: 10**64})
+        table = scan_fleet([fleet_root / "legacy"])
+        assert table.totals()[100] == 2**31 - 1
@@ -0,0 +1,242 @@
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from atm.bank_communication.account_ledger import AccountLedger
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.bank_server import BankServer
+from atm.bank_communication.idempotency_store import IdempotencyStore
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.remote_bank_gateway import BankConnectionError, RemoteBankGateway
+from atm.config import Config
+from atm.transaction.withdrawal import WithdrawalTransaction
+
+CLIENT = "1234567890123456"
+OTHER = "1111111111111111"
+
+
+def failing_replace(src, dst):
+    raise OSError("disk full")
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestIdempotencyStore:
+    def test_lookup_returns_recorded_result(self):
+        store = IdempotencyStore()
+        assert store.lookup("k1", "withdraw 1 100") is None
+        store.remember("k1", "withdraw 1 100", True)
+        store.remember("k2", "withdraw 1 100", False)
+        assert store.lookup("k1", "withdraw 1 100") is True
+        assert store.lookup("k2", "withdraw 1 100") is False
+        with pytest.raises(ValueError):
+            store.lookup("k1", "withdraw 1 200")
+
+    def test_keys_expire(self):
+        clock = FakeClock()
+        store = IdempotencyStore(ttl_seconds=60, clock=clock)
+        store.remember("old", "r", True)
+        clock.now += 30
+        store.remember("new", "r", True)
+        clock.now += 31
+        assert store.lookup("old", "r") is None
+        assert store.lookup("new", "r") is True
+        assert len(store) == 1
+
+    def test_oldest_keys_evicted_beyond_max(self):
+        store = IdempotencyStore(max_keys=3, persist=False)
+        for i in range(5):
+            store.remember(f"k{i}", "r", True)
+        assert len(store) == 3
+        assert store.lookup("k1", "r") is None
+        assert store.lookup("k4", "r") is True
+
+    def test_keys_survive_restart(self):
+        clock = FakeClock()
+        store = IdempotencyStore(ttl_seconds=60, clock=clock)
+        store.remember("a", "r", True)
+        clock.now += 50
+        store.remember("b", "r", False)
+        store.close()
+        with open(Config.BANK_IDEMPOTENCY_FILE, "ab") as f:
+            f.write(b'{"key":"c","ts":')
+        clock.now += 20
+        reopened = IdempotencyStore(ttl_seconds=60, clock=clock)
+        assert reopened.lookup("a", "r") is None
+        assert reopened.lookup("b", "r") is False
+        assert len(reopened) == 1
+
+    def test_write_after_torn_tail_survives_restart(self):
+        store = IdempotencyStore()
+        store.remember("a", "r", True)
+        store.close()
+        with open(Config.BANK_IDEMPOTENCY_FILE, "ab") as f:
+            f.write(b'{"key":"b","ts":1.0,"fp":"r","ok":true}')
+        store = IdempotencyStore()
+        assert store.lookup("b", "r") is None
+        store.remember("c", "r", False)
+        store.close()
+        reopened = IdempotencyStore()
+        assert reopened.lookup("a", "r") is True
+        assert reopened.lookup("c", "r") is False
+
+    def test_log_compacted(self):
+        store = IdempotencyStore(max_keys=5)
+        for i in range(23):
+            store.remember(f"k{i}", "r", True)
+        store.close()
+        assert len(Config.BANK_IDEMPOTENCY_FILE.read_bytes().splitlines()) <= 10
+        reopened = IdempotencyStore(max_keys=5)
+        assert reopened.lookup("k22", "r") is True
+        assert reopened.lookup("k17", "r") is None
+
+
+    def test_failed_compaction_keeps_logging(self, monkeypatch):
+        store = IdempotencyStore(max_keys=2)
+        store.remember("k0", "r", True)
+        store.remember("k1", "r", True)
+        store.remember("k2", "r", True)
+        with monkeypatch.context() as m:
+            m.setattr(os, "replace", failing_replace)
+            with pytest.raises(RuntimeError, match="compact"):
+                store.remember("k3", "r", True)
+        store.remember("k4", "r", False)
+        store.close()
+        reopened = IdempotencyStore(max_keys=2)
+        assert reopened.lookup("k3", "r") is True
+        assert reopened.lookup("k4", "r") is False
+
+class TestGatewayIdempotency:
+    def make_gateway(self, **kwargs):
+        return BankGateway(MockBankRepository(), cache_size=0, **kwargs)
+
+    def test_retried_withdraw_debits_once(self):
+        gw = self.make_gateway(ledger=AccountLedger())
+        assert gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.get_balance(CLIENT) == Decimal("9900")
+        assert len(gw.get_history(CLIENT)) == 1
+        assert gw.get_remaining_withdrawal_limit(CLIENT) == Decimal(
+            Config.MAX_WITHDRAW_AMOUNT_PER_DAY - 100)
+        assert gw.withdraw(CLIENT, Decimal("100"))
+        assert gw.get_balance(CLIENT) == Decimal("9800")
+
+    def test_failed_result_is_replayed(self):
+        gw = self.make_gateway()
+        assert not gw.withdraw(OTHER, Decimal("6000"), idempotency_key="w1", operation="payment")
+        gw.deposit(OTHER, Decimal("1000"))
+        assert not gw.withdraw(OTHER, Decimal("6000"), idempotency_key="w1", operation="payment")
+        assert gw.get_balance(OTHER) == Decimal("6000")
+
+    def test_deposit_and_transfer(self):
+        gw = self.make_gateway()
+        for _ in range(2):
+            assert gw.deposit(OTHER, Decimal("10"), idempotency_key="d1")
+            assert gw.transfer(CLIENT, OTHER, Decimal("5"), idempotency_key="t1")
+        assert gw.get_balance(OTHER) == Decimal("5015")
+        assert gw.get_balance(CLIENT) == Decimal("9995")
+
+    def test_key_reused_for_other_request_rejected(self):
+        gw = self.make_gateway()
+        gw.withdraw(CLIENT, Decimal("100"), idempotency_key="k")
+        with pytest.raises(ValueError):
+            gw.withdraw(CLIENT, Decimal("200"), idempotency_key="k")
+        with pytest.raises(ValueError):
+            gw.deposit(CLIENT, Decimal("100"), idempotency_key="k")
+
+    def test_dedupe_survives_gateway_restart(self):
+        assert self.make_gateway().withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        gw = self.make_gateway()
+        assert gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.get_balance(CLIENT) == Decimal("9900")
+
+    def test_crash_after_debit_is_not_debited_again(self):
+        gw = self.make_gateway()
+        gw.idempotency.remember = MagicMock(side_effect=SystemExit)
+        with pytest.raises(SystemExit):
+            gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        gw = self.make_gateway()
+        with pytest.raises(RuntimeError, match="unknown"):
+            gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.get_balance(CLIENT) == Decimal("9900")
+
+    def test_crash_before_debit_runs_on_retry(self):
+        gw = self.make_gateway()
+        gw._repo.update_balance = MagicMock(side_effect=SystemExit)
+        with pytest.raises(SystemExit):
+            gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.idempotency.pending("w1") is not None
+        gw = self.make_gateway()
+        assert gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.get_balance(CLIENT) == Decimal("9900")
+
+    def test_disabled_by_config(self, monkeypatch):
+        monkeypatch.setattr(Config, "BANK_IDEMPOTENCY_MAX_KEYS", 0)
+        gw = self.make_gateway()
+        assert gw.idempotency is None
+        gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        gw.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+        assert gw.get_balance(CLIENT) == Decimal("9800")
+
+
+class TestRemoteRetry:
+    def test_withdraw_retried_after_lost_response(self):
+        gateway = BankGateway(MockBankRepository(), cache_size=0)
+        server = BankServer(gateway, port=0)
+        server.start()
+        client = RemoteBankGateway(port=server.port)
+        real_call = client.call
+        lost: list[str] = []
+
+        def losing_first_response(method, *args, timeout=None):
+            result = real_call(method, *args, timeout=timeout)
+            if not lost:
+                lost.append(method)
+                raise BankConnectionError("Bank server closed the connection")
+            return result
+
+        client.call = losing_first_response
+        try:
+            assert client.withdraw(CLIENT, Decimal("100"), idempotency_key="w1")
+            assert lost == ["withdraw"]
+            assert gateway.get_balance(CLIENT) == Decimal("9900")
+            lost.clear()
+            with pytest.raises(BankConnectionError):
+                client.withdraw(CLIENT, Decimal("100"))
+            assert gateway.get_balance(CLIENT) == Decimal("9800")
+        finally:
+            client.close()
+            server.stop()
+
+
+class TestWithdrawalTransactionKeys:
+    def make_atm(self):
+        atm = MagicMock()
+        atm.card_reader.get_current_card.return_value.number = CLIENT
+        atm.bank_gateway = BankGateway(MockBankRepository(), cache_size=0)
+        return atm
+
+    def test_execute_again_does_not_debit_twice(self):
+        atm = self.make_atm()
+        t = WithdrawalTransaction(atm, Decimal("500"))
+        assert t.execute()
+        assert t.execute()
+        assert atm.bank_gateway.get_balance(CLIENT) == Decimal("9500")
+
+    def test_reversed_withdrawal_can_be_retried(self):
+        atm = self.make_atm()
+        atm.cash_dispenser.dispense.side_effect = [ValueError("Jammed"), None]
+        t = WithdrawalTransaction(atm, Decimal("500"))
+        assert not t.execute()
+        assert atm.bank_gateway.get_balance(CLIENT) == Decimal("10000")
+        assert t.execute()
+        assert atm.bank_gateway.get_balance(CLIENT) == Decimal("9500")
@@ -92,6 +92,17 @@ class TestMockBankRepository:
         assert repo.get_account("1234567890123456") is not None
         assert repo.get_account("1234567890123456").balance == Decimal("100")
 
+    def test_load_rounds_sub_cent_balance(self, temp_data_dir):
+        import json
+        path = temp_data_dir / "bank_accounts.json"
+        path.write_text(json.dumps({
+            card: {"card_number": card, "pin_hash": "hashed_pin_0000", "balance": balance, "is_blocked": False}
+            for card, balance in (("1111111111111111", "10.005"), ("2222222222222222", "10.015"))
+        }), encoding="utf-8")
+        repo = MockBankRepository()
+        assert repo.get_account("1111111111111111").balance == Decimal("10.00")
+        assert repo.get_account("2222222222222222").balance == Decimal("10.02")
+
     def test_set_card_retained_and_get_retained_card_numbers(self):
         repo = MockBankRepository()
         assert repo.get_retained_card_numbers() == []
@@ -109,3 +120,52 @@ class TestMockBankRepository:
         acc = repo.get_account("1234567890123456")
         assert acc.is_retained is False
         assert acc.is_blocked is False
+
+    def test_transfer_single_write(self, monkeypatch):
+        repo = MockBankRepository()
+        calls = []
+        original = repo._save_accounts
+        monkeypatch.setattr(repo, "_save_accounts", lambda *a: calls.append(1) or original(*a))
+        assert repo.transfer("1234567890123456", "1111111111111111", Decimal("10")) is True
+        assert len(calls) == 1
+
+    def test_transfer_rolled_back_when_save_fails(self, monkeypatch):
+        repo = MockBankRepository()
+
+        def fail(*args):
+            raise RuntimeError("disk full")
+        monkeypatch.setattr(repo, "_save_accounts", fail)
+        with pytest.raises(RuntimeError):
+            repo.transfer("1234567890123456", "1111111111111111", Decimal("10"))
+        assert repo.get_account("1234567890123456").balance == Decimal("10000")
+        assert repo.get_account("1111111111111111").balance == Decimal("5000")
+
+    def test_transfer_to_same_card_keeps_balance(self):
+        repo = MockBankRepository()
+        assert repo.transfer("1234567890123456", "1234567890123456", Decimal("10")) is True
+        assert repo.get_account("1234567890123456").balance == Decimal("10000")
+
+    def test_save_leaves_no_temp_files(self, temp_data_dir):
+        repo = MockBankRepository()
+        repo.update_balance("1234567890123456", Decimal("1"))
+        assert not [p.name for p in temp_data_dir.iterdir() if p.name.endswith(".tmp")]
+
+    def test_blocked_and_retained_indexes(self):
+        repo = MockBankRepository()
+        assert repo.get_blocked_card_numbers() == ["9999999999999999"]
+        assert repo.is_card_blocked("9999999999999999") is True
+        assert repo.is_card_blocked("0000000000000000") is False
+        repo.block_card("1234567890123456")
+        repo.set_card_retained("1234567890123456", True)
+        assert set(repo.get_blocked_card_numbers()) == {"9999999999999999", "1234567890123456"}
+        assert repo.count_retained() == 1
+        repo.collect_retained_cards(["1234567890123456"])
+        assert repo.count_retained() == 0
+        assert repo.get_blocked_card_numbers() == ["9999999999999999"]
+
+    def test_indexes_rebuilt_on_load(self):
+        repo = MockBankRepository()
+        repo.set_card_retained("1111111111111111", True)
+        repo2 = MockBankRepository()
+        assert repo2.get_retained_card_numbers() == ["1111111111111111"]
+        assert repo2.get_blocked_card_numbers() == ["9999999999999999"]
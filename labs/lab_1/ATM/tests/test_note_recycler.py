@@ -0,0 +1,65 @@
+import pytest
+
+from atm.cash_handling.cash_acceptor import CashAcceptor
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.cash_handling.note_recycler import NoteRecycler
+from atm.cash_management.cash_collector import CashCollector
+from atm.config import Config
+
+
+class TestNoteRecycler:
+    def test_recycles_below_fill_mark(self):
+        inv = CashInventory()
+        inv.set_count(100, 0)
+        recycler = NoteRecycler(max_fill=0.5)
+        half = Config.CASSETTE_CAPACITY // 2
+        assert recycler.recyclable(inv, 100) == half
+        placement = recycler.place(inv, {100: half + 7, 50: 3})
+        assert placement.recycled == {100: half, 50: 3}
+        assert placement.deposited == {100: 7}
+        assert placement.rejected == {}
+        assert inv.get_count(100) == half
+        assert inv.get_deposited() == {100: 7}
+
+    def test_not_recycled_denominations_go_to_deposit_bin(self):
+        inv = CashInventory()
+        before = inv.get_counts()
+        placement = NoteRecycler(denominations=(50,)).place(inv, {50: 2, 1000: 4})
+        assert placement.recycled == {50: 2}
+        assert placement.deposited == {1000: 4}
+        assert inv.get_count(1000) == before[1000]
+
+    def test_deposit_bin_overflow_and_refusal(self, monkeypatch):
+        monkeypatch.setattr(Config, "DEPOSIT_BIN_CAPACITY", 3)
+        monkeypatch.setattr(Config, "REJECT_BIN_CAPACITY", 2)
+        inv = CashInventory()
+        recycler = NoteRecycler(denominations=())
+        placement = recycler.place(inv, {100: 4, 200: 1})
+        assert placement.deposited == {100: 3}
+        assert placement.rejected == {100: 1, 200: 1}
+        with pytest.raises(ValueError, match="full"):
+            recycler.place(inv, {20: 1})
+        with pytest.raises(ValueError, match="Unsupported"):
+            recycler.place(inv, {30: 1})
+        assert inv.get_deposited() == {100: 3}
+
+    def test_availability_and_persistence(self):
+        inv = CashInventory()
+        inv.set_count(500, 10)
+        acc = CashAcceptor(inv, NoteRecycler(denominations=(20,)))
+        assert acc.accept({500: 2, 20: 5}) == 1100
+        view = CashInventory().availability()
+        assert view[500].dispensable == 10
+        assert view[500].deposit_bin == 2
+        assert view[500].total == 12
+        assert view[20].dispensable == inv.get_count(20)
+        assert CashCollector(inv).collect_deposit_bin() == {500: 2}
+        assert CashInventory().availability()[500].deposit_bin == 0
+
+    def test_recycled_notes_are_dispensable(self):
+        inv = CashInventory()
+        for denom in inv.get_counts():
+            inv.set_count(denom, 0)
+        assert not inv.can_dispense(300)
+        CashAcceptor(inv).accept({100: 3})
+        assert inv.dispense(300) == {100: 3}
@@ -0,0 +1,184 @@
+import sqlite3
+import threading
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_data import AccountData
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.bank_repository import VersionConflictError
+from atm.bank_communication.bank_server import BankServer
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.remote_bank_gateway import RemoteBankGateway
+from atm.bank_communication.sqlite_bank_repo import SqliteBankRepository
+from atm.config import Config
+
+CLIENT = "1234567890123456"
+OTHER = "1111111111111111"
+BLOCKED = "9999999999999999"
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def repo(request):
+    repo = MockBankRepository() if request.param == "json" else SqliteBankRepository()
+    yield repo
+    repo.close()
+
+
+def reopen(repo):
+    repo.close()
+    return MockBankRepository() if isinstance(repo, MockBankRepository) else SqliteBankRepository()
+
+
+class TestAccountVersions:
+    def test_negative_version_rejected(self):
+        with pytest.raises(ValueError):
+            AccountData(CLIENT, "hashed_pin_0000", Decimal("1"), version=-1)
+
+    def test_every_change_increments_version(self, repo):
+        assert repo.get_account(CLIENT).version == 0
+        repo.update_balance(CLIENT, Decimal("10"))
+        repo.change_pin(CLIENT, "4321")
+        repo.set_card_retained(CLIENT, True)
+        repo.collect_retained_cards([CLIENT])
+        repo.transfer(CLIENT, OTHER, Decimal("1"))
+        assert repo.get_account(CLIENT).version == 5
+        assert repo.get_account(OTHER).version == 1
+        assert reopen(repo).get_account(CLIENT).version == 5
+
+    def test_add_account_moves_version_forward(self, repo):
+        repo.update_balance(CLIENT, Decimal("10"))
+        repo.update_balance(CLIENT, Decimal("20"))
+        repo.add_account(AccountData(CLIENT, "hashed_pin_0000", Decimal("5")))
+        assert repo.get_account(CLIENT).version == 3
+        repo.add_accounts([AccountData("2222222222222222", "hashed_pin_0000", Decimal("5"))])
+        assert repo.get_account("2222222222222222").version == 1
+
+    def test_compare_and_set(self, repo):
+        version = repo.get_account(CLIENT).version
+        assert repo.update_balance(CLIENT, Decimal("7"), expected_version=version)
+        with pytest.raises(VersionConflictError) as info:
+            repo.update_balance(CLIENT, Decimal("8"), expected_version=version)
+        assert (info.value.expected, info.value.actual) == (version, version + 1)
+        with pytest.raises(VersionConflictError):
+            repo.change_pin(CLIENT, "1111", expected_version=version)
+        with pytest.raises(VersionConflictError):
+            repo.block_card(CLIENT, expected_version=version)
+        with pytest.raises(VersionConflictError):
+            repo.set_card_retained(CLIENT, True, expected_version=version)
+        account = repo.get_account(CLIENT)
+        assert account.balance == Decimal("7")
+        assert account.pin_hash == "hashed_pin_0000"
+        assert not account.is_blocked and not account.is_retained
+        assert not repo.update_balance("0000000000000000", Decimal("1"), expected_version=0)
+
+    def test_failed_save_keeps_version(self, monkeypatch):
+        repo = MockBankRepository()
+
+        def fail(self, store=None):
+            raise RuntimeError("disk full")
+        monkeypatch.setattr(MockBankRepository, "_save_accounts", fail)
+        with pytest.raises(RuntimeError):
+            repo.update_balance(CLIENT, Decimal("1"))
+        assert repo.get_account(CLIENT).version == 0
+
+    def test_journal_replay_keeps_version(self):
+        repo = MockBankRepository(journal=True)
+        repo.update_balance(CLIENT, Decimal("1"))
+        repo.update_balance(CLIENT, Decimal("2"))
+        repo.close()
+        assert MockBankRepository(journal=True).get_account(CLIENT).version == 2
+
+    def test_sqlite_database_without_version_column_migrated(self):
+        Config.ensure_data_dir()
+        conn = sqlite3.connect(str(Config.BANK_DB_FILE))
+        conn.execute(
+            "CREATE TABLE accounts (card_number TEXT PRIMARY KEY, pin_hash TEXT NOT NULL, "
+            "balance TEXT NOT NULL, is_blocked INTEGER NOT NULL DEFAULT 0, "
+            "is_retained INTEGER NOT NULL DEFAULT 0, owner_name TEXT, expiry_date TEXT) WITHOUT ROWID")
+        conn.execute("INSERT INTO accounts VALUES (?, 'hashed_pin_0000', '5', 0, 0, NULL, NULL)",
+                     (CLIENT,))
+        conn.commit()
+        conn.close()
+        repo = SqliteBankRepository()
+        assert repo.get_account(CLIENT).version == 0
+        assert repo.update_balance(CLIENT, Decimal("4"), expected_version=0)
+        assert repo.get_account(CLIENT).version == 1
+        repo.close()
+
+
+class TestOptimisticGateway:
+    def test_explicit_version_fails_fast(self):
+        gw = BankGateway(MockBankRepository(), cache_size=16)
+        version = gw.get_account(CLIENT).version
+        assert gw.withdraw(CLIENT, Decimal("100"), expected_version=version)
+        with pytest.raises(VersionConflictError):
+            gw.withdraw(CLIENT, Decimal("100"), expected_version=version)
+        with pytest.raises(VersionConflictError):
+            gw.deposit(CLIENT, Decimal("100"), expected_version=version)
+        assert gw.get_balance(CLIENT) == Decimal("9900")
+        assert not gw.withdraw(CLIENT, Decimal("100000"), expected_version=version + 1)
+
+    def test_optimistic_withdraw_retries_on_conflict(self, monkeypatch):
+        repo = MockBankRepository()
+        gw = BankGateway(repo, cache_size=0, optimistic=True)
+        original = MockBankRepository.update_balance
+        interfered = []
+
+        def update_balance(self, card_number, new_balance, expected_version=None):
+            if not interfered:
+                interfered.append(True)
+                original(self, card_number, Decimal("500"))
+            return original(self, card_number, new_balance, expected_version)
+        monkeypatch.setattr(MockBankRepository, "update_balance", update_balance)
+        assert gw.withdraw(CLIENT, Decimal("100"))
+        assert repo.get_account(CLIENT).balance == Decimal("400")
+        assert gw.cas_retries == 1
+
+    def test_optimistic_gives_up_after_max_retries(self, monkeypatch):
+        repo = MockBankRepository()
+        gw = BankGateway(repo, cache_size=0, optimistic=True)
+        original = MockBankRepository.update_balance
+
+        def update_balance(self, card_number, new_balance, expected_version=None):
+            original(self, card_number, Decimal("500"))
+            return original(self, card_number, new_balance, expected_version)
+        monkeypatch.setattr(MockBankRepository, "update_balance", update_balance)
+        with pytest.raises(VersionConflictError):
+            gw.deposit(CLIENT, Decimal("1"))
+        assert gw.cas_retries == Config.BANK_CAS_MAX_RETRIES
+
+    def test_optimistic_blocked_and_insufficient(self):
+        gw = BankGateway(MockBankRepository(), cache_size=0, optimistic=True)
+        assert not gw.withdraw(BLOCKED, Decimal("1"))
+        assert not gw.deposit(BLOCKED, Decimal("1"))
+        assert not gw.withdraw(CLIENT, Decimal("100000"))
+        assert not gw.withdraw("0000000000000000", Decimal("1"))
+
+    def test_concurrent_optimistic_withdrawals_not_lost(self):
+        gw = BankGateway(MockBankRepository(thread_safe=True), cache_size=0, optimistic=True)
+
+        def worker():
+            for _ in range(20):
+                assert gw.withdraw(CLIENT, Decimal("1"))
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert gw.get_balance(CLIENT) == Decimal("9840")
+
+    def test_conflict_reraised_by_remote_gateway(self):
+        server = BankServer(BankGateway(MockBankRepository(), cache_size=0), port=0)
+        server.start()
+        client = RemoteBankGateway(port=server.port)
+        try:
+            account = client.get_account(CLIENT)
+            assert account.version == 0
+            assert client.withdraw(CLIENT, Decimal("1"), account.version)
+            with pytest.raises(VersionConflictError) as info:
+                client.withdraw(CLIENT, Decimal("1"), account.version)
+            assert (info.value.card_number, info.value.actual) == (CLIENT, 1)
+        finally:
+            client.close()
+            server.stop()
@@ -0,0 +1,72 @@
+import multiprocessing
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+
+CLIENT = "1234567890123456"
+OTHER = "1111111111111111"
+
+
+def withdraw_many(count):
+    repo = MockBankRepository(shared=True)
+    gw = BankGateway(repo, cache_size=0)
+    for _ in range(count):
+        assert gw.withdraw(CLIENT, Decimal("1"))
+    repo.close()
+
+
+class TestSharedBankFile:
+    def test_changes_of_other_repository_visible(self):
+        a = MockBankRepository(shared=True)
+        b = MockBankRepository(shared=True)
+        gw_a = BankGateway(a, cache_size=0)
+        gw_b = BankGateway(b, cache_size=0)
+        assert gw_a.withdraw(CLIENT, Decimal("100"))
+        assert gw_b.get_balance(CLIENT) == Decimal("9900")
+        assert gw_b.deposit(OTHER, Decimal("1"))
+        assert gw_a.withdraw(CLIENT, Decimal("100"))
+        assert b.block_card("9999999999999999")
+        assert a.set_card_retained(OTHER, True)
+        assert b.get_retained_card_numbers() == [OTHER]
+        a.close()
+        b.close()
+        fresh = MockBankRepository()
+        assert fresh.get_account(CLIENT).balance == Decimal("9800")
+        assert fresh.get_account(OTHER).balance == Decimal("5001")
+
+    def test_reload_only_after_external_change(self, monkeypatch):
+        a = MockBankRepository(shared=True)
+        b = MockBankRepository(shared=True)
+        loads = []
+        original = MockBankRepository._load_accounts
+        monkeypatch.setattr(MockBankRepository, "_load_accounts",
+                            lambda self: loads.append(self) or original(self))
+        for _ in range(3):
+            b.get_account(CLIENT)
+            b.update_balance(CLIENT, Decimal("1"))
+        assert loads == []
+        a.update_balance(CLIENT, Decimal("2"))
+        assert b.get_account(CLIENT).balance == Decimal("2")
+        assert loads == [a, b]
+        a.close()
+        b.close()
+
+    def test_journal_mode_rejected(self):
+        with pytest.raises(ValueError):
+            MockBankRepository(journal=True, shared=True)
+
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                        reason="needs fork start method")
+    def test_processes_do_not_lose_updates(self):
+        MockBankRepository().close()
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=withdraw_many, args=(25,)) for _ in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        assert all(p.exitcode == 0 for p in procs)
+        assert MockBankRepository().get_account(CLIENT).balance == Decimal("9900")
@@ -0,0 +1,160 @@
+import json
+import threading
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.account_operation import AccountOperation, OperationType
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.sqlite_bank_repo import SqliteBankRepository
+
+
+class TestSqliteBankRepository:
+    def test_seed_created_when_empty(self):
+        repo = SqliteBankRepository()
+        accounts = repo.get_all_accounts()
+        assert len(accounts) == 5
+        assert accounts["9999999999999999"].is_blocked is True
+
+    def test_imports_existing_json(self, temp_data_dir):
+        json_repo = MockBankRepository()
+        json_repo.update_balance("1234567890123456", Decimal("123.45"))
+        repo = SqliteBankRepository()
+        assert repo.get_account("1234567890123456").balance == Decimal("123.45")
+
+    def test_import_json_skips_invalid(self, temp_data_dir):
+        path = temp_data_dir / "other.json"
+        path.write_text(json.dumps({
+            "1": {"card_number": "1", "pin_hash": "h", "balance": "0", "is_blocked": False},
+            "2222222222222222": {
+                "card_number": "2222222222222222", "pin_hash": "hashed_pin_1",
+                "balance": "5", "is_blocked": False,
+            },
+        }), encoding="utf-8")
+        repo = SqliteBankRepository()
+        assert repo.import_json(path) == 1
+        assert repo.get_account("2222222222222222").balance == Decimal("5")
+
+    def test_update_balance_and_blocked(self):
+        repo = SqliteBankRepository()
+        assert repo.update_balance("1234567890123456", Decimal("1")) is True
+        assert repo.get_account("1234567890123456").balance == Decimal("1")
+        assert repo.update_balance("9999999999999999", Decimal("1")) is False
+        assert repo.update_balance("0000000000000000", Decimal("1")) is False
+
+    def test_pin(self):
+        repo = SqliteBankRepository()
+        assert repo.validate_pin("1234567890123456", "0000") is True
+        assert repo.change_pin("1234567890123456", "4321") is True
+        assert repo.validate_pin("1234567890123456", "4321") is True
+        assert repo.change_pin("9999999999999999", "4321") is False
+
+    def test_transfer(self):
+        repo = SqliteBankRepository()
+        assert repo.transfer("1234567890123456", "1111111111111111", Decimal("100")) is True
+        assert repo.get_account("1234567890123456").balance == Decimal("9900")
+        assert repo.get_account("1111111111111111").balance == Decimal("5100")
+        assert repo.transfer("1234567890123456", "1111111111111111", Decimal("99999")) is False
+        assert repo.transfer("1234567890123456", "9999999999999999", Decimal("1")) is False
+
+    def test_retained_cards(self):
+        repo = SqliteBankRepository()
+        assert repo.get_retained_card_numbers() == []
+        repo.set_card_retained("1234567890123456", True)
+        repo.block_card("1234567890123456")
+        assert repo.get_retained_card_numbers() == ["1234567890123456"]
+        assert repo.count_retained() == 1
+        assert set(repo.get_blocked_card_numbers()) == {"1234567890123456", "9999999999999999"}
+        assert repo.is_card_blocked("1234567890123456") is True
+        repo.collect_retained_cards(["1234567890123456"])
+        acc = repo.get_account("1234567890123456")
+        assert acc.is_retained is False
+        assert acc.is_blocked is False
+
+    def test_persistence(self):
+        repo = SqliteBankRepository()
+        repo.update_balance("1234567890123456", Decimal("77"))
+        repo.close()
+        assert SqliteBankRepository().get_account(
+            "1234567890123456").balance == Decimal("77")
+
+    def test_balances_stored_in_whole_cents(self):
+        card = "1111111111111111"
+        repo = SqliteBankRepository()
+        assert repo.adjust_balance(card, Decimal("0.10"))
+        repo.apply_batch([AccountOperation(OperationType.ADJUST_BALANCE, card, Decimal("0.20"))])
+        stored = repo._conn.execute("SELECT balance FROM accounts WHERE card_number = ?", (card,)).fetchone()
+        assert stored[0] == str(MockBankRepository().get_account(card).balance + Decimal("0.3"))
+        with pytest.raises(ValueError):
+            repo.adjust_balance(card, Decimal("0.001"))
+        with pytest.raises(ValueError):
+            repo.update_balance(card, Decimal("1.005"))
+        with pytest.raises(ValueError):
+            repo.apply_batch([AccountOperation(OperationType.SET_BALANCE, card, Decimal("1.005"))])
+        assert repo.get_account(card).balance == Decimal("5000.30")
+        repo.close()
+
+    def test_adjust_balance(self):
+        repo = SqliteBankRepository()
+        assert repo.adjust_balance("1111111111111111", Decimal("-0.01")) is True
+        assert repo.get_account("1111111111111111").balance == Decimal("4999.99")
+        assert repo.adjust_balance("1111111111111111", Decimal("-5000")) is False
+        assert repo.adjust_balance("9999999999999999", Decimal("1")) is False
+        assert repo.adjust_balance("0000000000000000", Decimal("1")) is False
+        repo.close()
+
+    def test_deposit_racing_with_another_process_is_not_lost(self):
+        card = "1111111111111111"
+        other = SqliteBankRepository()
+        """A second connection stands for another ATM process on the same database."""
+
+        class RacingRepo(SqliteBankRepository):
+            race = True
+
+            def get_account(self, card_number):
+                account = super().get_account(card_number)
+                if self.race:
+                    self.race = False
+                    other.adjust_balance(card_number, Decimal("1"))
+                return account
+
+        repo = RacingRepo()
+        assert BankGateway(repo, cache_size=0).deposit(card, Decimal("10"))
+        raced = not repo.race
+        assert other.get_account(card).balance == Decimal("5010") + raced
+        repo.close()
+        other.close()
+
+    def test_threads_share_connection(self):
+        repo = SqliteBankRepository()
+        gw = BankGateway(repo, cache_size=0)
+
+        def work():
+            for _ in range(100):
+                assert gw.deposit("1111111111111111", Decimal("1"))
+                assert gw.transfer("1111111111111111", "1234567890123456", Decimal("1"))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert repo.get_account("1111111111111111").balance == Decimal("5000")
+        assert repo.get_account("1234567890123456").balance == Decimal("10400")
+        repo.close()
+
+
+class TestBankGatewayBackend:
+    def test_sqlite_backend_from_config(self, monkeypatch):
+        from atm.config import Config
+        monkeypatch.setattr(Config, "BANK_BACKEND", "sqlite")
+        gw = BankGateway()
+        assert gw.withdraw("1234567890123456", Decimal("100")) is True
+        assert gw.get_balance("1234567890123456") == Decimal("9900")
+
+    def test_unknown_backend(self, monkeypatch):
+        from atm.config import Config
+        monkeypatch.setattr(Config, "BANK_BACKEND", "paper")
+        with pytest.raises(ValueError):
+            BankGateway()
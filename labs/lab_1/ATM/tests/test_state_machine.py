@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock
+
 from atm.session_manager.state import State
 from atm.session_manager.atm_state_machine import (
     ATMStateMachine,
@@ -9,6 +11,11 @@ from atm.session_manager.atm_state_machine import (
     SessionEndingState,
 )
 from atm.atm import ATM
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.cash_handling.cash_dispenser import CashDispenser
+from atm.cash_handling.cash_inventory import CashInventory
+from atm.config import Config
 
 
 class TestATMStateMachine:
@@ -22,3 +29,49 @@ class TestATMStateMachine:
         new_state = CardInsertedState(fsm)
         fsm.change_state(new_state)
         assert fsm.current_state.__class__.__name__ == "CardInsertedState"
+
+
+class TestWithdrawalState:
+    def make_context(self, *inputs):
+        atm = MagicMock()
+        atm.cash_inventory = CashInventory()
+        for denom in atm.cash_inventory.get_counts():
+            atm.cash_inventory.set_count(denom, 0)
+        atm.cash_inventory.set_count(500, 2)
+        atm.cash_dispenser = CashDispenser(atm.cash_inventory)
+        atm.bank_gateway = BankGateway(MockBankRepository(), cache_size=0)
+        atm.card_reader.get_current_card.return_value.number = "1234567890123456"
+        atm.read_line_with_timeout.side_effect = list(inputs)
+        context = MagicMock()
+        context.atm = atm
+        return context
+
+    def messages(self, context):
+        return [c.args[0] for c in context.atm.display.show_message.call_args_list]
+
+    def test_suggests_dispensable_amounts(self):
+        context = self.make_context("700", "n", "")
+        WithdrawalState(context).handle()
+        messages = self.messages(context)
+        assert messages[0] == "Fast cash: 1) 500  2) 1000"
+        assert messages[1] == "Cannot dispense 700 with the notes available. Nearest: 500, maximum: 1000."
+        assert context.atm.bank_gateway.get_balance("1234567890123456") == 10000
+
+    def test_fast_cash_preset(self):
+        context = self.make_context("2", "n", "")
+        WithdrawalState(context).handle()
+        assert context.atm.bank_gateway.get_balance("1234567890123456") == 9000
+        assert context.atm.cash_inventory.get_count(500) == 0
+
+    def test_dispenser_failure_reverses_debit(self):
+        context = self.make_context("1000", "n", "")
+        context.atm.cash_dispenser = MagicMock()
+        context.atm.cash_dispenser.dispense.side_effect = ValueError("Jammed")
+        WithdrawalState(context).handle()
+        assert context.atm.bank_gateway.get_balance("1234567890123456") == 10000
+        assert self.messages(context)[-1] == "Jammed"
+
+    def test_non_numeric_amount(self):
+        context = self.make_context("abc", "n", "")
+        WithdrawalState(context).handle()
+        assert self.messages(context)[-1] == Config.MSG_INVALID_AMOUNT
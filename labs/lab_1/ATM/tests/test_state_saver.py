@@ -16,3 +16,69 @@ class TestStateSaver:
         saver = StateSaver()
         loaded = saver.load()
         assert loaded == {}
+
+    def test_load_is_cached(self, temp_data_dir):
+        saver = StateSaver()
+        saver.save({"a": 1})
+        saver.file_path.write_text('{"a": 2}', encoding="utf-8")
+        assert saver.load() == {"a": 1}
+        assert StateSaver().load() == {"a": 2}
+
+    def test_update_rewrites_only_own_section(self, temp_data_dir):
+        saver = StateSaver()
+        saver.save({"other": {"x": [1, 2]}, "cash_inventory": {"100": 5}})
+        saver.update("cash_inventory", {"100": 4})
+        assert StateSaver().load() == {"other": {"x": [1, 2]}, "cash_inventory": {"100": 4}}
+        assert saver.section("cash_inventory") == {"100": 4}
+        assert saver.writes == 2
+        assert not saver.dirty
+        assert list(temp_data_dir.glob("*.tmp")) == []
+
+    def test_flush_interval_coalesces_writes(self, temp_data_dir):
+        now = [0.0]
+        saver = StateSaver(flush_interval=1.0, clock=lambda: now[0])
+        saver.update("cash_inventory", {"100": 1})
+        for count in range(2, 6):
+            saver.update("cash_inventory", {"100": count})
+        assert saver.writes == 1
+        assert saver.dirty
+        assert StateSaver().section("cash_inventory") == {"100": 1}
+        now[0] = 1.5
+        saver.update("cash_inventory", {"100": 6})
+        assert saver.writes == 2
+        saver.update("cash_inventory", {"100": 7})
+        saver.close()
+        assert saver.writes == 3
+        assert StateSaver().section("cash_inventory") == {"100": 7}
+
+    def test_failed_write_keeps_file_and_changes(self, temp_data_dir, monkeypatch):
+        saver = StateSaver()
+        saver.save({"cash_inventory": {"100": 5}})
+
+        def fail(src, dst):
+            raise OSError("disk full")
+
+        with monkeypatch.context() as m:
+            m.setattr("atm.session_manager.state_saver.os.replace", fail)
+            with pytest.raises(RuntimeError):
+                saver.update("cash_inventory", {"100": 4})
+        assert StateSaver().section("cash_inventory") == {"100": 5}
+        assert list(saver.file_path.parent.glob("*.tmp")) == []
+        assert saver.dirty
+        saver.flush()
+        assert StateSaver().section("cash_inventory") == {"100": 4}
+
+    def test_invalid_json_raises(self, temp_data_dir):
+        saver = StateSaver()
+        saver.file_path.write_text("{", encoding="utf-8")
+        with pytest.raises(RuntimeError):
+            saver.load()
+
+    def test_cash_operation_is_one_write(self, temp_data_dir):
+        from atm.cash_handling.cash_inventory import CashInventory
+
+        inv = CashInventory()
+        writes = inv._saver.writes
+        inv.dispense(300)
+        assert inv._saver.writes == writes + 1
+        assert CashInventory().get_counts() == inv.get_counts()
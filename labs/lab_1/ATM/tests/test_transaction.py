@@ -42,6 +42,7 @@ class TestWithdrawalTransaction:
         card = MagicMock()
         card.number = "1234567890123456"
         atm.card_reader.get_current_card.return_value = card
+        atm.bank_gateway.get_remaining_withdrawal_limit.return_value = None
         atm.bank_gateway.withdraw.return_value = True
         t = WithdrawalTransaction(atm, Decimal("200"))
         assert t.execute() is True
@@ -52,10 +53,22 @@ class TestWithdrawalTransaction:
         card = MagicMock()
         card.number = "1234567890123456"
         atm.card_reader.get_current_card.return_value = card
+        atm.bank_gateway.get_remaining_withdrawal_limit.return_value = None
         atm.bank_gateway.withdraw.return_value = False
         t = WithdrawalTransaction(atm, Decimal("100"))
         assert t.execute() is False
 
+    def test_execute_daily_limit_exceeded(self):
+        atm = MagicMock()
+        card = MagicMock()
+        card.number = "1234567890123456"
+        atm.card_reader.get_current_card.return_value = card
+        atm.bank_gateway.get_remaining_withdrawal_limit.return_value = Decimal("100")
+        t = WithdrawalTransaction(atm, Decimal("200"))
+        assert t.execute() is False
+        assert "limit" in t.error_message
+        atm.bank_gateway.withdraw.assert_not_called()
+
 
 class TestBalanceInquiryTransaction:
     def test_execute_success(self):
@@ -0,0 +1,165 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+from atm.bank_communication.bank_gateway import BankGateway
+from atm.bank_communication.mock_bank_repo import MockBankRepository
+from atm.bank_communication.withdrawal_limits import WithdrawalLimits
+from atm.config import Config
+
+CLIENT = "1234567890123456"
+OTHER = "1111111111111111"
+HOUR = 3600.0
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000 * HOUR):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def failing_replace(src, dst):
+    raise OSError("disk full")
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestWithdrawalLimits:
+    def test_limit_enforced(self, clock):
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        assert limits.try_consume(CLIENT, Decimal("600"))
+        assert not limits.try_consume(CLIENT, Decimal("500"))
+        assert limits.try_consume(CLIENT, Decimal("400"))
+        assert limits.remaining(CLIENT) == Decimal("0")
+        assert limits.remaining(OTHER) == Decimal("1000")
+        assert not limits.try_consume(OTHER, Decimal("1001"))
+        assert limits.active_cards() == 1
+
+    def test_window_rolls_by_hour(self, clock):
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        limits.try_consume(CLIENT, Decimal("700"))
+        clock.now += 5 * HOUR
+        limits.try_consume(CLIENT, Decimal("300"))
+        clock.now += 18 * HOUR
+        assert limits.withdrawn(CLIENT) == Decimal("1000")
+        clock.now += HOUR
+        assert limits.withdrawn(CLIENT) == Decimal("300")
+        clock.now += 5 * HOUR
+        assert limits.withdrawn(CLIENT) == Decimal("0")
+
+    def test_release(self, clock):
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        limits.try_consume(CLIENT, Decimal("400"))
+        clock.now += HOUR
+        limits.try_consume(CLIENT, Decimal("100"))
+        limits.release(CLIENT, Decimal("300"))
+        assert limits.withdrawn(CLIENT) == Decimal("200")
+        limits.release(OTHER, Decimal("1"))
+        assert limits.withdrawn(OTHER) == Decimal("0")
+
+    def test_idle_slots_recycled(self, clock):
+        limits = WithdrawalLimits(Decimal("1000"), persist=False, clock=clock)
+        for i in range(100):
+            limits.try_consume(f"{i:016d}", Decimal("1"))
+        clock.now += 24 * HOUR
+        assert limits.active_cards() == 0
+        for i in range(100, 200):
+            limits.try_consume(f"{i:016d}", Decimal("1"))
+        assert limits.active_cards() == 100
+        assert len(limits._keys) == 100
+        assert limits.withdrawn("0000000000000150") == Decimal("1")
+
+    def test_counters_survive_restart(self, clock):
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        limits.try_consume(CLIENT, Decimal("600"))
+        clock.now += 2 * HOUR
+        limits.try_consume(CLIENT, Decimal("100"))
+        limits.release(CLIENT, Decimal("50"))
+        limits.close()
+        reopened = WithdrawalLimits(Decimal("1000"), clock=clock)
+        assert reopened.withdrawn(CLIENT) == Decimal("650")
+        clock.now += 23 * HOUR
+        reopened.close()
+        assert WithdrawalLimits(Decimal("1000"), clock=clock).withdrawn(CLIENT) == Decimal("50")
+
+    def test_torn_last_line_ignored(self, clock):
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        limits.try_consume(CLIENT, Decimal("100"))
+        limits.close()
+        with open(Config.WITHDRAWAL_LIMITS_FILE, "ab") as f:
+            f.write(b"1234567890123456 100")
+        assert WithdrawalLimits(Decimal("1000"), clock=clock).withdrawn(CLIENT) == Decimal("100")
+
+    def test_write_after_cut_off_amount_survives_restart(self, clock):
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        limits.try_consume(CLIENT, Decimal("100"))
+        limits.close()
+        with open(Config.WITHDRAWAL_LIMITS_FILE, "ab") as f:
+            f.write(f"{CLIENT} {int(clock.now // HOUR)} 50".encode("ascii"))
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        assert limits.withdrawn(CLIENT) == Decimal("100")
+        limits.try_consume(CLIENT, Decimal("300"))
+        limits.close()
+        assert WithdrawalLimits(Decimal("1000"), clock=clock).withdrawn(CLIENT) == Decimal("400")
+
+    def test_log_compacted(self, clock, monkeypatch):
+        monkeypatch.setattr(Config, "WITHDRAWAL_LIMIT_COMPACT_RECORDS", 10)
+        limits = WithdrawalLimits(Decimal("100000"), clock=clock)
+        for _ in range(25):
+            limits.try_consume(CLIENT, Decimal("10"))
+            limits.try_consume(OTHER, Decimal("1"))
+        limits.close()
+        assert len(Config.WITHDRAWAL_LIMITS_FILE.read_bytes().splitlines()) < 10
+        reopened = WithdrawalLimits(Decimal("100000"), clock=clock)
+        assert reopened.withdrawn(CLIENT) == Decimal("250")
+        assert reopened.withdrawn(OTHER) == Decimal("25")
+
+
+    def test_failed_compaction_keeps_logging(self, clock, monkeypatch):
+        monkeypatch.setattr(Config, "WITHDRAWAL_LIMIT_COMPACT_RECORDS", 2)
+        limits = WithdrawalLimits(Decimal("1000"), clock=clock)
+        limits.try_consume(CLIENT, Decimal("100"))
+        with monkeypatch.context() as m:
+            m.setattr(os, "replace", failing_replace)
+            with pytest.raises(RuntimeError, match="compact"):
+                limits.try_consume(CLIENT, Decimal("100"))
+        limits.try_consume(CLIENT, Decimal("100"))
+        limits.close()
+        assert WithdrawalLimits(Decimal("1000"), clock=clock).withdrawn(CLIENT) == Decimal("300")
+
+class TestGatewayDailyLimit:
+    def make_gateway(self, clock):
+        return BankGateway(MockBankRepository(), cache_size=0,
+                           withdrawal_limits=WithdrawalLimits(Decimal("1000"), clock=clock))
+
+    def test_withdraw_over_limit_rejected(self, clock):
+        gw = self.make_gateway(clock)
+        assert gw.withdraw(CLIENT, Decimal("800"))
+        assert gw.get_remaining_withdrawal_limit(CLIENT) == Decimal("200")
+        assert not gw.withdraw(CLIENT, Decimal("300"))
+        assert gw.get_balance(CLIENT) == Decimal("9200")
+        clock.now += 24 * HOUR
+        assert gw.withdraw(CLIENT, Decimal("300"))
+
+    def test_only_cash_withdrawals_counted(self, clock):
+        gw = self.make_gateway(clock)
+        assert gw.withdraw(CLIENT, Decimal("2000"), operation="payment")
+        assert not gw.withdraw(OTHER, Decimal("900000"))
+        assert gw.get_remaining_withdrawal_limit(OTHER) == Decimal("1000")
+        assert gw.withdraw(CLIENT, Decimal("1000"))
+        assert gw.deposit(CLIENT, Decimal("400"), operation="withdraw_reversal")
+        assert gw.get_remaining_withdrawal_limit(CLIENT) == Decimal("400")
+
+    def test_limit_survives_gateway_restart(self, clock):
+        assert self.make_gateway(clock).withdraw(CLIENT, Decimal("900"))
+        assert not self.make_gateway(clock).withdraw(CLIENT, Decimal("200"))
+
+    def test_default_limit_from_config(self):
+        gw = BankGateway(MockBankRepository(), cache_size=0)
+        assert gw.get_remaining_withdrawal_limit(CLIENT) == Decimal(Config.MAX_WITHDRAW_AMOUNT_PER_DAY)